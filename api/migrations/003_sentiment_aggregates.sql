@@ -0,0 +1,32 @@
+-- Migration 003: Incrementally maintained per-coin sentiment aggregates
+-- Created: 2026-10-18
+-- Description: Replace the coin_sentiment_summary materialized view with a table
+-- updated by the ingest batch (add) and the expiry job (subtract)
+
+-- ============================================
+-- COIN SENTIMENT AGGREGATES TABLE
+-- ============================================
+CREATE TABLE IF NOT EXISTS coin_sentiment_aggregates (
+    coin_symbol VARCHAR(20) PRIMARY KEY,
+    article_count INTEGER NOT NULL DEFAULT 0,
+    sentiment_sum NUMERIC NOT NULL DEFAULT 0,
+    positive_count INTEGER NOT NULL DEFAULT 0,
+    negative_count INTEGER NOT NULL DEFAULT 0,
+    neutral_count INTEGER NOT NULL DEFAULT 0,
+    -- 201 bins of width 0.01 over [-1, 1] (see services/sentiment_sketch.py)
+    sentiment_histogram INTEGER[] NOT NULL,
+    latest_article TIMESTAMP WITH TIME ZONE,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_coin_sentiment_agg_count
+    ON coin_sentiment_aggregates(article_count DESC);
+
+-- Tracks which articles are currently counted, so expiry subtracts exactly once
+ALTER TABLE news_articles ADD COLUMN IF NOT EXISTS in_aggregate BOOLEAN NOT NULL DEFAULT FALSE;
+
+CREATE INDEX IF NOT EXISTS idx_articles_in_aggregate
+    ON news_articles(expires_at) WHERE in_aggregate = TRUE;
+
+-- The materialized view is superseded by coin_sentiment_aggregates
+DROP MATERIALIZED VIEW IF EXISTS coin_sentiment_summary;
@@ -0,0 +1,16 @@
+-- Migration 004: Time-bucketed per-coin sentiment series
+-- Created: 2026-10-18
+-- Description: Per-coin sentiment sums bucketed by publish time, written by the
+-- ingest batch and read by /api/news/series with a single range scan
+
+CREATE TABLE IF NOT EXISTS coin_sentiment_buckets (
+    bucket_interval VARCHAR(5) NOT NULL,
+    coin_symbol VARCHAR(20) NOT NULL,
+    bucket_start TIMESTAMP WITH TIME ZONE NOT NULL,
+    article_count INTEGER NOT NULL DEFAULT 0,
+    sentiment_sum NUMERIC NOT NULL DEFAULT 0,
+    positive_count INTEGER NOT NULL DEFAULT 0,
+    negative_count INTEGER NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    PRIMARY KEY (bucket_interval, coin_symbol, bucket_start)
+);
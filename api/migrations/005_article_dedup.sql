@@ -0,0 +1,9 @@
+-- Migration 005: Near-duplicate article linking
+-- Created: 2026-10-18
+-- Description: Syndicated copies of a story are stored without sentiment/coins
+-- and point at the first copy seen (see services/dedup_index.py)
+
+ALTER TABLE news_articles ADD COLUMN IF NOT EXISTS canonical_article_id VARCHAR(255);
+
+CREATE INDEX IF NOT EXISTS idx_articles_canonical
+    ON news_articles(canonical_article_id) WHERE canonical_article_id IS NOT NULL;
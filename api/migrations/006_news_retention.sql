@@ -0,0 +1,7 @@
+-- Migration 006: Indexes for the news retention purge
+-- Created: 2026-10-18
+-- Description: Let services/news_retention.py find purge batches and old
+-- sentiment buckets with index range scans instead of sequential scans
+
+CREATE INDEX IF NOT EXISTS idx_articles_fetched ON news_articles(fetched_at);
+CREATE INDEX IF NOT EXISTS idx_sentiment_buckets_start ON coin_sentiment_buckets(bucket_start);
@@ -64,6 +64,8 @@ async def lifespan(app):
 
         # Initialize news service
         news_service = NewsService(db)
+        await news_service.rebuild_sentiment_aggregates()
+        await news_service.warm_dedup_index()
         logger.info("News service initialized")
 
         # Start scheduler
@@ -72,7 +74,6 @@ async def lifespan(app):
 
         # Initial fetch on startup
         await news_service.fetch_active_sources()
-        await news_service.refresh_materialized_view()
 
     except Exception as e:
         logger.error(f"Failed to initialize services: {e}")
@@ -42,8 +42,27 @@ class CoinSummary(BaseModel):
     coin_symbol: str
     article_count: int
     average_sentiment: float
+    median_sentiment: Optional[float] = None
     sentiment_label: str
-    latest_article: datetime
+    positive_count: int = 0
+    negative_count: int = 0
+    neutral_count: int = 0
+    latest_article: Optional[datetime]
+
+
+class SentimentBucket(BaseModel):
+    bucket_start: datetime
+    article_count: int
+    average_sentiment: Optional[float]
+    rolling_sentiment: Optional[float]
+    positive_count: int
+    negative_count: int
+
+
+class SentimentSeriesResponse(BaseModel):
+    coin: str
+    interval: str
+    buckets: List[SentimentBucket]
 
 
 class NewsArticleResponse(BaseModel):
@@ -87,9 +106,18 @@ class CacheStats(BaseModel):
     next_expiry: Optional[datetime]
 
 
+class DedupStats(BaseModel):
+    entries: int
+    lookups: int
+    duplicates: int
+    threshold: float
+    window_hours: float
+
+
 class SystemStatusResponse(BaseModel):
     failover: FailoverStatus
     cache_stats: CacheStats
+    dedup: Optional[DedupStats] = None
 
 
 class RefreshResponse(BaseModel):
@@ -8,8 +8,9 @@ from datetime import datetime
 
 # Import utilities with fallback for both relative and absolute imports
 try:
-    from ..utils.date_utils import convert_date_format, timestamp_to_iso
-    from ..utils.price_validation import validate_price_data, PriceValidationError
+    from ..utils.candles import CandleFrame
+    from ..utils.date_utils import convert_date_format
+    from ..utils.price_validation import validate_candles, PriceValidationError
     from ..utils.crypto_utils import generate_signature, get_timestamp
     from ..models.api_models import (
         PriceResponse,
@@ -20,8 +21,9 @@ try:
     )
     from ..models.settings import settings
 except ImportError:
-    from utils.date_utils import convert_date_format, timestamp_to_iso
-    from utils.price_validation import validate_price_data
+    from utils.candles import CandleFrame
+    from utils.date_utils import convert_date_format
+    from utils.price_validation import validate_candles
     from utils.crypto_utils import generate_signature, get_timestamp
     from models.api_models import (
         PriceResponse,
@@ -146,31 +148,11 @@ async def get_binance_price(
             )
 
             if response.status_code == 200:
-                data = response.json()
-
-                # Transform the response to a more user-friendly format
-                transformed_data = []
-                for kline in data:
-                    transformed_data.append(
-                        {
-                            "open_time": timestamp_to_iso(kline[0]),
-                            "open_price": float(kline[1]),
-                            "high_price": float(kline[2]),
-                            "low_price": float(kline[3]),
-                            "close_price": float(kline[4]),
-                            "volume": float(kline[5]),
-                            "close_time": timestamp_to_iso(kline[6]),
-                            "quote_asset_volume": float(kline[7]),
-                            "number_of_trades": int(kline[8]),
-                            "taker_buy_base_asset_volume": float(kline[9]),
-                            "taker_buy_quote_asset_volume": float(kline[10]),
-                            "ignore": kline[11],
-                        }
-                    )
+                candles = CandleFrame.from_rows(response.json())
 
                 # Validate price data
-                validation_errors = validate_price_data(
-                    transformed_data,
+                validation_errors = validate_candles(
+                    candles,
                     interval.value,
                     skip_volume_validation=skip_volume_validation,
                     skip_time_validation=skip_time_validation,
@@ -192,8 +174,8 @@ async def get_binance_price(
 
                 return PriceResponse(
                     symbol=symbol,
-                    data=transformed_data,
-                    count=len(transformed_data),
+                    data=candles.to_price_points(),
+                    count=len(candles),
                 )
             else:
                 error_detail = f"Binance API error: {response.status_code}"
@@ -1,8 +1,9 @@
 """Technical indicators API routes."""
 
 from fastapi import APIRouter, HTTPException, Query, Depends
-from typing import List, Tuple
+from typing import Tuple
 import httpx
+import numpy as np
 import os
 import logging
 
@@ -10,6 +11,7 @@ import logging
 try:
     from ..utils.date_utils import convert_date_format, timestamp_to_iso
     from ..utils.indicators import TechnicalIndicators
+    from ..utils.candles import CandleFrame
     from ..models.api_models import (
         PriceRequest,
         PriceResponse,
@@ -33,6 +35,7 @@ try:
 except ImportError:
     from utils.date_utils import convert_date_format, timestamp_to_iso
     from utils.indicators import TechnicalIndicators
+    from utils.candles import CandleFrame
     from models.api_models import (
         PriceRequest,
         PriceResponse,
@@ -117,7 +120,7 @@ async def get_binance_api_key() -> str:
 
 async def get_price_data(
     symbol: str, interval: str, limit: int, api_key: str
-) -> Tuple[List[float], int]:
+) -> Tuple[np.ndarray, int]:
     """
     Fetch price data from Binance API and extract closing prices.
 
@@ -149,15 +152,11 @@ async def get_price_data(
             )
 
             if response.status_code == 200:
-                data = response.json()
+                candles = CandleFrame.from_bytes(response.content)
 
-                # Extract closing prices and timestamps
-                closing_prices = []
-                last_timestamp = None
-                for kline in data:
-                    closing_prices.append(float(kline[4]))  # Close price is at index 4
-                    if last_timestamp is None:
-                        last_timestamp = int(kline[0])  # Open time is at index 0
+                # Closing prices, and the open time of the first candle
+                closing_prices = candles.close
+                last_timestamp = int(candles.open_time[0]) if len(candles) else None
 
                 return closing_prices, last_timestamp
             else:
@@ -262,7 +261,7 @@ async def get_technical_analysis(
         )
 
         # Get current price
-        current_price = closing_prices[-1]
+        current_price = float(closing_prices[-1])
 
         # Calculate SMA based on interval
         sma_windows = get_sma_windows(interval)
@@ -379,7 +378,7 @@ async def get_sma_indicator(
         # Calculate SMA based on interval
         sma_windows = get_sma_windows(interval)
         sma_values = TechnicalIndicators.calculate_sma(closing_prices, sma_windows)
-        current_price = closing_prices[-1]
+        current_price = float(closing_prices[-1])
         sma_signal = TechnicalIndicators.generate_sma_signal(current_price, sma_values)
 
         return SMAResult(
@@ -451,7 +450,7 @@ async def get_ema_indicator(
         # Calculate EMA based on interval
         ema_windows = get_ema_windows(interval)
         ema_values = TechnicalIndicators.calculate_emas(closing_prices, ema_windows)
-        current_price = closing_prices[-1]
+        current_price = float(closing_prices[-1])
         ema_signal = TechnicalIndicators.generate_ema_signal(current_price, ema_values)
 
         return EMAResult(
@@ -529,7 +528,7 @@ async def get_single_indicator(
         TechnicalIndicators.validate_price_data(closing_prices, min_candles=30)
 
         # Get current price
-        current_price = closing_prices[-1]
+        current_price = float(closing_prices[-1])
 
         # Calculate indicator
         if indicator_name == "rsi":
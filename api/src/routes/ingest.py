@@ -9,6 +9,7 @@ try:
         SMAResult,
         EMAResult,
     )
+    from ..utils.candles import CandleFrame
     from ..utils.indicators import TechnicalIndicators
 except ImportError:
     from models.ingest_models import (
@@ -19,6 +20,7 @@ except ImportError:
         SMAResult,
         EMAResult,
     )
+    from utils.candles import CandleFrame
     from utils.indicators import TechnicalIndicators
 from datetime import datetime
 import logging
@@ -88,10 +90,10 @@ async def analyze_n8n_data(request: IngestRequest):
         if not klines:
             raise HTTPException(status_code=400, detail="No kline data provided")
 
-        # Convert close prices to float (n8n sends strings)
+        # Convert to columns (n8n sends prices as strings)
         # Sort by closeTime just in case, though n8n usually sends sorted
-        sorted_klines = sorted(klines, key=lambda k: k.closeTime)
-        prices = [float(k.close) for k in sorted_klines]
+        candles = CandleFrame.from_n8n(klines).sort()
+        prices = candles.close
 
         # Get parameters
         params = request.parameters
@@ -112,7 +114,7 @@ async def analyze_n8n_data(request: IngestRequest):
         )
 
         # Get current price
-        current_price = prices[-1]
+        current_price = float(prices[-1])
 
         # Calculate SMA based on interval, filtering out windows larger than available data
         sma_values = {}
@@ -146,7 +148,7 @@ async def analyze_n8n_data(request: IngestRequest):
         recommendation = TechnicalIndicators.generate_overall_recommendation(
             rsi_signal, macd_signal_type, macd_crossover
         )
-        last_close_time_ms = sorted_klines[-1].closeTime
+        last_close_time_ms = int(candles.close_time[-1])
         analysis_timestamp = datetime.fromtimestamp(last_close_time_ms / 1000.0)
 
         sma_result = None
@@ -8,6 +8,7 @@ from models.news_models import (
     NewsArticleResponse,
     RefreshResponse,
     SentimentResponse,
+    SentimentSeriesResponse,
     SourceInfo,
     SystemStatusResponse,
 )
@@ -53,6 +54,33 @@ async def get_all_sentiment(
     return await news_service.get_all_coins_sentiment(min_articles)
 
 
+@router.get("/series", response_model=list[SentimentSeriesResponse])
+async def get_sentiment_series(
+    coins: str = Query(..., description="Comma-separated coin symbols, e.g. BTC,ETH"),
+    interval: str = Query(default="1h", description="Bucket size: 15m, 1h or 4h"),
+    limit: int = Query(default=24, ge=1, le=500),
+    half_life: float = Query(default=6, gt=0, le=96),
+    news_service: NewsService = Depends(get_news_service),
+):
+    """
+    Get the last `limit` sentiment buckets per coin with a time-decayed rolling value.
+
+    `half_life` is expressed in buckets.
+    """
+    symbols = [c.strip() for c in coins.split(",") if c.strip()]
+    if not symbols:
+        raise HTTPException(status_code=400, detail="At least one coin is required")
+    if len(symbols) > 50:
+        raise HTTPException(status_code=400, detail="At most 50 coins per request")
+
+    try:
+        return await news_service.get_sentiment_series(
+            symbols, interval=interval, limit=limit, half_life=half_life
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
 @router.get("/articles", response_model=list[NewsArticleResponse])
 async def get_recent_articles(
     coin: Optional[str] = Query(default=None),
@@ -121,7 +149,6 @@ async def trigger_refresh(
     async def fetch_news():
         results = await news_service.fetch_active_sources()
         total_articles = sum(len(articles) for articles in results.values())
-        await news_service.refresh_materialized_view()
         return results, total_articles
 
     results, total = await fetch_news()
@@ -144,8 +171,7 @@ async def trigger_refresh_async(
     """
 
     async def fetch_news():
-        results = await news_service.fetch_active_sources()
-        await news_service.refresh_materialized_view()
+        await news_service.fetch_active_sources()
 
     background_tasks.add_task(fetch_news)
 
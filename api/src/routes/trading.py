@@ -198,33 +198,17 @@ async def get_futures_klines(
         client = BinanceClient()
 
         # Fetch klines directly from Binance
-        klines = await client.get_klines(
+        klines = await client.get_kline_columns(
             symbol=symbol, market_type=market_type, interval=interval.value, limit=limit
         )
 
         await client.close()
 
-        # Transform to CandlestickData format
-        candles = []
-        for kline in klines:
-            candles.append(
-                CandlestickData(
-                    symbol=symbol.upper(),
-                    market_type=market_type.lower(),
-                    interval=interval.value,
-                    open_time=datetime.fromtimestamp(kline[0] / 1000),
-                    open_price=float(kline[1]),
-                    high_price=float(kline[2]),
-                    low_price=float(kline[3]),
-                    close_price=float(kline[4]),
-                    volume=float(kline[5]),
-                    close_time=datetime.fromtimestamp(kline[6] / 1000),
-                    quote_volume=float(kline[7]),
-                    trades=int(kline[8]),
-                    taker_buy_base_volume=float(kline[9]),
-                    taker_buy_quote_volume=float(kline[10]),
-                )
-            )
+        candles = klines.to_models(
+            symbol=symbol.upper(),
+            market_type=market_type.lower(),
+            interval=interval.value,
+        )
 
         return CandlestickResponse(
             success=True,
@@ -1,4 +1,6 @@
 import logging
+from datetime import datetime
+
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.interval import IntervalTrigger
 
@@ -20,11 +22,30 @@ class NewsScheduler:
         )
 
         self.scheduler.add_job(
-            self.news_service.refresh_materialized_view,
-            trigger=IntervalTrigger(minutes=15),
-            id="refresh_view",
+            self.news_service.expire_sentiment_aggregates,
+            trigger=IntervalTrigger(minutes=5),
+            id="expire_sentiment_aggregates",
+            replace_existing=True,
+            name="Subtract expired articles from sentiment aggregates",
+        )
+
+        self.scheduler.add_job(
+            self.news_service.retention.purge,
+            trigger=IntervalTrigger(hours=1),
+            id="purge_news",
+            replace_existing=True,
+            name="Purge and archive news past retention",
+        )
+
+        self.scheduler.add_job(
+            self.news_service.detector.refresh,
+            trigger=IntervalTrigger(
+                hours=self.news_service.detector.REFRESH_INTERVAL_HOURS
+            ),
+            id="refresh_coin_dictionary",
             replace_existing=True,
-            name="Refresh sentiment materialized view",
+            name="Refresh coin dictionary from Binance exchangeInfo",
+            next_run_time=datetime.now(),
         )
 
         self.scheduler.start()
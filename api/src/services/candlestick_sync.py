@@ -8,13 +8,15 @@ import os
 
 # Import with fallback for both relative and absolute imports
 try:
-    from ..models.trading_models import MarketTypeEnum, IntervalEnum, CandlestickData
+    from ..models.trading_models import MarketTypeEnum, IntervalEnum
     from ..utils.binance_client import BinanceClient
+    from ..utils.candles import CandleFrame
     from ..utils.exceptions import BinanceAPIError, SyncError
     from .database import db
 except ImportError:
-    from models.trading_models import MarketTypeEnum, IntervalEnum, CandlestickData
+    from models.trading_models import MarketTypeEnum, IntervalEnum
     from utils.binance_client import BinanceClient
+    from utils.candles import CandleFrame
     from utils.exceptions import BinanceAPIError, SyncError
     from services.database import db
 
@@ -142,54 +144,30 @@ class CandlestickSyncService:
             client = await self._get_client()
 
             # Fetch klines from Binance
-            klines = await client.get_klines(
+            klines = await client.get_kline_columns(
                 symbol=symbol, market_type=market_type, interval=interval, limit=limit
             )
 
-            if not klines:
+            if not len(klines):
                 return
 
-            # Transform and store each kline
-            for kline in klines:
-                candlestick = self._transform_kline(
-                    kline=kline,
-                    symbol=symbol,
-                    market_type=market_type,
+            # Store all klines in one batch
+            await self._upsert_candlesticks(
+                klines.to_rows(
+                    symbol=symbol.upper(),
+                    market_type=market_type.lower(),
                     interval=interval,
+                    updated_at=datetime.now(),
                 )
-
-                await self._upsert_candlestick(candlestick)
+            )
 
         except BinanceAPIError as e:
             raise SyncError(f"Binance API error: {e}", symbol=symbol, interval=interval)
         except Exception as e:
             raise SyncError(f"Unexpected error: {e}", symbol=symbol, interval=interval)
 
-    def _transform_kline(
-        self, kline: List, symbol: str, market_type: str, interval: str
-    ) -> CandlestickData:
-        """Transform Binance kline array to CandlestickData model."""
-        # Binance kline format: [open_time, open, high, low, close, volume, close_time, ...]
-        return CandlestickData(
-            symbol=symbol.upper(),
-            market_type=market_type.lower(),
-            interval=interval,
-            open_time=datetime.fromtimestamp(kline[0] / 1000),
-            open_price=float(kline[1]),
-            high_price=float(kline[2]),
-            low_price=float(kline[3]),
-            close_price=float(kline[4]),
-            volume=float(kline[5]),
-            close_time=datetime.fromtimestamp(kline[6] / 1000),
-            quote_volume=float(kline[7]),
-            trades=int(kline[8]),
-            taker_buy_base_volume=float(kline[9]),
-            taker_buy_quote_volume=float(kline[10]),
-            updated_at=datetime.now(),
-        )
-
-    async def _upsert_candlestick(self, candlestick: CandlestickData):
-        """Insert or update a single candlestick in the database."""
+    async def _upsert_candlesticks(self, rows: List[tuple]):
+        """Insert or update candlesticks in the database."""
         query = """
             INSERT INTO candlestick_cache (
                 symbol, market_type, interval, open_time, open_price, high_price,
@@ -210,24 +188,7 @@ class CandlestickSyncService:
                 updated_at = EXCLUDED.updated_at
         """
 
-        await db.pool.execute(
-            query,
-            candlestick.symbol,
-            candlestick.market_type,
-            candlestick.interval,
-            candlestick.open_time,
-            candlestick.open_price,
-            candlestick.high_price,
-            candlestick.low_price,
-            candlestick.close_price,
-            candlestick.volume,
-            candlestick.close_time,
-            candlestick.quote_volume,
-            candlestick.trades,
-            candlestick.taker_buy_base_volume,
-            candlestick.taker_buy_quote_volume,
-            candlestick.updated_at,
-        )
+        await db.pool.executemany(query, rows)
 
     async def get_cached_candles(
         self,
@@ -237,8 +198,8 @@ class CandlestickSyncService:
         limit: int = 100,
         start_time: Optional[datetime] = None,
         end_time: Optional[datetime] = None,
-    ) -> List[CandlestickData]:
-        """Query cached candlesticks from database."""
+    ) -> CandleFrame:
+        """Query the latest cached candlesticks from database, oldest first."""
         try:
             conditions = ["symbol = $1", "market_type = $2", "interval = $3"]
             params = [symbol.upper(), market_type.lower(), interval]
@@ -266,29 +227,7 @@ class CandlestickSyncService:
 
             rows = await db.pool.fetch(query, *params)
 
-            candles = []
-            for row in rows:
-                candles.append(
-                    CandlestickData(
-                        symbol=row["symbol"],
-                        market_type=row["market_type"],
-                        interval=row["interval"],
-                        open_time=row["open_time"],
-                        open_price=float(row["open_price"]),
-                        high_price=float(row["high_price"]),
-                        low_price=float(row["low_price"]),
-                        close_price=float(row["close_price"]),
-                        volume=float(row["volume"]),
-                        close_time=row["close_time"],
-                        quote_volume=float(row["quote_volume"]),
-                        trades=row["trades"],
-                        taker_buy_base_volume=float(row["taker_buy_base_volume"]),
-                        taker_buy_quote_volume=float(row["taker_buy_quote_volume"]),
-                        updated_at=row["updated_at"],
-                    )
-                )
-
-            return candles
+            return CandleFrame.from_records(rows[::-1])
 
         except Exception as e:
             logger.error(f"Error fetching cached candles: {e}")
@@ -1,118 +1,232 @@
+import asyncio
+import json
+import logging
+import os
 import re
-from typing import List, Dict, Optional
-
-COIN_PATTERNS = {
-    "BTC": ["bitcoin", "btc", "xbt"],
-    "ETH": ["ethereum", "eth", "ether"],
-    "SOL": ["solana", "sol"],
-    "BNB": ["binance coin", "bnb", "binancecoin"],
-    "XRP": ["ripple", "xrp"],
-    "ADA": ["cardano", "ada"],
-    "DOGE": ["dogecoin", "doge"],
-    "DOT": ["polkadot", "dot"],
-    "AVAX": ["avalanche", "avax"],
-    "MATIC": ["polygon", "matic"],
-    "LINK": ["chainlink", "link"],
-    "UNI": ["uniswap", "uni"],
-    "ATOM": ["cosmos", "atom"],
-    "LTC": ["litecoin", "ltc"],
-    "XLM": ["stellar", "xlm"],
-    "ALGO": ["algorand", "algo"],
-    "VET": ["vechain", "vet"],
-    "FIL": ["filecoin", "fil"],
-    "THETA": ["theta", "theta token"],
-    "AAVE": ["aave", "lend"],
-    "MKR": ["maker", "mkr"],
-    "SNX": ["synthetix", "snx"],
-    "CRV": ["curve dao", "curve", "crv"],
-    "SUSHI": ["sushiswap", "sushi"],
-    "COMP": ["compound", "comp"],
-    "YFI": ["yearn finance", "yfi", "yearn"],
-    "SAND": ["the sandbox", "sandbox", "sand"],
-    "MANA": ["decentraland", "mana"],
-    "AXS": ["axie infinity", "axs"],
-    "ENJ": ["enjin", "enj"],
-    "CHZ": ["chiliz", "chz"],
-    "BAT": ["basic attention token", "bat"],
-    "ZEC": ["zcash", "zec"],
-    "DASH": ["dash", "dash coin"],
-    "XMR": ["monero", "xmr"],
-    "NEAR": ["near protocol", "near"],
-    "APT": ["aptos", "apt"],
-    "ARB": ["arbitrum", "arb"],
-    "OP": ["optimism", "op"],
-    "LDO": ["lido dao", "lido", "ldo"],
-    "RUNE": ["thorchain", "rune"],
-    "KAVA": ["kava", "kava"],
-    "FTM": ["fantom", "ftm"],
-    "SCRT": ["secret", "scrt"],
-    "ONE": ["harmony", "one"],
-    "CELO": ["celo", "celo"],
-    "QTUM": ["qtum", "qtum"],
-    "EGLD": ["elrond", "egld", "multiversx"],
-    "FLOW": ["flow", "flow"],
-    "HBAR": ["hedera", "hbar", "hashgraph"],
-    "XTZ": ["tezos", "xtz"],
-    "EOS": ["eos", "eos"],
-    "CAKE": ["pancakeswap", "cake"],
-    "PEPE": ["pepe", "pepecoin"],
-    "SHIB": ["shiba inu", "shib"],
-    "TRX": ["tron", "trx"],
-    "USDT": ["tether", "usdt"],
-    "USDC": ["usd coin", "usdc"],
-    "DAI": ["dai", "dai"],
-    "BUSD": ["binance usd", "busd"],
-    "TUSD": ["trueusd", "tusd"],
-}
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "data")
+ALIASES_PATH = os.getenv(
+    "COIN_ALIASES_PATH", os.path.join(DATA_DIR, "coin_aliases.json")
+)
+EXCHANGE_INFO_CACHE_PATH = os.getenv(
+    "COIN_EXCHANGE_INFO_CACHE", os.path.join(DATA_DIR, "exchange_info_cache.json")
+)
+EXCHANGE_INFO_PATH = "/api/v3/exchangeInfo"
+
+# Auto-discovered tickers shorter than this are too noisy to match on their own
+MIN_TICKER_LENGTH = 3
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+
+class CoinMatcher:
+    """Immutable phrase -> symbols lookup.
+
+    Text is tokenized once and every token n-gram (up to the longest alias) is
+    probed in a dict, so detection cost depends on text length only, not on
+    how many coins are known.
+    """
+
+    def __init__(
+        self,
+        aliases: Dict[str, List[str]],
+        tickers: Iterable[str] = (),
+    ):
+        self.insensitive: Dict[Tuple[str, ...], set] = {}
+        self.exact: Dict[str, set] = {}
+
+        for symbol, variants in aliases.items():
+            for variant in variants:
+                key = tuple(TOKEN_PATTERN.findall(variant.lower()))
+                if key:
+                    self.insensitive.setdefault(key, set()).add(symbol)
+
+        for ticker in tickers:
+            if (ticker.lower(),) not in self.insensitive:
+                self.exact.setdefault(ticker, set()).add(ticker)
+
+        self.max_phrase_len = max((len(k) for k in self.insensitive), default=1)
+        self.symbols = frozenset(aliases) | frozenset(self.exact)
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    def match(self, text: str) -> Dict[str, List[str]]:
+        """Return symbol -> list of matched (lowercased) phrases."""
+        found: Dict[str, List[str]] = {}
+        if not text:
+            return found
+
+        tokens = TOKEN_PATTERN.findall(text)
+        lowered = [t.lower() for t in tokens]
+
+        for i, token in enumerate(tokens):
+            for symbol in self.exact.get(token, ()):
+                found.setdefault(symbol, []).append(lowered[i])
+
+            for n in range(1, min(self.max_phrase_len, len(tokens) - i) + 1):
+                key = tuple(lowered[i : i + n])
+                symbols = self.insensitive.get(key)
+                if symbols:
+                    phrase = " ".join(key)
+                    for symbol in symbols:
+                        found.setdefault(symbol, []).append(phrase)
+
+        return found
+
+
+def load_aliases(path: str = ALIASES_PATH) -> Tuple[Dict[str, List[str]], set]:
+    with open(path) as f:
+        data = json.load(f)
+    aliases = {
+        symbol.upper(): [v.lower() for v in variants]
+        for symbol, variants in data.get("aliases", {}).items()
+    }
+    ambiguous = {t.upper() for t in data.get("ambiguous_tickers", [])}
+    return aliases, ambiguous
+
+
+def extract_base_assets(exchange_info: dict) -> List[str]:
+    """Collect base assets of TRADING symbols from a raw exchangeInfo payload."""
+    assets = {
+        s["baseAsset"].upper()
+        for s in exchange_info.get("symbols", [])
+        if s.get("baseAsset") and s.get("status", "TRADING") == "TRADING"
+    }
+    return sorted(assets)
+
+
+def load_cached_base_assets(path: str = EXCHANGE_INFO_CACHE_PATH) -> List[str]:
+    """Read base assets from the cache file.
+
+    Accepts both the compact cache written by ``CoinDetector.refresh`` and a
+    raw recorded ``exchangeInfo`` response.
+    """
+    if not os.path.exists(path):
+        return []
+    try:
+        with open(path) as f:
+            data = json.load(f)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Ignoring unreadable exchangeInfo cache {path}: {e}")
+        return []
+    if "base_assets" in data:
+        return [a.upper() for a in data["base_assets"]]
+    return extract_base_assets(data)
+
+
+def build_matcher(
+    base_assets: Iterable[str], aliases_path: str = ALIASES_PATH
+) -> CoinMatcher:
+    aliases, ambiguous = load_aliases(aliases_path)
+    tickers = [
+        a
+        for a in base_assets
+        if a.isalnum()
+        and len(a) >= MIN_TICKER_LENGTH
+        and a not in ambiguous
+        and a not in aliases
+    ]
+    return CoinMatcher(aliases, tickers)
 
 
 class CoinDetector:
-    def __init__(self):
-        self._build_patterns()
+    REFRESH_INTERVAL_HOURS = 24
 
-    def _build_patterns(self):
-        self.patterns = {}
-        for symbol, variants in COIN_PATTERNS.items():
-            pattern = r"\b(" + "|".join(re.escape(v) for v in variants) + r")\b"
-            self.patterns[symbol] = re.compile(pattern, re.IGNORECASE)
+    def __init__(
+        self,
+        aliases_path: str = ALIASES_PATH,
+        cache_path: str = EXCHANGE_INFO_CACHE_PATH,
+    ):
+        self.aliases_path = aliases_path
+        self.cache_path = cache_path
+        self.base_url = os.getenv("BINANCE_BASE_URL", "https://api.binance.com")
+        self.last_refresh: Optional[datetime] = None
+        self._refresh_lock = asyncio.Lock()
+        self.matcher = build_matcher(load_cached_base_assets(cache_path), aliases_path)
+        logger.info(f"Coin detector loaded {len(self.matcher)} symbols")
+
+    async def refresh(self) -> bool:
+        """Fetch exchangeInfo, rewrite the cache and hot-swap the matcher.
+
+        Detection keeps using the previous matcher until the new one is fully
+        built; on failure the current dictionary is left untouched.
+        """
+        if self._refresh_lock.locked():
+            return False
+
+        async with self._refresh_lock:
+            try:
+                async with httpx.AsyncClient(timeout=30) as client:
+                    response = await client.get(f"{self.base_url}{EXCHANGE_INFO_PATH}")
+                    response.raise_for_status()
+                base_assets = extract_base_assets(response.json())
+            except Exception as e:
+                logger.warning(f"Coin dictionary refresh failed, keeping cache: {e}")
+                return False
+
+            if not base_assets:
+                logger.warning("exchangeInfo returned no base assets, keeping cache")
+                return False
+
+            matcher = await asyncio.to_thread(
+                self._rebuild, base_assets, self.aliases_path, self.cache_path
+            )
+            self.matcher = matcher
+            self.last_refresh = datetime.now(timezone.utc)
+            logger.info(f"Coin detector refreshed with {len(matcher)} symbols")
+            return True
+
+    @staticmethod
+    def _rebuild(
+        base_assets: List[str], aliases_path: str, cache_path: str
+    ) -> CoinMatcher:
+        payload = {
+            "fetched_at": datetime.now(timezone.utc).isoformat(),
+            "base_assets": base_assets,
+        }
+        try:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            tmp_path = f"{cache_path}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(payload, f)
+            os.replace(tmp_path, cache_path)
+        except OSError as e:
+            logger.warning(f"Failed to write exchangeInfo cache {cache_path}: {e}")
+        return build_matcher(base_assets, aliases_path)
 
     def detect_coins(
         self, title: str = "", summary: str = "", content: str = ""
     ) -> List[Dict]:
-        detected = {}
-        text = f"{title} {summary} {content}"
+        matcher = self.matcher
+        fields = (("title", title), ("summary", summary), ("content", content))
 
-        for symbol, pattern in self.patterns.items():
-            matches = pattern.findall(text)
-            if matches:
-                unique_matches = set(m.lower() for m in matches)
-                confidence = min(0.95, 0.3 + (len(unique_matches) * 0.1))
+        matches: Dict[str, List[str]] = {}
+        locations: Dict[str, List[str]] = {}
+        for location, text in fields:
+            for symbol, phrases in matcher.match(text).items():
+                matches.setdefault(symbol, []).extend(phrases)
+                locations.setdefault(symbol, []).append(location)
 
-                detected[symbol] = {
+        detected = []
+        for symbol, phrases in matches.items():
+            confidence = min(0.95, 0.3 + (len(set(phrases)) * 0.1))
+            detected.append(
+                {
                     "symbol": symbol,
                     "confidence": round(confidence, 2),
-                    "mentions": len(matches),
-                    "mentioned_in": self._get_mentioned_locations(
-                        title, summary, content, symbol
-                    ),
+                    "mentions": len(phrases),
+                    "mentioned_in": locations.get(symbol) or ["text"],
                 }
+            )
 
-        return list(detected.values())
-
-    def _get_mentioned_locations(
-        self, title: str, summary: str, content: str, symbol: str
-    ) -> List[str]:
-        locations = []
-        pattern = self.patterns.get(symbol, re.compile(r"", re.IGNORECASE))
-
-        if pattern.search(title):
-            locations.append("title")
-        if pattern.search(summary):
-            locations.append("summary")
-        if pattern.search(content):
-            locations.append("content")
-
-        return locations if locations else ["text"]
+        return detected
 
     def get_unique_coins(self, coins: List[Dict]) -> List[str]:
         return list(set(c["symbol"] for c in coins))
@@ -42,6 +42,10 @@ class Database:
         migration_files = [
             "001_news_tables.sql",
             "002_trading_tables.sql",
+            "003_sentiment_aggregates.sql",
+            "004_sentiment_buckets.sql",
+            "005_article_dedup.sql",
+            "006_news_retention.sql",
         ]
 
         for migration_file in migration_files:
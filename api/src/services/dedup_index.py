@@ -0,0 +1,169 @@
+import hashlib
+import logging
+import re
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+HTML_TAG_PATTERN = re.compile(r"<[^>]+>")
+
+# Mersenne prime used for the universal hash family (a * x + b) mod p
+MERSENNE_PRIME = (1 << 61) - 1
+MAX_HASH = (1 << 32) - 1
+
+
+def shingles(text: str, size: int = 2) -> Set[str]:
+    """Word n-grams of lowercased, tag-stripped text."""
+    tokens = TOKEN_PATTERN.findall(HTML_TAG_PATTERN.sub(" ", text).lower())
+    if len(tokens) < size:
+        return {" ".join(tokens)} if tokens else set()
+    return {" ".join(tokens[i : i + size]) for i in range(len(tokens) - size + 1)}
+
+
+class NearDuplicateIndex:
+    """MinHash LSH index over recent article titles and summaries.
+
+    Signatures are split into ``bands`` of ``rows`` hashes; two articles become
+    candidates when any band matches exactly, and are confirmed when the
+    estimated Jaccard similarity reaches ``threshold``. Entries older than
+    ``window_seconds`` (or beyond ``max_entries``) are evicted oldest first.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.7,
+        bands: int = 16,
+        rows: int = 4,
+        window_seconds: float = 48 * 3600,
+        max_entries: int = 20000,
+        seed: int = 1,
+    ):
+        if not 0 < threshold <= 1:
+            raise ValueError("threshold must be in (0, 1]")
+
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = rows
+        self.num_perm = bands * rows
+        self.window_seconds = window_seconds
+        self.max_entries = max_entries
+
+        self._permutations = self._make_permutations(self.num_perm, seed)
+        self._entries: "OrderedDict[str, Tuple[Tuple[int, ...], float, str]]" = (
+            OrderedDict()
+        )
+        self._buckets: Dict[Tuple[int, Tuple[int, ...]], Set[str]] = {}
+
+        self.lookups = 0
+        self.duplicates = 0
+
+    @staticmethod
+    def _make_permutations(num_perm: int, seed: int) -> List[Tuple[int, int]]:
+        perms = []
+        for i in range(num_perm):
+            digest = hashlib.blake2b(f"{seed}:{i}".encode(), digest_size=16).digest()
+            a = int.from_bytes(digest[:8], "little") % (MERSENNE_PRIME - 1) + 1
+            b = int.from_bytes(digest[8:], "little") % MERSENNE_PRIME
+            perms.append((a, b))
+        return perms
+
+    def signature(self, text: str) -> Optional[Tuple[int, ...]]:
+        grams = shingles(text)
+        if not grams:
+            return None
+        hashes = [
+            int.from_bytes(
+                hashlib.blake2b(g.encode(), digest_size=8).digest(), "little"
+            )
+            for g in grams
+        ]
+        return tuple(
+            min(((a * h + b) % MERSENNE_PRIME) & MAX_HASH for h in hashes)
+            for a, b in self._permutations
+        )
+
+    def _band_keys(self, signature: Tuple[int, ...]):
+        for band in range(self.bands):
+            start = band * self.rows
+            yield band, signature[start : start + self.rows]
+
+    @staticmethod
+    def similarity(a: Tuple[int, ...], b: Tuple[int, ...]) -> float:
+        return sum(1 for x, y in zip(a, b) if x == y) / len(a)
+
+    def find(
+        self, signature: Optional[Tuple[int, ...]], now: Optional[float] = None
+    ) -> Optional[Tuple[str, float]]:
+        """Return ``(canonical_article_id, similarity)`` of the best match."""
+        self.evict(now)
+        self.lookups += 1
+        if signature is None:
+            return None
+
+        candidates: Set[str] = set()
+        for key in self._band_keys(signature):
+            candidates |= self._buckets.get(key, set())
+
+        best: Optional[Tuple[str, float]] = None
+        for article_id in candidates:
+            other, _, canonical_id = self._entries[article_id]
+            score = self.similarity(signature, other)
+            if score >= self.threshold and (best is None or score > best[1]):
+                best = (canonical_id, score)
+
+        if best:
+            self.duplicates += 1
+        return best
+
+    def add(
+        self,
+        article_id: str,
+        signature: Optional[Tuple[int, ...]],
+        canonical_id: Optional[str] = None,
+        now: Optional[float] = None,
+    ) -> None:
+        if signature is None or article_id in self._entries:
+            return
+        self._entries[article_id] = (
+            signature,
+            time.time() if now is None else now,
+            canonical_id or article_id,
+        )
+        for key in self._band_keys(signature):
+            self._buckets.setdefault(key, set()).add(article_id)
+        self.evict(now)
+
+    def evict(self, now: Optional[float] = None) -> int:
+        cutoff = (time.time() if now is None else now) - self.window_seconds
+        evicted = 0
+        while self._entries:
+            article_id, (signature, added_at, _) = next(iter(self._entries.items()))
+            if added_at >= cutoff and len(self._entries) <= self.max_entries:
+                break
+            self._remove(article_id, signature)
+            evicted += 1
+        return evicted
+
+    def _remove(self, article_id: str, signature: Tuple[int, ...]) -> None:
+        del self._entries[article_id]
+        for key in self._band_keys(signature):
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                bucket.discard(article_id)
+                if not bucket:
+                    del self._buckets[key]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "lookups": self.lookups,
+            "duplicates": self.duplicates,
+            "threshold": self.threshold,
+            "window_hours": round(self.window_seconds / 3600, 2),
+        }
@@ -0,0 +1,162 @@
+import asyncio
+import gzip
+import json
+import logging
+import os
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+
+from .database import Database
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ARCHIVE_DIR = os.path.join(
+    os.path.dirname(__file__), "..", "..", "data", "archive"
+)
+
+
+class NewsRetention:
+    """Batched purge of old news rows with optional gzip JSONL archival.
+
+    Articles are deleted by ``fetched_at`` in small batches (each its own
+    transaction) so the purge never holds long locks; sentiment and coin rows
+    go with them through ``ON DELETE CASCADE``. Rows still counted in
+    ``coin_sentiment_aggregates`` are never touched. A batch's archive is
+    staged under a temporary name and only renamed into place once its
+    DELETE commits, so a failed batch leaves nothing to be archived twice.
+    """
+
+    BATCH_SIZE = 1000
+
+    def __init__(self, db: Database):
+        self.db = db
+        self.retention_hours = int(os.getenv("NEWS_RETENTION_HOURS", "168"))
+        self.bucket_retention_days = int(os.getenv("NEWS_BUCKET_RETENTION_DAYS", "30"))
+        self.archive_dir: Optional[str] = os.getenv(
+            "NEWS_ARCHIVE_DIR", DEFAULT_ARCHIVE_DIR
+        )
+        self.last_run: Optional[dict] = None
+
+    async def purge(self) -> dict:
+        now = datetime.now(timezone.utc)
+        cutoff = now - timedelta(hours=self.retention_hours)
+        bucket_cutoff = now - timedelta(days=self.bucket_retention_days)
+
+        articles = 0
+        while True:
+            deleted = await self._purge_batch(cutoff)
+            articles += deleted
+            if deleted < self.BATCH_SIZE:
+                break
+            # Yield between batches so ingest and API queries interleave
+            await asyncio.sleep(0)
+
+        async with self.db.acquire() as conn:
+            status = await conn.execute(
+                "DELETE FROM coin_sentiment_buckets WHERE bucket_start < $1",
+                bucket_cutoff,
+            )
+        buckets = int(status.split()[-1])
+
+        self.last_run = {
+            "ran_at": now,
+            "articles_deleted": articles,
+            "buckets_deleted": buckets,
+            "cutoff": cutoff,
+        }
+        logger.info(
+            f"News retention purged {articles} articles older than "
+            f"{self.retention_hours}h and {buckets} sentiment buckets"
+        )
+        return self.last_run
+
+    async def _purge_batch(self, cutoff: datetime) -> int:
+        query_select = """
+        SELECT
+            na.id,
+            na.article_id,
+            na.source,
+            na.title,
+            na.summary,
+            na.link,
+            na.published_at,
+            na.fetched_at,
+            na.canonical_article_id,
+            ast.compound_score,
+            COALESCE(
+                array_agg(ac.coin_symbol) FILTER (WHERE ac.coin_symbol IS NOT NULL),
+                '{}'
+            ) AS coins
+        FROM news_articles na
+        LEFT JOIN article_sentiment ast ON ast.article_id = na.article_id
+        LEFT JOIN article_coins ac ON ac.article_id = na.article_id
+        WHERE na.id IN (
+            SELECT id FROM news_articles
+            WHERE fetched_at < $1 AND in_aggregate = FALSE
+            ORDER BY fetched_at
+            LIMIT $2
+        )
+        GROUP BY na.id, ast.compound_score
+        """
+        query_delete = "DELETE FROM news_articles WHERE id = ANY($1::int[])"
+
+        staged: List[str] = []
+        try:
+            async with self.db.acquire() as conn:
+                async with conn.transaction():
+                    rows = await conn.fetch(query_select, cutoff, self.BATCH_SIZE)
+                    if not rows:
+                        return 0
+
+                    if self.archive_dir:
+                        staged = await asyncio.to_thread(
+                            self._archive, [dict(r) for r in rows], self.archive_dir
+                        )
+                    await conn.execute(query_delete, [r["id"] for r in rows])
+        except BaseException:
+            await asyncio.to_thread(self._discard, staged)
+            raise
+
+        await asyncio.to_thread(self._publish, staged)
+        return len(rows)
+
+    @staticmethod
+    def _archive(rows: List[dict], archive_dir: str) -> List[str]:
+        """Stage rows as per-day gzip JSONL files named by the batch's id range.
+
+        Returns the final paths; each file is written to ``<path>.tmp`` until
+        ``_publish`` renames it. A batch retried after a failed commit maps to
+        the same names, so it replaces its own files instead of adding rows.
+        """
+        os.makedirs(archive_dir, exist_ok=True)
+        by_day = {}
+        for row in rows:
+            day = row["fetched_at"].strftime("%Y%m%d")
+            by_day.setdefault(day, []).append(row)
+
+        paths = []
+        for day, day_rows in by_day.items():
+            ids = [row.pop("id") for row in day_rows]
+            path = os.path.join(
+                archive_dir, f"news-{day}-{min(ids)}-{max(ids)}.jsonl.gz"
+            )
+            with gzip.open(path + ".tmp", "wt", encoding="utf-8") as f:
+                for row in day_rows:
+                    f.write(json.dumps(row, default=str) + "\n")
+            paths.append(path)
+        return paths
+
+    @staticmethod
+    def _publish(paths: List[str]) -> None:
+        """Move staged archive files into place once their batch committed."""
+        for path in paths:
+            os.replace(path + ".tmp", path)
+
+    @staticmethod
+    def _discard(paths: List[str]) -> None:
+        """Remove staged archive files of a batch that did not commit."""
+        for path in paths:
+            try:
+                os.remove(path + ".tmp")
+            except FileNotFoundError:
+                pass
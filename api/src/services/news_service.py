@@ -1,13 +1,23 @@
 import hashlib
 import logging
+import os
 from datetime import datetime, timedelta, timezone
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 from .database import Database
 from .rss_fetcher import RSSFetcher
 from .sentiment_analyzer import SentimentAnalyzer
 from .coin_detector import CoinDetector
+from .dedup_index import NearDuplicateIndex
+from .news_retention import NewsRetention
 from .failover_manager import FailoverManager
+from .sentiment_sketch import CoinSentimentDelta, SentimentHistogram
+from .sentiment_series import (
+    BUCKET_INTERVALS,
+    accumulate_bucket_deltas,
+    build_series,
+    window_start,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -21,6 +31,11 @@ class NewsService:
         self.analyzer = SentimentAnalyzer()
         self.detector = CoinDetector()
         self.failover = FailoverManager()
+        self.retention = NewsRetention(db)
+        self.dedup = NearDuplicateIndex(
+            threshold=float(os.getenv("NEWS_DEDUP_THRESHOLD", "0.7")),
+            window_seconds=float(os.getenv("NEWS_DEDUP_WINDOW_HOURS", "48")) * 3600,
+        )
 
     async def fetch_active_sources(self) -> dict:
         active_sources = self.failover.get_active_sources()
@@ -43,23 +58,52 @@ class NewsService:
     async def _process_articles_batch(self, source: str, articles: List[dict]) -> None:
         processed = 0
         skipped = 0
+        duplicates_before = self.dedup.duplicates
+        stored: List[dict] = []
 
         for article in articles:
             try:
-                await self._process_article(source, article)
+                record = await self._process_article(source, article)
+                if record:
+                    stored.append(record)
                 processed += 1
             except Exception as e:
                 logger.warning(f"Failed to process article from {source}: {e}")
                 skipped += 1
 
-        logger.info(f"Processed {processed} articles from {source}, skipped {skipped}")
+        if stored:
+            try:
+                await self._add_to_sentiment_aggregates(stored)
+            except Exception as e:
+                logger.error(f"Failed to update sentiment aggregates for {source}: {e}")
+
+        logger.info(
+            f"Processed {processed} articles from {source}, skipped {skipped}, "
+            f"near-duplicates {self.dedup.duplicates - duplicates_before}"
+        )
 
-    async def _process_article(self, source: str, article: dict) -> None:
+    async def _process_article(self, source: str, article: dict) -> Optional[dict]:
         article_id = self._generate_article_id(article)
 
         exists = await self._article_exists(article_id)
         if exists:
-            return
+            return None
+
+        signature = self.dedup.signature(
+            f"{article.get('title', '')} {article.get('summary', '')}"
+        )
+        match = self.dedup.find(signature)
+        if match:
+            canonical_id, similarity = match
+            logger.debug(
+                f"Article {article_id} from {source} duplicates {canonical_id} "
+                f"(similarity {similarity:.2f})"
+            )
+            await self._store_article(
+                article_id, source, article, {}, [], canonical_article_id=canonical_id
+            )
+            self.dedup.add(article_id, signature, canonical_id)
+            return None
 
         sentiment = self.analyzer.analyze_article(
             article.get("title", ""), article.get("summary", "")
@@ -70,7 +114,20 @@ class NewsService:
             summary=article.get("summary", ""),
         )
 
-        await self._store_article(article_id, source, article, sentiment, coins)
+        published_at = await self._store_article(
+            article_id, source, article, sentiment, coins
+        )
+        if published_at is not None:
+            self.dedup.add(article_id, signature)
+        if published_at is None or not coins:
+            return None
+
+        return {
+            "article_id": article_id,
+            "compound": sentiment["compound"],
+            "coins": [c["symbol"] for c in coins],
+            "published_at": published_at,
+        }
 
     def _generate_article_id(self, article: dict) -> str:
         unique_string = f"{article.get('link', '')}{article.get('title', '')}"
@@ -89,16 +146,18 @@ class NewsService:
         article: dict,
         sentiment: dict,
         coins: List[dict],
-    ) -> None:
+        canonical_article_id: Optional[str] = None,
+    ) -> Optional[datetime]:
         now = datetime.now(timezone.utc)
         expires_at = now + timedelta(hours=self.CACHE_TTL_HOURS)
 
         published_at = self._parse_published_date(article.get("published"))
 
         query_article = """
-        INSERT INTO news_articles (article_id, source, title, summary, link, published_at, fetched_at, expires_at)
-        VALUES ($1, $2, $3, $4, $5, $6, $7, $8)
+        INSERT INTO news_articles (article_id, source, title, summary, link, published_at, fetched_at, expires_at, canonical_article_id)
+        VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9)
         ON CONFLICT (article_id) DO NOTHING
+        RETURNING article_id
         """
         query_sentiment = """
         INSERT INTO article_sentiment (article_id, compound_score, positive_score, negative_score, neutral_score)
@@ -110,7 +169,7 @@ class NewsService:
         """
 
         async with self.db.acquire() as conn:
-            await conn.execute(
+            inserted = await conn.fetchval(
                 query_article,
                 article_id,
                 source,
@@ -120,7 +179,10 @@ class NewsService:
                 published_at,
                 now,
                 expires_at,
+                canonical_article_id,
             )
+            if inserted is None:
+                return None
 
             if coins:
                 await conn.execute(
@@ -137,6 +199,8 @@ class NewsService:
                         query_coins, article_id, coin["symbol"], coin["confidence"]
                     )
 
+        return published_at
+
     def _parse_published_date(self, published: Optional[str]) -> datetime:
         if not published:
             return datetime.now(timezone.utc)
@@ -268,12 +332,16 @@ class NewsService:
 
     async def get_all_coins_sentiment(self, min_articles: int = 5) -> List[dict]:
         query = """
-        SELECT 
+        SELECT
             coin_symbol,
             article_count,
-            avg_sentiment,
+            sentiment_sum,
+            positive_count,
+            negative_count,
+            neutral_count,
+            sentiment_histogram,
             latest_article
-        FROM coin_sentiment_summary
+        FROM coin_sentiment_aggregates
         WHERE article_count >= $1
         ORDER BY article_count DESC
         LIMIT 50
@@ -284,14 +352,19 @@ class NewsService:
 
         results = []
         for r in rows:
+            avg_sentiment = float(r["sentiment_sum"]) / r["article_count"]
             results.append(
                 {
                     "coin_symbol": r["coin_symbol"],
                     "article_count": r["article_count"],
-                    "average_sentiment": round(float(r["avg_sentiment"]), 4),
-                    "sentiment_label": self.analyzer.get_sentiment_label(
-                        float(r["avg_sentiment"])
-                    ),
+                    "average_sentiment": round(avg_sentiment, 4),
+                    "median_sentiment": SentimentHistogram(
+                        r["sentiment_histogram"]
+                    ).median(),
+                    "sentiment_label": self.analyzer.get_sentiment_label(avg_sentiment),
+                    "positive_count": r["positive_count"],
+                    "negative_count": r["negative_count"],
+                    "neutral_count": r["neutral_count"],
                     "latest_article": r["latest_article"],
                 }
             )
@@ -302,8 +375,30 @@ class NewsService:
         return {
             "failover": self.failover.get_status(),
             "cache_stats": await self._get_cache_stats(),
+            "dedup": self.dedup.get_stats(),
         }
 
+    async def warm_dedup_index(self) -> None:
+        """Reload recent article signatures so dedup survives restarts."""
+        query = """
+        SELECT article_id, title, summary, fetched_at, canonical_article_id
+        FROM news_articles
+        WHERE fetched_at > NOW() - INTERVAL '1 second' * $1
+        ORDER BY fetched_at
+        """
+
+        async with self.db.acquire() as conn:
+            rows = await conn.fetch(query, self.dedup.window_seconds)
+
+        for r in rows:
+            self.dedup.add(
+                r["article_id"],
+                self.dedup.signature(f"{r['title']} {r['summary'] or ''}"),
+                r["canonical_article_id"],
+                now=r["fetched_at"].timestamp(),
+            )
+        logger.info(f"Dedup index warmed with {len(self.dedup)} recent articles")
+
     async def _get_cache_stats(self) -> dict:
         query = """
         SELECT 
@@ -327,7 +422,211 @@ class NewsService:
             "next_expiry": stats["next_expiry"],
         }
 
-    async def refresh_materialized_view(self) -> None:
-        query = "REFRESH MATERIALIZED VIEW CONCURRENTLY coin_sentiment_summary"
+    async def _add_to_sentiment_aggregates(self, stored: List[dict]) -> None:
+        deltas: Dict[str, CoinSentimentDelta] = {}
+        for record in stored:
+            for coin in record["coins"]:
+                deltas.setdefault(coin, CoinSentimentDelta()).add(
+                    record["compound"], record["published_at"]
+                )
+
+        query_mark = """
+        UPDATE news_articles SET in_aggregate = TRUE
+        WHERE article_id = ANY($1::varchar[])
+        """
+
+        async with self.db.acquire() as conn:
+            async with conn.transaction():
+                await conn.execute(query_mark, [r["article_id"] for r in stored])
+                await self._apply_sentiment_deltas(conn, deltas)
+                await self._apply_bucket_deltas(conn, stored)
+
+    async def expire_sentiment_aggregates(self) -> int:
+        """Subtract articles whose ``expires_at`` has passed from the aggregates."""
+        query_expired = """
+        WITH expired AS (
+            UPDATE news_articles SET in_aggregate = FALSE
+            WHERE in_aggregate = TRUE AND expires_at <= NOW()
+            RETURNING article_id
+        )
+        SELECT ac.coin_symbol, ast.compound_score
+        FROM expired e
+        JOIN article_coins ac ON ac.article_id = e.article_id
+        JOIN article_sentiment ast ON ast.article_id = e.article_id
+        """
+        # GREATEST() in the upsert can't go down, so the latest article of the
+        # coins expiry touched is recomputed, and coins left empty are dropped
+        query_delete_empty = """
+        DELETE FROM coin_sentiment_aggregates
+        WHERE coin_symbol = ANY($1::varchar[]) AND article_count <= 0
+        """
+        query_latest = """
+        UPDATE coin_sentiment_aggregates csa SET latest_article = (
+            SELECT MAX(na.published_at)
+            FROM article_coins ac
+            JOIN news_articles na ON na.article_id = ac.article_id
+            WHERE ac.coin_symbol = csa.coin_symbol AND na.in_aggregate = TRUE
+        )
+        WHERE csa.coin_symbol = ANY($1::varchar[])
+        """
+
+        async with self.db.acquire() as conn:
+            async with conn.transaction():
+                rows = await conn.fetch(query_expired)
+                deltas: Dict[str, CoinSentimentDelta] = {}
+                for r in rows:
+                    deltas.setdefault(r["coin_symbol"], CoinSentimentDelta()).add(
+                        r["compound_score"], sign=-1
+                    )
+                await self._apply_sentiment_deltas(conn, deltas)
+                if deltas:
+                    coins = sorted(deltas)
+                    await conn.execute(query_delete_empty, coins)
+                    await conn.execute(query_latest, coins)
+
+        if rows:
+            logger.info(f"Expired {len(rows)} coin mentions from sentiment aggregates")
+        return len(rows)
+
+    async def rebuild_sentiment_aggregates(self) -> None:
+        """Recompute aggregates from the currently active articles.
+
+        Only used on startup to self-heal after crashes or schema changes; the
+        active set is bounded by ``CACHE_TTL_HOURS`` so this stays cheap.
+        """
+        query_mark = """
+        UPDATE news_articles SET in_aggregate = (is_active AND expires_at > NOW())
+        WHERE in_aggregate <> (is_active AND expires_at > NOW())
+        """
+        query_active = """
+        SELECT ac.coin_symbol, ast.compound_score, na.published_at
+        FROM news_articles na
+        JOIN article_coins ac ON ac.article_id = na.article_id
+        JOIN article_sentiment ast ON ast.article_id = na.article_id
+        WHERE na.in_aggregate = TRUE
+        """
+
         async with self.db.acquire() as conn:
-            await conn.execute(query)
+            async with conn.transaction():
+                await conn.execute("LOCK TABLE coin_sentiment_aggregates")
+                await conn.execute(query_mark)
+                await conn.execute("DELETE FROM coin_sentiment_aggregates")
+                rows = await conn.fetch(query_active)
+                deltas: Dict[str, CoinSentimentDelta] = {}
+                for r in rows:
+                    deltas.setdefault(r["coin_symbol"], CoinSentimentDelta()).add(
+                        r["compound_score"], r["published_at"]
+                    )
+                await self._apply_sentiment_deltas(conn, deltas)
+
+    async def _apply_sentiment_deltas(
+        self, conn, deltas: Dict[str, CoinSentimentDelta]
+    ) -> None:
+        query = """
+        INSERT INTO coin_sentiment_aggregates (
+            coin_symbol, article_count, sentiment_sum, positive_count,
+            negative_count, neutral_count, sentiment_histogram, latest_article,
+            updated_at
+        )
+        VALUES ($1, $2, $3, $4, $5, $6, $7::integer[], $8, NOW())
+        ON CONFLICT (coin_symbol) DO UPDATE SET
+            article_count = coin_sentiment_aggregates.article_count + EXCLUDED.article_count,
+            sentiment_sum = coin_sentiment_aggregates.sentiment_sum + EXCLUDED.sentiment_sum,
+            positive_count = coin_sentiment_aggregates.positive_count + EXCLUDED.positive_count,
+            negative_count = coin_sentiment_aggregates.negative_count + EXCLUDED.negative_count,
+            neutral_count = coin_sentiment_aggregates.neutral_count + EXCLUDED.neutral_count,
+            sentiment_histogram = (
+                SELECT array_agg(a + b ORDER BY i)
+                FROM unnest(
+                    coin_sentiment_aggregates.sentiment_histogram,
+                    EXCLUDED.sentiment_histogram
+                ) WITH ORDINALITY AS h(a, b, i)
+            ),
+            latest_article = GREATEST(
+                coin_sentiment_aggregates.latest_article, EXCLUDED.latest_article
+            ),
+            updated_at = NOW()
+        """
+
+        # Sorted to keep row lock order stable between concurrent batches
+        await conn.executemany(
+            query,
+            [
+                (
+                    coin,
+                    d.article_count,
+                    d.sentiment_sum,
+                    d.positive_count,
+                    d.negative_count,
+                    d.neutral_count,
+                    d.histogram.counts,
+                    d.latest_article,
+                )
+                for coin, d in sorted(deltas.items())
+            ],
+        )
+
+    async def _apply_bucket_deltas(self, conn, stored: List[dict]) -> None:
+        query = """
+        INSERT INTO coin_sentiment_buckets (
+            bucket_interval, coin_symbol, bucket_start, article_count,
+            sentiment_sum, positive_count, negative_count, updated_at
+        )
+        VALUES ($1, $2, $3, $4, $5, $6, $7, NOW())
+        ON CONFLICT (bucket_interval, coin_symbol, bucket_start) DO UPDATE SET
+            article_count = coin_sentiment_buckets.article_count + EXCLUDED.article_count,
+            sentiment_sum = coin_sentiment_buckets.sentiment_sum + EXCLUDED.sentiment_sum,
+            positive_count = coin_sentiment_buckets.positive_count + EXCLUDED.positive_count,
+            negative_count = coin_sentiment_buckets.negative_count + EXCLUDED.negative_count,
+            updated_at = NOW()
+        """
+
+        deltas = accumulate_bucket_deltas(stored)
+        await conn.executemany(
+            query,
+            [
+                (
+                    interval,
+                    coin,
+                    start,
+                    d.article_count,
+                    d.sentiment_sum,
+                    d.positive_count,
+                    d.negative_count,
+                )
+                for (coin, interval, start), d in sorted(deltas.items())
+            ],
+        )
+
+    async def get_sentiment_series(
+        self,
+        coins: List[str],
+        interval: str = "1h",
+        limit: int = 24,
+        half_life: float = 6,
+    ) -> List[dict]:
+        if interval not in BUCKET_INTERVALS:
+            raise ValueError(
+                f"Unsupported interval {interval}, expected one of "
+                f"{', '.join(BUCKET_INTERVALS)}"
+            )
+
+        coins = list(dict.fromkeys(c.upper() for c in coins))
+        end = datetime.now(timezone.utc)
+
+        query = """
+        SELECT coin_symbol, bucket_start, article_count, sentiment_sum,
+               positive_count, negative_count
+        FROM coin_sentiment_buckets
+        WHERE bucket_interval = $1
+          AND coin_symbol = ANY($2::varchar[])
+          AND bucket_start >= $3
+        ORDER BY coin_symbol, bucket_start
+        """
+
+        async with self.db.acquire() as conn:
+            rows = await conn.fetch(
+                query, interval, coins, window_start(end, interval, limit, half_life)
+            )
+
+        return build_series(rows, coins, interval, end, limit, half_life)
@@ -0,0 +1,116 @@
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Dict, Iterable, List
+
+from .sentiment_sketch import NEGATIVE_THRESHOLD, POSITIVE_THRESHOLD, to_decimal
+
+BUCKET_INTERVALS = {"15m": 15, "1h": 60, "4h": 240}
+
+# Extra buckets read before the requested window so the decayed value is
+# already warmed up at the first returned bucket, in multiples of half-life
+WARMUP_HALF_LIVES = 3
+
+
+def bucket_start(ts: datetime, interval: str) -> datetime:
+    seconds = BUCKET_INTERVALS[interval] * 60
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc)
+    epoch = int(ts.timestamp())
+    return datetime.fromtimestamp(epoch - epoch % seconds, tz=timezone.utc)
+
+
+class SentimentBucketDelta:
+    def __init__(self):
+        self.article_count = 0
+        self.sentiment_sum = Decimal(0)
+        self.positive_count = 0
+        self.negative_count = 0
+
+    def add(self, score) -> None:
+        value = to_decimal(score)
+        self.article_count += 1
+        self.sentiment_sum += value
+        if value > POSITIVE_THRESHOLD:
+            self.positive_count += 1
+        elif value < NEGATIVE_THRESHOLD:
+            self.negative_count += 1
+
+
+def window_start(
+    end: datetime, interval: str, limit: int, half_life: float
+) -> datetime:
+    """First bucket to read for ``limit`` buckets ending at ``end`` plus warm-up."""
+    step = timedelta(minutes=BUCKET_INTERVALS[interval])
+    warmup = int(WARMUP_HALF_LIVES * half_life)
+    return bucket_start(end, interval) - step * (limit + warmup - 1)
+
+
+def accumulate_bucket_deltas(
+    stored: Iterable[dict],
+) -> Dict[tuple, SentimentBucketDelta]:
+    """Group ingested article records into (coin, interval, bucket_start) deltas."""
+    deltas: Dict[tuple, SentimentBucketDelta] = {}
+    for record in stored:
+        for interval in BUCKET_INTERVALS:
+            start = bucket_start(record["published_at"], interval)
+            for coin in record["coins"]:
+                key = (coin, interval, start)
+                deltas.setdefault(key, SentimentBucketDelta()).add(record["compound"])
+    return deltas
+
+
+def build_series(
+    rows: Iterable[dict],
+    coins: List[str],
+    interval: str,
+    end: datetime,
+    limit: int,
+    half_life: float,
+) -> List[dict]:
+    """Turn sparse bucket rows into dense per-coin series.
+
+    Missing buckets are filled with zero counts. ``rolling_sentiment`` is an
+    exponentially decayed, article-weighted average over all buckets up to and
+    including the current one, halving a bucket's weight every ``half_life``
+    buckets.
+    """
+    step = timedelta(minutes=BUCKET_INTERVALS[interval])
+    first = window_start(end, interval, limit, half_life)
+    last = bucket_start(end, interval)
+    decay = 0.5 ** (1 / half_life)
+
+    by_coin: Dict[str, Dict[datetime, dict]] = {coin: {} for coin in coins}
+    for r in rows:
+        by_coin.setdefault(r["coin_symbol"], {})[r["bucket_start"]] = r
+
+    series = []
+    for coin in coins:
+        buckets = by_coin.get(coin, {})
+        weighted_sum = 0.0
+        weight = 0.0
+        points = []
+        start = first
+        while start <= last:
+            r = buckets.get(start)
+            count = r["article_count"] if r else 0
+            total = float(r["sentiment_sum"]) if r else 0.0
+
+            weighted_sum = weighted_sum * decay + total
+            weight = weight * decay + count
+            points.append(
+                {
+                    "bucket_start": start,
+                    "article_count": count,
+                    "average_sentiment": round(total / count, 4) if count else None,
+                    "rolling_sentiment": (
+                        round(weighted_sum / weight, 4) if weight > 0 else None
+                    ),
+                    "positive_count": r["positive_count"] if r else 0,
+                    "negative_count": r["negative_count"] if r else 0,
+                }
+            )
+            start += step
+
+        series.append({"coin": coin, "interval": interval, "buckets": points[-limit:]})
+
+    return series
@@ -0,0 +1,100 @@
+from decimal import Decimal
+from typing import Iterable, List, Optional, Union
+
+Score = Union[float, Decimal]
+
+# Compound scores live in [-1, 1] with 4 decimals; 0.01-wide bins plus a final
+# bin for exactly 1.0 mirror Postgres ``width_bucket(score, -1, 1, 200)``.
+BIN_WIDTH = Decimal("0.01")
+NUM_BINS = 201
+
+POSITIVE_THRESHOLD = Decimal("0.05")
+NEGATIVE_THRESHOLD = Decimal("-0.05")
+
+
+def to_decimal(score: Score) -> Decimal:
+    if isinstance(score, Decimal):
+        return score
+    return Decimal(str(round(score, 4)))
+
+
+def bin_index(score: Score) -> int:
+    value = min(max(to_decimal(score), Decimal(-1)), Decimal(1))
+    return min(int((value + 1) // BIN_WIDTH), NUM_BINS - 1)
+
+
+class SentimentHistogram:
+    """Fixed-bin histogram over compound scores.
+
+    Unlike ``PERCENTILE_CONT`` it is mergeable and supports removal, so the
+    per-coin median can be maintained with plain element-wise addition when
+    articles are ingested or expire.
+    """
+
+    def __init__(self, counts: Optional[Iterable[int]] = None):
+        self.counts: List[int] = list(counts) if counts is not None else [0] * NUM_BINS
+        if len(self.counts) != NUM_BINS:
+            raise ValueError(f"Expected {NUM_BINS} bins, got {len(self.counts)}")
+
+    def add(self, score: Score, weight: int = 1) -> None:
+        self.counts[bin_index(score)] += weight
+
+    def remove(self, score: Score) -> None:
+        self.add(score, -1)
+
+    def merge(self, other: "SentimentHistogram") -> None:
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+
+    @property
+    def total(self) -> int:
+        return sum(self.counts)
+
+    def quantile(self, q: float) -> Optional[float]:
+        total = self.total
+        if total <= 0:
+            return None
+
+        target = q * total
+        cumulative = 0
+        for i, count in enumerate(self.counts):
+            if count <= 0:
+                continue
+            if cumulative + count >= target:
+                lower = -1 + i * float(BIN_WIDTH)
+                if i == NUM_BINS - 1:
+                    return 1.0
+                fraction = (target - cumulative) / count
+                return round(lower + fraction * float(BIN_WIDTH), 4)
+            cumulative += count
+        return 1.0
+
+    def median(self) -> Optional[float]:
+        return self.quantile(0.5)
+
+
+class CoinSentimentDelta:
+    """Signed per-coin change applied to ``coin_sentiment_aggregates``."""
+
+    def __init__(self):
+        self.article_count = 0
+        self.sentiment_sum = Decimal(0)
+        self.positive_count = 0
+        self.negative_count = 0
+        self.neutral_count = 0
+        self.histogram = SentimentHistogram()
+        self.latest_article = None
+
+    def add(self, score: Score, published_at=None, sign: int = 1) -> None:
+        value = to_decimal(score)
+        self.article_count += sign
+        self.sentiment_sum += sign * value
+        if value > POSITIVE_THRESHOLD:
+            self.positive_count += sign
+        elif value < NEGATIVE_THRESHOLD:
+            self.negative_count += sign
+        else:
+            self.neutral_count += sign
+        self.histogram.add(value, sign)
+        if sign > 0 and published_at is not None:
+            if self.latest_article is None or published_at > self.latest_article:
+                self.latest_article = published_at
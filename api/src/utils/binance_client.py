@@ -15,6 +15,7 @@ from .exceptions import (
     BinanceOrderError,
     BinanceServerError,
 )
+from .candles import CandleFrame
 
 
 class BinanceClient:
@@ -112,8 +113,12 @@ class BinanceClient:
         params: Dict[str, Any] = None,
         signed: bool = True,
         retry_count: int = 0,
+        raw: bool = False,
     ) -> Dict[str, Any]:
-        """Make HTTP request with retry logic."""
+        """Make HTTP request with retry logic.
+
+        With `raw`, returns the response body undecoded.
+        """
         base_url = self._get_base_url(market_type)
         url = f"{base_url}{endpoint}"
 
@@ -142,7 +147,7 @@ class BinanceClient:
             if response.status_code >= 400:
                 self._handle_error(response, f"{method} {endpoint}")
 
-            return response.json()
+            return response.content if raw else response.json()
 
         except (httpx.TimeoutException, httpx.ConnectError) as e:
             # Network errors - retry
@@ -152,7 +157,13 @@ class BinanceClient:
                 )
                 await self._sleep(self.RETRY_DELAY)
                 return await self._make_request(
-                    method, endpoint, market_type, params, signed, retry_count + 1
+                    method,
+                    endpoint,
+                    market_type,
+                    params,
+                    signed,
+                    retry_count + 1,
+                    raw,
                 )
             raise BinanceAPIError(
                 f"Request failed after {self.MAX_RETRIES} retries: {str(e)}"
@@ -166,7 +177,13 @@ class BinanceClient:
                 )
                 await self._sleep(self.RETRY_DELAY)
                 return await self._make_request(
-                    method, endpoint, market_type, params, signed, retry_count + 1
+                    method,
+                    endpoint,
+                    market_type,
+                    params,
+                    signed,
+                    retry_count + 1,
+                    raw,
                 )
             raise
 
@@ -179,7 +196,13 @@ class BinanceClient:
                 )
                 await self._sleep(delay)
                 return await self._make_request(
-                    method, endpoint, market_type, params, signed, retry_count + 1
+                    method,
+                    endpoint,
+                    market_type,
+                    params,
+                    signed,
+                    retry_count + 1,
+                    raw,
                 )
             raise
 
@@ -507,6 +530,47 @@ class BinanceClient:
         else:
             raise BinanceValidationError(f"Invalid market type: {market_type}")
 
+    async def get_kline_columns(
+        self,
+        symbol: str,
+        market_type: str,
+        interval: str,
+        limit: int = 500,
+        start_time: int = None,
+        end_time: int = None,
+    ) -> CandleFrame:
+        """Get klines for any market type, decoded column-wise."""
+        market_type = market_type.lower()
+
+        if market_type == "spot":
+            endpoint = "/api/v3/klines"
+        elif market_type in ["usd_m", "usdm", "usd-m"]:
+            endpoint = "/fapi/v1/klines"
+        elif market_type in ["coin_m", "coinm", "coin-m"]:
+            endpoint = "/dapi/v1/klines"
+        else:
+            raise BinanceValidationError(f"Invalid market type: {market_type}")
+
+        params = {
+            "symbol": symbol.upper(),
+            "interval": interval,
+            "limit": limit,
+        }
+        if start_time:
+            params["startTime"] = start_time
+        if end_time:
+            params["endTime"] = end_time
+
+        body = await self._make_request(
+            "GET",
+            endpoint,
+            market_type=market_type,
+            params=params,
+            signed=False,
+            raw=True,
+        )
+        return CandleFrame.from_bytes(body)
+
     async def place_order(
         self,
         symbol: str,
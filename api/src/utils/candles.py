@@ -0,0 +1,269 @@
+"""Columnar candle container shared by routes, services, and indicators."""
+
+import json
+from datetime import datetime
+from operator import getitem
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .exceptions import BinanceAPIError
+
+try:
+    from ..models.trading_models import CandlestickData
+except ImportError:
+    from models.trading_models import CandlestickData
+
+
+KLINE_WIDTH = 12  # fields per kline in Binance responses, the last one unused
+
+# Value Binance sends for the unused last kline field
+KLINE_UNUSED_FIELD = "0"
+
+# Stripped from a klines response body, leaving only comma-separated numbers
+KLINE_NON_NUMERIC_BYTES = b'[]" \t\r\n'
+
+# Columns holding millisecond timestamps and counts, the others are float64
+TIME_COLUMNS = ("open_time", "close_time")
+INT_COLUMNS = TIME_COLUMNS + ("trades",)
+
+# Field names per column in CandlestickData and candlestick_cache rows
+MODEL_FIELDS = {
+    "open_time": "open_time",
+    "open": "open_price",
+    "high": "high_price",
+    "low": "low_price",
+    "close": "close_price",
+    "volume": "volume",
+    "close_time": "close_time",
+    "quote_volume": "quote_volume",
+    "trades": "trades",
+    "taker_buy_base_volume": "taker_buy_base_volume",
+    "taker_buy_quote_volume": "taker_buy_quote_volume",
+}
+
+# Field names per column in klines from the n8n Binance node
+N8N_FIELDS = {
+    "open_time": "openTime",
+    "open": "open",
+    "high": "high",
+    "low": "low",
+    "close": "close",
+    "volume": "volume",
+    "close_time": "closeTime",
+    "quote_volume": "quoteVolume",
+    "trades": "trades",
+    "taker_buy_base_volume": "takerBuyBaseVolume",
+    "taker_buy_quote_volume": "takerBuyQuoteVolume",
+}
+
+# Field names per column in PriceDataPoint
+PRICE_POINT_FIELDS = {
+    "open_time": "open_time",
+    "open": "open_price",
+    "high": "high_price",
+    "low": "low_price",
+    "close": "close_price",
+    "volume": "volume",
+    "close_time": "close_time",
+    "quote_volume": "quote_asset_volume",
+    "trades": "number_of_trades",
+    "taker_buy_base_volume": "taker_buy_base_asset_volume",
+    "taker_buy_quote_volume": "taker_buy_quote_asset_volume",
+}
+
+
+def to_datetime(timestamp: int) -> datetime:
+    """Millisecond timestamp to a naive local datetime, as stored in the cache."""
+    return datetime.fromtimestamp(timestamp / 1000)
+
+
+def to_timestamp(value: datetime) -> int:
+    """Datetime to a millisecond timestamp."""
+    return round(value.timestamp() * 1000)
+
+
+class CandleFrame:
+    """Candles as one contiguous numpy array per field.
+
+    Times are int64 millisecond timestamps, trades int64, prices and volumes
+    float64, all in time order as received. This is the one representation of
+    candles between their sources (Binance responses, n8n klines, cache rows)
+    and their consumers (indicators, validation, responses), which convert
+    only at the edges via the `from_*` and `to_*` methods.
+
+    Slicing, e.g. `candles[-50:]`, returns a frame of views on the same
+    arrays, so windows over a series cost no copy.
+    """
+
+    __slots__ = tuple(MODEL_FIELDS)
+
+    def __init__(self, **columns: Any):
+        """Columns by name as arrays or sequences, cast to their dtype."""
+        for name in self.__slots__:
+            dtype = np.int64 if name in INT_COLUMNS else np.float64
+            setattr(self, name, np.ascontiguousarray(columns[name], dtype=dtype))
+
+        if len({len(getattr(self, name)) for name in self.__slots__}) > 1:
+            raise ValueError("All candle columns must have the same length")
+
+    @classmethod
+    def from_values(cls, values: np.ndarray) -> "CandleFrame":
+        """Columns from a (candles, fields) float64 array, in Binance field order."""
+        columns = np.ascontiguousarray(values.T)
+        return cls(**dict(zip(cls.__slots__, columns)))
+
+    @classmethod
+    def from_bytes(cls, body: bytes) -> "CandleFrame":
+        """Decode a Binance klines response body.
+
+        The body is parsed with numpy's text parser instead of building a list
+        of string lists first, so decoding creates no Python object per field.
+        """
+        numbers = body.translate(None, KLINE_NON_NUMERIC_BYTES)
+        if not numbers:
+            return cls.from_values(np.empty((0, KLINE_WIDTH)))
+
+        try:
+            values = np.fromstring(numbers, dtype=np.float64, sep=",")
+        except ValueError:
+            values = None  # a non-numeric field, e.g. an unexpected format
+
+        # one bracket per kline plus the outer one
+        if values is None or values.size != (body.count(b"[") - 1) * KLINE_WIDTH:
+            return cls.from_rows(json.loads(body))
+
+        return cls.from_values(values.reshape(-1, KLINE_WIDTH))
+
+    @classmethod
+    def from_rows(cls, rows: List[List]) -> "CandleFrame":
+        """Decode Binance klines already parsed from JSON, with numbers as strings or not."""
+        width = len(cls.__slots__)
+        try:
+            values = np.array([row[:width] for row in rows], dtype=np.float64)
+        except (TypeError, ValueError) as e:
+            raise BinanceAPIError(f"Unexpected klines response: {e}")
+
+        if values.size == 0:
+            values = np.empty((0, width))
+        elif values.ndim != 2 or values.shape[1] != width:
+            raise BinanceAPIError(
+                f"Unexpected klines response: expected {width} fields per kline"
+            )
+
+        return cls.from_values(values)
+
+    @classmethod
+    def from_records(cls, records: Sequence[Any]) -> "CandleFrame":
+        """From asyncpg records of candlestick_cache rows."""
+        return cls._from_fields(records, MODEL_FIELDS, getitem)
+
+    @classmethod
+    def from_models(cls, candles: Sequence[CandlestickData]) -> "CandleFrame":
+        """From CandlestickData models."""
+        return cls._from_fields(candles, MODEL_FIELDS, getattr)
+
+    @classmethod
+    def from_n8n(cls, klines: Sequence[Any]) -> "CandleFrame":
+        """From N8NKline models, whose prices and volumes are strings."""
+        return cls._from_fields(klines, N8N_FIELDS, getattr)
+
+    @classmethod
+    def _from_fields(
+        cls,
+        items: Sequence[Any],
+        fields: Dict[str, str],
+        get: Callable[[Any, str], Any],
+    ) -> "CandleFrame":
+        columns = {}
+        for name, field in fields.items():
+            values = [get(item, field) for item in items]
+            if name in TIME_COLUMNS and values and isinstance(values[0], datetime):
+                values = [to_timestamp(value) for value in values]
+            columns[name] = values
+
+        return cls(**columns)
+
+    def __len__(self) -> int:
+        return len(self.open_time)
+
+    def __getitem__(self, index: slice) -> "CandleFrame":
+        if not isinstance(index, slice):
+            raise TypeError("CandleFrame only supports slicing, e.g. candles[-50:]")
+
+        frame = object.__new__(type(self))
+        for name in self.__slots__:
+            setattr(frame, name, getattr(self, name)[index])
+        return frame
+
+    def sort(self) -> "CandleFrame":
+        """Candles ordered by close time; the frame itself if already ordered."""
+        if np.all(self.close_time[1:] >= self.close_time[:-1]):
+            return self
+
+        order = np.argsort(self.close_time, kind="stable")
+        return type(self)(
+            **{name: getattr(self, name)[order] for name in self.__slots__}
+        )
+
+    def records(self) -> List[Tuple]:
+        """One tuple of native Python values per candle, in `__slots__` order."""
+        return list(zip(*(getattr(self, name).tolist() for name in self.__slots__)))
+
+    def to_rows(
+        self, symbol: str, market_type: str, interval: str, updated_at: datetime
+    ) -> List[Tuple]:
+        """candlestick_cache rows, in column order."""
+        return [
+            (
+                symbol,
+                market_type,
+                interval,
+                to_datetime(record[0]),
+                *record[1:6],
+                to_datetime(record[6]),
+                *record[7:],
+                updated_at,
+            )
+            for record in self.records()
+        ]
+
+    def to_models(
+        self,
+        symbol: str,
+        market_type: str,
+        interval: str,
+        updated_at: Optional[datetime] = None,
+    ) -> List[CandlestickData]:
+        """CandlestickData models, e.g. for a CandlestickResponse."""
+        return [
+            CandlestickData(
+                symbol=symbol,
+                market_type=market_type,
+                interval=interval,
+                updated_at=updated_at,
+                **fields,
+            )
+            for fields in self._to_dicts(MODEL_FIELDS, to_datetime)
+        ]
+
+    def to_price_points(self) -> List[Dict[str, Any]]:
+        """PriceDataPoint dicts, with times as ISO strings."""
+        points = self._to_dicts(
+            PRICE_POINT_FIELDS, lambda timestamp: to_datetime(timestamp).isoformat()
+        )
+        for point in points:
+            point["ignore"] = KLINE_UNUSED_FIELD
+        return points
+
+    def _to_dicts(
+        self, fields: Dict[str, str], convert_time: Callable[[int], Any]
+    ) -> List[Dict[str, Any]]:
+        keys = [fields[name] for name in self.__slots__]
+        times = [keys[self.__slots__.index(name)] for name in TIME_COLUMNS]
+
+        dicts = [dict(zip(keys, record)) for record in self.records()]
+        for values in dicts:
+            for key in times:
+                values[key] = convert_time(values[key])
+        return dicts
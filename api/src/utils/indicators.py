@@ -7,7 +7,11 @@ from datetime import datetime
 
 
 class TechnicalIndicators:
-    """Core technical indicator calculations."""
+    """Core technical indicator calculations.
+
+    Prices may be lists or numpy arrays, e.g. the `close` column of a
+    CandleFrame, which is then used without conversion.
+    """
 
     @staticmethod
     def calculate_rsi(prices: List[float], period: int = 14) -> float:
@@ -270,13 +274,18 @@ class TechnicalIndicators:
         Raises:
             ValueError: If data validation fails
         """
-        if not prices:
+        if len(prices) == 0:
             raise ValueError("Price data cannot be empty")
 
-        if not all(isinstance(price, (int, float)) for price in prices):
+        if isinstance(prices, np.ndarray):
+            if prices.dtype.kind not in "iuf":
+                raise ValueError("All prices must be numeric values")
+        elif not all(isinstance(price, (int, float)) for price in prices):
             raise ValueError("All prices must be numeric values")
 
-        if any(price <= 0 for price in prices):
+        prices = np.asarray(prices, dtype=np.float64)
+
+        if np.any(prices <= 0):
             raise ValueError("All prices must be positive")
 
         if len(prices) < min_candles:
@@ -285,7 +294,7 @@ class TechnicalIndicators:
             )
 
         # Check for reasonable price variation
-        if len(set(prices)) < 2:
+        if np.all(prices == prices[0]):
             raise ValueError(
                 "Price data must contain variation (all prices are identical)"
             )
@@ -305,7 +314,7 @@ class TechnicalIndicators:
         Raises:
             ValueError: If insufficient data or invalid inputs
         """
-        if not prices:
+        if len(prices) == 0:
             raise ValueError("Price data cannot be empty for SMA calculation")
 
         if not windows:
@@ -380,7 +389,7 @@ class TechnicalIndicators:
         Raises:
             ValueError: If insufficient data or invalid inputs
         """
-        if not prices:
+        if len(prices) == 0:
             raise ValueError("Price data cannot be empty for EMA calculation")
 
         if not windows:
@@ -4,6 +4,10 @@ from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime, timedelta
 import logging
 
+import numpy as np
+
+from .candles import CandleFrame
+
 logger = logging.getLogger(__name__)
 
 
@@ -196,50 +200,132 @@ def validate_price_data(
     errors = []
 
     for index, data_point in enumerate(data_points):
-        if not skip_time_validation:
-            is_valid, error_msg = validate_close_time(data_point, interval_value, index)
-            if not is_valid:
-                errors.append(
-                    PriceValidationError(
-                        index=index,
-                        error_type="CLOSE_TIME_VALIDATION",
-                        message=error_msg,
-                        details={
-                            "open_time": data_point.get("open_time"),
-                            "close_time": data_point.get("close_time"),
-                            "interval": interval_value,
-                        },
-                    )
-                )
+        errors.extend(
+            validate_data_point(
+                data_point,
+                index,
+                interval_value,
+                skip_volume_validation,
+                skip_time_validation,
+                skip_price_validation,
+            )
+        )
 
-        if not skip_price_validation:
-            is_valid, error_msg = validate_prices(data_point, index)
-            if not is_valid:
-                errors.append(
-                    PriceValidationError(
-                        index=index,
-                        error_type="PRICE_VALIDATION",
-                        message=error_msg,
-                        details={
-                            "open_price": data_point.get("open_price"),
-                            "high_price": data_point.get("high_price"),
-                            "low_price": data_point.get("low_price"),
-                            "close_price": data_point.get("close_price"),
-                        },
-                    )
-                )
+    return errors
 
-        if not skip_volume_validation:
-            is_valid, error_msg = validate_volume(data_point, index)
-            if not is_valid:
-                errors.append(
-                    PriceValidationError(
-                        index=index,
-                        error_type="VOLUME_VALIDATION",
-                        message=error_msg,
-                        details={"volume": data_point.get("volume")},
-                    )
+
+def validate_data_point(
+    data_point: Dict[str, Any],
+    index: int,
+    interval_value: str,
+    skip_volume_validation: bool = False,
+    skip_time_validation: bool = False,
+    skip_price_validation: bool = False,
+) -> List[PriceValidationError]:
+    """Validate a single price data point, see `validate_price_data`.
+
+    Returns:
+        List of validation errors for this data point (empty if valid)
+    """
+    errors = []
+
+    if not skip_time_validation:
+        is_valid, error_msg = validate_close_time(data_point, interval_value, index)
+        if not is_valid:
+            errors.append(
+                PriceValidationError(
+                    index=index,
+                    error_type="CLOSE_TIME_VALIDATION",
+                    message=error_msg,
+                    details={
+                        "open_time": data_point.get("open_time"),
+                        "close_time": data_point.get("close_time"),
+                        "interval": interval_value,
+                    },
+                )
+            )
+
+    if not skip_price_validation:
+        is_valid, error_msg = validate_prices(data_point, index)
+        if not is_valid:
+            errors.append(
+                PriceValidationError(
+                    index=index,
+                    error_type="PRICE_VALIDATION",
+                    message=error_msg,
+                    details={
+                        "open_price": data_point.get("open_price"),
+                        "high_price": data_point.get("high_price"),
+                        "low_price": data_point.get("low_price"),
+                        "close_price": data_point.get("close_price"),
+                    },
                 )
+            )
+
+    if not skip_volume_validation:
+        is_valid, error_msg = validate_volume(data_point, index)
+        if not is_valid:
+            errors.append(
+                PriceValidationError(
+                    index=index,
+                    error_type="VOLUME_VALIDATION",
+                    message=error_msg,
+                    details={"volume": data_point.get("volume")},
+                )
+            )
+
+    return errors
+
+
+def validate_candles(
+    candles: CandleFrame,
+    interval_value: str,
+    skip_volume_validation: bool = False,
+    skip_time_validation: bool = False,
+    skip_price_validation: bool = False,
+) -> List[PriceValidationError]:
+    """Validate a CandleFrame with the same checks as `validate_price_data`.
+
+    All candles are checked at once with array comparisons; only those that
+    fail are converted to data points to build their errors.
+
+    Args:
+        candles: Candles in time order
+        interval_value: The interval string for time validation
+        skip_volume_validation: Skip volume validation if True
+        skip_time_validation: Skip close_time validation if True
+        skip_price_validation: Skip price consistency validation if True
+
+    Returns:
+        List of validation errors (empty if all valid)
+    """
+    invalid = np.zeros(len(candles), dtype=bool)
+
+    if not skip_time_validation:
+        duration_ms = get_interval_duration_minutes(interval_value) * 60_000
+        invalid |= np.abs(candles.close_time - candles.open_time - duration_ms) > 60_000
+
+    if not skip_price_validation:
+        invalid |= (candles.high < np.maximum(candles.open, candles.close)) | (
+            candles.low > np.minimum(candles.open, candles.close)
+        )
+
+    if not skip_volume_validation:
+        invalid |= candles.volume <= 0
+
+    errors = []
+    for index in np.flatnonzero(invalid).tolist():
+        (data_point,) = candles[index : index + 1].to_price_points()
+        errors.extend(
+            validate_data_point(
+                data_point,
+                index,
+                interval_value,
+                skip_volume_validation,
+                skip_time_validation,
+                skip_price_validation,
+            )
+        )
 
     return errors
 
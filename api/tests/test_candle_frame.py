@@ -0,0 +1,230 @@
+"""Tests for the columnar candle container and its conversions."""
+
+import asyncio
+import os
+import sys
+from datetime import datetime, timezone
+from decimal import Decimal
+from unittest.mock import AsyncMock, patch
+
+import numpy as np
+import pytest
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+)
+
+from models.ingest_models import N8NKline
+from utils.candles import CandleFrame
+from utils.indicators import TechnicalIndicators
+from utils.price_validation import validate_candles, validate_price_data
+
+HOUR_MS = 3_600_000
+START_MS = 1704067200000  # 2024-01-01T00:00:00Z
+
+
+def binance_rows(count: int) -> list:
+    return [
+        [
+            START_MS + i * HOUR_MS,
+            f"{100 + i}.0",
+            f"{102 + i}.0",
+            f"{99 + i}.0",
+            f"{101 + i}.0",
+            "10.5",
+            START_MS + (i + 1) * HOUR_MS - 1,
+            "1050.0",
+            20 + i,
+            "5.25",
+            "525.0",
+            "0",
+        ]
+        for i in range(count)
+    ]
+
+
+class TestSlicing:
+    def test_slices_are_views_on_the_same_columns(self):
+        candles = CandleFrame.from_rows(binance_rows(10))
+
+        window = candles[-3:]
+
+        assert len(window) == 3
+        assert window.close.tolist() == [108.0, 109.0, 110.0]
+        assert np.shares_memory(window.close, candles.close)
+        assert np.shares_memory(window.open_time, candles.open_time)
+
+    def test_rejects_indexing_a_single_candle(self):
+        with pytest.raises(TypeError, match="slicing"):
+            CandleFrame.from_rows(binance_rows(2))[0]
+
+    def test_rejects_columns_of_different_lengths(self):
+        columns = {name: [1.0] for name in CandleFrame.__slots__}
+        columns["close"] = [1.0, 2.0]
+
+        with pytest.raises(ValueError, match="same length"):
+            CandleFrame(**columns)
+
+
+class TestConversions:
+    def test_models_round_trip(self):
+        candles = CandleFrame.from_rows(binance_rows(3))
+
+        models = candles.to_models("BTCUSDT", "spot", "1h")
+        restored = CandleFrame.from_models(models)
+
+        assert models[0].open_price == 100.0
+        assert models[0].open_time == datetime.fromtimestamp(START_MS / 1000)
+        assert models[2].trades == 22
+        assert restored.records() == candles.records()
+
+    def test_from_records_of_cache_rows(self):
+        records = [
+            {
+                "open_time": datetime(2024, 1, 1, tzinfo=timezone.utc),
+                "open_price": Decimal("100.5"),
+                "high_price": Decimal("102"),
+                "low_price": Decimal("99"),
+                "close_price": Decimal("101.25"),
+                "volume": Decimal("10"),
+                "close_time": datetime(2024, 1, 1, 0, 59, 59, 999000, timezone.utc),
+                "quote_volume": Decimal("1000"),
+                "trades": 7,
+                "taker_buy_base_volume": Decimal("5"),
+                "taker_buy_quote_volume": Decimal("500"),
+            }
+        ]
+
+        candles = CandleFrame.from_records(records)
+
+        assert candles.open_time.tolist() == [START_MS]
+        assert candles.close_time.tolist() == [START_MS + HOUR_MS - 1]
+        assert candles.close.tolist() == [101.25]
+        assert candles.trades.dtype == np.int64
+
+    def test_from_n8n_sorts_by_close_time(self):
+        klines = [
+            N8NKline(
+                openTime=open_time,
+                open="1",
+                high="3",
+                low="0.5",
+                close=close,
+                volume="1",
+                closeTime=open_time + HOUR_MS - 1,
+                quoteVolume="1",
+                trades=1,
+                takerBuyBaseVolume="1",
+                takerBuyQuoteVolume="1",
+            )
+            for open_time, close in [(START_MS + HOUR_MS, "2.5"), (START_MS, "1.5")]
+        ]
+
+        candles = CandleFrame.from_n8n(klines).sort()
+
+        assert candles.close.tolist() == [1.5, 2.5]
+        assert candles.open_time.tolist() == [START_MS, START_MS + HOUR_MS]
+
+    def test_cache_rows_and_price_points(self):
+        candles = CandleFrame.from_rows(binance_rows(1))
+        updated_at = datetime(2024, 1, 2)
+
+        (row,) = candles.to_rows("BTCUSDT", "spot", "1h", updated_at)
+        (point,) = candles.to_price_points()
+
+        assert row[:3] == ("BTCUSDT", "spot", "1h")
+        assert row[3] == datetime.fromtimestamp(START_MS / 1000)
+        assert row[4:9] == (100.0, 102.0, 99.0, 101.0, 10.5)
+        assert row[11] == 20
+        assert row[14] == updated_at
+        assert point["open_time"] == datetime.fromtimestamp(START_MS / 1000).isoformat()
+        assert point["number_of_trades"] == 20
+        assert point["ignore"] == "0"
+
+
+class TestValidateCandles:
+    def test_matches_validation_of_price_points(self):
+        rows = binance_rows(5)
+        rows[1][2] = "50.0"  # high below open and close
+        rows[3][5] = "0"  # no volume
+        rows[4][6] = START_MS + 10 * HOUR_MS  # closes hours late
+        candles = CandleFrame.from_rows(rows)
+
+        errors = validate_candles(candles, "1h")
+        expected = validate_price_data(candles.to_price_points(), "1h")
+
+        assert [(e.index, e.error_type, e.message) for e in errors] == [
+            (e.index, e.error_type, e.message) for e in expected
+        ]
+        assert [e.index for e in errors] == [1, 3, 4]
+
+    def test_skips_checks(self):
+        rows = binance_rows(2)
+        rows[0][5] = "0"
+
+        candles = CandleFrame.from_rows(rows)
+
+        assert validate_candles(candles, "1h", skip_volume_validation=True) == []
+
+
+class TestIndicatorsOnColumns:
+    def test_indicators_accept_the_close_column(self):
+        closes = [100 + (i % 7) * 1.5 for i in range(60)]
+        rows = binance_rows(60)
+        for row, close in zip(rows, closes):
+            row[4] = str(close)
+        candles = CandleFrame.from_rows(rows)
+
+        TechnicalIndicators.validate_price_data(candles.close, min_candles=30)
+
+        assert TechnicalIndicators.calculate_rsi(
+            candles.close
+        ) == TechnicalIndicators.calculate_rsi(closes)
+        assert TechnicalIndicators.calculate_sma(
+            candles.close, [20, 50]
+        ) == TechnicalIndicators.calculate_sma(closes, [20, 50])
+
+    def test_validate_price_data_rejects_non_positive_columns(self):
+        with pytest.raises(ValueError, match="All prices must be positive"):
+            TechnicalIndicators.validate_price_data(np.array([10.0, 0.0, 10.5]))
+
+
+class TestGetCachedCandles:
+    def test_returns_latest_candles_oldest_first(self):
+        from services.candlestick_sync import CandlestickSyncService, db
+
+        candles = CandleFrame.from_rows(binance_rows(3))
+        records = [
+            dict(zip(("symbol", "market_type", "interval"), row[:3]))
+            | dict(
+                zip(
+                    (
+                        "open_time",
+                        "open_price",
+                        "high_price",
+                        "low_price",
+                        "close_price",
+                        "volume",
+                        "close_time",
+                        "quote_volume",
+                        "trades",
+                        "taker_buy_base_volume",
+                        "taker_buy_quote_volume",
+                        "updated_at",
+                    ),
+                    row[3:],
+                )
+            )
+            for row in candles.to_rows("BTCUSDT", "spot", "1h", datetime.now())
+        ]
+
+        with patch.object(db, "pool", AsyncMock()) as pool:
+            pool.fetch.return_value = records[::-1]  # newest first
+            cached = asyncio.run(
+                CandlestickSyncService().get_cached_candles("btcusdt", "SPOT", "1h")
+            )
+
+        assert cached.records() == candles.records()
+        query, *params = pool.fetch.call_args.args
+        assert "ORDER BY open_time DESC" in query
+        assert params == ["BTCUSDT", "spot", "1h", 100]
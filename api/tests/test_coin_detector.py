@@ -0,0 +1,98 @@
+"""Tests for the exchangeInfo-backed coin detector."""
+
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+)
+
+from services.coin_detector import (
+    CoinDetector,
+    CoinMatcher,
+    extract_base_assets,
+    load_cached_base_assets,
+)
+
+RECORDED_EXCHANGE_INFO = {
+    "timezone": "UTC",
+    "symbols": [
+        {"symbol": "BTCUSDT", "baseAsset": "BTC", "status": "TRADING"},
+        {"symbol": "PENGUUSDT", "baseAsset": "PENGU", "status": "TRADING"},
+        {"symbol": "WIFUSDT", "baseAsset": "WIF", "status": "TRADING"},
+        {"symbol": "NOTUSDT", "baseAsset": "NOT", "status": "TRADING"},
+        {"symbol": "OLDUSDT", "baseAsset": "OLD", "status": "BREAK"},
+    ],
+}
+
+
+@pytest.fixture
+def cache_file(tmp_path):
+    path = tmp_path / "exchange_info.json"
+    path.write_text(json.dumps(RECORDED_EXCHANGE_INFO))
+    return str(path)
+
+
+class TestCoinMatcher:
+    def test_multi_word_alias(self):
+        matcher = CoinMatcher({"BNB": ["binance coin", "bnb"]})
+        assert matcher.match("Binance Coin rallies")["BNB"] == ["binance coin"]
+
+    def test_word_boundaries(self):
+        matcher = CoinMatcher({"ETH": ["eth"]})
+        assert matcher.match("Ethernet cables") == {}
+
+    def test_exact_tickers_are_case_sensitive(self):
+        matcher = CoinMatcher({}, tickers=["PENGU"])
+        assert "PENGU" in matcher.match("PENGU jumps 20%")
+        assert matcher.match("a pengu walks in") == {}
+
+
+class TestCoinDetector:
+    def test_builtin_aliases_without_cache(self, tmp_path):
+        detector = CoinDetector(cache_path=str(tmp_path / "missing.json"))
+        coins = detector.detect_coins(
+            title="Bitcoin hits new high", summary="BTC and ETH rally"
+        )
+        by_symbol = {c["symbol"]: c for c in coins}
+
+        assert by_symbol["BTC"]["mentions"] == 2
+        assert by_symbol["BTC"]["confidence"] == 0.5
+        assert by_symbol["BTC"]["mentioned_in"] == ["title", "summary"]
+        assert by_symbol["ETH"]["mentioned_in"] == ["summary"]
+
+    def test_recorded_exchange_info_adds_tickers(self, cache_file):
+        detector = CoinDetector(cache_path=cache_file)
+        symbols = detector.get_unique_coins(
+            detector.detect_coins(title="WIF and PENGU lead memecoin rebound")
+        )
+        assert sorted(symbols) == ["PENGU", "WIF"]
+
+    def test_ambiguous_tickers_are_not_auto_added(self, cache_file):
+        detector = CoinDetector(cache_path=cache_file)
+        assert detector.detect_coins(title="Why this is NOT a bubble") == []
+
+    def test_extract_base_assets_skips_inactive_symbols(self):
+        assert extract_base_assets(RECORDED_EXCHANGE_INFO) == [
+            "BTC",
+            "NOT",
+            "PENGU",
+            "WIF",
+        ]
+
+    def test_compact_cache_format(self, tmp_path):
+        path = tmp_path / "cache.json"
+        path.write_text(json.dumps({"base_assets": ["pengu", "wif"]}))
+        assert load_cached_base_assets(str(path)) == ["PENGU", "WIF"]
+
+    @pytest.mark.asyncio
+    async def test_failed_refresh_keeps_matcher(self, cache_file):
+        detector = CoinDetector(cache_path=cache_file)
+        detector.base_url = "http://127.0.0.1:9"
+        before = detector.matcher
+
+        assert await detector.refresh() is False
+        assert detector.matcher is before
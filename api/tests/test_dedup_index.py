@@ -0,0 +1,73 @@
+"""Tests for the MinHash near-duplicate article index."""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+)
+
+from services.dedup_index import NearDuplicateIndex, shingles
+
+ORIGINAL = (
+    "Bitcoin ETF inflows hit record as BlackRock fund tops $2 billion. "
+    "Spot bitcoin exchange-traded funds saw their largest daily inflow on Tuesday."
+)
+SYNDICATED = (
+    "Bitcoin ETF inflows hit record as BlackRock fund tops $2 billion - "
+    "<p>Spot bitcoin exchange-traded funds saw their largest daily inflow on Tuesday</p>"
+)
+UNRELATED = "Ethereum developers schedule Pectra upgrade for mainnet in March"
+
+
+@pytest.fixture
+def index():
+    return NearDuplicateIndex(threshold=0.7, window_seconds=3600)
+
+
+def test_shingles_strip_markup():
+    assert shingles("<b>Hello</b> World") == {"hello world"}
+
+
+def test_syndicated_copy_links_to_canonical(index):
+    index.add("a1", index.signature(ORIGINAL), now=0)
+
+    match = index.find(index.signature(SYNDICATED), now=10)
+
+    assert match is not None
+    assert match[0] == "a1"
+    assert match[1] >= 0.7
+
+
+def test_unrelated_article_is_not_duplicate(index):
+    index.add("a1", index.signature(ORIGINAL), now=0)
+    assert index.find(index.signature(UNRELATED), now=10) is None
+
+
+def test_chained_duplicates_keep_first_canonical(index):
+    index.add("a1", index.signature(ORIGINAL), now=0)
+    index.add("a2", index.signature(SYNDICATED), canonical_id="a1", now=1)
+    index._remove("a1", index.signature(ORIGINAL))
+
+    assert index.find(index.signature(ORIGINAL), now=2)[0] == "a1"
+
+
+def test_time_based_eviction(index):
+    index.add("a1", index.signature(ORIGINAL), now=0)
+    assert index.find(index.signature(SYNDICATED), now=3601) is None
+    assert len(index) == 0
+    assert index._buckets == {}
+
+
+def test_max_entries_bound():
+    index = NearDuplicateIndex(max_entries=2)
+    for i in range(5):
+        index.add(f"a{i}", index.signature(f"headline number {i} about crypto"), now=i)
+    assert len(index) == 2
+
+
+def test_invalid_threshold():
+    with pytest.raises(ValueError):
+        NearDuplicateIndex(threshold=0)
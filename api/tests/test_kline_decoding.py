@@ -0,0 +1,124 @@
+"""Tests for column-wise decoding of Binance klines."""
+
+import asyncio
+import json
+import os
+import sys
+from unittest.mock import AsyncMock, patch
+
+import numpy as np
+import pytest
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+)
+
+from utils.binance_client import BinanceClient
+from utils.candles import CandleFrame
+from utils.exceptions import BinanceAPIError
+
+
+def kline(i: int) -> list:
+    return [
+        1704067200000 + i * 60000,
+        f"{45000 + i:.8f}",
+        f"{45100 + i:.8f}",
+        f"{44900 + i:.8f}",
+        f"{45050 + i:.8f}",
+        "12.50000000",
+        1704067259999 + i * 60000,
+        "562500.00000000",
+        100 + i,
+        "6.25000000",
+        "281250.00000000",
+        "0",
+    ]
+
+
+def body(klines: list) -> bytes:
+    return json.dumps(klines, separators=(",", ":")).encode()
+
+
+class TestFromBytes:
+    def test_decodes_columns_with_their_types(self):
+        klines = CandleFrame.from_bytes(body([kline(0), kline(1)]))
+
+        assert len(klines) == 2
+        assert klines.open_time.dtype == np.int64
+        assert klines.open_time.tolist() == [1704067200000, 1704067260000]
+        assert klines.close.tolist() == [45050.0, 45051.0]
+        assert klines.trades.tolist() == [100, 101]
+        assert klines.close.flags["C_CONTIGUOUS"]
+
+    def test_records_are_native_values_in_field_order(self):
+        (record,) = CandleFrame.from_bytes(body([kline(0)])).records()
+
+        assert record == (
+            1704067200000,
+            45000.0,
+            45100.0,
+            44900.0,
+            45050.0,
+            12.5,
+            1704067259999,
+            562500.0,
+            100,
+            6.25,
+            281250.0,
+        )
+        assert all(type(value) in (int, float) for value in record)
+
+    def test_empty_response(self):
+        assert len(CandleFrame.from_bytes(b"[]")) == 0
+
+    def test_falls_back_to_json_for_non_numeric_unused_field(self):
+        klines = CandleFrame.from_bytes(body([kline(0)[:11] + ["ignore"]]))
+
+        assert klines.close.tolist() == [45050.0]
+
+    def test_rejects_klines_with_missing_fields(self):
+        with pytest.raises(BinanceAPIError, match="fields per kline"):
+            CandleFrame.from_bytes(body([kline(0)[:6]]))
+
+
+class TestGetKlineColumns:
+    def test_requests_raw_body_from_market_endpoint(self):
+        with patch.dict(
+            os.environ, {"BINANCE_API_KEY": "key", "BINANCE_SECRET_KEY": "secret"}
+        ):
+            client = BinanceClient()
+
+        with patch.object(
+            client, "_make_request", AsyncMock(return_value=body([kline(0)]))
+        ) as make_request:
+            klines = asyncio.run(
+                client.get_kline_columns("btcusdt", "usd_m", "1m", limit=1)
+            )
+
+        assert len(klines) == 1
+        args, kwargs = make_request.call_args
+        assert args == ("GET", "/fapi/v1/klines")
+        assert kwargs["params"]["symbol"] == "BTCUSDT"
+        assert kwargs["raw"] is True
+
+
+class TestSyncSymbolInterval:
+    def test_upserts_all_klines_in_one_batch(self):
+        from services.candlestick_sync import CandlestickSyncService, db
+
+        service = CandlestickSyncService()
+        service.client = AsyncMock()
+        service.client.get_kline_columns.return_value = CandleFrame.from_bytes(
+            body([kline(0), kline(1)])
+        )
+
+        with patch.object(db, "pool", AsyncMock()) as pool:
+            asyncio.run(service.sync_symbol_interval("btcusdt", "SPOT", "1m"))
+
+        (query, rows), _ = pool.executemany.call_args
+        assert "ON CONFLICT" in query
+        assert len(rows) == 2
+        assert rows[0][:3] == ("BTCUSDT", "spot", "1m")
+        assert rows[1][4:9] == (45001.0, 45101.0, 44901.0, 45051.0, 12.5)
+        assert rows[1][11] == 101
+        assert rows[0][14] == rows[1][14]  # one updated_at per batch
@@ -0,0 +1,87 @@
+"""Tests for news retention archival."""
+
+import asyncio
+import gzip
+import json
+import os
+import sys
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+)
+
+from services.news_retention import NewsRetention
+
+
+def _row(i, day):
+    return {
+        "id": i,
+        "article_id": f"a{i}",
+        "title": f"Story {i}",
+        "fetched_at": datetime(2026, 3, day, 12, tzinfo=timezone.utc),
+        "coins": ["BTC"],
+    }
+
+
+def _retention(tmp_path, commit_error=None):
+    conn = MagicMock()
+    conn.fetch = AsyncMock(return_value=[_row(1, 1), _row(2, 2), _row(3, 1)])
+    conn.execute = AsyncMock()
+
+    @asynccontextmanager
+    async def transaction():
+        yield
+        if commit_error:
+            raise commit_error
+
+    @asynccontextmanager
+    async def acquire():
+        yield conn
+
+    conn.transaction = transaction
+    db = MagicMock()
+    db.acquire = acquire
+
+    retention = NewsRetention(db)
+    retention.archive_dir = str(tmp_path)
+    return retention
+
+
+def test_archive_writes_gzip_jsonl_per_day_and_batch(tmp_path):
+    retention = _retention(tmp_path)
+
+    deleted = asyncio.run(retention._purge_batch(datetime.now(timezone.utc)))
+
+    assert deleted == 3
+    assert sorted(os.listdir(tmp_path)) == [
+        "news-20260301-1-3.jsonl.gz",
+        "news-20260302-2-2.jsonl.gz",
+    ]
+    with gzip.open(tmp_path / "news-20260301-1-3.jsonl.gz", "rt") as f:
+        archived = [json.loads(line) for line in f]
+
+    assert [r["article_id"] for r in archived] == ["a1", "a3"]
+    assert "id" not in archived[0]
+    assert archived[0]["fetched_at"] == "2026-03-01 12:00:00+00:00"
+
+
+def test_failed_commit_leaves_no_archive(tmp_path):
+    retention = _retention(tmp_path, commit_error=ConnectionError("lost"))
+    cutoff = datetime.now(timezone.utc) - timedelta(hours=1)
+
+    with pytest.raises(ConnectionError):
+        asyncio.run(retention._purge_batch(cutoff))
+    assert os.listdir(tmp_path) == []
+
+    # the rows are still there, so the next run archives them exactly once
+    retention = _retention(tmp_path)
+    asyncio.run(retention._purge_batch(cutoff))
+    asyncio.run(retention._purge_batch(cutoff))
+
+    with gzip.open(tmp_path / "news-20260301-1-3.jsonl.gz", "rt") as f:
+        assert [json.loads(line)["article_id"] for line in f] == ["a1", "a3"]
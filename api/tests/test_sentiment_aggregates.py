@@ -0,0 +1,48 @@
+"""Tests for expiring articles from the per-coin sentiment aggregates."""
+
+import asyncio
+import os
+import sys
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, MagicMock
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+)
+
+from services.news_service import NewsService
+
+
+def test_expiry_drops_empty_coins_and_recomputes_latest_article():
+    conn = MagicMock()
+    conn.fetch = AsyncMock(
+        return_value=[
+            {"coin_symbol": "ETH", "compound_score": 0.5},
+            {"coin_symbol": "BTC", "compound_score": -0.2},
+        ]
+    )
+    conn.execute = AsyncMock()
+    conn.executemany = AsyncMock()
+
+    @asynccontextmanager
+    async def transaction():
+        yield
+
+    @asynccontextmanager
+    async def acquire():
+        yield conn
+
+    conn.transaction = transaction
+    db = MagicMock()
+    db.acquire = acquire
+
+    expired = asyncio.run(NewsService(db).expire_sentiment_aggregates())
+
+    assert expired == 2
+    (delete_query, coins), (latest_query, latest_coins) = [
+        call.args for call in conn.execute.call_args_list
+    ]
+    assert "DELETE FROM coin_sentiment_aggregates" in delete_query
+    assert "article_count <= 0" in delete_query
+    assert "MAX(na.published_at)" in latest_query
+    assert coins == latest_coins == ["BTC", "ETH"]
@@ -0,0 +1,71 @@
+"""Tests for bucketed sentiment series construction."""
+
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+)
+
+from services.sentiment_series import (
+    accumulate_bucket_deltas,
+    bucket_start,
+    build_series,
+)
+
+NOW = datetime(2026, 3, 1, 12, 40, tzinfo=timezone.utc)
+
+
+def test_bucket_start_floors_to_interval():
+    assert bucket_start(NOW, "15m") == datetime(2026, 3, 1, 12, 30, tzinfo=timezone.utc)
+    assert bucket_start(NOW, "1h") == datetime(2026, 3, 1, 12, tzinfo=timezone.utc)
+    assert bucket_start(NOW, "4h") == datetime(2026, 3, 1, 12, tzinfo=timezone.utc)
+
+
+def test_accumulate_groups_by_coin_interval_and_bucket():
+    stored = [
+        {"coins": ["BTC", "ETH"], "compound": 0.5, "published_at": NOW},
+        {"coins": ["BTC"], "compound": -0.3, "published_at": NOW},
+    ]
+    deltas = accumulate_bucket_deltas(stored)
+    btc = deltas[("BTC", "1h", bucket_start(NOW, "1h"))]
+
+    assert btc.article_count == 2
+    assert btc.sentiment_sum == Decimal("0.2")
+    assert (btc.positive_count, btc.negative_count) == (1, 1)
+    assert deltas[("ETH", "15m", bucket_start(NOW, "15m"))].article_count == 1
+
+
+def test_build_series_fills_gaps_and_decays():
+    hour = timedelta(hours=1)
+    current = bucket_start(NOW, "1h")
+    rows = [
+        {
+            "coin_symbol": "BTC",
+            "bucket_start": current - 2 * hour,
+            "article_count": 1,
+            "sentiment_sum": Decimal("0.8"),
+            "positive_count": 1,
+            "negative_count": 0,
+        },
+        {
+            "coin_symbol": "BTC",
+            "bucket_start": current,
+            "article_count": 1,
+            "sentiment_sum": Decimal("-0.4"),
+            "positive_count": 0,
+            "negative_count": 1,
+        },
+    ]
+
+    [btc, eth] = build_series(rows, ["BTC", "ETH"], "1h", NOW, limit=3, half_life=1)
+    counts = [b["article_count"] for b in btc["buckets"]]
+
+    assert counts == [1, 0, 1]
+    assert btc["buckets"][1]["average_sentiment"] is None
+    assert btc["buckets"][1]["rolling_sentiment"] == 0.8
+    # 0.8 decayed by two half-lives carries weight 0.25 against -0.4 at 1.0
+    assert btc["buckets"][2]["rolling_sentiment"] == round((0.2 - 0.4) / 1.25, 4)
+    assert all(b["article_count"] == 0 for b in eth["buckets"])
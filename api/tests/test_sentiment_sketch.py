@@ -0,0 +1,78 @@
+"""Tests for the mergeable sentiment histogram used by coin aggregates."""
+
+import os
+import statistics
+import sys
+from decimal import Decimal
+
+import pytest
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+)
+
+from services.sentiment_sketch import (
+    NUM_BINS,
+    CoinSentimentDelta,
+    SentimentHistogram,
+    bin_index,
+)
+
+
+class TestSentimentHistogram:
+    def test_bin_index_matches_width_bucket(self):
+        # width_bucket(score, -1, 1, 200) - 1
+        assert bin_index(-1.0) == 0
+        assert bin_index(0.0) == 100
+        assert bin_index(0.05) == 105
+        assert bin_index(0.9999) == 199
+        assert bin_index(1.0) == NUM_BINS - 1
+
+    def test_median_close_to_exact(self):
+        scores = [-0.8, -0.3, 0.0, 0.12, 0.4, 0.45, 0.7]
+        histogram = SentimentHistogram()
+        for score in scores:
+            histogram.add(score)
+        assert histogram.median() == pytest.approx(statistics.median(scores), abs=0.01)
+
+    def test_merge_and_remove(self):
+        a, b = SentimentHistogram(), SentimentHistogram()
+        a.add(0.5)
+        b.add(-0.5)
+        b.add(-0.1)
+        b.add(0.2)
+        a.merge(b)
+        a.remove(0.5)
+        assert a.total == 3
+        assert a.median() == pytest.approx(-0.1, abs=0.01)
+
+    def test_empty_median(self):
+        assert SentimentHistogram().median() is None
+
+    def test_wrong_bin_count_rejected(self):
+        with pytest.raises(ValueError):
+            SentimentHistogram([0, 1, 2])
+
+
+class TestCoinSentimentDelta:
+    def test_add_then_subtract_cancels(self):
+        delta = CoinSentimentDelta()
+        delta.add(0.6)
+        delta.add(-0.2)
+        delta.add(0.6, sign=-1)
+        delta.add(-0.2, sign=-1)
+
+        assert delta.article_count == 0
+        assert delta.sentiment_sum == Decimal(0)
+        assert delta.positive_count == delta.negative_count == 0
+        assert delta.histogram.total == 0
+
+    def test_buckets_follow_label_thresholds(self):
+        delta = CoinSentimentDelta()
+        for score in (0.06, 0.05, -0.05, -0.06):
+            delta.add(score)
+        assert (delta.positive_count, delta.neutral_count, delta.negative_count) == (
+            1,
+            2,
+            1,
+        )
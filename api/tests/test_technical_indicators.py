@@ -1,5 +1,6 @@
 """Tests for technical indicators functionality."""
 
+import json
 import pytest
 import numpy as np
 from unittest.mock import patch, AsyncMock, MagicMock
@@ -17,6 +18,11 @@ from main import app
 client = TestClient(app)
 
 
+def encode_klines(klines: list) -> bytes:
+    """Klines as the response body Binance sends, byte strings as JSON strings."""
+    return json.dumps(klines, default=bytes.decode).encode()
+
+
 class TestTechnicalIndicators:
     """Test suite for technical indicator calculations"""
 
@@ -625,7 +631,7 @@ class TestTechnicalIndicatorsAPI:
                 mock_client = AsyncMock()
                 mock_response = MagicMock()
                 mock_response.status_code = 200
-                mock_response.json.return_value = mock_response_data
+                mock_response.content = encode_klines(mock_response_data)
                 mock_client.get.return_value = mock_response
                 mock_client_class.return_value.__aenter__.return_value = mock_client
 
@@ -708,7 +714,7 @@ class TestTechnicalIndicatorsAPI:
                 mock_client = AsyncMock()
                 mock_response = MagicMock()
                 mock_response.status_code = 200
-                mock_response.json.return_value = mock_response_data
+                mock_response.content = encode_klines(mock_response_data)
                 mock_client.get.return_value = mock_response
                 mock_client_class.return_value.__aenter__.return_value = mock_client
 
@@ -751,7 +757,7 @@ class TestTechnicalIndicatorsAPI:
                 mock_client = AsyncMock()
                 mock_response = MagicMock()
                 mock_response.status_code = 200
-                mock_response.json.return_value = mock_response_data
+                mock_response.content = encode_klines(mock_response_data)
                 mock_client.get.return_value = mock_response
                 mock_client_class.return_value.__aenter__.return_value = mock_client
 
@@ -799,7 +805,7 @@ class TestTechnicalIndicatorsAPI:
                 mock_client = AsyncMock()
                 mock_response = MagicMock()
                 mock_response.status_code = 200
-                mock_response.json.return_value = mock_response_data
+                mock_response.content = encode_klines(mock_response_data)
                 mock_client.get.return_value = mock_response
                 mock_client_class.return_value.__aenter__.return_value = mock_client
 
@@ -847,7 +853,7 @@ class TestTechnicalIndicatorsAPI:
                 mock_client = AsyncMock()
                 mock_response = MagicMock()
                 mock_response.status_code = 200
-                mock_response.json.return_value = mock_response_data
+                mock_response.content = encode_klines(mock_response_data)
                 mock_client.get.return_value = mock_response
                 mock_client_class.return_value.__aenter__.return_value = mock_client
 
@@ -893,7 +899,7 @@ class TestTechnicalIndicatorsAPI:
                 mock_client = AsyncMock()
                 mock_response = MagicMock()
                 mock_response.status_code = 200
-                mock_response.json.return_value = mock_response_data
+                mock_response.content = encode_klines(mock_response_data)
                 mock_client.get.return_value = mock_response
                 mock_client_class.return_value.__aenter__.return_value = mock_client
 
@@ -938,7 +944,7 @@ class TestTechnicalIndicatorsAPI:
                 mock_client = AsyncMock()
                 mock_response = MagicMock()
                 mock_response.status_code = 200
-                mock_response.json.return_value = mock_response_data
+                mock_response.content = encode_klines(mock_response_data)
                 mock_client.get.return_value = mock_response
                 mock_client_class.return_value.__aenter__.return_value = mock_client
 
@@ -983,7 +989,7 @@ class TestTechnicalIndicatorsAPI:
                 mock_client = AsyncMock()
                 mock_response = MagicMock()
                 mock_response.status_code = 200
-                mock_response.json.return_value = mock_response_data
+                mock_response.content = encode_klines(mock_response_data)
                 mock_client.get.return_value = mock_response
                 mock_client_class.return_value.__aenter__.return_value = mock_client
 
@@ -1028,7 +1034,7 @@ class TestTechnicalIndicatorsAPI:
                 mock_client = AsyncMock()
                 mock_response = MagicMock()
                 mock_response.status_code = 200
-                mock_response.json.return_value = mock_response_data
+                mock_response.content = encode_klines(mock_response_data)
                 mock_client.get.return_value = mock_response
                 mock_client_class.return_value.__aenter__.return_value = mock_client
 
@@ -1075,7 +1081,7 @@ class TestTechnicalIndicatorsAPI:
                 mock_client = AsyncMock()
                 mock_response = MagicMock()
                 mock_response.status_code = 200
-                mock_response.json.return_value = mock_response_data
+                mock_response.content = encode_klines(mock_response_data)
                 mock_client.get.return_value = mock_response
                 mock_client_class.return_value.__aenter__.return_value = mock_client
 
@@ -1122,7 +1128,7 @@ class TestTechnicalIndicatorsAPI:
                 mock_client = AsyncMock()
                 mock_response = MagicMock()
                 mock_response.status_code = 200
-                mock_response.json.return_value = mock_response_data
+                mock_response.content = encode_klines(mock_response_data)
                 mock_client.get.return_value = mock_response
                 mock_client_class.return_value.__aenter__.return_value = mock_client
 
@@ -1167,7 +1173,7 @@ class TestTechnicalIndicatorsAPI:
                 mock_client = AsyncMock()
                 mock_response = MagicMock()
                 mock_response.status_code = 200
-                mock_response.json.return_value = mock_response_data
+                mock_response.content = encode_klines(mock_response_data)
                 mock_client.get.return_value = mock_response
                 mock_client_class.return_value.__aenter__.return_value = mock_client
 
@@ -0,0 +1,475 @@
+"""Throughput and latency benchmarks for the task runner.
+
+Drives a real runner subprocess through the local task broker used by the
+integration tests. Each scenario gets a fresh runner, runs a few warm-up
+tasks, then measures its tasks end to end, from the broker sending the task
+to receiving `runner:taskdone`. Per-phase timings come from the runner's
+`/metrics` and peak memory from `/stats` and `/proc`.
+
+Results are written as JSON with sorted keys, so two runs can be diffed or
+compared with `--compare`, which exits non-zero on regressions.
+
+    uv run python -m benchmarks.run_benchmarks --output results.json
+    uv run python -m benchmarks.run_benchmarks --quick --compare results.json
+"""
+
+import argparse
+import asyncio
+import json
+import platform
+import re
+import sys
+import textwrap
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+
+import aiohttp
+from src.constants import METRICS_PREFIX
+from src.nanoid import nanoid
+
+from tests.fixtures.local_task_broker import LocalTaskBroker, WebsocketMessage
+from tests.fixtures.task_runner_manager import TaskRunnerManager
+from tests.integration.conftest import create_task_settings
+
+KB = 1024
+MB = 1024 * KB
+
+TASK_TIMEOUT = 120  # seconds, large payloads take a while
+RUNNER_READY_TIMEOUT = 10  # seconds
+REGRESSION_THRESHOLD = 0.1  # relative change
+
+PHASES = [
+    "offer_accept",
+    "accept_settings",
+    "validation",
+    "process_spawn",
+    "execution",
+    "pipe_transfer",
+    "message_decode",
+    "message_encode",
+    "websocket_send",
+]
+
+ECHO_CODE = {
+    "all_items": "return _items",
+    "per_item": "return _item",
+}
+
+IMPORT_HEAVY_MODULES = [
+    "csv",
+    "decimal",
+    "difflib",
+    "email.parser",
+    "fractions",
+    "statistics",
+    "urllib.parse",
+    "xml.etree.ElementTree",
+    "zoneinfo",
+]
+
+IMPORT_HEAVY_CODE = textwrap.dedent(f"""
+    import {", ".join(IMPORT_HEAVY_MODULES)}
+    return [{{"json": {{"imported": {len(IMPORT_HEAVY_MODULES)}}}}}]
+""")
+
+
+# ========== Scenarios ==========
+
+
+@dataclass
+class Scenario:
+    name: str
+    node_mode: str = "all_items"
+    item_count: int = 1
+    payload_bytes: int = 0  # spread over the items, 0 for small items
+    concurrency: int = 1
+    tasks: int = 50
+    code: str | None = None  # defaults to echoing the items
+    env: dict[str, str] = field(default_factory=dict)
+
+    def create_task_settings(self) -> dict:
+        data = "x" * (self.payload_bytes // self.item_count)
+        items = [{"json": {"i": i, "data": data}} for i in range(self.item_count)]
+        code = self.code or ECHO_CODE[self.node_mode]
+
+        return create_task_settings(code=code, node_mode=self.node_mode, items=items)
+
+    def to_params(self) -> dict:
+        params = asdict(self)
+        del params["name"], params["code"]
+        return params
+
+
+def build_scenarios(quick: bool) -> list[Scenario]:
+    """Vary one dimension at a time from a small all_items task."""
+
+    scale = 5 if quick else 1
+    scenarios = []
+
+    for payload_bytes, tasks in [
+        (1 * KB, 50),
+        (100 * KB, 50),
+        (1 * MB, 20),
+        (10 * MB, 10),
+        (100 * MB, 3),
+    ]:
+        if quick and payload_bytes > 10 * MB:
+            continue
+        scenarios.append(
+            Scenario(
+                name=f"payload-{_format_size(payload_bytes)}",
+                item_count=100,
+                payload_bytes=payload_bytes,
+                tasks=max(tasks // scale, 2),
+            )
+        )
+
+    for node_mode in ["all_items", "per_item"]:
+        for item_count in [1, 100, 10_000]:
+            scenarios.append(
+                Scenario(
+                    name=f"{node_mode}-{item_count}-items",
+                    node_mode=node_mode,
+                    item_count=item_count,
+                    tasks=max(20 // scale, 2),
+                )
+            )
+
+    for concurrency in [1, 2, 4, 8]:
+        scenarios.append(
+            Scenario(
+                name=f"concurrency-{concurrency}",
+                concurrency=concurrency,
+                tasks=max(100 // scale, concurrency * 2),
+                env={"N8N_RUNNERS_MAX_CONCURRENCY": str(concurrency)},
+            )
+        )
+
+    scenarios.append(
+        Scenario(
+            name="import-heavy",
+            code=IMPORT_HEAVY_CODE,
+            tasks=max(20 // scale, 2),
+            env={"N8N_RUNNERS_STDLIB_ALLOW": "*"},
+        )
+    )
+    scenarios.append(
+        Scenario(
+            name="import-heavy-preloaded",
+            code=IMPORT_HEAVY_CODE,
+            tasks=max(20 // scale, 2),
+            env={
+                "N8N_RUNNERS_STDLIB_ALLOW": "*",
+                "N8N_RUNNERS_PRELOAD_MODULES": ",".join(IMPORT_HEAVY_MODULES),
+            },
+        )
+    )
+
+    return scenarios
+
+
+# ========== Running ==========
+
+
+class BenchmarkBroker(LocalTaskBroker):
+    """Local task broker that resolves a future per finished task and drops
+    results once received, so large results do not pile up in memory."""
+
+    def __init__(self):
+        super().__init__()
+        self.finished: dict[str, asyncio.Future[tuple[float, WebsocketMessage]]] = {}
+
+    def expect_task(self, task_id: str) -> asyncio.Future:
+        future = asyncio.get_running_loop().create_future()
+        self.finished[task_id] = future
+        return future
+
+    async def _handle_message(self, connection_id: str, message: WebsocketMessage):
+        await super()._handle_message(connection_id, message)
+
+        if message.get("type") in {"runner:taskdone", "runner:taskerror"}:
+            message.pop("data", None)
+            self.task_settings.pop(message.get("taskId"), None)
+            future = self.finished.pop(message.get("taskId"), None)
+            if future and not future.done():
+                future.set_result((asyncio.get_running_loop().time(), message))
+
+
+async def run_task(broker: BenchmarkBroker, task_settings: dict) -> float:
+    """Run one task and return its end-to-end latency in seconds."""
+
+    loop = asyncio.get_running_loop()
+    task_id = nanoid()
+    finished = broker.expect_task(task_id)
+
+    sent_at = loop.time()
+    await broker.send_task(task_id=task_id, task_settings=task_settings)
+
+    try:
+        finished_at, message = await asyncio.wait_for(finished, TASK_TIMEOUT)
+    except asyncio.TimeoutError:
+        raise RuntimeError(f"Task {task_id} did not finish within {TASK_TIMEOUT}s")
+
+    if message["type"] == "runner:taskerror":
+        raise RuntimeError(f"Task {task_id} failed: {message.get('error')}")
+
+    return finished_at - sent_at
+
+
+async def run_tasks(
+    broker: BenchmarkBroker, task_settings: dict, count: int, concurrency: int
+) -> list[float]:
+    remaining = iter(range(count))
+    latencies: list[float] = []
+
+    async def send_tasks():
+        for _ in remaining:
+            latencies.append(await run_task(broker, task_settings))
+
+    await asyncio.gather(*(send_tasks() for _ in range(concurrency)))
+
+    return latencies
+
+
+async def run_scenario(scenario: Scenario) -> dict:
+    broker = BenchmarkBroker()
+    await broker.start()
+
+    manager = TaskRunnerManager(
+        task_broker_url=broker.get_url(),
+        custom_env={
+            "N8N_RUNNERS_TASK_TIMEOUT": str(TASK_TIMEOUT),
+            "N8N_RUNNERS_VALIDATION_CACHE_FILE": "",
+            **scenario.env,
+        },
+    )
+
+    try:
+        await manager.start()
+        if not await broker.wait_for_msg(
+            "runner:taskoffer", timeout=RUNNER_READY_TIMEOUT
+        ):
+            raise RuntimeError(f"Runner sent no offers: {manager.stderr_buffer}")
+
+        task_settings = scenario.create_task_settings()
+        health_check_url = manager.get_health_check_url()
+
+        async with aiohttp.ClientSession() as session:
+            # first tasks pay for compiling, caching and preloading
+            await run_tasks(broker, task_settings, scenario.concurrency, 1)
+            metrics_before = await fetch_metrics(session, health_check_url)
+
+            started_at = time.perf_counter()
+            latencies = await run_tasks(
+                broker, task_settings, scenario.tasks, scenario.concurrency
+            )
+            duration = time.perf_counter() - started_at
+
+            metrics_after = await fetch_metrics(session, health_check_url)
+            async with session.get(f"{health_check_url}/stats") as response:
+                stats = await response.json()
+
+        assert manager.subprocess is not None
+        runner_peak_rss_bytes = read_peak_rss_bytes(manager.subprocess.pid)
+
+    finally:
+        await manager.stop()
+        await broker.stop()
+
+    return {
+        "params": scenario.to_params(),
+        "tasks_per_second": scenario.tasks / duration,
+        "latency_seconds": summarize(latencies),
+        "phase_seconds": phase_means(metrics_before, metrics_after),
+        "pipe_transfer_bytes_per_second": histogram_mean(
+            metrics_before, metrics_after, "pipe_transfer_bytes_per_second"
+        ),
+        "runner_peak_rss_bytes": runner_peak_rss_bytes,
+        "task_peak_rss_bytes": stats["max_task_peak_rss_bytes"],
+    }
+
+
+# ========== Measurements ==========
+
+
+def percentile(values: list[float], q: float) -> float:
+    """Linearly interpolated percentile, `q` in [0, 100]."""
+
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def summarize(latencies: list[float]) -> dict:
+    return {
+        "mean": sum(latencies) / len(latencies),
+        "p50": percentile(latencies, 50),
+        "p95": percentile(latencies, 95),
+        "p99": percentile(latencies, 99),
+        "max": max(latencies),
+    }
+
+
+async def fetch_metrics(session: aiohttp.ClientSession, url: str) -> dict:
+    async with session.get(f"{url}/metrics") as response:
+        return parse_metrics(await response.text())
+
+
+def parse_metrics(text: str) -> dict[str, float]:
+    """Sums and counts of the runner's histograms, keyed by their full names."""
+
+    pattern = re.compile(rf"^({METRICS_PREFIX}\w+_(?:sum|count)) (\S+)$")
+    return {
+        match[1]: float(match[2])
+        for line in text.splitlines()
+        if (match := pattern.match(line))
+    }
+
+
+def phase_means(before: dict[str, float], after: dict[str, float]) -> dict:
+    """Mean seconds per phase over the measured tasks, for phases that ran."""
+
+    means = {}
+    for phase in PHASES:
+        mean = histogram_mean(before, after, f"{phase}_seconds")
+        if mean is not None:
+            means[phase] = mean
+
+    return means
+
+
+def histogram_mean(
+    before: dict[str, float], after: dict[str, float], histogram: str
+) -> float | None:
+    """Mean of a histogram's observations between two snapshots, if any."""
+
+    name = f"{METRICS_PREFIX}{histogram}"
+    count = after.get(f"{name}_count", 0) - before.get(f"{name}_count", 0)
+    if count <= 0:
+        return None
+
+    return (after[f"{name}_sum"] - before.get(f"{name}_sum", 0)) / count
+
+
+def read_peak_rss_bytes(pid: int) -> int | None:
+    try:
+        status = Path(f"/proc/{pid}/status").read_text()
+    except OSError:
+        return None
+
+    match = re.search(r"^VmHWM:\s+(\d+) kB$", status, re.MULTILINE)
+    return int(match[1]) * 1024 if match else None
+
+
+# ========== Comparison ==========
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> list[str]:
+    """Return regressions of throughput or p95 latency beyond `threshold`."""
+
+    regressions = []
+
+    for name, result in current["scenarios"].items():
+        before = baseline["scenarios"].get(name)
+        if before is None:
+            continue
+
+        throughput_change = result["tasks_per_second"] / before["tasks_per_second"] - 1
+        if throughput_change < -threshold:
+            regressions.append(
+                f"{name}: throughput {throughput_change:+.0%} "
+                f"({before['tasks_per_second']:.1f} -> {result['tasks_per_second']:.1f} tasks/s)"
+            )
+
+        p95_before = before["latency_seconds"]["p95"]
+        p95_after = result["latency_seconds"]["p95"]
+        latency_change = p95_after / p95_before - 1
+        if latency_change > threshold:
+            regressions.append(
+                f"{name}: p95 latency {latency_change:+.0%} "
+                f"({p95_before * 1000:.1f} -> {p95_after * 1000:.1f} ms)"
+            )
+
+    return regressions
+
+
+# ========== CLI ==========
+
+
+def _format_size(size: int) -> str:
+    return f"{size // MB}mb" if size >= MB else f"{size // KB}kb"
+
+
+def print_result(name: str, result: dict) -> None:
+    latency = result["latency_seconds"]
+    phases = ", ".join(
+        f"{phase} {seconds * 1000:.1f}"
+        for phase, seconds in result["phase_seconds"].items()
+    )
+    print(
+        f"{name:<28} {result['tasks_per_second']:>8.1f} tasks/s  "
+        f"p50 {latency['p50'] * 1000:>7.1f}  p95 {latency['p95'] * 1000:>7.1f}  "
+        f"p99 {latency['p99'] * 1000:>7.1f} ms  "
+        f"task rss {(result['task_peak_rss_bytes'] or 0) / MB:>6.1f} MiB"
+    )
+    print(f"{'':<28} phases (ms): {phases or 'none'}")
+    if result["pipe_transfer_bytes_per_second"]:
+        print(
+            f"{'':<28} pipe transfer "
+            f"{result['pipe_transfer_bytes_per_second'] / MB:.1f} MiB/s"
+        )
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", type=Path, help="write results as JSON")
+    parser.add_argument("--compare", type=Path, help="baseline JSON to compare with")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=REGRESSION_THRESHOLD,
+        help="relative change that counts as a regression (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--filter", default="", help="only run scenarios whose name contains this"
+    )
+    parser.add_argument(
+        "--quick", action="store_true", help="fewer tasks, payloads up to 10 MiB"
+    )
+    args = parser.parse_args()
+
+    results = {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "scenarios": {},
+    }
+
+    for scenario in build_scenarios(args.quick):
+        if args.filter not in scenario.name:
+            continue
+        result = await run_scenario(scenario)
+        results["scenarios"][scenario.name] = result
+        print_result(scenario.name, result)
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2, sort_keys=True) + "\n")
+
+    if args.compare:
+        baseline = json.loads(args.compare.read_text())
+        regressions = compare(baseline, results, args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
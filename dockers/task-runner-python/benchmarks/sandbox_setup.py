@@ -0,0 +1,129 @@
+"""Micro-benchmark of the sandbox setup every task process runs.
+
+Times sanitizing `sys.modules` and creating the task's builtins with a
+precomputed `SandboxTemplate` against rebuilding both on every task, as the
+runner did before templates. Runs in this process with the runner and
+`IMPORT_HEAVY_MODULES` imported, restoring `sys.modules` between rounds.
+
+    uv run python -m benchmarks.sandbox_setup
+"""
+
+import argparse
+import importlib
+import statistics
+import sys
+import time
+from collections.abc import Callable
+
+import src.main  # noqa: F401, loaded in the forkserver too
+from src import sandbox
+from src.config.security_config import SecurityConfig
+from src.sandbox import ALWAYS_SAFE_MODULES
+
+from benchmarks.run_benchmarks import IMPORT_HEAVY_MODULES
+
+ROUNDS = 2000
+
+SECURITY_CONFIGS = {
+    "deny-all": SecurityConfig(
+        stdlib_allow=set(),
+        external_allow=set(),
+        builtins_deny={"eval", "exec", "compile", "open"},
+        runner_env_deny=True,
+    ),
+    "allow-some": SecurityConfig(
+        stdlib_allow={"json", "datetime", "math", "decimal", "email", "urllib"},
+        external_allow={"numpy", "pandas"},
+        builtins_deny={"eval", "exec", "compile", "open"},
+        runner_env_deny=True,
+    ),
+    "allow-all": SecurityConfig(
+        stdlib_allow={"*"},
+        external_allow={"*"},
+        builtins_deny=set(),
+        runner_env_deny=True,
+    ),
+}
+
+
+def rebuild_per_task(security_config: SecurityConfig) -> None:
+    """The setup as it was before templates: a scan comparing every module
+    with every allowed prefix, and builtins filtered from scratch."""
+
+    safe_modules = set(ALWAYS_SAFE_MODULES)
+    if "*" in security_config.stdlib_allow:
+        safe_modules.update(sys.stdlib_module_names)
+    else:
+        safe_modules.update(security_config.stdlib_allow)
+    if "*" in security_config.external_allow:
+        safe_modules.update(
+            name for name in sys.modules if name not in sys.stdlib_module_names
+        )
+    else:
+        safe_modules.update(security_config.external_allow)
+
+    safe_prefixes = [safe + "." for safe in safe_modules]
+    for name in [
+        name
+        for name in sys.modules
+        if name not in safe_modules
+        and not any(name.startswith(prefix) for prefix in safe_prefixes)
+    ]:
+        del sys.modules[name]
+
+    sandbox._filter_builtins(security_config)
+
+
+def apply_template(security_config: SecurityConfig) -> None:
+    template = sandbox.get_template(security_config)
+    template.sanitize_sys_modules()
+    template.create_builtins()
+
+
+def time_setup(
+    setup: Callable[[SecurityConfig], None],
+    security_config: SecurityConfig,
+    rounds: int,
+) -> list[float]:
+    loaded = dict(sys.modules)
+    durations = []
+
+    for _ in range(rounds):
+        started_at = time.perf_counter()
+        setup(security_config)
+        durations.append(time.perf_counter() - started_at)
+        sys.modules.update(loaded)
+
+    return durations
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=ROUNDS)
+    args = parser.parse_args()
+
+    for module in IMPORT_HEAVY_MODULES:
+        importlib.import_module(module)
+
+    print(f"{len(sys.modules)} modules loaded, {args.rounds} rounds per setup")
+
+    for name, security_config in SECURITY_CONFIGS.items():
+        sandbox.get_template(security_config)  # as in the forkserver
+
+        before = statistics.median(
+            time_setup(rebuild_per_task, security_config, args.rounds)
+        )
+        after = statistics.median(
+            time_setup(apply_template, security_config, args.rounds)
+        )
+
+        print(
+            f"{name:<12} per task {before * 1e6:8.1f}us"
+            f"  template {after * 1e6:8.1f}us  ({before / after:.1f}x)"
+        )
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
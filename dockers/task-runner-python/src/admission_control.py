@@ -0,0 +1,170 @@
+import asyncio
+import logging
+import os
+
+from src.constants import ADMISSION_PAYLOAD_MEMORY_FACTOR, LOG_TASK_QUEUED_FOR_MEMORY
+from src.errors import TaskCancelledError, TaskMemoryBudgetError
+
+
+class AdmissionControl:
+    """Memory budget shared by the runner and the tasks running on it.
+
+    Before it starts, a task reserves an estimate of its memory, derived
+    from the size of its settings payload, and it releases the reservation
+    when it ends. A task fits if the runner's own RSS plus all reservations
+    stay within the budget. Memory the task already holds in the runner, such
+    as its decoded settings, is counted by the RSS and left out of its
+    reservation. A task that does not fit waits for running tasks to release
+    theirs or for it to be cancelled, and a task that could never fit fails
+    right away.
+    While the budget is used up, the runner neither offers nor accepts tasks.
+    """
+
+    def __init__(self, budget_mb: int):
+        self.budget_bytes = budget_mb * 1024 * 1024
+        self.reservations: dict[str, int] = {}  # task ID -> bytes
+
+        self.waiting: set[str] = set()  # task IDs
+        self.cancelled: set[str] = set()  # waiting task IDs to stop
+
+        self.queued_tasks = 0
+        self.tasks_queued = 0
+        self.tasks_rejected = 0
+
+        self.released = asyncio.Event()
+        self.logger = logging.getLogger(__name__)
+
+    @property
+    def is_enabled(self) -> bool:
+        return self.budget_bytes > 0
+
+    @property
+    def reserved_bytes(self) -> int:
+        return sum(self.reservations.values())
+
+    def estimate(self, payload_size: int) -> int:
+        """Estimated peak memory of a task across runner and subprocess, in bytes."""
+
+        return payload_size * ADMISSION_PAYLOAD_MEMORY_FACTOR
+
+    def has_headroom(self) -> bool:
+        if not self.is_enabled or not self.reservations:
+            return True
+
+        return self._used_bytes() < self.budget_bytes
+
+    async def reserve(
+        self,
+        task_id: str,
+        required_bytes: int,
+        timeout: float,
+        resident_bytes: int = 0,
+    ) -> None:
+        """Reserve memory for a task, waiting up to `timeout` for it to free up.
+
+        `resident_bytes` of `required_bytes` are already part of the runner's
+        RSS, so only the rest is reserved.
+        """
+
+        if not self.is_enabled:
+            return
+
+        if required_bytes > self.budget_bytes:
+            self.tasks_rejected += 1
+            raise TaskMemoryBudgetError(
+                required_bytes, self.budget_bytes, is_queue_timeout=False
+            )
+
+        reserved_bytes = max(0, required_bytes - resident_bytes)
+        if not self._fits(reserved_bytes):
+            await self._wait_until_fits(task_id, reserved_bytes, timeout)
+
+        self.reservations[task_id] = reserved_bytes
+
+    def release(self, task_id: str) -> None:
+        if self.reservations.pop(task_id, None) is None:
+            return
+
+        self._wake_waiters()
+
+    def cancel(self, task_id: str) -> None:
+        """Stop a task waiting for memory, its `reserve` raises `TaskCancelledError`."""
+
+        if task_id not in self.waiting:
+            return
+
+        self.cancelled.add(task_id)
+        self._wake_waiters()
+
+    def get_stats(self) -> dict:
+        return {
+            "budget_bytes": self.budget_bytes,
+            "reserved_bytes": self.reserved_bytes,
+            "runner_rss_bytes": _current_rss_bytes(),
+            "queued_tasks": self.queued_tasks,
+            "tasks_queued": self.tasks_queued,
+            "tasks_rejected": self.tasks_rejected,
+        }
+
+    def _fits(self, required_bytes: int) -> bool:
+        # with nothing else reserved, waiting would not free anything
+        if not self.reservations:
+            return True
+
+        return self._used_bytes() + required_bytes <= self.budget_bytes
+
+    def _used_bytes(self) -> int:
+        return _current_rss_bytes() + self.reserved_bytes
+
+    def _wake_waiters(self) -> None:
+        # wake current waiters, later waiters wait on a fresh event
+        self.released.set()
+        self.released = asyncio.Event()
+
+    async def _wait_until_fits(
+        self, task_id: str, required_bytes: int, timeout: float
+    ) -> None:
+        self.logger.info(
+            LOG_TASK_QUEUED_FOR_MEMORY.format(
+                task_id=task_id,
+                required=_format_mb(required_bytes),
+                reserved=_format_mb(self.reserved_bytes),
+                budget=_format_mb(self.budget_bytes),
+            )
+        )
+
+        self.waiting.add(task_id)
+        self.queued_tasks += 1
+        self.tasks_queued += 1
+
+        try:
+            async with asyncio.timeout(timeout):
+                while not self._fits(required_bytes):
+                    await self.released.wait()
+                    if task_id in self.cancelled:
+                        raise TaskCancelledError()
+        except TimeoutError:
+            self.tasks_rejected += 1
+            raise TaskMemoryBudgetError(
+                required_bytes, self.budget_bytes, is_queue_timeout=True
+            )
+        finally:
+            self.waiting.discard(task_id)
+            self.cancelled.discard(task_id)
+            self.queued_tasks -= 1
+
+
+def _current_rss_bytes() -> int:
+    """Current RSS of the runner process, or 0 where /proc is not available."""
+
+    try:
+        with open("/proc/self/statm") as statm:
+            resident_pages = int(statm.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return 0
+
+    return resident_pages * os.sysconf("SC_PAGE_SIZE")
+
+
+def _format_mb(size_bytes: int) -> str:
+    return f"{size_bytes / (1024 * 1024):.0f} MB"
@@ -0,0 +1,101 @@
+import asyncio
+import hashlib
+import marshal
+from collections import OrderedDict
+
+from src.constants import MAX_CODE_CACHE_SIZE
+from src.message_types.broker import NodeMode
+from src.task_executor import TaskExecutor
+
+CacheKey = tuple[str, NodeMode]  # (code_hash, node_mode)
+Bytecode = bytes  # marshalled code object
+
+
+class CodeCache:
+    """LRU of compiled task code, so the subprocess only has to load bytecode."""
+
+    def __init__(self, max_size: int = MAX_CODE_CACHE_SIZE):
+        self.max_size = max_size
+        self._cache: OrderedDict[CacheKey, Bytecode] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, code: str, node_mode: NodeMode) -> Bytecode | None:
+        """Return marshalled code for `code`, compiling it on a miss.
+
+        Returns None if the code does not compile, so the subprocess compiles
+        it itself and reports the error exactly as before.
+        """
+
+        cache_key = self._to_cache_key(code, node_mode)
+        bytecode = self._check_cache(cache_key)
+
+        if bytecode is None:
+            bytecode = self._compile(code, node_mode)
+            self._set_in_cache(cache_key, bytecode)
+
+        return bytecode
+
+    async def get_off_loop(self, code: str, node_mode: NodeMode) -> Bytecode | None:
+        """Like `get`, but compiles uncached code on a worker thread, so that
+        large code does not block the event loop. Lookups and the LRU order
+        stay on the loop, so the cache needs no lock."""
+
+        cache_key = self._to_cache_key(code, node_mode)
+        bytecode = self._check_cache(cache_key)
+
+        if bytecode is None:
+            bytecode = await asyncio.to_thread(self._compile, code, node_mode)
+            self._set_in_cache(cache_key, bytecode)
+
+        return bytecode
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def get_stats(self) -> dict:
+        return {
+            "size": len(self._cache),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hit_rate, 4),
+        }
+
+    def _to_cache_key(self, code: str, node_mode: NodeMode) -> CacheKey:
+        code_hash = hashlib.sha256(code.encode()).hexdigest()
+        return (code_hash, node_mode)
+
+    def _check_cache(self, cache_key: CacheKey) -> Bytecode | None:
+        bytecode = self._cache.get(cache_key)
+
+        if bytecode is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._cache.move_to_end(cache_key)
+        return bytecode
+
+    @staticmethod
+    def _compile(code: str, node_mode: NodeMode) -> Bytecode | None:
+        try:
+            compiled = TaskExecutor.compile_code(code, node_mode)
+        except (SyntaxError, ValueError):
+            return None
+
+        return marshal.dumps(compiled)
+
+    def _set_in_cache(self, cache_key: CacheKey, bytecode: Bytecode | None) -> None:
+        if bytecode is None:
+            return  # does not compile, the subprocess reports the error
+
+        if cache_key in self._cache:
+            return  # compiled concurrently for another task
+
+        if len(self._cache) >= self.max_size:
+            self._cache.popitem(last=False)
+
+        self._cache[cache_key] = bytecode
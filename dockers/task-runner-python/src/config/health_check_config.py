@@ -8,6 +8,7 @@ from src.constants import (
     ENV_HEALTH_CHECK_SERVER_ENABLED,
     ENV_HEALTH_CHECK_SERVER_HOST,
     ENV_HEALTH_CHECK_SERVER_PORT,
+    ENV_HEALTH_CHECK_SERVER_SOCKET,
 )
 
 
@@ -16,6 +17,7 @@ class HealthCheckConfig:
     enabled: bool
     host: str
     port: int
+    socket_path: str = ""  # set by the supervisor, replaces host and port
 
     @classmethod
     def from_env(cls):
@@ -31,4 +33,5 @@ class HealthCheckConfig:
                 ENV_HEALTH_CHECK_SERVER_HOST, DEFAULT_HEALTH_CHECK_SERVER_HOST
             ),
             port=port,
+            socket_path=read_str_env(ENV_HEALTH_CHECK_SERVER_SOCKET, ""),
         )
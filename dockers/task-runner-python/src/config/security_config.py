@@ -7,3 +7,5 @@ class SecurityConfig:
     external_allow: set[str]
     builtins_deny: set[str]
     runner_env_deny: bool
+    task_max_memory_bytes: int = 0  # RLIMIT_AS, 0 disables it
+    task_max_cpu_seconds: int = 0  # RLIMIT_CPU, 0 disables it
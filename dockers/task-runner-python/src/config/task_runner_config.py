@@ -1,7 +1,15 @@
 from dataclasses import dataclass
 
-from src.env import read_bool_env, read_int_env, read_str_env
+from src.env import (
+    read_bool_env,
+    read_env,
+    read_float_env,
+    read_int_env,
+    read_str_env,
+)
 from src.errors import ConfigurationError
+from src.import_validation import validate_module_import
+from src.config.security_config import SecurityConfig
 from src.constants import (
     BUILTINS_DENY_DEFAULT,
     DEFAULT_MAX_CONCURRENCY,
@@ -10,20 +18,44 @@ from src.constants import (
     DEFAULT_TASK_TIMEOUT,
     DEFAULT_AUTO_SHUTDOWN_TIMEOUT,
     DEFAULT_SHUTDOWN_TIMEOUT,
+    DEFAULT_MAX_MEMORY_MB,
+    DEFAULT_PER_ITEM_PARALLEL_MIN_ITEMS,
+    DEFAULT_PER_ITEM_PARALLEL_PROCESSES,
+    DEFAULT_PROFILE_SAMPLE_RATE,
+    DEFAULT_PROFILE_TOP,
+    DEFAULT_RUNNER_PROCESSES,
+    DEFAULT_TASK_MAX_CPU_SECONDS,
+    DEFAULT_VALIDATION_CACHE_FILE,
+    DEFAULT_TASK_MAX_MEMORY_MB,
+    DEFAULT_WORKER_MAX_MEMORY_MB,
+    DEFAULT_WORKER_MAX_TASKS,
+    ENV_AUTH_TOKEN,
     ENV_BLOCK_RUNNER_ENV_ACCESS,
     ENV_BUILTINS_DENY,
     ENV_EXTERNAL_ALLOW,
     ENV_GRANT_TOKEN,
     ENV_MAX_CONCURRENCY,
+    ENV_MAX_MEMORY_MB,
     ENV_MAX_PAYLOAD_SIZE,
+    ENV_PRELOAD_MODULES,
+    ENV_PROFILE_SAMPLE_RATE,
+    ENV_PROFILE_TOP,
+    ENV_PROFILE_WORKFLOWS,
+    ENV_RUNNER_PROCESSES,
     ENV_STDLIB_ALLOW,
     ENV_TASK_BROKER_URI,
+    ENV_TASK_MAX_CPU_SECONDS,
+    ENV_TASK_MAX_MEMORY_MB,
     ENV_TASK_TIMEOUT,
+    ENV_VALIDATION_CACHE_FILE,
     ENV_AUTO_SHUTDOWN_TIMEOUT,
     ENV_GRACEFUL_SHUTDOWN_TIMEOUT,
+    ENV_PER_ITEM_PARALLEL_MIN_ITEMS,
+    ENV_PER_ITEM_PARALLEL_PROCESSES,
+    ENV_WORKER_MAX_MEMORY_MB,
+    ENV_WORKER_MAX_TASKS,
+    ENV_WORKER_POOL_ENABLED,
     PIPE_MSG_MAX_SIZE,
-    TYPICAL_PAYLOAD_RATIO,
-    PARSE_THROUGHPUT_BYTES_PER_SEC,
     PIPE_READER_JOIN_TIMEOUT_SAFETY_BUFFER,
 )
 
@@ -47,6 +79,45 @@ def parse_allowlist(allowlist_str: str, list_name: str) -> set[str]:
     return modules
 
 
+def parse_preload_modules(
+    preload_str: str | None, stdlib_allow: set[str], external_allow: set[str]
+) -> list[str]:
+    """Modules to import into the forkserver, none unless listed.
+
+    Preloading is opt-in: heavy externals cost forkserver memory, and preloaded
+    modules run their import-time code with the runner's full env, before
+    `runner_env_deny` clears it in the task, so whatever they cache from it
+    stays reachable from user code.
+
+    Only allowlisted modules may be preloaded, since `_sanitize_sys_modules`
+    would drop any other module from the task's `sys.modules` anyway.
+    """
+
+    if not preload_str:
+        return []
+
+    modules = parse_allowlist(preload_str, ENV_PRELOAD_MODULES)
+    if "*" in modules:
+        raise ConfigurationError(
+            f"Wildcard '*' is not supported in {ENV_PRELOAD_MODULES}, list modules explicitly"
+        )
+
+    security_config = SecurityConfig(
+        stdlib_allow=stdlib_allow,
+        external_allow=external_allow,
+        builtins_deny=set(),
+        runner_env_deny=False,
+    )
+    for module in sorted(modules):
+        is_allowed, error_msg = validate_module_import(module, security_config)
+        if not is_allowed:
+            raise ConfigurationError(
+                f"Cannot preload module '{module}' in {ENV_PRELOAD_MODULES}: {error_msg}"
+            )
+
+    return sorted(modules)
+
+
 @dataclass
 class TaskRunnerConfig:
     grant_token: str
@@ -61,6 +132,25 @@ class TaskRunnerConfig:
     builtins_deny: set[str]
     env_deny: bool
     pipe_reader_timeout: float
+    preload_modules: list[str]
+    worker_pool_enabled: bool
+    worker_max_tasks: int
+    worker_max_memory_mb: int
+    per_item_parallel_min_items: int
+    per_item_parallel_processes: int
+    max_memory_mb: int
+    task_max_memory_mb: int
+    task_max_cpu_seconds: int
+    validation_cache_file: str
+    processes: int
+    auth_token: str
+    profile_workflow_ids: set[str]
+    profile_sample_rate: float
+    profile_top: int
+
+    @property
+    def is_supervisor(self) -> bool:
+        return self.processes > 1
 
     @property
     def is_auto_shutdown_enabled(self) -> bool:
@@ -68,8 +158,20 @@ class TaskRunnerConfig:
 
     @classmethod
     def from_env(cls):
+        processes = read_int_env(ENV_RUNNER_PROCESSES, DEFAULT_RUNNER_PROCESSES)
+        if processes < 1:
+            raise ConfigurationError(
+                f"Runner processes must be at least 1, got {processes}"
+            )
+
+        # grant tokens are single use, so each runner process needs its own
         grant_token = read_str_env(ENV_GRANT_TOKEN, "")
-        if not grant_token:
+        auth_token = read_str_env(ENV_AUTH_TOKEN, "")
+        if processes > 1 and not auth_token:
+            raise ConfigurationError(
+                f"Environment variable {ENV_AUTH_TOKEN} is required with {ENV_RUNNER_PROCESSES} above 1"
+            )
+        if processes == 1 and not grant_token:
             raise ConfigurationError(
                 "Environment variable N8N_RUNNERS_GRANT_TOKEN is required"
             )
@@ -102,11 +204,78 @@ class TaskRunnerConfig:
                 f"Max payload size of {max_payload_size} bytes exceeds pipe message limit of {PIPE_MSG_MAX_SIZE} bytes. Reduce {ENV_MAX_PAYLOAD_SIZE}."
             )
 
-        # Calculate pipe reader timeout based on configured max payload size (3s for default 1 GiB)
-        typical_payload = max_payload_size * TYPICAL_PAYLOAD_RATIO
-        pipe_reader_timeout = (
-            typical_payload / PARSE_THROUGHPUT_BYTES_PER_SEC
-        ) + PIPE_READER_JOIN_TIMEOUT_SAFETY_BUFFER
+        worker_max_tasks = read_int_env(ENV_WORKER_MAX_TASKS, DEFAULT_WORKER_MAX_TASKS)
+        if worker_max_tasks <= 0:
+            raise ConfigurationError(
+                f"Worker max tasks must be positive, got {worker_max_tasks}"
+            )
+
+        worker_max_memory_mb = read_int_env(
+            ENV_WORKER_MAX_MEMORY_MB, DEFAULT_WORKER_MAX_MEMORY_MB
+        )
+        if worker_max_memory_mb <= 0:
+            raise ConfigurationError(
+                f"Worker max memory must be positive, got {worker_max_memory_mb}"
+            )
+
+        per_item_parallel_min_items = read_int_env(
+            ENV_PER_ITEM_PARALLEL_MIN_ITEMS, DEFAULT_PER_ITEM_PARALLEL_MIN_ITEMS
+        )
+        if per_item_parallel_min_items < 0:
+            raise ConfigurationError(
+                f"Per-item parallel min items must be zero or positive, got {per_item_parallel_min_items}"
+            )
+
+        per_item_parallel_processes = read_int_env(
+            ENV_PER_ITEM_PARALLEL_PROCESSES, DEFAULT_PER_ITEM_PARALLEL_PROCESSES
+        )
+        if per_item_parallel_processes <= 0:
+            raise ConfigurationError(
+                f"Per-item parallel processes must be positive, got {per_item_parallel_processes}"
+            )
+
+        max_memory_mb = read_int_env(ENV_MAX_MEMORY_MB, DEFAULT_MAX_MEMORY_MB)
+        if max_memory_mb < 0:
+            raise ConfigurationError(
+                f"Max memory must be zero or positive, got {max_memory_mb}"
+            )
+
+        task_max_memory_mb = read_int_env(
+            ENV_TASK_MAX_MEMORY_MB, DEFAULT_TASK_MAX_MEMORY_MB
+        )
+        if task_max_memory_mb < 0:
+            raise ConfigurationError(
+                f"Task max memory must be zero or positive, got {task_max_memory_mb}"
+            )
+
+        task_max_cpu_seconds = read_int_env(
+            ENV_TASK_MAX_CPU_SECONDS, DEFAULT_TASK_MAX_CPU_SECONDS
+        )
+        if task_max_cpu_seconds < 0:
+            raise ConfigurationError(
+                f"Task max CPU seconds must be zero or positive, got {task_max_cpu_seconds}"
+            )
+
+        profile_sample_rate = read_float_env(
+            ENV_PROFILE_SAMPLE_RATE, DEFAULT_PROFILE_SAMPLE_RATE
+        )
+        if not 0 <= profile_sample_rate <= 1:
+            raise ConfigurationError(
+                f"Profile sample rate must be between 0 and 1, got {profile_sample_rate}"
+            )
+
+        profile_top = read_int_env(ENV_PROFILE_TOP, DEFAULT_PROFILE_TOP)
+        if profile_top <= 0:
+            raise ConfigurationError(
+                f"Profile top functions must be positive, got {profile_top}"
+            )
+
+        stdlib_allow = parse_allowlist(
+            read_str_env(ENV_STDLIB_ALLOW, ""), ENV_STDLIB_ALLOW
+        )
+        external_allow = parse_allowlist(
+            read_str_env(ENV_EXTERNAL_ALLOW, ""), ENV_EXTERNAL_ALLOW
+        )
 
         return cls(
             grant_token=grant_token,
@@ -116,12 +285,8 @@ class TaskRunnerConfig:
             task_timeout=task_timeout,
             auto_shutdown_timeout=auto_shutdown_timeout,
             graceful_shutdown_timeout=graceful_shutdown_timeout,
-            stdlib_allow=parse_allowlist(
-                read_str_env(ENV_STDLIB_ALLOW, ""), ENV_STDLIB_ALLOW
-            ),
-            external_allow=parse_allowlist(
-                read_str_env(ENV_EXTERNAL_ALLOW, ""), ENV_EXTERNAL_ALLOW
-            ),
+            stdlib_allow=stdlib_allow,
+            external_allow=external_allow,
             builtins_deny=set(
                 module.strip()
                 for module in read_str_env(
@@ -129,5 +294,31 @@ class TaskRunnerConfig:
                 ).split(",")
             ),
             env_deny=read_bool_env(ENV_BLOCK_RUNNER_ENV_ACCESS, True),
-            pipe_reader_timeout=pipe_reader_timeout,
+            # base only, readers add time for the result size they are told
+            pipe_reader_timeout=PIPE_READER_JOIN_TIMEOUT_SAFETY_BUFFER,
+            preload_modules=parse_preload_modules(
+                read_env(ENV_PRELOAD_MODULES), stdlib_allow, external_allow
+            ),
+            worker_pool_enabled=read_bool_env(ENV_WORKER_POOL_ENABLED, False),
+            worker_max_tasks=worker_max_tasks,
+            worker_max_memory_mb=worker_max_memory_mb,
+            per_item_parallel_min_items=per_item_parallel_min_items,
+            per_item_parallel_processes=per_item_parallel_processes,
+            max_memory_mb=max_memory_mb,
+            task_max_memory_mb=task_max_memory_mb,
+            task_max_cpu_seconds=task_max_cpu_seconds,
+            validation_cache_file=read_str_env(
+                ENV_VALIDATION_CACHE_FILE, DEFAULT_VALIDATION_CACHE_FILE
+            ),
+            processes=processes,
+            auth_token=auth_token,
+            profile_workflow_ids={
+                workflow_id
+                for raw_workflow_id in read_str_env(ENV_PROFILE_WORKFLOWS, "").split(
+                    ","
+                )
+                if (workflow_id := raw_workflow_id.strip())
+            },
+            profile_sample_rate=profile_sample_rate,
+            profile_top=profile_top,
         )
@@ -30,37 +30,115 @@ DEFAULT_MAX_PAYLOAD_SIZE = 1024 * 1024 * 1024  # 1 GiB
 DEFAULT_TASK_TIMEOUT = 60  # seconds
 DEFAULT_AUTO_SHUTDOWN_TIMEOUT = 0  # seconds
 DEFAULT_SHUTDOWN_TIMEOUT = 10  # seconds
-OFFER_INTERVAL = 0.25  # 250ms
+OFFER_INTERVAL = 1.0  # seconds, fallback for the event-driven offers loop
+OFFER_EXPIRY_TIMER_SLACK = 0.005  # 5ms, so the expiry timer fires just after expiry
 OFFER_VALIDITY = 5000  # ms
 OFFER_VALIDITY_MAX_JITTER = 500  # ms
 OFFER_VALIDITY_LATENCY_BUFFER = 0.1  # 100ms
 MAX_VALIDATION_CACHE_SIZE = 500  # cached validation results
+MAX_CODE_CACHE_SIZE = 500  # cached compiled task code
+VALIDATION_CACHE_FORMAT_VERSION = 1  # bump to discard saved validation results
+DEFAULT_WORKER_MAX_TASKS = 100  # tasks per pooled worker before recycling
+DEFAULT_WORKER_MAX_MEMORY_MB = 512  # peak RSS per pooled worker before recycling
+DEFAULT_PER_ITEM_PARALLEL_MIN_ITEMS = 0  # items, 0 disables chunked per-item runs
+DEFAULT_PER_ITEM_PARALLEL_PROCESSES = 4  # subprocesses per chunked per-item task
+DEFAULT_MAX_MEMORY_MB = 0  # memory budget of runner and tasks, 0 disables admission
+DEFAULT_TASK_MAX_MEMORY_MB = 0  # RLIMIT_AS per task subprocess, 0 disables it
+DEFAULT_TASK_MAX_CPU_SECONDS = 0  # RLIMIT_CPU per task, 0 disables it
+DEFAULT_VALIDATION_CACHE_FILE = "/tmp/n8n-runners-validation-cache.json"
+DEFAULT_PROFILE_SAMPLE_RATE = 0.0  # share of tasks to profile, 0 disables sampling
+DEFAULT_PROFILE_TOP = 20  # functions reported per profiled task
+PROFILE_HISTORY_SIZE = 50  # most recent task profiles kept for the health check
+ADMISSION_PAYLOAD_MEMORY_FACTOR = 4  # estimated task memory per settings payload byte
 
 # Executor
 EXECUTOR_USER_OUTPUT_KEY = "__n8n_internal_user_output__"
+EXECUTOR_USER_FUNCTION_NAME = "_user_function"
 EXECUTOR_CIRCULAR_REFERENCE_KEY = "__n8n_internal_circular_ref__"
 EXECUTOR_ALL_ITEMS_FILENAME = "<all_items_task_execution>"
 EXECUTOR_PER_ITEM_FILENAME = "<per_item_task_execution>"
 EXECUTOR_FILENAMES = {EXECUTOR_ALL_ITEMS_FILENAME, EXECUTOR_PER_ITEM_FILENAME}
 SIGTERM_EXIT_CODE = -15
 SIGKILL_EXIT_CODE = -9
+SIGXCPU_EXIT_CODE = -24
+TASK_CPU_HARD_LIMIT_GRACE_SECONDS = 1  # SIGKILL after SIGXCPU, if user code handles it
+WORKER_ACK_TIMEOUT = 5  # seconds
+WORKER_EXIT_TIMEOUT = 1  # seconds
+WORKER_RECYCLE_MAX_TASKS = "max_tasks"
+WORKER_RECYCLE_MAX_MEMORY = "max_memory"
+WORKER_RECYCLE_STATE_CHANGED = "state_changed"
+WORKER_RECYCLE_FAILED = "failed"
 PIPE_MSG_PREFIX_LENGTH = 4  # bytes
+PIPE_READS_PER_CALLBACK = 16  # reads per readiness callback of the event loop reader
+PIPE_FRAME_HANDLER_THREADS = 4  # threads handling frames read on the event loop
+# `__main__` is not preloaded on Python 3.13 when started with `-m` or from a
+# path, so `src.main` is preloaded too, or every task would import the runner
+FORKSERVER_BASE_PRELOAD = ["__main__", "src.main", "src.task_executor"]
+FORKSERVER_WARM_UP_MODULE = "src.forkserver_warm_up"  # imported after preloads
+FORKSERVER_WARM_UP_TIMEOUT = 120  # seconds
 PIPE_MSG_MAX_SIZE = (
     2 ** (PIPE_MSG_PREFIX_LENGTH * 8) - 1
 )  # bytes (~4 GiB with 4-byte prefix)
+PIPE_RESULT_CHUNK_SIZE = 4 * 1024 * 1024  # bytes of encoded items per result chunk
+PIPE_RESULT_ENCODE_BATCH = 1000  # items encoded per codec call
+PIPE_RESULT_CHUNK_PREFIX = b'{"result_chunk":['
+PIPE_RESULT_CHUNK_SUFFIX = b"]}"
+SHARED_MEMORY_MIN_SIZE = 1024 * 1024  # bytes, smaller payloads go through the pipe
+SHARED_MEMORY_HANDLE_PREFIX = b'{"shm_size":'
+SHARED_MEMORY_ITEMS_NAME = "n8n_items"  # memfd names, only shown in /proc
+SHARED_MEMORY_RESULT_NAME = "n8n_result"
+SHARED_MEMORY_FDS_PER_READ = 1  # a result frame carries one memfd
 
-# Pipe reader join timeout
-TYPICAL_PAYLOAD_RATIO = 0.1  # assume typical size is 10% of max payload
-PARSE_THROUGHPUT_BYTES_PER_SEC = 100_000_000  # 100 MB/s
+# Pipe reader join timeout, sized from the announced result size
+PARSE_THROUGHPUT_BYTES_PER_SEC = (
+    100_000_000  # 100 MB/s, low end for reading and parsing a result
+)
 PIPE_READER_JOIN_TIMEOUT_SAFETY_BUFFER = 2.0  # seconds
 
 # Broker
 DEFAULT_TASK_BROKER_URI = "http://127.0.0.1:5679"
 TASK_BROKER_WS_PATH = "/runners/_ws"
+TASK_BROKER_AUTH_PATH = "/runners/auth"
+
+# Supervisor
+DEFAULT_RUNNER_PROCESSES = 1  # runner processes, more than 1 starts a supervisor
+SUPERVISOR_RESTART_DELAY = 1  # seconds before restarting a crashed runner process
+SUPERVISOR_GRANT_TOKEN_TIMEOUT = 10  # seconds
+SUPERVISOR_STATS_TIMEOUT = 1  # seconds to wait for a runner process's stats
+SUPERVISOR_SHUTDOWN_MARGIN = 1  # seconds runner processes stop ahead of the supervisor
 
 # Health check
 DEFAULT_HEALTH_CHECK_SERVER_HOST = "127.0.0.1"
 DEFAULT_HEALTH_CHECK_SERVER_PORT = 5681
+HEALTH_CHECK_STATS_PATH = "/stats"
+HEALTH_CHECK_METRICS_PATH = "/metrics"
+HEALTH_CHECK_PROFILES_PATH = "/profiles"
+HEALTH_CHECK_REQUEST_TIMEOUT = 1  # seconds
+
+# Metrics
+METRICS_PREFIX = "n8n_runner_"
+METRICS_LATENCY_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1,
+    2.5,
+    5,
+    10,
+    30,
+    60,
+)  # seconds
+METRICS_BYTES_BUCKETS = tuple(1024 * 4**i for i in range(11))  # 1 KiB to 1 GiB
+METRICS_THROUGHPUT_BUCKETS = tuple(
+    1024 * 1024 * 2**i for i in range(15)
+)  # 1 MiB/s to 16 GiB/s
 
 # Env vars
 ENV_TASK_BROKER_URI = "N8N_RUNNERS_TASK_BROKER_URI"
@@ -73,9 +151,28 @@ ENV_GRACEFUL_SHUTDOWN_TIMEOUT = "N8N_RUNNERS_GRACEFUL_SHUTDOWN_TIMEOUT"
 ENV_STDLIB_ALLOW = "N8N_RUNNERS_STDLIB_ALLOW"
 ENV_EXTERNAL_ALLOW = "N8N_RUNNERS_EXTERNAL_ALLOW"
 ENV_BUILTINS_DENY = "N8N_RUNNERS_BUILTINS_DENY"
+ENV_PRELOAD_MODULES = "N8N_RUNNERS_PRELOAD_MODULES"
+ENV_WORKER_POOL_ENABLED = "N8N_RUNNERS_WORKER_POOL_ENABLED"
+ENV_WORKER_MAX_TASKS = "N8N_RUNNERS_WORKER_MAX_TASKS"
+ENV_WORKER_MAX_MEMORY_MB = "N8N_RUNNERS_WORKER_MAX_MEMORY_MB"
+ENV_PER_ITEM_PARALLEL_MIN_ITEMS = "N8N_RUNNERS_PER_ITEM_PARALLEL_MIN_ITEMS"
+ENV_PER_ITEM_PARALLEL_PROCESSES = "N8N_RUNNERS_PER_ITEM_PARALLEL_PROCESSES"
+ENV_MAX_MEMORY_MB = "N8N_RUNNERS_MAX_MEMORY_MB"
+ENV_TASK_MAX_MEMORY_MB = "N8N_RUNNERS_TASK_MAX_MEMORY_MB"
+ENV_TASK_MAX_CPU_SECONDS = "N8N_RUNNERS_TASK_MAX_CPU_SECONDS"
+ENV_VALIDATION_CACHE_FILE = "N8N_RUNNERS_VALIDATION_CACHE_FILE"
+ENV_PROFILE_WORKFLOWS = "N8N_RUNNERS_PROFILE_WORKFLOWS"
+ENV_PROFILE_SAMPLE_RATE = "N8N_RUNNERS_PROFILE_SAMPLE_RATE"
+ENV_PROFILE_TOP = "N8N_RUNNERS_PROFILE_TOP"
 ENV_HEALTH_CHECK_SERVER_ENABLED = "N8N_RUNNERS_HEALTH_CHECK_SERVER_ENABLED"
 ENV_HEALTH_CHECK_SERVER_HOST = "N8N_RUNNERS_HEALTH_CHECK_SERVER_HOST"
 ENV_HEALTH_CHECK_SERVER_PORT = "N8N_RUNNERS_HEALTH_CHECK_SERVER_PORT"
+ENV_HEALTH_CHECK_SERVER_SOCKET = "N8N_RUNNERS_HEALTH_CHECK_SERVER_SOCKET"
+ENV_RUNNER_PROCESSES = "N8N_RUNNERS_PROCESSES"
+ENV_SANDBOX_WARM_UP = (
+    "N8N_RUNNERS_SANDBOX_WARM_UP"  # set by the runner for the forkserver
+)
+ENV_AUTH_TOKEN = "N8N_RUNNERS_AUTH_TOKEN"
 ENV_LAUNCHER_LOG_LEVEL = "N8N_RUNNERS_LAUNCHER_LOG_LEVEL"
 ENV_BLOCK_RUNNER_ENV_ACCESS = "N8N_BLOCK_RUNNER_ENV_ACCESS"
 ENV_SENTRY_DSN = "N8N_SENTRY_DSN"
@@ -99,7 +196,8 @@ IGNORED_ERROR_TYPES = (
 # Logging
 LOG_FORMAT = "%(asctime)s.%(msecs)03d\t%(levelname)s\t%(message)s"
 LOG_TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
-LOG_TASK_COMPLETE = 'Completed task {task_id} in {duration} ({result_size}) for node "{node_name}" ({node_id}) in workflow "{workflow_name}" ({workflow_id})'
+LOG_TASK_COMPLETE = 'Completed task {task_id} in {duration} ({result_size} at {transfer_rate}, peak memory {peak_memory}) for node "{node_name}" ({node_id}) in workflow "{workflow_name}" ({workflow_id})'
+LOG_TASK_PROFILE = 'Profiled task {task_id} for node "{node_name}" ({node_id}) in workflow "{workflow_name}" ({workflow_id}), user code ran {exec_time}, top functions by cumulative time:\n{functions}'
 LOG_TASK_CANCEL = 'Cancelled task {task_id} for node "{node_name}" ({node_id}) in workflow "{workflow_name}" ({workflow_id})'
 LOG_TASK_CANCEL_UNKNOWN = (
     "Received cancel for unknown task: {task_id}. Discarding message."
@@ -107,10 +205,33 @@ LOG_TASK_CANCEL_UNKNOWN = (
 LOG_TASK_CANCEL_WAITING = "Cancelled task {task_id} (waiting for settings)"
 LOG_SENTRY_MISSING = "Sentry is enabled but sentry-sdk is not installed. Install with: uv sync --all-extras"
 LOG_PIPE_READER_TIMEOUT_TRIGGERED = (
-    "Pipe reader thread did not finish reading within {timeout}s. "
-    "Closing pipe to unblock. Task may fail if data was not fully read. "
-    "For large payloads, increase N8N_RUNNERS_MAX_PAYLOAD to scale timeout."
+    "Pipe reader made no progress for {timeout}s after the task exited, "
+    "with {unread} of {length} announced bytes unread. "
+    "Closing pipe to unblock. Task may fail if data was not fully read."
+)
+LOG_FORKSERVER_PRELOAD = (
+    "Preloaded {count} modules into forkserver in {duration}: {modules}"
 )
+LOG_FORKSERVER_PRELOAD_FAILED = "Failed to preload modules into forkserver, tasks will import them on use: {modules}"
+LOG_CODE_CACHE_STATS = (
+    "Code cache: {hits} hits, {misses} misses ({hit_rate:.0%} hit rate)"
+)
+LOG_VALIDATION_CACHE_LOADED = "Loaded {count} cached validation results from {path}"
+LOG_VALIDATION_CACHE_LOAD_FAILED = (
+    "Failed to load validation cache from {path}, starting empty: {error}"
+)
+LOG_VALIDATION_CACHE_SAVE_FAILED = "Failed to save validation cache to {path}: {error}"
+LOG_SUPERVISOR_STARTED = "Started runner process {index} with pid {pid}"
+LOG_SUPERVISOR_PROCESS_EXITED = "Runner process {index} exited with code {exit_code}"
+LOG_SUPERVISOR_RESTARTING = (
+    "Runner process {index} exited with code {exit_code}, restarting in {delay}s"
+)
+LOG_SUPERVISOR_START_FAILED = (
+    "Failed to start runner process {index}: {error} - retrying in {delay}s"
+)
+LOG_WORKER_POOL_STARTED = "Started worker pool with {size} workers in {duration}"
+LOG_WORKER_RECYCLED = "Recycled worker {pid} after {tasks} tasks ({reason})"
+LOG_TASK_QUEUED_FOR_MEMORY = "Queued task {task_id} until {required} of memory is free ({reserved} reserved, budget {budget})"
 
 # RPC
 RPC_BROWSER_CONSOLE_LOG_METHOD = "logNodeOutput"
@@ -120,6 +241,9 @@ TASK_REJECTED_REASON_OFFER_EXPIRED = (
     "Offer expired - not accepted within validity window"
 )
 TASK_REJECTED_REASON_AT_CAPACITY = "No open task slots - runner already at capacity"
+TASK_REJECTED_REASON_OUT_OF_MEMORY = (
+    "No memory headroom - runner already at its memory budget"
+)
 
 # Security
 BUILTINS_DENY_DEFAULT = "eval,exec,compile,open,input,breakpoint,getattr,object,type,vars,setattr,delattr,hasattr,dir,memoryview,__build_class__,globals,locals,license,help,credits,copyright"
@@ -38,6 +38,18 @@ def read_int_env(env_name: str, default: int) -> int:
         )
 
 
+def read_float_env(env_name: str, default: float) -> float:
+    value = read_env(env_name)
+    if value is None:
+        return default
+    try:
+        return float(value)
+    except ValueError:
+        raise ValueError(
+            f"Environment variable {env_name} must be a number, got '{value}'"
+        )
+
+
 def read_bool_env(env_name: str, default: bool) -> bool:
     value = read_env(env_name)
     if value is None:
@@ -4,7 +4,9 @@ from .invalid_pipe_msg_length_error import InvalidPipeMsgLengthError
 from .no_idle_timeout_handler_error import NoIdleTimeoutHandlerError
 from .security_violation_error import SecurityViolationError
 from .task_cancelled_error import TaskCancelledError
+from .task_cpu_limit_error import TaskCpuLimitError
 from .task_killed_error import TaskKilledError
+from .task_memory_budget_error import TaskMemoryBudgetError
 from .task_missing_error import TaskMissingError
 from .task_result_missing_error import TaskResultMissingError
 from .task_result_read_error import TaskResultReadError
@@ -20,7 +22,9 @@ __all__ = [
     "NoIdleTimeoutHandlerError",
     "SecurityViolationError",
     "TaskCancelledError",
+    "TaskCpuLimitError",
     "TaskKilledError",
+    "TaskMemoryBudgetError",
     "TaskMissingError",
     "TaskSubprocessFailedError",
     "TaskResultMissingError",
@@ -0,0 +1,7 @@
+class TaskCpuLimitError(Exception):
+    """Raised when a task process exceeds its CPU time limit (SIGXCPU)."""
+
+    def __init__(self):
+        super().__init__(
+            "Process exceeded its CPU time limit (SIGXCPU). Raise N8N_RUNNERS_TASK_MAX_CPU_SECONDS or reduce the work done by the task."
+        )
@@ -0,0 +1,15 @@
+class TaskMemoryBudgetError(Exception):
+    """Raised when a task cannot be admitted within the runner's memory budget."""
+
+    def __init__(self, required_bytes: int, budget_bytes: int, is_queue_timeout: bool):
+        required_mb = required_bytes // (1024 * 1024)
+        budget_mb = budget_bytes // (1024 * 1024)
+
+        if is_queue_timeout:
+            message = f"Task waited too long for {required_mb} MB of memory to free up (budget {budget_mb} MB)"
+        else:
+            message = f"Task needs an estimated {required_mb} MB of memory, more than the runner's budget of {budget_mb} MB. Reduce the input items or raise N8N_RUNNERS_MAX_MEMORY_MB."
+
+        super().__init__(message)
+        self.required_bytes = required_bytes
+        self.budget_bytes = budget_bytes
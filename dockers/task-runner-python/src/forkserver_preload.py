@@ -0,0 +1,96 @@
+import logging
+import os
+import sys
+import time
+from dataclasses import dataclass
+
+from src import sandbox
+from src.config.security_config import SecurityConfig
+from src.constants import (
+    FORKSERVER_BASE_PRELOAD,
+    FORKSERVER_WARM_UP_MODULE,
+    FORKSERVER_WARM_UP_TIMEOUT,
+    LOG_FORKSERVER_PRELOAD,
+    LOG_FORKSERVER_PRELOAD_FAILED,
+)
+from src.task_executor import MULTIPROCESSING_CONTEXT, TaskExecutor
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PreloadReport:
+    loaded: list[str]
+    failed: list[str]
+    duration: float  # seconds
+
+
+def _report_preloaded(modules: list[str], write_conn) -> None:
+    """Runs in a forkserver child. Reports which modules the forkserver imported."""
+
+    write_conn.send([name for name in modules if name in sys.modules])
+    write_conn.close()
+
+
+def preload_forkserver(
+    modules: list[str], security_config: SecurityConfig | None = None
+) -> PreloadReport:
+    """Import `modules` once in the forkserver so every task forks with them loaded.
+
+    The forkserver imports preload modules before it accepts its first
+    request, so the first process start blocks until all imports finish.
+    That latency is reported as the preload time. Modules that fail to
+    import are skipped by the forkserver and reported as failed. With a
+    `security_config`, the forkserver then builds its sandbox template.
+    """
+
+    MULTIPROCESSING_CONTEXT.set_forkserver_preload(
+        [*FORKSERVER_BASE_PRELOAD, *modules, FORKSERVER_WARM_UP_MODULE]
+    )
+
+    # the forkserver inherits our env when it starts below
+    warm_up_env = sandbox.warm_up_env(security_config) if security_config else {}
+    os.environ.update(warm_up_env)
+
+    read_conn, write_conn = MULTIPROCESSING_CONTEXT.Pipe(duplex=False)
+    process = MULTIPROCESSING_CONTEXT.Process(
+        target=_report_preloaded, args=(modules, write_conn)
+    )
+
+    started_at = time.perf_counter()
+    try:
+        process.start()
+        write_conn.close()
+        if not read_conn.poll(FORKSERVER_WARM_UP_TIMEOUT):
+            raise TimeoutError(
+                f"Forkserver did not start within {FORKSERVER_WARM_UP_TIMEOUT}s"
+            )
+        loaded = set(read_conn.recv())
+    finally:
+        for name in warm_up_env:
+            os.environ.pop(name, None)
+        write_conn.close()
+        read_conn.close()
+        if process.pid is not None:
+            process.join(timeout=1)
+            TaskExecutor.stop_process(process)
+
+    report = PreloadReport(
+        loaded=[name for name in modules if name in loaded],
+        failed=[name for name in modules if name not in loaded],
+        duration=time.perf_counter() - started_at,
+    )
+
+    logger.info(
+        LOG_FORKSERVER_PRELOAD.format(
+            count=len(report.loaded),
+            duration=f"{report.duration * 1000:.0f}ms",
+            modules=", ".join(report.loaded) or "none",
+        )
+    )
+    if report.failed:
+        logger.warning(
+            LOG_FORKSERVER_PRELOAD_FAILED.format(modules=", ".join(report.failed))
+        )
+
+    return report
@@ -0,0 +1,8 @@
+"""Imported by the forkserver after the preloaded modules, see `warm_up_from_env`."""
+
+from src.sandbox import warm_up_from_env
+
+try:
+    warm_up_from_env()
+except Exception:
+    pass  # an error here would stop the forkserver, tasks build the template instead
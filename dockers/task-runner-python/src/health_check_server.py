@@ -1,8 +1,17 @@
 import asyncio
 import errno
+import inspect
+import json
 import logging
+from typing import Awaitable, Callable
 
 from src.config.health_check_config import HealthCheckConfig
+from src.constants import (
+    HEALTH_CHECK_METRICS_PATH,
+    HEALTH_CHECK_PROFILES_PATH,
+    HEALTH_CHECK_REQUEST_TIMEOUT,
+    HEALTH_CHECK_STATS_PATH,
+)
 
 HEALTH_CHECK_RESPONSE = (
     b"HTTP/1.1 200 OK\r\nContent-Type: text/plain\r\nContent-Length: 2\r\n\r\nOK"
@@ -13,8 +22,23 @@ class HealthCheckServer:
     def __init__(self):
         self.server: asyncio.Server | None = None
         self.logger = logging.getLogger(__name__)
+        # async for a supervisor, which asks its runner processes
+        self.stats_provider: Callable[[], dict | Awaitable[dict]] | None = None
+        self.metrics_provider: Callable[[], str | Awaitable[str]] | None = None
+        self.profiles_provider: (
+            Callable[[], list[dict] | Awaitable[list[dict]]] | None
+        ) = None
 
     async def start(self, config: HealthCheckConfig) -> None:
+        if config.socket_path:
+            self.server = await asyncio.start_unix_server(
+                self._handle_request, config.socket_path
+            )
+            self.logger.info(
+                f"Health check server listening on socket {config.socket_path}"
+            )
+            return
+
         try:
             self.server = await asyncio.start_server(
                 self._handle_request, config.host, config.port
@@ -38,13 +62,62 @@ class HealthCheckServer:
             self.logger.info("Health check server stopped")
 
     async def _handle_request(
-        self, _reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
     ) -> None:
         try:
-            writer.write(HEALTH_CHECK_RESPONSE)
+            path = await self._read_path(reader)
+
+            if path == HEALTH_CHECK_STATS_PATH and self.stats_provider:
+                writer.write(await self._json_response(self.stats_provider))
+            elif path == HEALTH_CHECK_PROFILES_PATH and self.profiles_provider:
+                writer.write(await self._json_response(self.profiles_provider))
+            elif path == HEALTH_CHECK_METRICS_PATH and self.metrics_provider:
+                writer.write(await self._metrics_response())
+            else:
+                writer.write(HEALTH_CHECK_RESPONSE)
+
             await writer.drain()
         except Exception:
             pass
         finally:
             writer.close()
             await writer.wait_closed()
+
+    async def _read_path(self, reader: asyncio.StreamReader) -> str | None:
+        """Path from the request line. Clients that send nothing get the health check."""
+
+        try:
+            request_line = await asyncio.wait_for(
+                reader.readline(), timeout=HEALTH_CHECK_REQUEST_TIMEOUT
+            )
+        except asyncio.TimeoutError:
+            return None
+
+        parts = request_line.decode("latin-1").split()
+        return parts[1].split("?")[0] if len(parts) >= 2 else None
+
+    async def _json_response(
+        self, provider: Callable[[], object | Awaitable[object]]
+    ) -> bytes:
+        body = json.dumps(await _resolve(provider())).encode("utf-8")
+        return self._response(body, "application/json")
+
+    async def _metrics_response(self) -> bytes:
+        """Metrics in the Prometheus text exposition format."""
+
+        assert self.metrics_provider is not None
+        metrics = await _resolve(self.metrics_provider())
+        body = metrics.encode("utf-8")
+        return self._response(body, "text/plain; version=0.0.4; charset=utf-8")
+
+    def _response(self, body: bytes, content_type: str) -> bytes:
+        headers = (
+            "HTTP/1.1 200 OK\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\n\r\n"
+        )
+        return headers.encode("latin-1") + body
+
+
+async def _resolve[T](value: T | Awaitable[T]) -> T:
+    return await value if inspect.isawaitable(value) else value
@@ -0,0 +1,98 @@
+import json
+import math
+from typing import Any
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class JsonCodec:
+    """Compact UTF-8 JSON via the stdlib. Values JSON has no type for are
+    encoded with `str`, and NaN and infinities as `null` like orjson does,
+    since the broker only parses standard JSON. Decoding rejects them too.
+
+    `OrjsonCodec` is used instead if orjson is installed. It falls back to
+    this for values orjson cannot encode, e.g. ints beyond 64 bits, so that
+    such results still encode and errors such as circular references read
+    the same whichever codec is in use.
+    """
+
+    name = "json"
+
+    def dumps(self, obj: Any) -> bytes:
+        try:
+            return self._dumps(obj, allow_nan=False)
+        except ValueError as e:
+            # also raised for circular references, which must not be walked
+            if not str(e).startswith("Out of range float values"):
+                raise
+
+        return self._dumps(_replace_non_finite(obj), allow_nan=True)
+
+    def loads(self, data: str | bytes | bytearray | memoryview) -> Any:
+        if isinstance(data, memoryview):
+            data = data.tobytes()  # the stdlib parses no buffers other than these
+        return json.loads(data, parse_constant=_reject_constant)
+
+    @staticmethod
+    def _dumps(obj: Any, allow_nan: bool) -> bytes:
+        return json.dumps(
+            obj,
+            default=str,
+            ensure_ascii=False,
+            separators=(",", ":"),
+            allow_nan=allow_nan,
+        ).encode("utf-8")
+
+
+class OrjsonCodec(JsonCodec):
+    name = "orjson"
+
+    # datetimes and dataclasses go through `str` as with the stdlib
+    OPTIONS = (
+        orjson.OPT_NON_STR_KEYS
+        | orjson.OPT_PASSTHROUGH_DATETIME
+        | orjson.OPT_PASSTHROUGH_DATACLASS
+        if orjson
+        else 0
+    )
+
+    def dumps(self, obj: Any) -> bytes:
+        try:
+            return orjson.dumps(obj, default=_to_str, option=self.OPTIONS)
+        except orjson.JSONEncodeError:
+            return super().dumps(obj)
+
+    def loads(self, data: str | bytes | bytearray | memoryview) -> Any:
+        return orjson.loads(data)
+
+
+def _replace_non_finite(obj: Any) -> Any:
+    """Copy of `obj` with NaN and infinite floats replaced by None. Only
+    walks the containers the encoder does, so other objects go to `str`."""
+
+    if isinstance(obj, float):
+        return obj if math.isfinite(obj) else None
+    if isinstance(obj, dict):
+        return {key: _replace_non_finite(value) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_replace_non_finite(value) for value in obj]
+    return obj
+
+
+def _reject_constant(name: str) -> Any:
+    raise ValueError(f"{name} is not valid JSON")
+
+
+def _to_str(obj: Any) -> Any:
+    # float subclasses such as numpy.float64 stay numbers, as with the stdlib
+    return float(obj) if isinstance(obj, float) else str(obj)
+
+
+def _select_codec() -> JsonCodec:
+    return OrjsonCodec() if orjson else JsonCodec()
+
+
+codec = _select_codec()
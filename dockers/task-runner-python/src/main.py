@@ -2,16 +2,23 @@ import asyncio
 import logging
 import sys
 import platform
+from typing import TYPE_CHECKING
 
 from src.constants import ERROR_WINDOWS_NOT_SUPPORTED
 from src.config.health_check_config import HealthCheckConfig
 from src.config.sentry_config import SentryConfig
 from src.config.task_runner_config import TaskRunnerConfig
 from src.errors import ConfigurationError
+from src.forkserver_preload import preload_forkserver
 from src.logs import setup_logging
+from src.runner_supervisor import RunnerSupervisor
 from src.task_runner import TaskRunner
 from src.shutdown import Shutdown
 
+if TYPE_CHECKING:
+    from src.health_check_server import HealthCheckServer
+    from src.sentry import TaskRunnerSentry
+
 
 async def main():
     setup_logging()
@@ -48,7 +55,25 @@ async def main():
         logger.error(str(e))
         sys.exit(1)
 
+    if task_runner_config.is_supervisor:
+        await supervise(task_runner_config, health_check_server, sentry)
+        return
+
     task_runner = TaskRunner(task_runner_config)
+
+    try:
+        await asyncio.to_thread(
+            preload_forkserver,
+            task_runner_config.preload_modules,
+            task_runner.security_config,
+        )
+    except Exception as e:
+        logger.warning(f"Failed to preload modules into forkserver: {e}")
+
+    if health_check_server:
+        health_check_server.stats_provider = task_runner.get_stats
+        health_check_server.metrics_provider = task_runner.get_metrics
+        health_check_server.profiles_provider = task_runner.get_profiles
     logger.info("Starting runner...")
 
     shutdown = Shutdown(task_runner, health_check_server, sentry)
@@ -64,6 +89,36 @@ async def main():
     sys.exit(exit_code)
 
 
+async def supervise(
+    config: TaskRunnerConfig,
+    health_check_server: "HealthCheckServer | None",
+    sentry: "TaskRunnerSentry | None",
+):
+    """Run `config.processes` runner processes instead of running tasks here."""
+
+    logger = logging.getLogger(__name__)
+
+    supervisor = RunnerSupervisor(config)
+    if health_check_server:
+        health_check_server.stats_provider = supervisor.get_stats
+        health_check_server.metrics_provider = supervisor.get_metrics
+        health_check_server.profiles_provider = supervisor.get_profiles
+    logger.info(f"Starting {config.processes} runner processes...")
+
+    shutdown = Shutdown(supervisor, health_check_server, sentry)
+
+    try:
+        await supervisor.start()
+    except Exception:
+        logger.error("Unexpected error", exc_info=True)
+
+    # every process exited on its own, e.g. on its idle timeout
+    await shutdown.start_shutdown()
+
+    exit_code = await shutdown.wait_for_shutdown()
+    sys.exit(exit_code)
+
+
 if __name__ == "__main__":
     if platform.system() == "Windows":
         print(ERROR_WINDOWS_NOT_SUPPORTED, file=sys.stderr)
@@ -1,7 +1,8 @@
-import json
-from dataclasses import asdict
+from dataclasses import fields
+from functools import cache
 from typing import cast
 
+from src.json_codec import codec
 from src.message_types.broker import NodeMode, TaskSettings
 from src.constants import (
     BROKER_INFO_REQUEST,
@@ -20,7 +21,9 @@ from src.message_types import (
     BrokerTaskSettings,
     BrokerTaskCancel,
     BrokerRpcResponse,
+    RunnerTaskDone,
 )
+from src.message_types.pipe import EncodedItems
 
 
 NODE_MODE_MAP = {
@@ -116,23 +119,69 @@ class MessageSerde:
 
     @staticmethod
     def deserialize_broker_message(data: str) -> BrokerMessage:
-        message_dict = json.loads(data)
+        message_dict = codec.loads(data)
         message_type = message_dict.get("type")
 
         if message_type not in MESSAGE_TYPE_MAP:
             raise ValueError(f"Unknown message type: {message_type}")
 
-        return MESSAGE_TYPE_MAP[message_type](message_dict)
+        message = MESSAGE_TYPE_MAP[message_type](message_dict)
+
+        if isinstance(message, BrokerTaskSettings):
+            message.settings.payload_size = len(data)
+
+        return message
 
     @staticmethod
-    def serialize_runner_message(message: RunnerMessage) -> str:
-        data = asdict(message)
+    def serialize_runner_message(message: RunnerMessage) -> bytes:
+        """Encode a message as UTF-8 JSON, to be sent as a text frame."""
+
+        if isinstance(message, RunnerTaskDone) and isinstance(
+            message.data.get("result"), EncodedItems
+        ):
+            return MessageSerde._serialize_encoded_task_done(message)
+
+        # shallow, unlike `asdict`, which deep-copies results and print args
         camel_case_data = {
-            MessageSerde._snake_to_camel_case(k): v for k, v in data.items()
+            camel_case_key: getattr(message, key)
+            for key, camel_case_key in _get_camel_case_fields(type(message))
         }
-        return json.dumps(camel_case_data)
+        return codec.dumps(camel_case_data)
+
+    @staticmethod
+    def _serialize_encoded_task_done(message: RunnerTaskDone) -> bytes:
+        """Splice streamed result items into the message as they are, instead of
+        parsing and encoding them again. Consumes the chunks, releasing each
+        one once it is copied into the message."""
+
+        result: EncodedItems = message.data["result"]
+        data = {k: v for k, v in message.data.items() if k != "result"}
+        envelope = codec.dumps(
+            {"taskId": message.task_id, "type": message.type, "data": data}
+        )
+
+        # envelope ends with the `data` dict, then the message dict: "...}}"
+        parts = [envelope[:-2] + (b"," if data else b"") + b'"result":[']
+
+        result.chunks.reverse()
+        while result.chunks:
+            if len(parts) > 1:
+                parts.append(b",")
+            parts.append(result.chunks.pop())
+
+        parts.append(b"]}}")
+
+        return b"".join(parts)
 
     @staticmethod
     def _snake_to_camel_case(snake_case_str: str) -> str:
         parts = snake_case_str.split("_")
         return parts[0] + "".join(word.capitalize() for word in parts[1:])
+
+
+@cache
+def _get_camel_case_fields(message_type: type) -> tuple[tuple[str, str], ...]:
+    return tuple(
+        (field.name, MessageSerde._snake_to_camel_case(field.name))
+        for field in fields(message_type)
+    )
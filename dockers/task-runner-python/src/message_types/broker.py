@@ -46,6 +46,7 @@ class TaskSettings:
     node_name: str
     node_id: str
     query: Query = None
+    payload_size: int = 0  # bytes of the settings message, for admission control
 
 
 @dataclass
@@ -1,4 +1,5 @@
-from typing import Any, TypedDict
+from dataclasses import dataclass, field
+from typing import Any, NotRequired, TypedDict
 
 from src.message_types.broker import Items
 
@@ -12,14 +13,46 @@ class TaskErrorInfo(TypedDict):
     stderr: str
 
 
+class ProfileEntry(TypedDict):
+    function: str  # e.g. `_user_function (<all_items_task_execution>:1)`
+    calls: int
+    own_seconds: float  # in the function itself
+    cumulative_seconds: float  # including functions it called
+
+
+TaskProfile = list[ProfileEntry]  # top functions by cumulative time
+
+
 class PipeResultMessage(TypedDict):
-    result: Items
+    result: Items  # empty if the items were streamed ahead in result chunks
     print_args: PrintArgs
+    peak_rss: NotRequired[int]  # bytes
+    exec_seconds: NotRequired[float]  # time spent running user code
+    profile: NotRequired[TaskProfile]  # only if profiling was enabled for the task
 
 
 class PipeErrorMessage(TypedDict):
     error: TaskErrorInfo
     print_args: PrintArgs
+    peak_rss: NotRequired[int]  # bytes
+
+
+class PipeSharedMemoryMessage(TypedDict):
+    """Sent instead of a large message, which is written to a memfd that is
+    passed along with this frame."""
+
+    shm_size: int
 
 
 PipeMessage = PipeResultMessage | PipeErrorMessage
+
+
+@dataclass
+class EncodedItems:
+    """Result items streamed from the subprocess as JSON and forwarded as is.
+
+    Each chunk is a comma-separated run of encoded items. The runner never
+    parses them, it only splices them into the task done message.
+    """
+
+    chunks: list[bytes | memoryview] = field(default_factory=list)
@@ -0,0 +1,184 @@
+import bisect
+
+from src.constants import (
+    METRICS_BYTES_BUCKETS,
+    METRICS_LATENCY_BUCKETS,
+    METRICS_PREFIX,
+    METRICS_THROUGHPUT_BUCKETS,
+)
+
+Gauge = tuple[str, str, float]  # name, description, value
+
+
+class Histogram:
+    """Cumulative histogram, rendered in the Prometheus text format."""
+
+    def __init__(self, name: str, description: str, buckets: tuple[float, ...]):
+        self.name = f"{METRICS_PREFIX}{name}"
+        self.description = description
+        self.buckets = buckets
+        self.bucket_counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.count += 1
+        self.sum += value
+
+        # upper bounds are inclusive, as in Prometheus
+        index = bisect.bisect_left(self.buckets, value)
+        if index < len(self.buckets):
+            self.bucket_counts[index] += 1
+
+    def render(self) -> list[str]:
+        lines = [
+            f"# HELP {self.name} {self.description}",
+            f"# TYPE {self.name} histogram",
+        ]
+
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.bucket_counts):
+            cumulative += count
+            lines.append(f'{self.name}_bucket{{le="{_format(bound)}"}} {cumulative}')
+
+        lines.append(f'{self.name}_bucket{{le="+Inf"}} {self.count}')
+        lines.append(f"{self.name}_sum {_format(self.sum)}")
+        lines.append(f"{self.name}_count {self.count}")
+
+        return lines
+
+
+class Metrics:
+    """Per-phase latencies and sizes of the tasks run by this runner."""
+
+    def __init__(self):
+        self.offer_accept_seconds = Histogram(
+            "offer_accept_seconds",
+            "Time from sending a task offer to the broker accepting it.",
+            METRICS_LATENCY_BUCKETS,
+        )
+        self.accept_settings_seconds = Histogram(
+            "accept_settings_seconds",
+            "Time from accepting a task to receiving its settings.",
+            METRICS_LATENCY_BUCKETS,
+        )
+        self.validation_seconds = Histogram(
+            "validation_seconds",
+            "Time to validate task code, including validation cache hits.",
+            METRICS_LATENCY_BUCKETS,
+        )
+        self.process_spawn_seconds = Histogram(
+            "process_spawn_seconds",
+            "Time to start a task subprocess from the forkserver.",
+            METRICS_LATENCY_BUCKETS,
+        )
+        self.execution_seconds = Histogram(
+            "execution_seconds",
+            "Time spent running user code in the subprocess.",
+            METRICS_LATENCY_BUCKETS,
+        )
+        self.pipe_transfer_seconds = Histogram(
+            "pipe_transfer_seconds",
+            "Time from the first to the last byte of a task result read from the pipe.",
+            METRICS_LATENCY_BUCKETS,
+        )
+        self.pipe_transfer_bytes = Histogram(
+            "pipe_transfer_bytes",
+            "Size of task results read from the pipe.",
+            METRICS_BYTES_BUCKETS,
+        )
+        self.pipe_transfer_bytes_per_second = Histogram(
+            "pipe_transfer_bytes_per_second",
+            "Throughput of reading task results from the pipe.",
+            METRICS_THROUGHPUT_BUCKETS,
+        )
+        self.message_decode_seconds = Histogram(
+            "message_decode_seconds",
+            "Time to decode a message from the broker.",
+            METRICS_LATENCY_BUCKETS,
+        )
+        self.message_encode_seconds = Histogram(
+            "message_encode_seconds",
+            "Time to encode a message to the broker.",
+            METRICS_LATENCY_BUCKETS,
+        )
+        self.websocket_send_seconds = Histogram(
+            "websocket_send_seconds",
+            "Time to send a message to the broker.",
+            METRICS_LATENCY_BUCKETS,
+        )
+        self.task_peak_rss_bytes = Histogram(
+            "task_peak_rss_bytes",
+            "Peak RSS of the subprocess that ran a task.",
+            METRICS_BYTES_BUCKETS,
+        )
+
+    @property
+    def histograms(self) -> list[Histogram]:
+        return [
+            self.offer_accept_seconds,
+            self.accept_settings_seconds,
+            self.validation_seconds,
+            self.process_spawn_seconds,
+            self.execution_seconds,
+            self.pipe_transfer_seconds,
+            self.pipe_transfer_bytes,
+            self.pipe_transfer_bytes_per_second,
+            self.message_decode_seconds,
+            self.message_encode_seconds,
+            self.websocket_send_seconds,
+            self.task_peak_rss_bytes,
+        ]
+
+    def render(self, gauges: list[Gauge]) -> str:
+        lines = []
+
+        for name, description, value in gauges:
+            name = f"{METRICS_PREFIX}{name}"
+            lines.append(f"# HELP {name} {description}")
+            lines.append(f"# TYPE {name} gauge")
+            lines.append(f"{name} {_format(value)}")
+
+        for histogram in self.histograms:
+            lines.extend(histogram.render())
+
+        return "\n".join(lines) + "\n"
+
+
+def merge_metrics(expositions: list[tuple[str, str]]) -> str:
+    """Merge the metrics of several runner processes, given as (process, text)
+    pairs, labelling each sample with its process. Samples of a metric stay
+    together under a single HELP and TYPE, as Prometheus requires."""
+
+    families: dict[str, list[str]] = {}
+
+    for process, text in expositions:
+        family: list[str] | None = None
+
+        for line in text.splitlines():
+            if line.startswith("# "):
+                name = line.split(" ", 3)[2]
+                family = families.get(name)
+                if family is None:
+                    family = families[name] = []
+                if len(family) < 2:
+                    family.append(line)  # first HELP and TYPE
+            elif line and family is not None:
+                family.append(_add_label(line, f'process="{process}"'))
+
+    return "".join("\n".join(lines) + "\n" for lines in families.values() if lines)
+
+
+def _add_label(sample: str, label: str) -> str:
+    name, _, value = sample.partition(" ")
+
+    if name.endswith("}"):
+        name = f"{name[:-1]},{label}}}"
+    else:
+        name = f"{name}{{{label}}}"
+
+    return f"{name} {value}"
+
+
+def _format(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
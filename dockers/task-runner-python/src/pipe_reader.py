@@ -1,6 +1,12 @@
-import json
+import array
+import asyncio
 import os
+import socket
 import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
 from typing import cast
 
 from multiprocessing.connection import Connection
@@ -10,55 +16,162 @@ from src.errors import (
     InvalidPipeMsgLengthError,
 )
 from src.message_types.pipe import PipeMessage
-from src.constants import PIPE_MSG_PREFIX_LENGTH
+from src import shared_payload
+from src.json_codec import codec
+from src.constants import (
+    PARSE_THROUGHPUT_BYTES_PER_SEC,
+    PIPE_FRAME_HANDLER_THREADS,
+    PIPE_MSG_PREFIX_LENGTH,
+    PIPE_READS_PER_CALLBACK,
+    PIPE_RESULT_CHUNK_PREFIX,
+    PIPE_RESULT_CHUNK_SUFFIX,
+    SHARED_MEMORY_FDS_PER_READ,
+    SHARED_MEMORY_HANDLE_PREFIX,
+)
+
+_FD_ANCILLARY_SIZE = socket.CMSG_SPACE(
+    SHARED_MEMORY_FDS_PER_READ * array.array("i").itemsize
+)
 
 type PipeConnection = Connection
 
+# handles frames for every AsyncPipeReader, threads start on demand
+_frame_handlers = ThreadPoolExecutor(
+    max_workers=PIPE_FRAME_HANDLER_THREADS, thread_name_prefix="pipe-frame"
+)
 
-class PipeReader(threading.Thread):
-    """Background thread that reads result from pipe."""
 
-    def __init__(self, read_fd: int, read_conn: PipeConnection):
-        super().__init__()
-        self.read_fd = read_fd
+class BasePipeReader:
+    """Result message state shared by the thread and event loop readers.
+
+    A task writes zero or more result chunk frames, then a final message.
+    Both readers drain the pipe from the moment the task starts, so a task
+    writing a large result never waits on a full pipe for longer than it
+    takes to read it. They track how much of the frame in progress is read,
+    so the wait for the rest once the task exited is sized from the frame's
+    length prefix rather than from the max payload size.
+
+    The pipe is one end of a Unix socket pair, so that a frame announcing a
+    large message can carry the memfd holding it, see `shared_payload`.
+    """
+
+    def __init__(self, read_conn: PipeConnection):
         self.read_conn = read_conn
+        self.sock: socket.socket | None = None  # on read_conn's fd, not owning it
+        self.received_fds: deque[int] = deque()  # memfds not yet handled
         self.pipe_message: PipeMessage | None = None
-        self.message_size: int | None = None  # bytes
+        self.result_chunks: list[bytes | memoryview] = []
+        self.message_size: int = 0  # bytes
         self.error: Exception | None = None
+        self.transfer_started_at: float | None = None  # perf counter, at first byte
+        self.transfer_seconds: float | None = None
+        self.bytes_read = 0  # from the pipe and shared memory, grows while reading
+        self.frame_length = 0  # of the frame being read or handled
+        self.frame_bytes_read = 0
 
-    def run(self):
-        try:
-            length_bytes = PipeReader._read_exact_bytes(
-                self.read_fd, PIPE_MSG_PREFIX_LENGTH
+    def finish_timeout(self, base_timeout: float) -> float:
+        """Seconds to allow for finishing the transfer: `base_timeout`, plus
+        reading what is left of the announced frame and parsing all of it."""
+
+        unread = self.frame_length - self.frame_bytes_read
+        return base_timeout + (unread + self.frame_length) / (
+            PARSE_THROUGHPUT_BYTES_PER_SEC
+        )
+
+    def _start_frame(self, length: int) -> None:
+        self.frame_length = length
+        self.frame_bytes_read = 0
+
+    def _count_read(self, size: int) -> None:
+        self.bytes_read += size
+        self.frame_bytes_read += size
+
+    def _handle_frame(self, data: bytes | bytearray) -> bool:
+        """Handle a frame and return whether it was the final message."""
+
+        if data.startswith(SHARED_MEMORY_HANDLE_PREFIX):
+            handle = codec.loads(data)
+            if not self.received_fds:
+                raise InvalidPipeMsgContentError("Shared memory handle without a memfd")
+            self._start_frame(handle["shm_size"])
+            data = shared_payload.read_result(
+                self.received_fds.popleft(), handle["shm_size"]
             )
-            length_int = int.from_bytes(length_bytes, "big")
-            if length_int <= 0:
-                raise InvalidPipeMsgLengthError(length_int)
-            self.message_size = length_int
-            data = PipeReader._read_exact_bytes(self.read_fd, length_int)
-            parsed_msg = json.loads(data.decode("utf-8"))
-            self.pipe_message = self._validate_pipe_message(parsed_msg)
-        except Exception as e:
-            self.error = e
-        finally:
-            self.read_conn.close()
+            self._count_read(len(data))
 
-    @staticmethod
-    def _read_exact_bytes(fd: int, n: int) -> bytes:
-        """Read exactly n bytes from file descriptor.
+        self.message_size += len(data)
+
+        if data.startswith(PIPE_RESULT_CHUNK_PREFIX):
+            self.result_chunks.append(self._validate_result_chunk(data))
+            return False
+
+        self.pipe_message = self._validate_pipe_message(codec.loads(data))
+
+        if self.transfer_started_at is not None:
+            self.transfer_seconds = time.perf_counter() - self.transfer_started_at
 
-        Uses os.read() instead of Connection.recv() because recv() pickles.
-        Preallocates bytearray to avoid repeated reallocation.
+        return True
+
+    def _open_socket(self) -> socket.socket:
+        self.sock = socket.socket(fileno=self.read_conn.fileno())
+        return self.sock
+
+    def _recv_into(self, view: memoryview) -> int:
+        """Read into `view`, keeping any memfd sent along with the bytes."""
+
+        assert self.sock is not None
+        read, ancdata, _, _ = self.sock.recvmsg_into([view], _FD_ANCILLARY_SIZE)
+
+        for level, kind, data in ancdata:
+            if level == socket.SOL_SOCKET and kind == socket.SCM_RIGHTS:
+                fds = array.array("i")
+                fds.frombytes(data[: len(data) - len(data) % fds.itemsize])
+                self.received_fds.extend(fds)
+
+        return read
+
+    def _close_socket(self) -> None:
+        """Close the pipe and any memfd received but not handled."""
+
+        if self.sock is not None:
+            self.sock.detach()  # read_conn owns the fd
+            self.sock = None
+
+        self.read_conn.close()
+
+        while self.received_fds:
+            os.close(self.received_fds.popleft())
+
+    def _mark_transfer_start(self) -> None:
+        if self.transfer_started_at is None:
+            self.transfer_started_at = time.perf_counter()
+
+    def _validate_result_chunk(self, data: bytes | bytearray) -> memoryview:
+        """Return the items of a result chunk frame, as a view on the frame.
+
+        Chunks are spliced into the `runner:taskdone` message as they are, so
+        each must be JSON values separated by commas, and nothing that could
+        close the result list and add keys of its own. The frame's prefix and
+        suffix enclose the items in brackets, so they are parsed as a list in
+        place, and this is the only time the runner parses result items.
         """
-        result = bytearray(n)
-        offset = 0
-        while offset < n:
-            chunk = os.read(fd, n - offset)
-            if not chunk:
-                raise EOFError("Pipe closed before reading all data")
-            result[offset : offset + len(chunk)] = chunk
-            offset += len(chunk)
-        return bytes(result)
+
+        if not data.endswith(PIPE_RESULT_CHUNK_SUFFIX):
+            raise InvalidPipeMsgContentError("Result chunk is not terminated")
+
+        bracketed = memoryview(data)[
+            len(PIPE_RESULT_CHUNK_PREFIX) - 1 : 1 - len(PIPE_RESULT_CHUNK_SUFFIX)
+        ]
+
+        try:
+            items = codec.loads(bracketed)
+        except ValueError as e:
+            raise InvalidPipeMsgContentError(f"Invalid result chunk: {e}")
+
+        if not items:
+            raise InvalidPipeMsgContentError("Empty result chunk")
+
+        return bracketed[1:-1]
 
     def _validate_pipe_message(self, msg) -> PipeMessage:
         if not isinstance(msg, dict):
@@ -83,3 +196,157 @@ class PipeReader(threading.Thread):
             raise InvalidPipeMsgContentError("'error' must be a dict")
 
         return cast(PipeMessage, msg)
+
+    @staticmethod
+    def _to_frame_length(length_bytes: bytes | bytearray) -> int:
+        length_int = int.from_bytes(length_bytes, "big")
+        if length_int <= 0:
+            raise InvalidPipeMsgLengthError(length_int)
+        return length_int
+
+
+class PipeReader(BasePipeReader, threading.Thread):
+    """Background thread that reads result from pipe."""
+
+    def __init__(self, read_fd: int, read_conn: PipeConnection):
+        BasePipeReader.__init__(self, read_conn)
+        threading.Thread.__init__(self)
+        self.read_fd = read_fd
+
+    def run(self):
+        try:
+            self._open_socket()
+            while not self._handle_frame(self._read_frame()):
+                pass
+        except Exception as e:
+            self.error = e
+        finally:
+            self._close_socket()
+
+    def _read_frame(self) -> bytearray:
+        length_bytes = self._read_exact_bytes(PIPE_MSG_PREFIX_LENGTH)
+        self._mark_transfer_start()
+        self._start_frame(self._to_frame_length(length_bytes))
+        return self._read_exact_bytes(self.frame_length, on_read=self._count_read)
+
+    def _read_exact_bytes(
+        self, n: int, on_read: Callable[[int], None] | None = None
+    ) -> bytearray:
+        """Read exactly n bytes from the pipe.
+
+        Reads the socket directly instead of via Connection.recv() because
+        recv() pickles. Reads into a preallocated bytearray to avoid repeated
+        reallocation, and returns it as is to avoid copying it once more
+        into bytes.
+        """
+        result = bytearray(n)
+        offset = 0
+        with memoryview(result) as view:
+            while offset < n:
+                read = self._recv_into(view[offset:])
+                if not read:
+                    raise EOFError("Pipe closed before reading all data")
+                offset += read
+                if on_read:
+                    on_read(read)
+        return result
+
+
+class AsyncPipeReader(BasePipeReader):
+    """Reads result from pipe on the event loop, without a thread per task.
+
+    Complete frames are handled in a thread of a small shared pool, since
+    that can mean copying a memfd and parsing megabytes of JSON. Reading
+    pauses meanwhile, so frames are handled in order.
+    """
+
+    def __init__(self, read_conn: PipeConnection):
+        super().__init__(read_conn)
+        self.read_fd = read_conn.fileno()
+        self.loop = asyncio.get_running_loop()
+        self.done: asyncio.Future[None] = self.loop.create_future()
+        self._length_bytes = bytearray(PIPE_MSG_PREFIX_LENGTH)
+        self._frame: bytearray | None = None
+        self._offset = 0
+
+    def start(self):
+        self._open_socket().setblocking(False)
+        self.loop.add_reader(self.read_fd, self._on_readable)
+
+    def close(self):
+        if self.read_conn.closed:
+            return
+
+        self.loop.remove_reader(self.read_fd)
+        self._close_socket()
+
+        if not self.done.done():
+            self.done.set_result(None)
+
+    def _on_readable(self):
+        try:
+            # bounded, so one large result does not starve the event loop
+            for _ in range(PIPE_READS_PER_CALLBACK):
+                frame = self._read_available()
+                if frame is not None:
+                    self._handle_off_loop(frame)
+                    return
+        except BlockingIOError:
+            return
+        except Exception as e:
+            self.error = e
+            self.close()
+
+    def _handle_off_loop(self, frame: bytearray) -> None:
+        self.loop.remove_reader(self.read_fd)
+        handled = self.loop.run_in_executor(_frame_handlers, self._handle_frame, frame)
+        handled.add_done_callback(self._on_frame_handled)
+
+    def _on_frame_handled(self, handled: asyncio.Future[bool]) -> None:
+        if self.read_conn.closed:
+            return
+
+        if handled.cancelled():  # the loop is shutting down
+            self.close()
+            return
+
+        try:
+            is_final = handled.result()
+        except Exception as e:
+            self.error = e
+            is_final = True
+
+        if is_final:
+            self.close()
+        else:
+            self.loop.add_reader(self.read_fd, self._on_readable)
+
+    def _read_available(self) -> bytearray | None:
+        """Read once into the current frame. Returns the frame once complete."""
+
+        buffer = self._length_bytes if self._frame is None else self._frame
+
+        with memoryview(buffer) as view:
+            read = self._recv_into(view[self._offset :])
+
+        if read == 0:
+            raise EOFError("Pipe closed before reading all data")
+
+        self._mark_transfer_start()
+
+        if self._frame is not None:
+            self._count_read(read)
+
+        self._offset += read
+        if self._offset < len(buffer):
+            return None
+
+        self._offset = 0
+
+        if self._frame is None:
+            self._start_frame(self._to_frame_length(self._length_bytes))
+            self._frame = bytearray(self.frame_length)
+            return None
+
+        frame, self._frame = self._frame, None
+        return frame
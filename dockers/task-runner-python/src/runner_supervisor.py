@@ -0,0 +1,312 @@
+import asyncio
+import json
+import logging
+import os
+import shutil
+import signal
+import sys
+import tempfile
+import urllib.request
+from dataclasses import dataclass
+
+from src.config.task_runner_config import TaskRunnerConfig
+from src.constants import (
+    ENV_AUTH_TOKEN,
+    ENV_GRACEFUL_SHUTDOWN_TIMEOUT,
+    ENV_GRANT_TOKEN,
+    ENV_HEALTH_CHECK_SERVER_ENABLED,
+    ENV_HEALTH_CHECK_SERVER_SOCKET,
+    ENV_MAX_MEMORY_MB,
+    ENV_RUNNER_PROCESSES,
+    HEALTH_CHECK_METRICS_PATH,
+    HEALTH_CHECK_PROFILES_PATH,
+    HEALTH_CHECK_STATS_PATH,
+    LOG_SUPERVISOR_PROCESS_EXITED,
+    LOG_SUPERVISOR_RESTARTING,
+    LOG_SUPERVISOR_START_FAILED,
+    LOG_SUPERVISOR_STARTED,
+    SUPERVISOR_GRANT_TOKEN_TIMEOUT,
+    SUPERVISOR_RESTART_DELAY,
+    SUPERVISOR_SHUTDOWN_MARGIN,
+    SUPERVISOR_STATS_TIMEOUT,
+    TASK_BROKER_AUTH_PATH,
+)
+from src.metrics import merge_metrics
+
+
+@dataclass
+class RunnerProcess:
+    index: int
+    socket_path: str
+    process: asyncio.subprocess.Process | None = None
+    restarts: int = 0
+
+    @property
+    def is_running(self) -> bool:
+        return self.process is not None and self.process.returncode is None
+
+
+class RunnerSupervisor:
+    """Runs `config.processes` runner processes, so that one container uses all
+    its cores despite each runner's single event loop.
+
+    Each process is a regular runner with its own runner ID, broker connection
+    and grant token, fetched from the broker with the auth token. Their health
+    check servers listen on unix sockets, and the supervisor's own health check
+    server aggregates their stats and metrics. A process that crashes is
+    restarted, one that stops on its idle timeout is not, and the supervisor
+    exits once no process is left.
+    """
+
+    def __init__(self, config: TaskRunnerConfig):
+        self.config = config
+        self.socket_dir = tempfile.mkdtemp(prefix="n8n-runners-")
+        self.runners = [
+            RunnerProcess(index, os.path.join(self.socket_dir, f"runner-{index}.sock"))
+            for index in range(config.processes)
+        ]
+        self.supervise_tasks: list[asyncio.Task] = []
+        self.is_stopping = False
+        self.stopping = asyncio.Event()
+        self.logger = logging.getLogger(__name__)
+
+    async def start(self) -> None:
+        """Run until every process has exited and is not restarted."""
+
+        self.supervise_tasks = [
+            asyncio.create_task(self._supervise(runner)) for runner in self.runners
+        ]
+        await asyncio.gather(*self.supervise_tasks)
+
+    async def stop(self) -> None:
+        """Ask every process to shut down and wait for it, killing any process
+        still running if the wait is cancelled."""
+
+        self.is_stopping = True
+        self.stopping.set()
+
+        for runner in self.runners:
+            self._send_signal(runner, signal.SIGTERM)
+
+        try:
+            await asyncio.gather(*self.supervise_tasks)
+        except asyncio.CancelledError:
+            for runner in self.runners:
+                self._send_signal(runner, signal.SIGKILL)
+            raise
+        finally:
+            shutil.rmtree(self.socket_dir, ignore_errors=True)
+
+    async def get_stats(self) -> dict:
+        responses = await asyncio.gather(
+            *(self._request(runner, HEALTH_CHECK_STATS_PATH) for runner in self.runners)
+        )
+
+        processes = []
+        for runner, response in zip(self.runners, responses):
+            process = runner.process
+            processes.append(
+                {
+                    "index": runner.index,
+                    "pid": process.pid if process else None,
+                    "status": "running" if runner.is_running else "stopped",
+                    "exit_code": process.returncode if process else None,
+                    "restarts": runner.restarts,
+                    "stats": _parse_json(response),
+                }
+            )
+
+        return {
+            "processes": processes,
+            "running_processes": sum(runner.is_running for runner in self.runners),
+            "running_tasks": sum(
+                process["stats"]["running_tasks"]
+                for process in processes
+                if process["stats"]
+            ),
+        }
+
+    async def get_metrics(self) -> str:
+        responses = await asyncio.gather(
+            *(
+                self._request(runner, HEALTH_CHECK_METRICS_PATH)
+                for runner in self.runners
+            )
+        )
+
+        # a starting process answers "OK" until its runner is created
+        return merge_metrics(
+            [
+                (str(runner.index), response.decode("utf-8"))
+                for runner, response in zip(self.runners, responses)
+                if response and response != b"OK"
+            ]
+        )
+
+    async def get_profiles(self) -> list[dict]:
+        """Recent task profiles of all processes, newest first."""
+
+        responses = await asyncio.gather(
+            *(
+                self._request(runner, HEALTH_CHECK_PROFILES_PATH)
+                for runner in self.runners
+            )
+        )
+
+        profiles = [
+            {"process": runner.index, **profile}
+            for runner, response in zip(self.runners, responses)
+            for profile in _parse_json(response) or []
+        ]
+        profiles.sort(key=lambda profile: profile["completed_at"], reverse=True)
+
+        return profiles
+
+    # ========== Processes ==========
+
+    async def _supervise(self, runner: RunnerProcess) -> None:
+        while not self.is_stopping:
+            try:
+                await self._spawn(runner)
+            except Exception as e:
+                self.logger.error(
+                    LOG_SUPERVISOR_START_FAILED.format(
+                        index=runner.index, error=e, delay=SUPERVISOR_RESTART_DELAY
+                    )
+                )
+                await self._wait_before_restart()
+                continue
+
+            if runner.process is None:
+                return  # stopped while spawning
+
+            exit_code = await runner.process.wait()
+
+            # exit code 0 means the runner shut down on its own, e.g. when idle
+            if self.is_stopping or exit_code == 0:
+                self.logger.info(
+                    LOG_SUPERVISOR_PROCESS_EXITED.format(
+                        index=runner.index, exit_code=exit_code
+                    )
+                )
+                return
+
+            self.logger.warning(
+                LOG_SUPERVISOR_RESTARTING.format(
+                    index=runner.index,
+                    exit_code=exit_code,
+                    delay=SUPERVISOR_RESTART_DELAY,
+                )
+            )
+            runner.restarts += 1
+            await self._wait_before_restart()
+
+    async def _spawn(self, runner: RunnerProcess) -> None:
+        grant_token = await asyncio.to_thread(self._fetch_grant_token)
+
+        if self.is_stopping:
+            runner.process = None
+            return
+
+        runner.process = await asyncio.create_subprocess_exec(
+            sys.executable,
+            "-m",
+            "src.main",
+            env=self._runner_env(runner, grant_token),
+        )
+
+        self.logger.info(
+            LOG_SUPERVISOR_STARTED.format(index=runner.index, pid=runner.process.pid)
+        )
+
+        if self.is_stopping:  # stop() did not see this process yet
+            self._send_signal(runner, signal.SIGTERM)
+
+    def _runner_env(self, runner: RunnerProcess, grant_token: str) -> dict[str, str]:
+        env = os.environ.copy()
+        env.pop(ENV_AUTH_TOKEN, None)
+        env[ENV_RUNNER_PROCESSES] = "1"
+        env[ENV_GRANT_TOKEN] = grant_token
+        env[ENV_HEALTH_CHECK_SERVER_ENABLED] = "true"
+        env[ENV_HEALTH_CHECK_SERVER_SOCKET] = runner.socket_path
+
+        # stop ahead of the supervisor, so it is not killed mid-shutdown
+        env[ENV_GRACEFUL_SHUTDOWN_TIMEOUT] = str(
+            max(1, self.config.graceful_shutdown_timeout - SUPERVISOR_SHUTDOWN_MARGIN)
+        )
+
+        # the memory budget is for the container, so each process gets its share
+        if self.config.max_memory_mb > 0:
+            env[ENV_MAX_MEMORY_MB] = str(
+                max(1, self.config.max_memory_mb // self.config.processes)
+            )
+
+        return env
+
+    def _fetch_grant_token(self) -> str:
+        request = urllib.request.Request(
+            f"{self.config.task_broker_uri}{TASK_BROKER_AUTH_PATH}",
+            data=json.dumps({"token": self.config.auth_token}).encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+
+        with urllib.request.urlopen(
+            request, timeout=SUPERVISOR_GRANT_TOKEN_TIMEOUT
+        ) as response:
+            return json.loads(response.read())["data"]["token"]
+
+    async def _wait_before_restart(self) -> None:
+        try:
+            await asyncio.wait_for(
+                self.stopping.wait(), timeout=SUPERVISOR_RESTART_DELAY
+            )
+        except asyncio.TimeoutError:
+            pass
+
+    def _send_signal(self, runner: RunnerProcess, sig: signal.Signals) -> None:
+        if not runner.is_running:
+            return
+
+        assert runner.process is not None
+        try:
+            runner.process.send_signal(sig)
+        except ProcessLookupError:
+            pass
+
+    # ========== Health check ==========
+
+    async def _request(self, runner: RunnerProcess, path: str) -> bytes | None:
+        """Body of a GET to the runner's health check server, or None if the
+        runner is not serving."""
+
+        if not runner.is_running:
+            return None
+
+        try:
+            response = await asyncio.wait_for(
+                self._get(runner.socket_path, path), timeout=SUPERVISOR_STATS_TIMEOUT
+            )
+        except (OSError, asyncio.TimeoutError):
+            return None
+
+        _, _, body = response.partition(b"\r\n\r\n")
+        return body
+
+    async def _get(self, socket_path: str, path: str) -> bytes:
+        reader, writer = await asyncio.open_unix_connection(socket_path)
+        try:
+            writer.write(f"GET {path} HTTP/1.1\r\n\r\n".encode("latin-1"))
+            await writer.drain()
+            return await reader.read()
+        finally:
+            writer.close()
+
+
+def _parse_json(response: bytes | None):
+    """A starting process answers "OK" until its runner is created."""
+
+    if not response or response == b"OK":
+        return None
+
+    return json.loads(response)
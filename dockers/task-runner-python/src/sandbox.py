@@ -0,0 +1,187 @@
+import builtins
+import json
+import os
+import sys
+from collections.abc import Callable
+from dataclasses import dataclass, replace
+from typing import Any
+
+from src.config.security_config import SecurityConfig
+from src.constants import ENV_SANDBOX_WARM_UP
+from src.errors import SecurityViolationError
+from src.import_validation import validate_module_import
+
+# kept in every task process regardless of allowlists
+ALWAYS_SAFE_MODULES = frozenset(
+    {
+        "builtins",
+        "__main__",
+        "sys",
+        "traceback",
+        "linecache",
+        "importlib",
+        "importlib.machinery",
+    }
+)
+
+TemplateKey = tuple[frozenset[str], frozenset[str], frozenset[str]]
+
+
+@dataclass(frozen=True)
+class SandboxTemplate:
+    """What a task process removes from `sys.modules` and the builtins it
+    starts from, computed once per allowlist and builtins denylist.
+
+    Built in the forkserver, a template splits the modules loaded there into
+    kept and removed, so a task process only deletes the removed ones and
+    checks the modules it imported itself. Whether a module is safe is looked
+    up per dotted prefix, e.g. `os`, `os.path`, instead of comparing it to
+    every allowed prefix.
+    """
+
+    safe_modules: frozenset[str]
+    allow_all_external: bool
+    known_modules: frozenset[str]  # in sys.modules when the template was built
+    removed_modules: tuple[str, ...]  # of the known modules, those not safe
+    builtins: dict[str, Any]
+
+    @classmethod
+    def build(cls, security_config: SecurityConfig) -> "SandboxTemplate":
+        safe_modules = set(ALWAYS_SAFE_MODULES)
+
+        if "*" in security_config.stdlib_allow:
+            safe_modules.update(sys.stdlib_module_names)
+        else:
+            safe_modules.update(security_config.stdlib_allow)
+
+        allow_all_external = "*" in security_config.external_allow
+        if not allow_all_external:
+            safe_modules.update(security_config.external_allow)
+
+        template = cls(
+            safe_modules=frozenset(safe_modules),
+            allow_all_external=allow_all_external,
+            known_modules=frozenset(sys.modules),
+            removed_modules=(),
+            builtins=_filter_builtins(security_config),
+        )
+
+        return replace(
+            template,
+            removed_modules=tuple(
+                name for name in template.known_modules if not template.is_safe(name)
+            ),
+        )
+
+    def is_safe(self, module_name: str) -> bool:
+        """Whether the module, or a package it is in, is allowed."""
+
+        if module_name in self.safe_modules:
+            return True
+
+        # with external wildcard, everything not in the stdlib is external
+        if self.allow_all_external and module_name not in sys.stdlib_module_names:
+            return True
+
+        dot = module_name.find(".")
+        while dot != -1:
+            if module_name[:dot] in self.safe_modules:
+                return True
+            dot = module_name.find(".", dot + 1)
+
+        return False
+
+    def sanitize_sys_modules(self) -> None:
+        for module_name in self.removed_modules:
+            sys.modules.pop(module_name, None)
+
+        for module_name in sys.modules.keys() - self.known_modules:
+            if not self.is_safe(module_name):
+                del sys.modules[module_name]
+
+    def create_builtins(self) -> dict[str, Any]:
+        """A copy, so that a task changing its builtins leaves the template as is."""
+
+        return dict(self.builtins)
+
+
+_templates: dict[TemplateKey, SandboxTemplate] = {}
+
+
+def get_template(security_config: SecurityConfig) -> SandboxTemplate:
+    key = _to_template_key(security_config)
+
+    template = _templates.get(key)
+    if template is None:
+        template = _templates[key] = SandboxTemplate.build(security_config)
+
+    return template
+
+
+def warm_up_env(security_config: SecurityConfig) -> dict[str, str]:
+    """Env that makes `warm_up_from_env` build the template for this config."""
+
+    return {
+        ENV_SANDBOX_WARM_UP: json.dumps(
+            [sorted(allowlist) for allowlist in _to_template_key(security_config)]
+        )
+    }
+
+
+def warm_up_from_env() -> None:
+    """Build the template described in the env, if any. Runs in the forkserver
+    after it imported the preloaded modules, so that task processes fork with
+    it and with those modules already sorted into kept and removed."""
+
+    value = os.environ.pop(ENV_SANDBOX_WARM_UP, None)
+    if not value:
+        return
+
+    stdlib_allow, external_allow, builtins_deny = json.loads(value)
+    get_template(
+        SecurityConfig(
+            stdlib_allow=set(stdlib_allow),
+            external_allow=set(external_allow),
+            builtins_deny=set(builtins_deny),
+            runner_env_deny=False,  # not part of the template
+        )
+    )
+
+
+def _to_template_key(security_config: SecurityConfig) -> TemplateKey:
+    return (
+        frozenset(security_config.stdlib_allow),
+        frozenset(security_config.external_allow),
+        frozenset(security_config.builtins_deny),
+    )
+
+
+def _filter_builtins(security_config: SecurityConfig) -> dict[str, Any]:
+    """`__builtins__` with denied ones removed and a safe `__import__`."""
+
+    filtered = {
+        k: v
+        for k, v in vars(builtins).items()
+        if k not in security_config.builtins_deny
+    }
+    filtered["__import__"] = _create_safe_import(security_config, builtins.__import__)
+
+    return filtered
+
+
+def _create_safe_import(
+    security_config: SecurityConfig, original_import: Callable
+) -> Callable:
+    def safe_import(name, *args, **kwargs):
+        is_allowed, error_msg = validate_module_import(name, security_config)
+
+        if not is_allowed:
+            assert error_msg is not None
+            raise SecurityViolationError(
+                message="Security violation detected",
+                description=error_msg,
+            )
+
+        return original_import(name, *args, **kwargs)
+
+    return safe_import
@@ -0,0 +1,144 @@
+import fcntl
+import mmap
+import os
+import pickle
+import stat
+from dataclasses import dataclass
+from multiprocessing import reduction
+
+from src.constants import (
+    SHARED_MEMORY_ITEMS_NAME,
+    SHARED_MEMORY_MIN_SIZE,
+    SHARED_MEMORY_RESULT_NAME,
+)
+from src.errors import InvalidPipeMsgContentError
+from src.message_types.broker import Items
+
+# no resizing or writing once sealed, so a reader can map the file safely
+_SEALS = (
+    fcntl.F_SEAL_SHRINK | fcntl.F_SEAL_GROW | fcntl.F_SEAL_WRITE | fcntl.F_SEAL_SEAL
+)
+
+
+@dataclass
+class SharedItems:
+    """Handle to pickled task items in a memfd, passed instead of the items.
+
+    Pickled for a subprocess, the fd is duplicated into it by the forkserver.
+    """
+
+    fd: int
+    size: int  # bytes
+
+    def __reduce__(self):
+        return _rebuild_items, (reduction.DupFd(self.fd), self.size)
+
+
+def _rebuild_items(dup_fd, size: int) -> SharedItems:
+    return SharedItems(fd=dup_fd.detach(), size=size)
+
+
+def share_items(items: Items) -> Items | SharedItems:
+    """Return a memfd handle for large items, else the items themselves.
+
+    Large items are pickled once into an anonymous, sealed memory file that
+    the subprocess unpickles in place, instead of being pickled into the
+    process args and copied through the forkserver socket. Only processes
+    the fd is passed to can read it. Pass the return value to
+    `release_items` once the subprocess is done.
+    """
+
+    data = pickle.dumps(items, protocol=pickle.HIGHEST_PROTOCOL)
+
+    if len(data) < SHARED_MEMORY_MIN_SIZE:
+        return items
+
+    fd = _create(SHARED_MEMORY_ITEMS_NAME, data, seal=True)
+    if fd is None:
+        return items
+
+    return SharedItems(fd=fd, size=len(data))
+
+
+def release_items(items: Items | SharedItems) -> None:
+    """Close the runner's fd. The memory is freed once no process holds one."""
+
+    if isinstance(items, SharedItems):
+        os.close(items.fd)
+
+
+def load_items(items: Items | SharedItems) -> Items:
+    """Unpickle items in a subprocess. The caller owns the fd."""
+
+    if not isinstance(items, SharedItems):
+        return items
+
+    with mmap.mmap(items.fd, items.size, access=mmap.ACCESS_READ) as buffer:
+        return pickle.loads(buffer)
+
+
+def put_result(data: bytes) -> int | None:
+    """Write an encoded result to a memfd, to send to the reader with the frame.
+
+    Returns None if the result is small or memory cannot be reserved for it,
+    so it goes through the pipe instead. The caller closes the fd once sent.
+    """
+
+    if len(data) < SHARED_MEMORY_MIN_SIZE:
+        return None
+
+    return _create(SHARED_MEMORY_RESULT_NAME, data, seal=False)
+
+
+def read_result(fd: int, size: int) -> bytearray:
+    """Copy an encoded result out of a memfd received from a subprocess, and close it.
+
+    Read with `preadv` instead of mapped, because the subprocess may still
+    hold the fd and could truncate the file while it is read.
+    """
+
+    try:
+        if not stat.S_ISREG(os.fstat(fd).st_mode):
+            raise InvalidPipeMsgContentError("Result handle is not a memory file")
+
+        data = bytearray(size)
+        offset = 0
+        with memoryview(data) as view:
+            while offset < size:
+                read = os.preadv(fd, [view[offset:]], offset)
+                if read == 0:
+                    raise InvalidPipeMsgContentError(
+                        f"Result memory file ended after {offset} of {size} bytes"
+                    )
+                offset += read
+
+        return data
+    finally:
+        os.close(fd)
+
+
+def _create(name: str, data: bytes, seal: bool) -> int | None:
+    """Write data to a new memfd, or return None if its memory is unavailable.
+
+    The memory is reserved before writing, so a shortage surfaces as an
+    error here rather than as SIGBUS on a page fault.
+    """
+
+    flags = os.MFD_CLOEXEC | (os.MFD_ALLOW_SEALING if seal else 0)
+    fd = os.memfd_create(name, flags)
+
+    try:
+        os.posix_fallocate(fd, 0, len(data))
+
+        view = memoryview(data)
+        offset = 0
+        while offset < len(data):
+            offset += os.pwrite(fd, view[offset:], offset)
+
+        if seal:
+            fcntl.fcntl(fd, fcntl.F_ADD_SEALS, _SEALS)
+    except OSError:
+        os.close(fd)
+        return None
+
+    return fd
@@ -5,16 +5,18 @@ from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
     from src.task_runner import TaskRunner
+    from src.runner_supervisor import RunnerSupervisor
     from src.health_check_server import HealthCheckServer
     from src.sentry import TaskRunnerSentry
 
 
 class Shutdown:
-    """Responsible for managing the shutdown routine of the task runner."""
+    """Responsible for managing the shutdown routine of the task runner, or of
+    the supervisor running several runner processes."""
 
     def __init__(
         self,
-        task_runner: "TaskRunner",
+        task_runner: "TaskRunner | RunnerSupervisor",
         health_check_server: "HealthCheckServer | None" = None,
         sentry: "TaskRunnerSentry | None" = None,
     ):
@@ -1,12 +1,22 @@
 import ast
+import asyncio
 import hashlib
+import json
+import os
+import stat
+import sys
+import threading
 from collections import OrderedDict
+from functools import cache
+from pathlib import Path
 
+from src import constants, import_validation
 from src.errors import SecurityViolationError
 from src.import_validation import validate_module_import
 from src.config.security_config import SecurityConfig
 from src.constants import (
     MAX_VALIDATION_CACHE_SIZE,
+    VALIDATION_CACHE_FORMAT_VERSION,
     ERROR_RELATIVE_IMPORT,
     ERROR_DANGEROUS_NAME,
     ERROR_DANGEROUS_ATTRIBUTE,
@@ -156,7 +166,16 @@ class SecurityValidator(ast.NodeVisitor):
 
 
 class TaskAnalyzer:
+    """Validates task code, caching results by code hash and allowlists.
+
+    The cache is an LRU shared by all analyzers and guarded by a lock, since
+    uncached code is validated on a worker thread. It can be saved to and
+    loaded from a file, so a runner restarted after an auto-shutdown does not
+    parse every workflow's code again.
+    """
+
     _cache: ValidationCache = OrderedDict()
+    _cache_lock = threading.Lock()
 
     def __init__(self, security_config: SecurityConfig):
         self._security_config = security_config
@@ -168,23 +187,127 @@ class TaskAnalyzer:
             "*" in security_config.stdlib_allow
             and "*" in security_config.external_allow
         )
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
 
     def validate(self, code: str) -> None:
         if self._allow_all:
             return
 
         cache_key = self._to_cache_key(code)
-        cached_violations = self._cache.get(cache_key)
-        cache_hit = cached_violations is not None
 
-        if cache_hit:
-            self._cache.move_to_end(cache_key)
+        if not self._check_cache(cache_key):
+            self._validate_uncached(code, cache_key)
+
+    async def validate_off_loop(self, code: str) -> None:
+        """Like `validate`, but parses uncached code on a worker thread, so that
+        large code does not block the event loop. Cache hits stay on the loop."""
+
+        if self._allow_all:
+            return
+
+        cache_key = self._to_cache_key(code)
+
+        if not self._check_cache(cache_key):
+            await asyncio.to_thread(self._validate_uncached, code, cache_key)
+
+    # ========== Persistence ==========
+
+    def load_cache(self, path: str) -> int:
+        """Load results saved by `save_cache` and return how many were loaded.
+
+        A missing file, a file saved by a different validator or Python
+        version, or a file that other users can write to, loads nothing.
+        """
+
+        file_path = Path(path)
+
+        try:
+            file_stat = file_path.stat()
+        except FileNotFoundError:
+            return 0
 
-            if len(cached_violations) == 0:
-                return
+        if file_stat.st_uid != os.getuid() or file_stat.st_mode & (
+            stat.S_IWGRP | stat.S_IWOTH
+        ):
+            raise PermissionError(f"{path} must be owned and only writable by us")
+
+        saved = json.loads(file_path.read_text(encoding="utf-8"))
+
+        if saved.get("fingerprint") != _validator_fingerprint():
+            return 0
+
+        entries = [
+            ((code_hash, (tuple(stdlib_allow), tuple(external_allow))), violations)
+            for code_hash, stdlib_allow, external_allow, violations in saved["entries"]
+        ]
+
+        with self._cache_lock:
+            # saved oldest first, keep entries validated since start most recent
+            entries = entries[-MAX_VALIDATION_CACHE_SIZE:]
+            loaded = OrderedDict(entries)
+            for cache_key, violations in self._cache.items():
+                loaded[cache_key] = violations
+                loaded.move_to_end(cache_key)
+            while len(loaded) > MAX_VALIDATION_CACHE_SIZE:
+                loaded.popitem(last=False)
+            self._cache.clear()
+            self._cache.update(loaded)
+
+        return len(entries)
+
+    def save_cache(self, path: str) -> int:
+        """Atomically write the cache to `path` and return how many results were saved."""
+
+        with self._cache_lock:
+            entries = [
+                [code_hash, list(stdlib_allow), list(external_allow), violations]
+                for (code_hash, (stdlib_allow, external_allow)), violations in (
+                    self._cache.items()
+                )
+            ]
+
+        data = json.dumps({"fingerprint": _validator_fingerprint(), "entries": entries})
+
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            Path(tmp_path).unlink(missing_ok=True)
+            raise
+
+        return len(entries)
+
+    # ========== Cache ==========
+
+    def _check_cache(self, cache_key: CacheKey) -> bool:
+        """Return whether a result is cached, raising if it has violations."""
+
+        with self._cache_lock:
+            cached_violations = self._cache.get(cache_key)
+            if cached_violations is not None:
+                self._cache.move_to_end(cache_key)
 
+        if cached_violations is None:
+            self.misses += 1
+            return False
+
+        self.hits += 1
+
+        if cached_violations:
             self._raise_security_error(cached_violations)
 
+        return True
+
+    def _validate_uncached(self, code: str, cache_key: CacheKey) -> None:
         tree = ast.parse(code)
 
         security_validator = SecurityValidator(self._security_config)
@@ -205,8 +328,21 @@ class TaskAnalyzer:
         return (code_hash, self._allowlists)
 
     def _set_in_cache(self, cache_key: CacheKey, violations: CachedViolations) -> None:
-        if len(self._cache) >= MAX_VALIDATION_CACHE_SIZE:
-            self._cache.popitem(last=False)  # FIFO
+        with self._cache_lock:
+            self._cache[cache_key] = violations.copy()
+            self._cache.move_to_end(cache_key)
+
+            if len(self._cache) > MAX_VALIDATION_CACHE_SIZE:
+                self._cache.popitem(last=False)  # least recently used
+
+
+@cache
+def _validator_fingerprint() -> str:
+    """Changes whenever validation results could, so saved results are not
+    trusted across runner upgrades."""
+
+    digest = hashlib.sha256(f"{VALIDATION_CACHE_FORMAT_VERSION}{sys.version}".encode())
+    for file in (__file__, import_validation.__file__, constants.__file__):
+        digest.update(Path(file).read_bytes())
 
-        self._cache[cache_key] = violations.copy()
-        self._cache.move_to_end(cache_key)
+    return digest.hexdigest()
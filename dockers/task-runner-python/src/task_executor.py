@@ -1,3 +1,5 @@
+import asyncio
+import marshal
 import multiprocessing
 import traceback
 import textwrap
@@ -6,36 +8,55 @@ import io
 import os
 import sys
 import logging
+import resource
+import socket
+import time
+import types
+from typing import NamedTuple
 
 from src.errors import (
     TaskCancelledError,
+    TaskCpuLimitError,
     TaskKilledError,
     TaskResultMissingError,
     TaskResultReadError,
     TaskRuntimeError,
     TaskTimeoutError,
     TaskSubprocessFailedError,
-    SecurityViolationError,
 )
-from src.import_validation import validate_module_import
 from src.config.security_config import SecurityConfig
 
 from src.message_types.broker import NodeMode, Items, Query
 from src.message_types.pipe import (
+    EncodedItems,
+    PipeMessage,
     PipeResultMessage,
     PipeErrorMessage,
+    PipeSharedMemoryMessage,
     TaskErrorInfo,
     PrintArgs,
+    TaskProfile,
 )
-from src.pipe_reader import PipeReader
+from src.pipe_reader import AsyncPipeReader, BasePipeReader, PipeReader
+from src import sandbox, shared_payload
+from src.json_codec import codec
+from src.shared_payload import SharedItems
+from src.task_profiler import TaskProfiler, merge_profiles
 from src.constants import (
     EXECUTOR_CIRCULAR_REFERENCE_KEY,
     EXECUTOR_USER_OUTPUT_KEY,
+    EXECUTOR_USER_FUNCTION_NAME,
     EXECUTOR_ALL_ITEMS_FILENAME,
     EXECUTOR_PER_ITEM_FILENAME,
     SIGTERM_EXIT_CODE,
     SIGKILL_EXIT_CODE,
+    SIGXCPU_EXIT_CODE,
+    TASK_CPU_HARD_LIMIT_GRACE_SECONDS,
     PIPE_MSG_PREFIX_LENGTH,
+    PIPE_RESULT_CHUNK_PREFIX,
+    PIPE_RESULT_CHUNK_SIZE,
+    PIPE_RESULT_CHUNK_SUFFIX,
+    PIPE_RESULT_ENCODE_BATCH,
     LOG_PIPE_READER_TIMEOUT_TRIGGERED,
 )
 
@@ -50,6 +71,21 @@ MAX_PRINT_ARGS_ALLOWED = 100
 type PipeConnection = Connection
 
 
+class TaskTimings(NamedTuple):
+    spawn_seconds: float | None = None  # starting the subprocess
+    exec_seconds: float | None = None  # running user code in the subprocess
+    transfer_seconds: float | None = None  # reading the result from the pipe
+
+
+class TaskOutput(NamedTuple):
+    result: Items | EncodedItems
+    print_args: PrintArgs
+    result_size_bytes: int
+    peak_rss_bytes: int | None  # of the subprocess that ran the task
+    timings: TaskTimings = TaskTimings()
+    profile: TaskProfile | None = None  # if profiling was enabled for the task
+
+
 class TaskExecutor:
     """Responsible for executing Python code tasks in isolated subprocesses."""
 
@@ -57,11 +93,19 @@ class TaskExecutor:
     def create_process(
         code: str,
         node_mode: NodeMode,
-        items: Items,
+        items: Items | SharedItems,
         security_config: SecurityConfig,
         query: Query = None,
+        bytecode: bytes | None = None,
+        profile_top: int = 0,
+        first_index: int = 0,
     ) -> tuple[ForkServerProcess, PipeConnection, PipeConnection]:
-        """Create a subprocess for executing a Python code task and a pipe for communication."""
+        """Create a subprocess for executing a Python code task and a pipe for communication.
+
+        With `profile_top` above 0, user code is profiled and the result
+        carries that many of its top functions. `first_index` is the index
+        of `items[0]` in the task, for a per-item chunk.
+        """
 
         fn = (
             TaskExecutor._all_items
@@ -69,8 +113,12 @@ class TaskExecutor:
             else TaskExecutor._per_item
         )
 
-        # thread in runner process reads, subprocess writes
-        read_conn, write_conn = MULTIPROCESSING_CONTEXT.Pipe(duplex=False)
+        kwargs = {"profile_top": profile_top}
+        if first_index:
+            kwargs["first_index"] = first_index
+
+        # runner reads, subprocess writes, over a socket pair to pass memfds
+        read_conn, write_conn = MULTIPROCESSING_CONTEXT.Pipe()
 
         process = MULTIPROCESSING_CONTEXT.Process(
             target=fn,
@@ -80,7 +128,9 @@ class TaskExecutor:
                 write_conn,
                 security_config,
                 query,
+                bytecode,
             ),
+            kwargs=kwargs,
         )
 
         return process, read_conn, write_conn
@@ -93,7 +143,7 @@ class TaskExecutor:
         task_timeout: int,
         pipe_reader_timeout: float,
         continue_on_fail: bool,
-    ) -> tuple[Items, PrintArgs, int]:
+    ) -> TaskOutput:
         """Execute a subprocess for a Python code task."""
 
         print_args: PrintArgs = []
@@ -103,7 +153,9 @@ class TaskExecutor:
 
         try:
             try:
+                spawned_at = time.perf_counter()
                 process.start()
+                spawn_seconds = time.perf_counter() - spawned_at
             except Exception as e:
                 raise TaskSubprocessFailedError(-1, e)
             finally:
@@ -115,55 +167,275 @@ class TaskExecutor:
                 TaskExecutor.stop_process(process)
                 raise TaskTimeoutError(task_timeout)
 
-            if process.exitcode == SIGTERM_EXIT_CODE:
-                raise TaskCancelledError()
+            assert process.exitcode is not None
+            TaskExecutor._raise_for_exit_code(process.exitcode)
 
-            if process.exitcode == SIGKILL_EXIT_CODE:
-                raise TaskKilledError()
+            return TaskExecutor._read_result(
+                pipe_reader, read_conn, pipe_reader_timeout, spawn_seconds
+            )
 
-            if process.exitcode != 0:
-                assert process.exitcode is not None
-                raise TaskSubprocessFailedError(process.exitcode)
+        except Exception as e:
+            if continue_on_fail:
+                return TaskOutput([{"json": {"error": str(e)}}], print_args, 0, None)
+            raise
 
-            pipe_reader.join(timeout=pipe_reader_timeout)
+    @staticmethod
+    async def supervise_process(
+        process: ForkServerProcess,
+        read_conn: PipeConnection,
+        write_conn: PipeConnection,
+        task_timeout: int,
+        pipe_reader_timeout: float,
+        continue_on_fail: bool,
+    ) -> TaskOutput:
+        """Execute a subprocess for a Python code task on the event loop.
 
-            if pipe_reader.is_alive():
-                logger.warning(
-                    LOG_PIPE_READER_TIMEOUT_TRIGGERED.format(
-                        timeout=pipe_reader_timeout
-                    )
-                )
-                try:
-                    read_conn.close()
-                except Exception:
-                    pass
+        Same as `execute_process`, but without a thread blocked per running
+        task: the pipe is read via `loop.add_reader`, and the exit is awaited
+        on the process sentinel, which the forkserver writes the exit code to
+        once the subprocess is reaped.
+        """
 
-            if pipe_reader.error:
-                raise TaskResultReadError(pipe_reader.error)
+        loop = asyncio.get_running_loop()
+        pipe_reader = AsyncPipeReader(read_conn)
+        pipe_reader.start()
 
-            if pipe_reader.pipe_message is None:
-                raise TaskResultMissingError()
+        try:
+            try:
+                spawned_at = time.perf_counter()
+                await asyncio.to_thread(process.start)
+                spawn_seconds = time.perf_counter() - spawned_at
+            except Exception as e:
+                raise TaskSubprocessFailedError(-1, e)
+            finally:
+                write_conn.close()
 
-            returned = pipe_reader.pipe_message
+            exited = loop.create_future()
+            loop.add_reader(
+                process.sentinel,
+                lambda: exited.done() or exited.set_result(None),
+            )
 
-            if "error" in returned:
-                raise TaskRuntimeError(returned["error"])
+            try:
+                await asyncio.wait_for(exited, task_timeout)
+            except TimeoutError:
+                await asyncio.to_thread(TaskExecutor.stop_process, process)
+                raise TaskTimeoutError(task_timeout)
+            finally:
+                loop.remove_reader(process.sentinel)
 
-            if "result" not in returned:
-                raise TaskResultMissingError()
+            process.join(timeout=0)
+            assert process.exitcode is not None
+            TaskExecutor._raise_for_exit_code(process.exitcode)
 
-            result = returned["result"]
-            print_args = returned.get("print_args", [])
-            assert pipe_reader.message_size is not None
-            result_size_bytes = pipe_reader.message_size
+            # the deadline restarts for as long as the reader makes progress
+            while True:
+                bytes_read = pipe_reader.bytes_read
+                timeout = pipe_reader.finish_timeout(pipe_reader_timeout)
+                try:
+                    await asyncio.wait_for(asyncio.shield(pipe_reader.done), timeout)
+                    break
+                except TimeoutError:
+                    if pipe_reader.bytes_read == bytes_read:
+                        TaskExecutor._log_pipe_reader_timeout(pipe_reader, timeout)
+                        break
 
-            return result, print_args, result_size_bytes
+            return TaskExecutor._unpack_result(pipe_reader, spawn_seconds)
 
         except Exception as e:
             if continue_on_fail:
-                return [{"json": {"error": str(e)}}], print_args, 0
+                return TaskOutput([{"json": {"error": str(e)}}], [], 0, None)
             raise
 
+        finally:
+            pipe_reader.close()
+
+    @staticmethod
+    def split_items(items: Items, chunk_count: int) -> list[tuple[int, Items]]:
+        """Split per-item items into contiguous chunks, with the index of their first item."""
+
+        chunk_size = -(-len(items) // chunk_count)  # ceil
+
+        return [
+            (first_index, items[first_index : first_index + chunk_size])
+            for first_index in range(0, len(items), chunk_size)
+        ]
+
+    @staticmethod
+    async def supervise_chunk_processes(
+        chunks: list[tuple[ForkServerProcess, PipeConnection, PipeConnection]],
+        task_timeout: int,
+        pipe_reader_timeout: float,
+        continue_on_fail: bool,
+    ) -> TaskOutput:
+        """Supervise chunk subprocesses concurrently and merge their results in order.
+
+        The first failing chunk stops the others. When several chunks have
+        failed by then, the error of the earliest chunk is reported.
+        """
+
+        tasks = [
+            asyncio.create_task(
+                TaskExecutor.supervise_process(
+                    process,
+                    read_conn,
+                    write_conn,
+                    task_timeout,
+                    pipe_reader_timeout,
+                    False,
+                )
+            )
+            for process, read_conn, write_conn in chunks
+        ]
+
+        try:
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+            failed = [t for t in tasks if t in done and t.exception()]
+
+            if failed:
+                await asyncio.gather(
+                    *(
+                        asyncio.to_thread(TaskExecutor.stop_process, process)
+                        for process, _, _ in chunks
+                    )
+                )
+                # let the stopped chunks close their pipe readers
+                await asyncio.gather(*tasks, return_exceptions=True)
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        if failed:
+            error = failed[0].exception()
+            assert error is not None
+            if continue_on_fail:
+                return TaskOutput([{"json": {"error": str(error)}}], [], 0, None)
+            raise error
+
+        outputs = [task.result() for task in tasks]
+        print_args = [args for output in outputs for args in output.print_args]
+        peak_rss = [output.peak_rss_bytes or 0 for output in outputs]
+
+        return TaskOutput(
+            result=TaskExecutor._merge_results([output.result for output in outputs]),
+            print_args=TaskExecutor._truncate_print_args(print_args),
+            result_size_bytes=sum(output.result_size_bytes for output in outputs),
+            peak_rss_bytes=max(peak_rss) or None,
+            # chunks run in parallel, so a phase takes as long as its slowest chunk
+            timings=TaskTimings(
+                *(
+                    max((t for t in phase if t is not None), default=None)
+                    for phase in zip(*(output.timings for output in outputs))
+                )
+            ),
+            profile=merge_profiles([output.profile for output in outputs]),
+        )
+
+    @staticmethod
+    def _merge_results(results: list[Items | EncodedItems]) -> Items | EncodedItems:
+        if all(isinstance(result, list) for result in results):
+            return [item for result in results for item in result]  # type: ignore[union-attr]
+
+        merged = EncodedItems()
+        for result in results:
+            if isinstance(result, EncodedItems):
+                merged.chunks.extend(result.chunks)
+            elif result:
+                merged.chunks.append(codec.dumps(result)[1:-1])
+
+        return merged
+
+    @staticmethod
+    def _raise_for_exit_code(exitcode: int):
+        if exitcode == SIGTERM_EXIT_CODE:
+            raise TaskCancelledError()
+
+        if exitcode == SIGKILL_EXIT_CODE:
+            raise TaskKilledError()
+
+        if exitcode == SIGXCPU_EXIT_CODE:
+            raise TaskCpuLimitError()
+
+        if exitcode != 0:
+            raise TaskSubprocessFailedError(exitcode)
+
+    @staticmethod
+    def _read_result(
+        pipe_reader: PipeReader,
+        read_conn: PipeConnection,
+        pipe_reader_timeout: float,
+        spawn_seconds: float | None = None,
+    ) -> TaskOutput:
+        """Wait for the pipe reader and unpack the result message it read."""
+
+        # the deadline restarts for as long as the reader makes progress
+        while True:
+            bytes_read = pipe_reader.bytes_read
+            timeout = pipe_reader.finish_timeout(pipe_reader_timeout)
+            pipe_reader.join(timeout=timeout)
+
+            if not pipe_reader.is_alive():
+                break
+
+            if pipe_reader.bytes_read == bytes_read:
+                TaskExecutor._log_pipe_reader_timeout(pipe_reader, timeout)
+                try:
+                    read_conn.close()
+                except Exception:
+                    pass
+                break
+
+        return TaskExecutor._unpack_result(pipe_reader, spawn_seconds)
+
+    @staticmethod
+    def _log_pipe_reader_timeout(pipe_reader: BasePipeReader, timeout: float):
+        logger.warning(
+            LOG_PIPE_READER_TIMEOUT_TRIGGERED.format(
+                timeout=f"{timeout:.1f}",
+                unread=pipe_reader.frame_length - pipe_reader.frame_bytes_read,
+                length=pipe_reader.frame_length,
+            )
+        )
+
+    @staticmethod
+    def _unpack_result(
+        pipe_reader: BasePipeReader, spawn_seconds: float | None = None
+    ) -> TaskOutput:
+        """Unpack the result message a pipe reader read, or raise its error."""
+
+        if pipe_reader.error:
+            raise TaskResultReadError(pipe_reader.error)
+
+        if pipe_reader.pipe_message is None:
+            raise TaskResultMissingError()
+
+        returned = pipe_reader.pipe_message
+
+        if "error" in returned:
+            raise TaskRuntimeError(returned["error"])
+
+        if "result" not in returned:
+            raise TaskResultMissingError()
+
+        result = returned["result"]
+        if pipe_reader.result_chunks:
+            result = EncodedItems(chunks=pipe_reader.result_chunks)
+        print_args = returned.get("print_args", [])
+        assert pipe_reader.message_size is not None
+
+        return TaskOutput(
+            result=result,
+            print_args=print_args,
+            result_size_bytes=pipe_reader.message_size,
+            peak_rss_bytes=returned.get("peak_rss"),
+            timings=TaskTimings(
+                spawn_seconds=spawn_seconds,
+                exec_seconds=returned.get("exec_seconds"),
+                transfer_seconds=pipe_reader.transfer_seconds,
+            ),
+            profile=returned.get("profile"),
+        )
+
     @staticmethod
     def stop_process(process: ForkServerProcess | None):
         """Stop a running subprocess, gracefully else force-killing."""
@@ -185,10 +457,13 @@ class TaskExecutor:
     @staticmethod
     def _all_items(
         raw_code: str,
-        items: Items,
+        items: Items | SharedItems,
         write_conn,
         security_config: SecurityConfig,
         query: Query = None,
+        bytecode: bytes | None = None,
+        profile_top: int = 0,
+        in_worker: bool = False,
     ):
         """Execute a Python code task in all-items mode."""
 
@@ -196,13 +471,14 @@ class TaskExecutor:
             os.environ.clear()
 
         TaskExecutor._sanitize_sys_modules(security_config)
+        TaskExecutor._apply_resource_limits(security_config, in_worker)
 
         print_args: PrintArgs = []
         sys.stderr = stderr_capture = io.StringIO()
 
         try:
-            wrapped_code = TaskExecutor._wrap_code(raw_code)
-            compiled_code = compile(wrapped_code, EXECUTOR_ALL_ITEMS_FILENAME, "exec")
+            items = shared_payload.load_items(items)
+            compiled_code = TaskExecutor._load_code(raw_code, bytecode, "all_items")
 
             globals = {
                 "__builtins__": TaskExecutor._filter_builtins(security_config),
@@ -211,10 +487,20 @@ class TaskExecutor:
                 "print": TaskExecutor._create_custom_print(print_args),
             }
 
-            exec(compiled_code, globals)
+            profiler = TaskProfiler(profile_top)
+            started_at = time.perf_counter()
+            with profiler:
+                exec(compiled_code, globals)
+            exec_seconds = time.perf_counter() - started_at
 
             result = globals[EXECUTOR_USER_OUTPUT_KEY]
-            TaskExecutor._put_result(write_conn.fileno(), result, print_args)
+            TaskExecutor._put_result(
+                write_conn.fileno(),
+                result,
+                print_args,
+                exec_seconds,
+                profiler.summarize(),
+            )
 
         except BaseException as e:
             TaskExecutor._put_error(
@@ -224,10 +510,14 @@ class TaskExecutor:
     @staticmethod
     def _per_item(
         raw_code: str,
-        items: Items,
+        items: Items | SharedItems,
         write_conn,
         security_config: SecurityConfig,
         _query: Query = None,  # unused, only to keep signatures consistent across modes
+        bytecode: bytes | None = None,
+        first_index: int = 0,  # index of items[0] in the task, when run as a chunk
+        profile_top: int = 0,
+        in_worker: bool = False,
     ):
         """Execute a Python code task in per-item mode."""
 
@@ -235,42 +525,57 @@ class TaskExecutor:
             os.environ.clear()
 
         TaskExecutor._sanitize_sys_modules(security_config)
+        TaskExecutor._apply_resource_limits(security_config, in_worker)
 
         print_args: PrintArgs = []
         sys.stderr = stderr_capture = io.StringIO()
 
         try:
-            wrapped_code = TaskExecutor._wrap_code(raw_code)
-            compiled_code = compile(wrapped_code, EXECUTOR_PER_ITEM_FILENAME, "exec")
+            items = shared_payload.load_items(items)
+            compiled_code = TaskExecutor._load_code(raw_code, bytecode, "per_item")
+
+            base_globals = {
+                "__builtins__": TaskExecutor._filter_builtins(security_config),
+                "_item": None,
+                "print": TaskExecutor._create_custom_print(print_args),
+            }
 
-            filtered_builtins = TaskExecutor._filter_builtins(security_config)
-            custom_print = TaskExecutor._create_custom_print(print_args)
+            # define the user function once, then call its code per item with
+            # fresh globals, so that `global` state does not carry over
+            exec(compiled_code, base_globals)
+            user_code = base_globals[EXECUTOR_USER_FUNCTION_NAME].__code__
 
+            profiler = TaskProfiler(profile_top)
+            started_at = time.perf_counter()
             result: Items = []
-            for index, item in enumerate(items):
-                globals = {
-                    "__builtins__": filtered_builtins,
-                    "_item": item,
-                    "print": custom_print,
-                }
-
-                exec(compiled_code, globals)
+            with profiler:
+                for index, item in enumerate(items, start=first_index):
+                    globals = {**base_globals, "_item": item}
+                    user_function = types.FunctionType(user_code, globals)
+                    globals[EXECUTOR_USER_FUNCTION_NAME] = user_function
 
-                user_output = globals[EXECUTOR_USER_OUTPUT_KEY]
+                    user_output = user_function()
 
-                if user_output is None:
-                    continue
+                    if user_output is None:
+                        continue
 
-                json_data = TaskExecutor._extract_json_data_per_item(user_output)
+                    json_data = TaskExecutor._extract_json_data_per_item(user_output)
 
-                output_item = {"json": json_data, "pairedItem": {"item": index}}
+                    output_item = {"json": json_data, "pairedItem": {"item": index}}
 
-                if isinstance(user_output, dict) and "binary" in user_output:
-                    output_item["binary"] = user_output["binary"]
+                    if isinstance(user_output, dict) and "binary" in user_output:
+                        output_item["binary"] = user_output["binary"]
 
-                result.append(output_item)
+                    result.append(output_item)
 
-            TaskExecutor._put_result(write_conn.fileno(), result, print_args)
+            exec_seconds = time.perf_counter() - started_at
+            TaskExecutor._put_result(
+                write_conn.fileno(),
+                result,
+                print_args,
+                exec_seconds,
+                profiler.summarize(),
+            )
 
         except BaseException as e:
             TaskExecutor._put_error(
@@ -278,9 +583,33 @@ class TaskExecutor:
             )
 
     @staticmethod
-    def _wrap_code(raw_code: str) -> str:
+    def _load_code(raw_code: str, bytecode: bytes | None, node_mode: NodeMode):
+        """Load code compiled by the parent, else compile it here."""
+
+        if bytecode is not None:
+            return marshal.loads(bytecode)
+
+        return TaskExecutor.compile_code(raw_code, node_mode)
+
+    @staticmethod
+    def compile_code(raw_code: str, node_mode: NodeMode):
+        filename = (
+            EXECUTOR_ALL_ITEMS_FILENAME
+            if node_mode == "all_items"
+            else EXECUTOR_PER_ITEM_FILENAME
+        )
+        return compile(TaskExecutor._wrap_code(raw_code, node_mode), filename, "exec")
+
+    @staticmethod
+    def _wrap_code(raw_code: str, node_mode: NodeMode = "all_items") -> str:
         indented_code = textwrap.indent(raw_code, "    ")
-        return f"def _user_function():\n{indented_code}\n\n{EXECUTOR_USER_OUTPUT_KEY} = _user_function()"
+        function_def = f"def {EXECUTOR_USER_FUNCTION_NAME}():\n{indented_code}\n"
+
+        # per-item mode calls the function itself, once per item
+        if node_mode == "per_item":
+            return function_def
+
+        return f"{function_def}\n{EXECUTOR_USER_OUTPUT_KEY} = {EXECUTOR_USER_FUNCTION_NAME}()"
 
     @staticmethod
     def _extract_json_data_per_item(user_output):
@@ -296,23 +625,68 @@ class TaskExecutor:
         return user_output
 
     @staticmethod
-    def _put_result(write_fd: int, result: Items, print_args: PrintArgs):
+    def _put_result(
+        write_fd: int,
+        result: Items,
+        print_args: PrintArgs,
+        exec_seconds: float | None = None,
+        profile: TaskProfile | None = None,
+    ):
         message: PipeResultMessage = {
             "result": result,
             "print_args": TaskExecutor._truncate_print_args(print_args),
         }
 
-        data = json.dumps(message, default=str, ensure_ascii=False).encode("utf-8")
-        length_bytes = len(data).to_bytes(PIPE_MSG_PREFIX_LENGTH, "big")
+        if exec_seconds is not None:
+            message["exec_seconds"] = exec_seconds
 
-        try:
-            TaskExecutor._write_bytes(write_fd, length_bytes)
-            TaskExecutor._write_bytes(write_fd, data)
-        finally:
-            try:
-                os.close(write_fd)
-            except Exception:
-                pass
+        if profile is not None:
+            message["profile"] = profile
+
+        if isinstance(result, list):
+            TaskExecutor._put_result_chunks(write_fd, result)
+            message["result"] = []
+
+        message["peak_rss"] = TaskExecutor._peak_rss_bytes()
+        TaskExecutor._put_message(write_fd, message)
+
+    @staticmethod
+    def _put_result_chunks(write_fd: int, result: Items):
+        """Stream items ahead of the result message, in chunks of at most
+        `PIPE_RESULT_CHUNK_SIZE` encoded bytes unless a single item is larger,
+        so neither process ever holds the whole encoded result at once."""
+
+        parts: list[bytes] = []
+        size = 0
+        batch_size = PIPE_RESULT_ENCODE_BATCH
+        start = 0
+
+        while start < len(result):
+            batch = result[start : start + batch_size]
+            part = codec.dumps(batch)[1:-1]
+
+            if len(part) > PIPE_RESULT_CHUNK_SIZE and len(batch) > 1:
+                # items are larger than a batch allows for, encode fewer at once
+                batch_size = max(1, len(batch) * PIPE_RESULT_CHUNK_SIZE // len(part))
+                continue
+
+            if size and size + len(part) > PIPE_RESULT_CHUNK_SIZE:
+                TaskExecutor._write_result_chunk(write_fd, parts)
+                parts, size = [], 0
+
+            parts.append(part)
+            size += len(part)
+            start += len(batch)
+
+        if size:
+            TaskExecutor._write_result_chunk(write_fd, parts)
+
+    @staticmethod
+    def _write_result_chunk(write_fd: int, parts: list[bytes]):
+        chunk = b",".join(parts)
+        TaskExecutor._write_frame(
+            write_fd, PIPE_RESULT_CHUNK_PREFIX + chunk + PIPE_RESULT_CHUNK_SUFFIX
+        )
 
     @staticmethod
     def _put_error(
@@ -327,7 +701,7 @@ class TaskExecutor:
         task_error_info: TaskErrorInfo = {
             "message": f"Process exited with code {e.code}"
             if isinstance(e, SystemExit)
-            else str(e),
+            else str(e) or type(e).__name__,  # e.g. MemoryError at RLIMIT_AS
             "description": getattr(e, "description", ""),
             "stack": traceback.format_exc(),
             "stderr": stderr,
@@ -336,20 +710,54 @@ class TaskExecutor:
         message: PipeErrorMessage = {
             "error": task_error_info,
             "print_args": TaskExecutor._truncate_print_args(print_args),
+            "peak_rss": TaskExecutor._peak_rss_bytes(),
         }
 
-        data = json.dumps(message, default=str, ensure_ascii=False).encode("utf-8")
-        length_bytes = len(data).to_bytes(PIPE_MSG_PREFIX_LENGTH, "big")
+        TaskExecutor._put_message(write_fd, message)
+
+    @staticmethod
+    def _put_message(write_fd: int, message: PipeMessage):
+        """Write the final message of a task and close the pipe."""
+
+        data = codec.dumps(message)
 
         try:
-            TaskExecutor._write_bytes(write_fd, length_bytes)
-            TaskExecutor._write_bytes(write_fd, data)
+            TaskExecutor._write_frame(write_fd, data)
         finally:
             try:
                 os.close(write_fd)
             except Exception:
                 pass
 
+    @staticmethod
+    def _write_frame(write_fd: int, data: bytes):
+        """Write length-prefixed data, or only a handle to its memfd if large."""
+
+        memfd = shared_payload.put_result(data)
+
+        if memfd is None:
+            length_bytes = len(data).to_bytes(PIPE_MSG_PREFIX_LENGTH, "big")
+            TaskExecutor._write_bytes(write_fd, length_bytes)
+            TaskExecutor._write_bytes(write_fd, data)
+            return
+
+        handle: PipeSharedMemoryMessage = {"shm_size": len(data)}
+        data = codec.dumps(handle)
+        frame = len(data).to_bytes(PIPE_MSG_PREFIX_LENGTH, "big") + data
+
+        try:
+            # the memfd arrives with the first bytes of its frame
+            with socket.socket(fileno=os.dup(write_fd)) as sock:
+                sent = socket.send_fds(sock, [frame], [memfd])
+            TaskExecutor._write_bytes(write_fd, frame[sent:])
+        finally:
+            os.close(memfd)
+
+    @staticmethod
+    def _peak_rss_bytes() -> int:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024  # KiB on Linux
+
     # ========== print() ==========
 
     @staticmethod
@@ -425,82 +833,60 @@ class TaskExecutor:
     def _filter_builtins(security_config: SecurityConfig):
         """Get __builtins__ with denied ones removed."""
 
-        if len(security_config.builtins_deny) == 0:
-            filtered = dict(__builtins__)
-        else:
-            filtered = {
-                k: v
-                for k, v in __builtins__.items()
-                if k not in security_config.builtins_deny
-            }
-
-        filtered["__import__"] = TaskExecutor._create_safe_import(security_config)
-
-        return filtered
+        return sandbox.get_template(security_config).create_builtins()
 
     @staticmethod
     def _sanitize_sys_modules(security_config: SecurityConfig):
-        safe_modules = {
-            "builtins",
-            "__main__",
-            "sys",
-            "traceback",
-            "linecache",
-            "importlib",
-            "importlib.machinery",
-        }
+        sandbox.get_template(security_config).sanitize_sys_modules()
 
-        if "*" in security_config.stdlib_allow:
-            safe_modules.update(sys.stdlib_module_names)
-        else:
-            safe_modules.update(security_config.stdlib_allow)
+    @staticmethod
+    def _apply_resource_limits(security_config: SecurityConfig, in_worker: bool):
+        """Limit the memory and CPU time of the task that is about to run.
+
+        A per-task process lowers the hard limits too, so user code cannot
+        raise the soft limits back. A pooled worker only sets soft limits,
+        since lowering a hard limit cannot be undone and the worker sets the
+        limits again for every task. The CPU limit counts from the CPU time
+        the process has already used, rounded to whole seconds like the
+        limit itself.
+        """
 
-        if "*" in security_config.external_allow:
-            safe_modules.update(
-                name
-                for name in sys.modules.keys()
-                if name not in sys.stdlib_module_names
+        if security_config.task_max_memory_bytes:
+            limit = security_config.task_max_memory_bytes
+            TaskExecutor._set_limit(
+                resource.RLIMIT_AS, limit, None if in_worker else limit
             )
-        else:
-            safe_modules.update(security_config.external_allow)
-
-        # keep modules marked as safe and submodules of those
-        safe_prefixes = [safe + "." for safe in safe_modules]
-        modules_to_remove = [
-            name
-            for name in sys.modules.keys()
-            if name not in safe_modules
-            and not any(name.startswith(prefix) for prefix in safe_prefixes)
-        ]
 
-        for module_name in modules_to_remove:
-            del sys.modules[module_name]
+        if security_config.task_max_cpu_seconds:
+            usage = resource.getrusage(resource.RUSAGE_SELF)
+            used_seconds = round(usage.ru_utime + usage.ru_stime)
+            limit = used_seconds + security_config.task_max_cpu_seconds
+            TaskExecutor._set_limit(
+                resource.RLIMIT_CPU,
+                limit,
+                None if in_worker else limit + TASK_CPU_HARD_LIMIT_GRACE_SECONDS,
+            )
 
     @staticmethod
-    def _create_safe_import(security_config: SecurityConfig):
-        original_import = __builtins__["__import__"]
-
-        def safe_import(name, *args, **kwargs):
-            is_allowed, error_msg = validate_module_import(name, security_config)
-
-            if not is_allowed:
-                assert error_msg is not None
-                raise SecurityViolationError(
-                    message="Security violation detected",
-                    description=error_msg,
-                )
-
-            return original_import(name, *args, **kwargs)
+    def _set_limit(limit: int, soft: int, hard: int | None = None):
+        """Set the soft limit, and the hard limit unless None, within the
+        current hard limit."""
 
-        return safe_import
+        _, current_hard = resource.getrlimit(limit)
+        if current_hard != resource.RLIM_INFINITY:
+            soft = min(soft, current_hard)
+            if hard is not None:
+                hard = min(hard, current_hard)
+        resource.setrlimit(limit, (soft, current_hard if hard is None else hard))
 
     # ========== pipe I/O ==========
 
     @staticmethod
     def _write_bytes(fd: int, data: bytes):
+        view = memoryview(data)  # slices without copying the rest of the data
         total_written = 0
         while total_written < len(data):
-            written = os.write(fd, data[total_written:])
+            written = os.write(fd, view[total_written:])
             if written == 0:
                 raise OSError("Write failed")
             total_written += written
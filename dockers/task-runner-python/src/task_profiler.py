@@ -0,0 +1,116 @@
+import cProfile
+import sys
+
+from src.message_types.pipe import ProfileEntry, TaskProfile
+
+
+class TaskProfiler:
+    """Profiles user code with cProfile in the task subprocess, when the runner
+    enabled profiling for the task.
+
+    Only the `top` functions by cumulative time are sent back to the runner,
+    so a profile adds a few KiB to the result message however large the code.
+    With `top` at 0 the profiler is a no-op.
+    """
+
+    def __init__(self, top: int):
+        self.top = top
+        self.profiler = cProfile.Profile() if top > 0 else None
+
+    def __enter__(self) -> "TaskProfiler":
+        if self.profiler:
+            self.profiler.enable()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        if self.profiler:
+            self.profiler.disable()
+
+    def summarize(self) -> TaskProfile | None:
+        if self.profiler is None:
+            return None
+
+        entries: TaskProfile = [
+            {
+                "function": _describe(stat.code),
+                "calls": stat.callcount,
+                "own_seconds": round(stat.inlinetime, 6),
+                "cumulative_seconds": round(stat.totaltime, 6),
+            }
+            for stat in self.profiler.getstats()
+            if not _is_profiler_frame(stat.code)
+        ]
+
+        return _top(entries, self.top)
+
+
+def merge_profiles(profiles: list[TaskProfile | None]) -> TaskProfile | None:
+    """Sum the profiles of a task's chunks, which ran the same code in parallel,
+    so times add up to more than the task took."""
+
+    profiles = [profile for profile in profiles if profile]
+    if not profiles:
+        return None
+
+    merged: dict[str, ProfileEntry] = {}
+    for profile in profiles:
+        for entry in profile:
+            total = merged.setdefault(
+                entry["function"],
+                {
+                    "function": entry["function"],
+                    "calls": 0,
+                    "own_seconds": 0.0,
+                    "cumulative_seconds": 0.0,
+                },
+            )
+            total["calls"] += entry["calls"]
+            total["own_seconds"] += entry["own_seconds"]
+            total["cumulative_seconds"] += entry["cumulative_seconds"]
+
+    for total in merged.values():
+        total["own_seconds"] = round(total["own_seconds"], 6)
+        total["cumulative_seconds"] = round(total["cumulative_seconds"], 6)
+
+    return _top(list(merged.values()), max(len(profile) for profile in profiles))
+
+
+def format_profile(profile: TaskProfile) -> str:
+    return "\n".join(
+        f"  {entry['cumulative_seconds']:8.3f}s cumulative "
+        f"{entry['own_seconds']:8.3f}s own {entry['calls']:>9} calls  "
+        f"{entry['function']}"
+        for entry in profile
+    )
+
+
+def _top(entries: TaskProfile, top: int) -> TaskProfile:
+    entries.sort(key=lambda entry: entry["cumulative_seconds"], reverse=True)
+    return entries[:top]
+
+
+def _describe(code) -> str:
+    """Builtins are described by cProfile as strings, e.g. `<built-in method
+    builtins.len>`, Python functions by their name and location."""
+
+    if isinstance(code, str):
+        return code
+
+    return f"{code.co_name} ({_short_path(code.co_filename)}:{code.co_firstlineno})"
+
+
+def _short_path(filename: str) -> str:
+    """Path relative to the `sys.path` entry it was imported from, if any."""
+
+    prefixes = [path for path in sys.path if path and filename.startswith(path + "/")]
+    if not prefixes:
+        return filename
+
+    return filename[len(max(prefixes, key=len)) + 1 :]
+
+
+def _is_profiler_frame(code) -> bool:
+    if isinstance(code, str):
+        return "_lsprof.Profiler" in code
+
+    return code.co_filename == __file__
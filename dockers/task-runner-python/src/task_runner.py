@@ -1,6 +1,7 @@
 import asyncio
 import logging
 import time
+from collections import deque
 from typing import Callable, Awaitable
 from dataclasses import dataclass
 from urllib.parse import urlparse
@@ -17,24 +18,33 @@ from src.errors import (
     TaskMissingError,
     WebsocketConnectionError,
 )
-from src.message_types.broker import TaskSettings
+from src.message_types.broker import Items, TaskSettings
+from src.message_types.pipe import PrintArgs
 from src.nanoid import nanoid
 
 from src.constants import (
     RUNNER_NAME,
     TASK_REJECTED_REASON_AT_CAPACITY,
+    TASK_REJECTED_REASON_OUT_OF_MEMORY,
     TASK_REJECTED_REASON_OFFER_EXPIRED,
     TASK_TYPE_PYTHON,
+    OFFER_EXPIRY_TIMER_SLACK,
     OFFER_INTERVAL,
     OFFER_VALIDITY,
     OFFER_VALIDITY_MAX_JITTER,
     OFFER_VALIDITY_LATENCY_BUFFER,
+    PROFILE_HISTORY_SIZE,
     TASK_BROKER_WS_PATH,
     RPC_BROWSER_CONSOLE_LOG_METHOD,
     LOG_TASK_COMPLETE,
+    LOG_TASK_PROFILE,
     LOG_TASK_CANCEL,
     LOG_TASK_CANCEL_UNKNOWN,
     LOG_TASK_CANCEL_WAITING,
+    LOG_CODE_CACHE_STATS,
+    LOG_VALIDATION_CACHE_LOADED,
+    LOG_VALIDATION_CACHE_LOAD_FAILED,
+    LOG_VALIDATION_CACHE_SAVE_FAILED,
 )
 from src.message_types import (
     BrokerMessage,
@@ -53,10 +63,18 @@ from src.message_types import (
     RunnerTaskError,
     RunnerRpcCall,
 )
+from src.json_codec import codec
 from src.message_serde import MessageSerde
 from src.task_state import TaskState, TaskStatus
-from src.task_executor import TaskExecutor
+from src.task_executor import TaskExecutor, TaskOutput
+from src.task_profiler import format_profile
 from src.task_analyzer import TaskAnalyzer
+from src.code_cache import CodeCache
+from src.admission_control import AdmissionControl
+from src.metrics import Metrics
+from src import shared_payload
+from src.shared_payload import SharedItems
+from src.worker_pool import WorkerPool
 from src.config.security_config import SecurityConfig
 
 
@@ -64,6 +82,7 @@ from src.config.security_config import SecurityConfig
 class TaskOffer:
     offer_id: str
     valid_until: float
+    sent_at: float = 0.0  # perf counter
 
     @property
     def has_expired(self) -> bool:
@@ -86,6 +105,7 @@ class TaskRunner:
         self.running_tasks: dict[str, TaskState] = {}
 
         self.offers_coroutine: asyncio.Task | None = None
+        self.capacity_changed = asyncio.Event()
         self.serde = MessageSerde()
         self.executor = TaskExecutor()
         self.security_config = SecurityConfig(
@@ -93,8 +113,26 @@ class TaskRunner:
             external_allow=config.external_allow,
             builtins_deny=config.builtins_deny,
             runner_env_deny=config.env_deny,
+            task_max_memory_bytes=config.task_max_memory_mb * 1024 * 1024,
+            task_max_cpu_seconds=config.task_max_cpu_seconds,
         )
         self.analyzer = TaskAnalyzer(self.security_config)
+        self.code_cache = CodeCache()
+        self.admission = AdmissionControl(config.max_memory_mb)
+        self.metrics = Metrics()
+        self.max_task_peak_rss_bytes = 0
+        self.last_task_peak_rss_bytes: int | None = None
+        self.profiles: deque[dict] = deque(maxlen=PROFILE_HISTORY_SIZE)
+        self.worker_pool = (
+            WorkerPool(
+                size=config.max_concurrency,
+                max_tasks=config.worker_max_tasks,
+                max_memory_mb=config.worker_max_memory_mb,
+                security_config=self.security_config,
+            )
+            if config.worker_pool_enabled
+            else None
+        )
         self.logger = logging.getLogger(__name__)
 
         self.idle_coroutine: asyncio.Task | None = None
@@ -112,10 +150,64 @@ class TaskRunner:
     def running_tasks_count(self) -> int:
         return len(self.running_tasks)
 
+    def get_stats(self) -> dict:
+        stats = {
+            "runner_id": self.runner_id,
+            "running_tasks": self.running_tasks_count,
+            "json_codec": codec.name,
+            "code_cache": self.code_cache.get_stats(),
+            "max_task_peak_rss_bytes": self.max_task_peak_rss_bytes,
+            "last_task_peak_rss_bytes": self.last_task_peak_rss_bytes,
+        }
+
+        if self.admission.is_enabled:
+            stats["admission"] = self.admission.get_stats()
+
+        if self.worker_pool:
+            stats["worker_pool"] = self.worker_pool.get_stats()
+
+        return stats
+
+    def get_profiles(self) -> list[dict]:
+        """Profiles of the most recent profiled tasks, newest first."""
+
+        return list(reversed(self.profiles))
+
+    def get_metrics(self) -> str:
+        return self.metrics.render(
+            gauges=[
+                (
+                    "running_tasks",
+                    "Tasks running on this runner.",
+                    self.running_tasks_count,
+                ),
+                (
+                    "open_offers",
+                    "Task offers not yet accepted or expired.",
+                    len(self.open_offers),
+                ),
+                (
+                    "validation_cache_hit_rate",
+                    "Hit rate of the code validation cache.",
+                    self.analyzer.hit_rate,
+                ),
+                (
+                    "code_cache_hit_rate",
+                    "Hit rate of the compiled code cache.",
+                    self.code_cache.hit_rate,
+                ),
+            ]
+        )
+
     async def start(self) -> None:
         if self.config.is_auto_shutdown_enabled and not self.on_idle_timeout:
             raise NoIdleTimeoutHandlerError(self.config.auto_shutdown_timeout)
 
+        await self._load_validation_cache()
+
+        if self.worker_pool:
+            await asyncio.to_thread(self.worker_pool.start)
+
         headers = {"Authorization": f"Bearer {self.config.grant_token}"}
 
         while not self.is_shutting_down:
@@ -164,6 +256,18 @@ class TaskRunner:
 
         await self._wait_for_tasks()
         await self._terminate_tasks()
+        await self._save_validation_cache()
+
+        self.logger.info(
+            LOG_CODE_CACHE_STATS.format(
+                hits=self.code_cache.hits,
+                misses=self.code_cache.misses,
+                hit_rate=self.code_cache.hit_rate,
+            )
+        )
+
+        if self.worker_pool:
+            await asyncio.to_thread(self.worker_pool.stop)
 
         if self.websocket_connection:
             await self.websocket_connection.close()
@@ -196,9 +300,9 @@ class TaskRunner:
         self.logger.warning(f"Terminating {self.running_tasks_count} tasks...")
 
         tasks_to_terminate = [
-            asyncio.to_thread(self.executor.stop_process, task_state.process)
+            asyncio.to_thread(self.executor.stop_process, process)
             for task_state in self.running_tasks.values()
-            if task_state.process
+            for process in task_state.processes
         ]
 
         if tasks_to_terminate:
@@ -216,7 +320,11 @@ class TaskRunner:
 
         async for raw_message in self.websocket_connection:
             try:
+                decoded_at = time.perf_counter()
                 message = self.serde.deserialize_broker_message(raw_message)
+                self.metrics.message_decode_seconds.observe(
+                    time.perf_counter() - decoded_at
+                )
                 await self._handle_message(message)
             except websockets.ConnectionClosedOK:
                 break
@@ -269,7 +377,17 @@ class TaskRunner:
             await self._send_message(response)
             return
 
+        if not self.admission.has_headroom():
+            self.admission.tasks_rejected += 1
+            response = RunnerTaskRejected(
+                task_id=message.task_id,
+                reason=TASK_REJECTED_REASON_OUT_OF_MEMORY,
+            )
+            await self._send_message(response)
+            return
+
         del self.open_offers[message.offer_id]
+        self.metrics.offer_accept_seconds.observe(time.perf_counter() - offer.sent_at)
 
         task_state = TaskState(message.task_id)
         self.running_tasks[message.task_id] = task_state
@@ -295,6 +413,10 @@ class TaskRunner:
         task_state.node_name = message.settings.node_name
         task_state.node_id = message.settings.node_id
 
+        self.metrics.accept_settings_seconds.observe(
+            time.perf_counter() - task_state.accepted_at
+        )
+
         task_state.status = TaskStatus.RUNNING
         asyncio.create_task(self._execute_task(message.task_id, message.settings))
         self.logger.info(f"Received task {message.task_id}")
@@ -308,31 +430,56 @@ class TaskRunner:
             if task_state is None:
                 raise TaskMissingError(task_id)
 
-            self.analyzer.validate(task_settings.code)
+            validated_at = time.perf_counter()
+            try:
+                await self.analyzer.validate_off_loop(task_settings.code)
+            finally:
+                self.metrics.validation_seconds.observe(
+                    time.perf_counter() - validated_at
+                )
 
-            process, read_conn, write_conn = self.executor.create_process(
-                code=task_settings.code,
-                node_mode=task_settings.node_mode,
-                items=task_settings.items,
-                security_config=self.security_config,
-                query=task_settings.query,
-            )
+            bytecode = await self._get_bytecode(task_settings)
 
-            task_state.process = process
+            chunks = self._split_per_item(task_settings)
 
-            result, print_args, result_size_bytes = await asyncio.to_thread(
-                self.executor.execute_process,
-                process=process,
-                read_conn=read_conn,
-                write_conn=write_conn,
-                task_timeout=self.config.task_timeout,
-                pipe_reader_timeout=self.config.pipe_reader_timeout,
-                continue_on_fail=task_settings.continue_on_fail,
+            # every chunk is a process of its own
+            await self.admission.reserve(
+                task_id,
+                self.admission.estimate(task_settings.payload_size)
+                * (len(chunks) if chunks else 1),
+                self.config.task_timeout,
+                resident_bytes=task_settings.payload_size,
             )
+            if task_state.status == TaskStatus.ABORTING:
+                raise TaskCancelledError()
+
+            profile_top = self._get_profile_top(task_state)
 
-            for print_args_per_call in print_args:
+            if chunks:
+                output = await self._execute_in_chunks(
+                    task_state, task_settings, chunks, bytecode, profile_top
+                )
+            else:
+                output = await self._execute_in_process(
+                    task_state, task_settings, bytecode, profile_top
+                )
+
+            result, print_args, result_size_bytes, peak_rss_bytes, _, _ = output
+            if peak_rss_bytes is not None:
+                self.last_task_peak_rss_bytes = peak_rss_bytes
+                self.max_task_peak_rss_bytes = max(
+                    self.max_task_peak_rss_bytes, peak_rss_bytes
+                )
+            self._observe_task_output(output)
+            if output.profile:
+                self._record_profile(task_id, task_state, output)
+
+            if print_args:
+                # one RPC for all print() calls, instead of one per call
                 await self._send_rpc_message(
-                    task_id, RPC_BROWSER_CONSOLE_LOG_METHOD, print_args_per_call
+                    task_id,
+                    RPC_BROWSER_CONSOLE_LOG_METHOD,
+                    [self._format_console_output(print_args)],
                 )
 
             response = RunnerTaskDone(task_id=task_id, data={"result": result})
@@ -343,6 +490,10 @@ class TaskRunner:
                     task_id=task_id,
                     duration=self._get_duration(start_time),
                     result_size=self._get_result_size(result_size_bytes),
+                    transfer_rate=self._get_transfer_rate(output),
+                    peak_memory=self._get_result_size(peak_rss_bytes)
+                    if peak_rss_bytes is not None
+                    else "unknown",
                     **task_state.context(),
                 )
             )
@@ -368,8 +519,249 @@ class TaskRunner:
 
         finally:
             self.running_tasks.pop(task_id, None)
+            self.admission.release(task_id)
+            self.capacity_changed.set()
             self._reset_idle_timer()
 
+    def _observe_task_output(self, output: TaskOutput) -> None:
+        spawn_seconds, exec_seconds, transfer_seconds = output.timings
+
+        if spawn_seconds is not None:
+            self.metrics.process_spawn_seconds.observe(spawn_seconds)
+        if exec_seconds is not None:
+            self.metrics.execution_seconds.observe(exec_seconds)
+        if transfer_seconds is not None:
+            self.metrics.pipe_transfer_seconds.observe(transfer_seconds)
+        if transfer_seconds:
+            self.metrics.pipe_transfer_bytes_per_second.observe(
+                output.result_size_bytes / transfer_seconds
+            )
+        if output.peak_rss_bytes is not None:
+            self.metrics.task_peak_rss_bytes.observe(output.peak_rss_bytes)
+
+        self.metrics.pipe_transfer_bytes.observe(output.result_size_bytes)
+
+    def _get_profile_top(self, task_state: TaskState) -> int:
+        """Functions to report in the task's profile, or 0 to not profile it."""
+
+        if task_state.workflow_id in self.config.profile_workflow_ids or (
+            random.random() < self.config.profile_sample_rate
+        ):
+            return self.config.profile_top
+
+        return 0
+
+    def _record_profile(
+        self, task_id: str, task_state: TaskState, output: TaskOutput
+    ) -> None:
+        assert output.profile is not None
+        exec_seconds = output.timings.exec_seconds
+
+        self.profiles.append(
+            {
+                "task_id": task_id,
+                "completed_at": time.time(),
+                **task_state.context(),
+                "exec_seconds": exec_seconds,
+                "functions": output.profile,
+            }
+        )
+
+        self.logger.info(
+            LOG_TASK_PROFILE.format(
+                task_id=task_id,
+                exec_time=f"{exec_seconds * 1000:.0f}ms"
+                if exec_seconds is not None
+                else "unknown",
+                functions=format_profile(output.profile),
+                **task_state.context(),
+            )
+        )
+
+    async def _get_bytecode(self, task_settings: TaskSettings) -> bytes | None:
+        misses = self.code_cache.misses
+        bytecode = await self.code_cache.get_off_loop(
+            task_settings.code, task_settings.node_mode
+        )
+
+        if self.code_cache.misses > misses:
+            self.logger.debug(
+                LOG_CODE_CACHE_STATS.format(
+                    hits=self.code_cache.hits,
+                    misses=self.code_cache.misses,
+                    hit_rate=self.code_cache.hit_rate,
+                )
+            )
+
+        return bytecode
+
+    async def _load_validation_cache(self) -> None:
+        path = self.config.validation_cache_file
+        if not path:
+            return
+
+        try:
+            count = await asyncio.to_thread(self.analyzer.load_cache, path)
+        except Exception as e:
+            self.logger.warning(
+                LOG_VALIDATION_CACHE_LOAD_FAILED.format(path=path, error=e)
+            )
+            return
+
+        if count:
+            self.logger.info(LOG_VALIDATION_CACHE_LOADED.format(count=count, path=path))
+
+    async def _save_validation_cache(self) -> None:
+        path = self.config.validation_cache_file
+        if not path:
+            return
+
+        try:
+            await asyncio.to_thread(self.analyzer.save_cache, path)
+        except Exception as e:
+            self.logger.warning(
+                LOG_VALIDATION_CACHE_SAVE_FAILED.format(path=path, error=e)
+            )
+
+    async def _execute_on_worker(
+        self,
+        task_state: TaskState,
+        task_settings: TaskSettings,
+        items: Items | SharedItems,
+        bytecode: bytes | None,
+        profile_top: int,
+    ) -> TaskOutput:
+        assert self.worker_pool is not None
+
+        worker = await asyncio.to_thread(self.worker_pool.acquire)
+
+        # a cancel while acquiring had no process to stop
+        if task_state.status == TaskStatus.ABORTING:
+            self.worker_pool.release(worker)
+            raise TaskCancelledError()
+
+        # cancel and shutdown stop the worker process, as in per-task mode
+        task_state.process = worker.process
+
+        return await asyncio.to_thread(
+            self.worker_pool.execute_task,
+            worker=worker,
+            code=task_settings.code,
+            node_mode=task_settings.node_mode,
+            items=items,
+            query=task_settings.query,
+            bytecode=bytecode,
+            task_timeout=self.config.task_timeout,
+            pipe_reader_timeout=self.config.pipe_reader_timeout,
+            continue_on_fail=task_settings.continue_on_fail,
+            profile_top=profile_top,
+        )
+
+    async def _execute_in_process(
+        self,
+        task_state: TaskState,
+        task_settings: TaskSettings,
+        bytecode: bytes | None,
+        profile_top: int,
+    ) -> TaskOutput:
+        items = await asyncio.to_thread(shared_payload.share_items, task_settings.items)
+
+        try:
+            if self.worker_pool:
+                return await self._execute_on_worker(
+                    task_state, task_settings, items, bytecode, profile_top
+                )
+
+            # a cancel while sharing the items had no process to stop
+            if task_state.status == TaskStatus.ABORTING:
+                raise TaskCancelledError()
+
+            process, read_conn, write_conn = self.executor.create_process(
+                code=task_settings.code,
+                node_mode=task_settings.node_mode,
+                items=items,
+                security_config=self.security_config,
+                query=task_settings.query,
+                bytecode=bytecode,
+                profile_top=profile_top,
+            )
+
+            task_state.process = process
+
+            return await self.executor.supervise_process(
+                process=process,
+                read_conn=read_conn,
+                write_conn=write_conn,
+                task_timeout=self.config.task_timeout,
+                pipe_reader_timeout=self.config.pipe_reader_timeout,
+                continue_on_fail=task_settings.continue_on_fail,
+            )
+        finally:
+            shared_payload.release_items(items)
+
+    def _split_per_item(
+        self, task_settings: TaskSettings
+    ) -> list[tuple[int, Items]] | None:
+        """Chunks of a per-item task to run in parallel, or None to run it whole."""
+
+        min_items = self.config.per_item_parallel_min_items
+        if (
+            task_settings.node_mode != "per_item"
+            or min_items <= 0
+            or len(task_settings.items) < min_items
+            or self.config.per_item_parallel_processes <= 1
+        ):
+            return None
+
+        return self.executor.split_items(
+            task_settings.items, self.config.per_item_parallel_processes
+        )
+
+    async def _execute_in_chunks(
+        self,
+        task_state: TaskState,
+        task_settings: TaskSettings,
+        chunks: list[tuple[int, Items]],
+        bytecode: bytes | None,
+        profile_top: int,
+    ) -> TaskOutput:
+        shared_chunks = await asyncio.gather(
+            *(
+                asyncio.to_thread(shared_payload.share_items, items)
+                for _, items in chunks
+            )
+        )
+
+        try:
+            # a cancel while sharing the items had no process to stop
+            if task_state.status == TaskStatus.ABORTING:
+                raise TaskCancelledError()
+
+            processes = [
+                self.executor.create_process(
+                    code=task_settings.code,
+                    node_mode="per_item",
+                    items=items,
+                    security_config=self.security_config,
+                    bytecode=bytecode,
+                    profile_top=profile_top,
+                    first_index=first_index,
+                )
+                for (first_index, _), items in zip(chunks, shared_chunks)
+            ]
+
+            task_state.chunk_processes = [process for process, _, _ in processes]
+
+            return await self.executor.supervise_chunk_processes(
+                chunks=processes,
+                task_timeout=self.config.task_timeout,
+                pipe_reader_timeout=self.config.pipe_reader_timeout,
+                continue_on_fail=task_settings.continue_on_fail,
+            )
+        finally:
+            for items in shared_chunks:
+                shared_payload.release_items(items)
+
     async def _handle_task_cancel(self, message: BrokerTaskCancel) -> None:
         task_id = message.task_id
         task_state = self.running_tasks.get(task_id)
@@ -381,12 +773,18 @@ class TaskRunner:
         if task_state.status == TaskStatus.WAITING_FOR_SETTINGS:
             self.running_tasks.pop(task_id, None)
             self.logger.info(LOG_TASK_CANCEL_WAITING.format(task_id=task_id))
-            await self._send_offers()
+            self.capacity_changed.set()
             return
 
         if task_state.status == TaskStatus.RUNNING:
             task_state.status = TaskStatus.ABORTING
-            await asyncio.to_thread(self.executor.stop_process, task_state.process)
+            self.admission.cancel(task_id)
+            await asyncio.gather(
+                *(
+                    asyncio.to_thread(self.executor.stop_process, process)
+                    for process in task_state.processes
+                )
+            )
             self.logger.info(
                 LOG_TASK_CANCEL.format(task_id=task_id, **task_state.context())
             )
@@ -402,11 +800,21 @@ class TaskRunner:
         if self.websocket_connection is None:
             raise WebsocketConnectionError(self.task_broker_uri)
 
+        encoded_at = time.perf_counter()
         serialized = self.serde.serialize_runner_message(message)
-        await self.websocket_connection.send(serialized)
+        sent_at = time.perf_counter()
+        self.metrics.message_encode_seconds.observe(sent_at - encoded_at)
+
+        await self.websocket_connection.send(serialized, text=True)
+        self.metrics.websocket_send_seconds.observe(time.perf_counter() - sent_at)
 
     # ========== Formatting ==========
 
+    def _format_console_output(self, print_args: PrintArgs) -> str:
+        """Join print() calls into lines, as they would appear in a terminal."""
+
+        return "\n".join(" ".join(args) for args in print_args)
+
     def _get_duration(self, start_time: float) -> str:
         elapsed = time.time() - start_time
 
@@ -418,6 +826,13 @@ class TaskRunner:
 
         return f"{int(elapsed) // 60}m"
 
+    def _get_transfer_rate(self, output: TaskOutput) -> str:
+        transfer_seconds = output.timings.transfer_seconds
+        if not transfer_seconds:
+            return "unknown MB/s"
+
+        return f"{output.result_size_bytes / transfer_seconds / (1024 * 1024):.1f} MB/s"
+
     def _get_result_size(self, size_bytes: int) -> str:
         if size_bytes < 1024:
             return f"{size_bytes} bytes"
@@ -429,14 +844,36 @@ class TaskRunner:
     # ========== Offers ==========
 
     async def _send_offers_loop(self) -> None:
+        """Top up offers whenever capacity frees up or an offer expires.
+
+        Tasks finishing or being cancelled set `capacity_changed`, and the
+        loop otherwise sleeps until the next offer expires, so freed capacity
+        is offered right away. The interval is only a fallback.
+        """
+
         while self.can_send_offers:
             try:
+                self.capacity_changed.clear()
                 await self._send_offers()
-                await asyncio.sleep(OFFER_INTERVAL)
+                await self._wait_for_offers_trigger()
             except asyncio.CancelledError:
                 break
             except Exception as e:
                 self.logger.error(f"Error sending offers: {e}")
+                await asyncio.sleep(OFFER_INTERVAL)
+
+    async def _wait_for_offers_trigger(self) -> None:
+        timeout = OFFER_INTERVAL
+
+        if self.open_offers:
+            next_expiry = min(offer.valid_until for offer in self.open_offers.values())
+            until_expiry = max(next_expiry - time.time(), 0) + OFFER_EXPIRY_TIMER_SLACK
+            timeout = min(timeout, until_expiry)
+
+        try:
+            await asyncio.wait_for(self.capacity_changed.wait(), timeout)
+        except TimeoutError:
+            pass
 
     async def _send_offers(self) -> None:
         if not self.can_send_offers:
@@ -451,6 +888,9 @@ class TaskRunner:
         for offer_id in expired_offer_ids:
             self.open_offers.pop(offer_id, None)
 
+        if not self.admission.has_headroom():
+            return
+
         offers_to_send = self.config.max_concurrency - (
             len(self.open_offers) + self.running_tasks_count
         )
@@ -464,7 +904,9 @@ class TaskRunner:
                 time.time() + (valid_for_ms / 1000) + OFFER_VALIDITY_LATENCY_BUFFER
             )
 
-            self.open_offers[offer_id] = TaskOffer(offer_id, valid_until)
+            self.open_offers[offer_id] = TaskOffer(
+                offer_id, valid_until, time.perf_counter()
+            )
 
             message = RunnerTaskOffer(
                 offer_id=offer_id, task_type=TASK_TYPE_PYTHON, valid_for=valid_for_ms
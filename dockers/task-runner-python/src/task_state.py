@@ -1,3 +1,4 @@
+import time
 from enum import Enum
 from dataclasses import dataclass
 from multiprocessing.context import ForkServerProcess
@@ -14,19 +15,30 @@ class TaskState:
     task_id: str
     status: TaskStatus
     process: ForkServerProcess | None = None
+    chunk_processes: list[ForkServerProcess] | None = None
     workflow_name: str | None = None
     workflow_id: str | None = None
     node_name: str | None = None
     node_id: str | None = None
+    accepted_at: float = 0.0  # perf counter
 
     def __init__(self, task_id: str):
         self.task_id = task_id
         self.status = TaskStatus.WAITING_FOR_SETTINGS
         self.process = None
+        self.chunk_processes = None
         self.workflow_name = None
         self.workflow_id = None
         self.node_name = None
         self.node_id = None
+        self.accepted_at = time.perf_counter()
+
+    @property
+    def processes(self) -> list[ForkServerProcess]:
+        """All subprocesses running this task, including per-item chunks."""
+
+        processes = [self.process] if self.process else []
+        return processes + (self.chunk_processes or [])
 
     def context(self):
         return {
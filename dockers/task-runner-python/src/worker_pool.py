@@ -0,0 +1,408 @@
+import logging
+import os
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from multiprocessing import reduction
+from multiprocessing.connection import Connection
+from multiprocessing.context import ForkServerProcess
+
+from src.config.security_config import SecurityConfig
+from src.constants import (
+    LOG_WORKER_POOL_STARTED,
+    LOG_WORKER_RECYCLED,
+    WORKER_ACK_TIMEOUT,
+    WORKER_EXIT_TIMEOUT,
+    WORKER_RECYCLE_FAILED,
+    WORKER_RECYCLE_MAX_MEMORY,
+    WORKER_RECYCLE_MAX_TASKS,
+    WORKER_RECYCLE_STATE_CHANGED,
+)
+from src.errors import TaskSubprocessFailedError, TaskTimeoutError
+from src.message_types.broker import Items, NodeMode, Query
+from src.pipe_reader import PipeReader
+from src.shared_payload import SharedItems
+from src.task_executor import MULTIPROCESSING_CONTEXT, TaskExecutor, TaskOutput
+
+type PipeConnection = Connection
+
+# Keys Python itself may add to a module namespace while running user code
+IGNORED_MODULE_KEYS = {"__warningregistry__"}
+
+
+@dataclass
+class Worker:
+    process: ForkServerProcess
+    control_conn: PipeConnection
+    tasks_completed: int = 0
+
+
+class WorkerPool:
+    """Warm processes that run tasks back to back instead of one process per task.
+
+    Each worker is forked from the forkserver once, clears its env (if
+    configured) and sanitizes `sys.modules`, then serves tasks sent over
+    its control pipe. Every task still gets fresh globals, filtered builtins,
+    a safe `__import__` and a fresh result pipe, and `sys.modules` is
+    sanitized again before each task.
+
+    Unlike per-task processes, tasks on the same worker share one
+    interpreter. A worker is therefore recycled when a task leaves behind a
+    change to shared state (newly imported modules, module attributes
+    rebound or added, builtins, import hooks, `sys.path`, tracing, env vars,
+    running threads), once its peak RSS exceeds the memory limit, after
+    `max_tasks` tasks, and whenever the worker itself failed. Timeouts and
+    cancels kill the worker outright, as in per-task mode. Mutations that do
+    not rebind anything, such as appending to a list held by a module, are
+    not detected, so only enable the pool when all workflows on this runner
+    trust each other.
+    """
+
+    def __init__(
+        self,
+        size: int,
+        max_tasks: int,
+        max_memory_mb: int,
+        security_config: SecurityConfig,
+    ):
+        self.size = size
+        self.max_tasks = max_tasks
+        self.max_memory_bytes = max_memory_mb * 1024 * 1024
+        self.security_config = security_config
+
+        self.idle_workers: list[Worker] = []
+        self.lock = threading.Lock()
+        self.is_stopped = False
+
+        self.tasks_executed = 0
+        self.workers_recycled = 0
+        self.logger = logging.getLogger(__name__)
+
+    def start(self) -> None:
+        started_at = time.perf_counter()
+        workers = [self._spawn_worker() for _ in range(self.size)]
+
+        with self.lock:
+            self.idle_workers.extend(workers)
+
+        duration = time.perf_counter() - started_at
+        self.logger.info(
+            LOG_WORKER_POOL_STARTED.format(
+                size=self.size, duration=f"{duration * 1000:.0f}ms"
+            )
+        )
+
+    def stop(self) -> None:
+        """Stop idle workers. Busy workers are stopped via their task's process."""
+
+        self.is_stopped = True
+
+        with self.lock:
+            workers, self.idle_workers = self.idle_workers, []
+
+        for worker in workers:
+            self._close_worker(worker)
+
+    def acquire(self) -> Worker:
+        with self.lock:
+            while self.idle_workers:
+                worker = self.idle_workers.pop()
+                if worker.process.is_alive():
+                    return worker
+                self._close_worker(worker)
+
+        return self._spawn_worker()
+
+    def release(self, worker: Worker) -> None:
+        """Return a worker that was acquired but given no task."""
+
+        with self.lock:
+            if not self.is_stopped:
+                self.idle_workers.append(worker)
+                return
+
+        self._close_worker(worker)
+
+    def execute_task(
+        self,
+        worker: Worker,
+        code: str,
+        node_mode: NodeMode,
+        items: Items | SharedItems,
+        query: Query,
+        bytecode: bytes | None,
+        task_timeout: int,
+        pipe_reader_timeout: float,
+        continue_on_fail: bool,
+        profile_top: int = 0,
+    ) -> TaskOutput:
+        """Run a task on an acquired worker and release the worker afterwards."""
+
+        read_conn, write_conn = MULTIPROCESSING_CONTEXT.Pipe()  # see create_process
+        pipe_reader = PipeReader(read_conn.fileno(), read_conn)
+        pipe_reader.start()
+
+        recycle_reason: str | None = WORKER_RECYCLE_FAILED
+
+        try:
+            try:
+                # shared items go as their size, and their fd after the pipe's
+                shared_items = None
+                if isinstance(items, SharedItems):
+                    shared_items, items = items, []
+                shared_size = shared_items.size if shared_items else None
+                worker.control_conn.send(
+                    (code, node_mode, items, shared_size, query, bytecode, profile_top)
+                )
+                reduction.send_handle(
+                    worker.control_conn, write_conn.fileno(), worker.process.pid
+                )
+                if shared_items:
+                    reduction.send_handle(
+                        worker.control_conn, shared_items.fd, worker.process.pid
+                    )
+            except Exception as e:
+                raise TaskSubprocessFailedError(-1, e)
+            finally:
+                write_conn.close()
+
+            pipe_reader.join(timeout=task_timeout)
+
+            if pipe_reader.is_alive():
+                TaskExecutor.stop_process(worker.process)
+                raise TaskTimeoutError(task_timeout)
+
+            if pipe_reader.pipe_message is None:
+                # pipe closed without a result, e.g. worker was cancelled or crashed
+                worker.process.join(timeout=WORKER_EXIT_TIMEOUT)
+                if worker.process.exitcode is not None:
+                    TaskExecutor._raise_for_exit_code(worker.process.exitcode)
+            else:
+                recycle_reason = self._receive_recycle_reason(worker)
+
+            return TaskExecutor._read_result(
+                pipe_reader, read_conn, pipe_reader_timeout
+            )
+
+        except Exception as e:
+            if continue_on_fail:
+                return TaskOutput([{"json": {"error": str(e)}}], [], 0, None)
+            raise
+
+        finally:
+            self._release(worker, recycle_reason)
+
+    def get_stats(self) -> dict:
+        return {
+            "size": self.size,
+            "idle_workers": len(self.idle_workers),
+            "tasks_executed": self.tasks_executed,
+            "workers_recycled": self.workers_recycled,
+        }
+
+    def _receive_recycle_reason(self, worker: Worker) -> str | None:
+        try:
+            if worker.control_conn.poll(WORKER_ACK_TIMEOUT):
+                return worker.control_conn.recv()
+        except (EOFError, OSError):
+            pass
+
+        return WORKER_RECYCLE_FAILED
+
+    def _release(self, worker: Worker, recycle_reason: str | None) -> None:
+        worker.tasks_completed += 1
+        self.tasks_executed += 1
+
+        if recycle_reason is None and worker.tasks_completed >= self.max_tasks:
+            recycle_reason = WORKER_RECYCLE_MAX_TASKS
+
+        if recycle_reason is None and not self.is_stopped:
+            with self.lock:
+                self.idle_workers.append(worker)
+            return
+
+        self._close_worker(worker)
+
+        if recycle_reason is None:
+            return
+
+        self.workers_recycled += 1
+        self.logger.debug(
+            LOG_WORKER_RECYCLED.format(
+                pid=worker.process.pid,
+                tasks=worker.tasks_completed,
+                reason=recycle_reason,
+            )
+        )
+
+        if self.is_stopped:
+            return
+
+        try:
+            replacement = self._spawn_worker()
+        except Exception as e:
+            # next acquire() spawns on demand
+            self.logger.warning(f"Failed to replace recycled worker: {e}")
+            return
+
+        with self.lock:
+            self.idle_workers.append(replacement)
+
+    def _spawn_worker(self) -> Worker:
+        parent_conn, child_conn = MULTIPROCESSING_CONTEXT.Pipe(duplex=True)
+        process = MULTIPROCESSING_CONTEXT.Process(
+            target=_worker_main,
+            args=(child_conn, self.security_config, self.max_memory_bytes),
+            daemon=True,
+        )
+
+        try:
+            process.start()
+        finally:
+            child_conn.close()
+
+        return Worker(process=process, control_conn=parent_conn)
+
+    def _close_worker(self, worker: Worker) -> None:
+        """Closing the control pipe makes an idle worker exit on its own."""
+
+        try:
+            worker.control_conn.close()
+        except OSError:
+            pass
+
+        worker.process.join(timeout=WORKER_EXIT_TIMEOUT)
+        TaskExecutor.stop_process(worker.process)
+
+
+# ========== worker process ==========
+
+
+@dataclass
+class _WriteEnd:
+    """Raw result pipe fd. Unlike a Connection, it does not close the fd when
+    collected, which matters once the executor has already closed it and the
+    number is reused by the next task's pipe."""
+
+    fd: int
+
+    def fileno(self) -> int:
+        return self.fd
+
+
+class _StateSnapshot:
+    """Interpreter state shared between tasks on the same worker."""
+
+    def __init__(self):
+        self.namespaces = {
+            name: dict(namespace)
+            for name, module in sys.modules.items()
+            if name != "sys" and (namespace := getattr(module, "__dict__", None))
+        }
+        self.modules = set(sys.modules)
+        self.sys_path = list(sys.path)
+        self.meta_path = list(sys.meta_path)
+        self.path_hooks = list(sys.path_hooks)
+        self.trace = sys.gettrace()
+        self.profile = sys.getprofile()
+        self.environ = dict(os.environ)
+        self.thread_count = threading.active_count()
+
+    def is_changed(self) -> bool:
+        if (
+            sys.path != self.sys_path
+            or not _same_items(sys.meta_path, self.meta_path)
+            or not _same_items(sys.path_hooks, self.path_hooks)
+            or sys.gettrace() is not self.trace
+            or sys.getprofile() is not self.profile
+            or os.environ != self.environ
+            or threading.active_count() > self.thread_count
+        ):
+            return True
+
+        # a module first imported by a task could have been modified by it
+        if sys.modules.keys() - self.modules:
+            return True
+
+        for name, before in self.namespaces.items():
+            module = sys.modules.get(name)
+            after = getattr(module, "__dict__", None)
+            if after is None or _is_namespace_changed(before, after):
+                return True
+
+        return False
+
+
+def _same_items(current: list, before: list) -> bool:
+    return len(current) == len(before) and all(a is b for a, b in zip(current, before))
+
+
+def _is_namespace_changed(before: dict, after: dict) -> bool:
+    keys = after.keys() - IGNORED_MODULE_KEYS
+    if keys != before.keys() - IGNORED_MODULE_KEYS:
+        return True
+
+    return any(after[key] is not before[key] for key in keys)
+
+
+def _worker_main(
+    control_conn: PipeConnection,
+    security_config: SecurityConfig,
+    max_memory_bytes: int,
+):
+    """Serve tasks until the control pipe closes or the worker must be recycled."""
+
+    if security_config.runner_env_deny:
+        os.environ.clear()
+
+    TaskExecutor._sanitize_sys_modules(security_config)
+    baseline = _StateSnapshot()
+
+    while True:
+        try:
+            # plain tuple, so unpickling never imports a sanitized-away module
+            (
+                code,
+                node_mode,
+                items,
+                shared_size,
+                query,
+                bytecode,
+                profile_top,
+            ) = control_conn.recv()
+            write_fd = reduction.recv_handle(control_conn)
+            if shared_size is not None:
+                items = SharedItems(reduction.recv_handle(control_conn), shared_size)
+        except (EOFError, OSError):
+            return
+
+        execute = (
+            TaskExecutor._all_items
+            if node_mode == "all_items"
+            else TaskExecutor._per_item
+        )
+        execute(
+            code,
+            items,
+            _WriteEnd(write_fd),
+            security_config,
+            query,
+            bytecode,
+            profile_top=profile_top,
+            in_worker=True,
+        )
+
+        if isinstance(items, SharedItems):
+            os.close(items.fd)
+
+        recycle_reason = None
+        if TaskExecutor._peak_rss_bytes() > max_memory_bytes:
+            recycle_reason = WORKER_RECYCLE_MAX_MEMORY
+        elif baseline.is_changed():
+            recycle_reason = WORKER_RECYCLE_STATE_CHANGED
+
+        control_conn.send(recycle_reason)
+
+        if recycle_reason:
+            return
@@ -9,6 +9,7 @@ from src.nanoid import nanoid
 
 from tests.fixtures.test_constants import (
     TASK_RESPONSE_WAIT,
+    LOCAL_TASK_BROKER_AUTH_PATH,
     LOCAL_TASK_BROKER_WS_PATH,
 )
 
@@ -31,10 +32,16 @@ class LocalTaskBroker:
         self.connections: dict[str, web_ws.WebSocketResponse] = {}
         self.pending_messages: dict[str, asyncio.Queue[WebsocketMessage]] = {}
         self.received_messages: list[WebsocketMessage] = []
+        self.received_at: list[float] = []  # loop time, per received message
+        self.received_from: list[str] = []  # connection ID, per received message
         self.active_tasks: dict[TaskId, ActiveTask] = {}
         self.task_settings: dict[TaskId, TaskSettings] = {}
         self.rpc_messages: dict[TaskId, list[dict]] = {}
+        self.used_offer_ids: set[str] = set()
+        self.message_received = asyncio.Event()
+        self.grant_tokens_issued = 0
         self.app.router.add_get(LOCAL_TASK_BROKER_WS_PATH, self.websocket_handler)
+        self.app.router.add_post(LOCAL_TASK_BROKER_AUTH_PATH, self.auth_handler)
 
     async def start(self) -> None:
         self.runner = web.AppRunner(self.app)
@@ -59,9 +66,18 @@ class LocalTaskBroker:
         if self.runner:
             await self.runner.cleanup()
 
+    async def auth_handler(self, request: web.Request) -> web.Response:
+        body = await request.json()
+        if not body.get("token"):
+            return web.json_response({"message": "Unauthorized"}, status=403)
+
+        self.grant_tokens_issued += 1
+        return web.json_response({"data": {"token": nanoid()}})
+
     async def websocket_handler(self, request: web.Request) -> web_ws.WebSocketResponse:
         print(f"WebSocket connection request from {request.remote}")
-        ws = web_ws.WebSocketResponse()
+        # no limit, like the n8n broker up to N8N_RUNNERS_MAX_PAYLOAD
+        ws = web_ws.WebSocketResponse(max_msg_size=0)
         await ws.prepare(request)
         connection_id = nanoid()
         self.connections[connection_id] = ws
@@ -76,6 +92,9 @@ class LocalTaskBroker:
                 if message.type == web_ws.WSMsgType.TEXT:
                     json_message = json.loads(message.data)
                     self.received_messages.append(json_message)
+                    self.received_at.append(asyncio.get_running_loop().time())
+                    self.received_from.append(connection_id)
+                    self._notify_message_received()
                     await self._handle_message(connection_id, json_message)
         finally:
             sender_coroutine.cancel()
@@ -89,6 +108,11 @@ class LocalTaskBroker:
 
         return ws
 
+    def _notify_message_received(self):
+        # wake current waiters, later waiters wait on a fresh event
+        self.message_received.set()
+        self.message_received = asyncio.Event()
+
     async def _message_sender(self, connection_id: str, ws: web_ws.WebSocketResponse):
         while True:
             message = await self.pending_messages[connection_id].get()
@@ -142,18 +166,24 @@ class LocalTaskBroker:
         self.active_tasks[task_id] = ActiveTask(task_settings)
         self.task_settings[task_id] = task_settings
 
-        offer = await self.wait_for_msg("runner:taskoffer", timeout=2.0)
+        # each offer can only be accepted once
+        offer = await self.wait_for_msg(
+            "runner:taskoffer",
+            timeout=2.0,
+            predicate=lambda msg: msg.get("offerId") not in self.used_offer_ids,
+            newest=True,
+        )
 
         if offer:
+            self.used_offer_ids.add(offer.get("offerId"))
             accept = {
                 "type": "broker:taskofferaccept",
                 "taskId": task_id,
                 "offerId": offer.get("offerId"),
             }
 
-            if self.connections:
-                connection = next(iter(self.connections.keys()))
-                await self.send_to_connection(connection, accept)
+            # to the runner that made the offer, in case several are connected
+            await self.send_to_connection(self.get_sender(offer), accept)
 
     async def cancel_task(self, task_id: TaskId, reason: str):
         cancel_message = {
@@ -170,21 +200,44 @@ class LocalTaskBroker:
         msg_type: str,
         timeout: float = TASK_RESPONSE_WAIT,
         predicate: Callable[[WebsocketMessage], bool] | None = None,
+        newest: bool = False,
     ) -> WebsocketMessage | None:
-        start_time = asyncio.get_running_loop().time()
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
 
-        while asyncio.get_running_loop().time() - start_time < timeout:
-            for msg in self.received_messages:
+        while True:
+            message_received = self.message_received
+            messages = (
+                reversed(self.received_messages) if newest else self.received_messages
+            )
+            for msg in messages:
                 if msg.get("type") == msg_type:
                     if predicate is None or predicate(msg):
                         return msg
 
-            await asyncio.sleep(0.1)
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return None
 
-        return None
+            try:
+                await asyncio.wait_for(message_received.wait(), timeout=remaining)
+            except asyncio.TimeoutError:
+                pass
 
     def get_messages_of_type(self, msg_type: str) -> list[WebsocketMessage]:
         return [msg for msg in self.received_messages if msg.get("type") == msg_type]
 
+    def get_receive_time(self, message: WebsocketMessage) -> float:
+        index = next(
+            i for i, msg in enumerate(self.received_messages) if msg is message
+        )
+        return self.received_at[index]
+
+    def get_sender(self, message: WebsocketMessage) -> str:
+        index = next(
+            i for i, msg in enumerate(self.received_messages) if msg is message
+        )
+        return self.received_from[index]
+
     def get_task_rpc_messages(self, task_id: TaskId) -> list[dict]:
         return self.rpc_messages.get(task_id, [])
@@ -1,5 +1,6 @@
 # Local task broker
 LOCAL_TASK_BROKER_WS_PATH = "/runners/_ws"
+LOCAL_TASK_BROKER_AUTH_PATH = "/runners/auth"
 
 # Timing
 TASK_RESPONSE_WAIT = 3
@@ -1,6 +1,9 @@
+import time
+
 import pytest_asyncio
 from src.message_types.broker import Items
 from src.message_serde import NODE_MODE_MAP
+from src.nanoid import nanoid
 
 from tests.fixtures.local_task_broker import LocalTaskBroker
 from tests.fixtures.task_runner_manager import TaskRunnerManager
@@ -68,18 +71,95 @@ async def manager_with_env_access_allowed(broker):
     await manager.stop()
 
 
+@pytest_asyncio.fixture
+async def manager_with_processes(broker):
+    manager = TaskRunnerManager(
+        task_broker_url=broker.get_url(),
+        custom_env={
+            "N8N_RUNNERS_PROCESSES": "2",
+            "N8N_RUNNERS_AUTH_TOKEN": "test_auth_token",
+        },
+    )
+    await manager.start()
+    yield manager
+    await manager.stop()
+
+
+@pytest_asyncio.fixture
+async def manager_with_worker_pool(broker):
+    manager = TaskRunnerManager(
+        task_broker_url=broker.get_url(),
+        custom_env={
+            "N8N_RUNNERS_WORKER_POOL_ENABLED": "true",
+            "N8N_RUNNERS_WORKER_MAX_TASKS": "5",
+            "N8N_RUNNERS_STDLIB_ALLOW": "json,sys",
+            "N8N_RUNNERS_LAUNCHER_LOG_LEVEL": "DEBUG",
+        },
+    )
+    await manager.start()
+    yield manager
+    await manager.stop()
+
+
+@pytest_asyncio.fixture
+async def manager_with_per_item_chunks(broker):
+    manager = TaskRunnerManager(
+        task_broker_url=broker.get_url(),
+        custom_env={
+            "N8N_RUNNERS_PER_ITEM_PARALLEL_MIN_ITEMS": "4",
+            "N8N_RUNNERS_PER_ITEM_PARALLEL_PROCESSES": "3",
+        },
+    )
+    await manager.start()
+    yield manager
+    await manager.stop()
+
+
+@pytest_asyncio.fixture
+async def manager_with_profiling(broker):
+    manager = TaskRunnerManager(
+        task_broker_url=broker.get_url(),
+        custom_env={
+            "N8N_RUNNERS_PROFILE_WORKFLOWS": "profiled-workflow",
+            "N8N_RUNNERS_PROFILE_TOP": "5",
+        },
+    )
+    await manager.start()
+    yield manager
+    await manager.stop()
+
+
+@pytest_asyncio.fixture
+async def manager_with_resource_limits(broker):
+    manager = TaskRunnerManager(
+        task_broker_url=broker.get_url(),
+        custom_env={
+            "N8N_RUNNERS_MAX_MEMORY_MB": "256",
+            "N8N_RUNNERS_TASK_MAX_MEMORY_MB": "1024",
+            "N8N_RUNNERS_TASK_MAX_CPU_SECONDS": "1",
+        },
+    )
+    await manager.start()
+    yield manager
+    await manager.stop()
+
+
 def create_task_settings(
     code: str,
     node_mode: str,
     items: Items | None = None,
     continue_on_fail: bool = False,
+    workflow_id: str | None = None,
 ):
-    return {
+    task_settings = {
         "code": code,
         "nodeMode": NODE_MODE_TO_BROKER_STYLE[node_mode],
         "items": items if items is not None else [],
         "continueOnFail": continue_on_fail,
     }
+    if workflow_id is not None:
+        task_settings["workflowId"] = workflow_id
+    return task_settings
 
 
 async def wait_for_task_done(broker, task_id: str, timeout: float = TASK_RESPONSE_WAIT):
@@ -106,3 +186,19 @@ def get_browser_console_msgs(broker: LocalTaskBroker, task_id: str) -> list[list
         if msg.get("method") == "logNodeOutput":
             console_msgs.append(msg.get("params", []))
     return console_msgs
+
+
+async def measure_throughput(
+    broker: LocalTaskBroker, task_settings: dict, count: int
+) -> float:
+    """Run `count` tasks one after another and return completed tasks per second."""
+
+    started_at = time.perf_counter()
+
+    for _ in range(count):
+        task_id = nanoid()
+        await broker.send_task(task_id=task_id, task_settings=task_settings)
+        done = await wait_for_task_done(broker, task_id)
+        assert done is not None, f"Task {task_id} did not complete"
+
+    return count / (time.perf_counter() - started_at)
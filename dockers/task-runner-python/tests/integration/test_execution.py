@@ -6,6 +6,7 @@ from src.nanoid import nanoid
 
 from tests.integration.conftest import (
     create_task_settings,
+    get_browser_console_msgs,
     wait_for_task_done,
     wait_for_task_error,
 )
@@ -75,6 +76,26 @@ async def test_all_items_with_continue_on_fail(broker, manager):
     assert "Intentional error" in str(done_msg["data"]["result"][0]["json"]["error"])
 
 
+@pytest.mark.asyncio
+async def test_all_items_with_large_payload(broker, manager):
+    task_id = nanoid()
+    # over one result chunk, so the result streams in several
+    items = [{"json": {"index": i, "data": "x" * 1024}} for i in range(6000)]
+    code = "return [{'index': item['json']['index'], 'data': item['json']['data']} for item in _items]"
+    task_settings = create_task_settings(code=code, node_mode="all_items", items=items)
+    await broker.send_task(task_id=task_id, task_settings=task_settings)
+
+    done_msg = await wait_for_task_done(broker, task_id)
+
+    assert done_msg["data"]["result"] == [item["json"] for item in items]
+
+    await asyncio.sleep(0.2)
+    assert any(
+        f"Completed task {task_id}" in line and "peak memory" in line
+        for line in manager.stdout_buffer
+    )
+
+
 # ========== per_item mode ==========
 
 
@@ -185,6 +206,83 @@ async def test_per_item_with_continue_on_fail(broker, manager):
     assert "division by zero" in done_msg["data"]["result"][0]["json"]["error"]
 
 
+@pytest.mark.asyncio
+async def test_per_item_globals_do_not_carry_over_between_items(broker, manager):
+    task_id = nanoid()
+    items = [{"json": {}} for _ in range(3)]
+    code = textwrap.dedent("""
+        global n
+        try:
+            n += 1
+        except NameError:
+            n = 1
+        return {'n': n}
+    """)
+    task_settings = create_task_settings(code=code, node_mode="per_item", items=items)
+    await broker.send_task(task_id=task_id, task_settings=task_settings)
+
+    done_msg = await wait_for_task_done(broker, task_id)
+
+    assert [item["json"]["n"] for item in done_msg["data"]["result"]] == [1, 1, 1]
+
+
+@pytest.mark.asyncio
+async def test_per_item_in_chunks_keeps_order_and_paired_items(
+    broker, manager_with_per_item_chunks
+):
+    task_id = nanoid()
+    items = [{"json": {"value": i}} for i in range(10)]
+    code = textwrap.dedent("""
+        value = _item['json']['value']
+        if value % 3 == 0:
+            return None
+        print(value)
+        return {'value': value}
+    """)
+    task_settings = create_task_settings(code=code, node_mode="per_item", items=items)
+    await broker.send_task(task_id=task_id, task_settings=task_settings)
+
+    done_msg = await wait_for_task_done(broker, task_id)
+
+    assert done_msg["data"]["result"] == [
+        {"json": {"value": i}, "pairedItem": {"item": i}}
+        for i in range(10)
+        if i % 3 != 0
+    ]
+    [[printed]] = get_browser_console_msgs(broker, task_id)
+    assert printed.split("\n") == [str(i) for i in range(10) if i % 3 != 0]
+
+
+@pytest.mark.asyncio
+async def test_per_item_in_chunks_with_error(broker, manager_with_per_item_chunks):
+    task_id = nanoid()
+    items = [{"json": {"value": i}} for i in range(6)]
+    code = "return {'result': 100 / (_item['json']['value'] - 4)}"
+    task_settings = create_task_settings(code=code, node_mode="per_item", items=items)
+    await broker.send_task(task_id=task_id, task_settings=task_settings)
+
+    error_msg = await wait_for_task_error(broker, task_id)
+
+    assert "division by zero" in error_msg["error"]["message"]
+
+
+@pytest.mark.asyncio
+async def test_per_item_below_chunk_threshold(broker, manager_with_per_item_chunks):
+    task_id = nanoid()
+    items = [{"json": {"value": i}} for i in range(3)]
+    code = "return {'value': _item['json']['value']}"
+    task_settings = create_task_settings(code=code, node_mode="per_item", items=items)
+    await broker.send_task(task_id=task_id, task_settings=task_settings)
+
+    done_msg = await wait_for_task_done(broker, task_id)
+
+    assert [item["pairedItem"]["item"] for item in done_msg["data"]["result"]] == [
+        0,
+        1,
+        2,
+    ]
+
+
 # ========== Security ===========
 
 
@@ -5,7 +5,7 @@ import aiohttp
 import pytest
 from src.nanoid import nanoid
 
-from tests.integration.conftest import create_task_settings
+from tests.integration.conftest import create_task_settings, wait_for_task_done
 
 
 @pytest.mark.asyncio
@@ -38,3 +38,97 @@ async def test_health_check_server_ressponds_mid_execution(broker, manager):
         response = await session.get(manager.get_health_check_url())
         assert response.status == 200
         assert await response.text() == "OK"
+
+
+@pytest.mark.asyncio
+async def test_health_check_server_reports_stats(broker, manager):
+    for _ in range(2):
+        task_id = nanoid()
+        task_settings = create_task_settings(
+            code="return [{'ok': True}]", node_mode="all_items"
+        )
+        await broker.send_task(task_id=task_id, task_settings=task_settings)
+        await wait_for_task_done(broker, task_id)
+
+    async with aiohttp.ClientSession() as session:
+        response = await session.get(f"{manager.get_health_check_url()}/stats")
+        assert response.status == 200
+        stats = await response.json()
+
+    assert stats["code_cache"]["hits"] == 1
+    assert stats["code_cache"]["misses"] == 1
+    assert stats["code_cache"]["hit_rate"] == 0.5
+
+
+@pytest.mark.asyncio
+async def test_health_check_server_reports_metrics(broker, manager):
+    task_id = nanoid()
+    task_settings = create_task_settings(
+        code="return [{'ok': True}]", node_mode="all_items"
+    )
+    await broker.send_task(task_id=task_id, task_settings=task_settings)
+    await wait_for_task_done(broker, task_id)
+
+    async with aiohttp.ClientSession() as session:
+        response = await session.get(f"{manager.get_health_check_url()}/metrics")
+        assert response.status == 200
+        assert response.content_type == "text/plain"
+        metrics = await response.text()
+
+    lines = metrics.splitlines()
+    for gauge in (
+        "running_tasks",
+        "open_offers",
+        "validation_cache_hit_rate",
+        "code_cache_hit_rate",
+    ):
+        assert any(line.startswith(f"n8n_runner_{gauge} ") for line in lines), gauge
+    for histogram in (
+        "offer_accept_seconds",
+        "accept_settings_seconds",
+        "validation_seconds",
+        "process_spawn_seconds",
+        "execution_seconds",
+        "pipe_transfer_seconds",
+        "pipe_transfer_bytes",
+        "pipe_transfer_bytes_per_second",
+        "task_peak_rss_bytes",
+    ):
+        assert f"n8n_runner_{histogram}_count 1" in lines, histogram
+    assert "n8n_runner_websocket_send_seconds_count 0" not in lines
+
+
+@pytest.mark.asyncio
+async def test_health_check_server_reports_profiles(broker, manager_with_profiling):
+    code = textwrap.dedent("""
+        def slow_square(n):
+            return sum(n for _ in range(20_000))
+
+        return [{"square": slow_square(item["json"]["n"])} for item in _items]
+    """)
+    items = [{"json": {"n": n}} for n in range(10)]
+
+    for workflow_id in ["profiled-workflow", "other-workflow"]:
+        task_id = nanoid()
+        task_settings = create_task_settings(
+            code=code, node_mode="all_items", items=items, workflow_id=workflow_id
+        )
+        await broker.send_task(task_id=task_id, task_settings=task_settings)
+        done = await wait_for_task_done(broker, task_id)
+        assert done is not None
+
+    async with aiohttp.ClientSession() as session:
+        response = await session.get(
+            f"{manager_with_profiling.get_health_check_url()}/profiles"
+        )
+        assert response.status == 200
+        profiles = await response.json()
+
+    assert len(profiles) == 1
+    assert profiles[0]["workflow_id"] == "profiled-workflow"
+    assert profiles[0]["exec_seconds"] > 0
+
+    functions = profiles[0]["functions"]
+    assert len(functions) == 5
+    slow_square = next(f for f in functions if f["function"].startswith("slow_square"))
+    assert slow_square["calls"] == 10
@@ -0,0 +1,60 @@
+import asyncio
+import textwrap
+
+import pytest
+from src.constants import DEFAULT_MAX_CONCURRENCY, OFFER_INTERVAL, OFFER_VALIDITY
+from src.nanoid import nanoid
+
+from tests.integration.conftest import create_task_settings, wait_for_task_done
+
+
+def get_offer_ids(broker) -> set[str]:
+    return {msg["offerId"] for msg in broker.get_messages_of_type("runner:taskoffer")}
+
+
+async def wait_for_initial_offers(broker) -> set[str]:
+    await broker.wait_for_msg(
+        "runner:taskoffer",
+        predicate=lambda _: len(get_offer_ids(broker)) >= DEFAULT_MAX_CONCURRENCY,
+    )
+    return get_offer_ids(broker)
+
+
+@pytest.mark.asyncio
+async def test_capacity_is_reoffered_when_task_finishes(broker, manager):
+    task_id = nanoid()
+    code = textwrap.dedent("""
+        return [{"done": True}]
+    """)
+    task_settings = create_task_settings(code=code, node_mode="all_items")
+    offer_ids = await wait_for_initial_offers(broker)
+    await broker.send_task(task_id=task_id, task_settings=task_settings)
+
+    done_msg = await wait_for_task_done(broker, task_id)
+    assert done_msg is not None
+
+    offer = await broker.wait_for_msg(
+        "runner:taskoffer",
+        timeout=OFFER_INTERVAL * 2,
+        predicate=lambda msg: msg["offerId"] not in offer_ids,
+    )
+    assert offer is not None
+
+    latency = broker.get_receive_time(offer) - broker.get_receive_time(done_msg)
+    print(f"\nRe-offer latency after task done: {latency * 1000:.1f}ms")
+
+    assert latency < 0.05
+
+
+@pytest.mark.asyncio
+async def test_idle_runner_sends_no_extra_offers(broker, manager):
+    await wait_for_initial_offers(broker)
+
+    # well within the validity of the first offers
+    await asyncio.sleep(OFFER_VALIDITY / 1000 / 2)
+
+    offers = broker.get_messages_of_type("runner:taskoffer")
+
+    print(f"\nOffers sent while idle: {len(offers)}")
+
+    assert len(offers) == DEFAULT_MAX_CONCURRENCY
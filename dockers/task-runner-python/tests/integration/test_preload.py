@@ -0,0 +1,75 @@
+import asyncio
+import textwrap
+
+import pytest
+import pytest_asyncio
+from src.nanoid import nanoid
+
+from tests.fixtures.task_runner_manager import TaskRunnerManager
+from tests.integration.conftest import create_task_settings, wait_for_task_done
+
+
+@pytest_asyncio.fixture
+async def manager_with_preload(broker):
+    manager = TaskRunnerManager(
+        task_broker_url=broker.get_url(),
+        custom_env={
+            "N8N_RUNNERS_STDLIB_ALLOW": "json,statistics,sys",
+            "N8N_RUNNERS_PRELOAD_MODULES": "statistics",
+        },
+    )
+    await manager.start()
+    yield manager
+    await manager.stop()
+
+
+async def wait_for_stdout(manager: TaskRunnerManager, text: str, timeout=5.0):
+    for _ in range(int(timeout / 0.1)):
+        if any(text in line for line in manager.stdout_buffer):
+            return
+        await asyncio.sleep(0.1)
+    raise TimeoutError(f"'{text}' not logged. Stdout: {manager.stdout_buffer}")
+
+
+@pytest.mark.asyncio
+async def test_preload_is_reported(broker, manager_with_preload):
+    await wait_for_stdout(manager_with_preload, "Preloaded 1 modules into forkserver")
+
+    line = next(
+        line
+        for line in manager_with_preload.stdout_buffer
+        if "Preloaded 1 modules" in line
+    )
+    assert line.endswith(": statistics")
+
+
+@pytest.mark.asyncio
+async def test_preloaded_module_is_usable(broker, manager_with_preload):
+    task_id = nanoid()
+    code = textwrap.dedent("""
+        import statistics
+        return [{"median": statistics.median([1, 3, 2])}]
+    """)
+    task_settings = create_task_settings(code=code, node_mode="all_items")
+    await broker.send_task(task_id=task_id, task_settings=task_settings)
+
+    result = await wait_for_task_done(broker, task_id)
+
+    assert result["data"]["result"] == [{"median": 2}]
+
+
+@pytest.mark.asyncio
+async def test_preload_does_not_widen_imports(broker, manager_with_preload):
+    task_id = nanoid()
+    code = textwrap.dedent("""
+        import sys
+        return [{"has_fractions": "fractions" in sys.modules}]
+    """)
+    task_settings = create_task_settings(code=code, node_mode="all_items")
+    await broker.send_task(task_id=task_id, task_settings=task_settings)
+
+    result = await wait_for_task_done(broker, task_id)
+
+    # statistics imports fractions in the forkserver, but fractions is not
+    # allowlisted so it is dropped from sys.modules before user code runs
+    assert result["data"]["result"] == [{"has_fractions": False}]
@@ -0,0 +1,70 @@
+import textwrap
+
+import pytest
+from src.nanoid import nanoid
+
+from tests.integration.conftest import (
+    create_task_settings,
+    wait_for_task_done,
+    wait_for_task_error,
+)
+
+
+@pytest.mark.asyncio
+async def test_task_within_budget_runs(broker, manager_with_resource_limits):
+    task_id = nanoid()
+    items = [{"json": {"value": i}} for i in range(100)]
+    code = "return [{'count': len(_items)}]"
+    task_settings = create_task_settings(code=code, node_mode="all_items", items=items)
+    await broker.send_task(task_id=task_id, task_settings=task_settings)
+
+    done_msg = await wait_for_task_done(broker, task_id)
+
+    assert done_msg["data"]["result"] == [{"count": 100}]
+
+
+@pytest.mark.asyncio
+async def test_task_over_memory_budget_fails(broker, manager_with_resource_limits):
+    task_id = nanoid()
+    # ~80 MB payload, estimated at four times that
+    items = [{"json": {"value": "x" * 1_000_000}} for _ in range(80)]
+    code = "return _items"
+    task_settings = create_task_settings(code=code, node_mode="all_items", items=items)
+    await broker.send_task(task_id=task_id, task_settings=task_settings)
+
+    error_msg = await wait_for_task_error(broker, task_id)
+
+    assert error_msg is not None
+    assert "budget of 256 MB" in error_msg["error"]["message"]
+
+
+@pytest.mark.asyncio
+async def test_task_over_cpu_limit_fails(broker, manager_with_resource_limits):
+    task_id = nanoid()
+    code = textwrap.dedent("""
+        while True:
+            pass
+    """)
+    task_settings = create_task_settings(code=code, node_mode="all_items")
+    await broker.send_task(task_id=task_id, task_settings=task_settings)
+
+    error_msg = await wait_for_task_error(broker, task_id)
+
+    assert error_msg is not None
+    assert "CPU time limit" in error_msg["error"]["message"]
+
+
+@pytest.mark.asyncio
+async def test_task_over_memory_limit_fails(broker, manager_with_resource_limits):
+    task_id = nanoid()
+    code = textwrap.dedent("""
+        data = bytearray(2 * 1024 * 1024 * 1024)
+        return [{"size": len(data)}]
+    """)
+    task_settings = create_task_settings(code=code, node_mode="all_items")
+    await broker.send_task(task_id=task_id, task_settings=task_settings)
+
+    error_msg = await wait_for_task_error(broker, task_id)
+
+    assert error_msg is not None
+    assert "MemoryError" in error_msg["error"]["message"]
@@ -32,25 +32,15 @@ async def test_print_basic_types(broker, manager):
 
     msgs = get_browser_console_msgs(broker, task_id)
 
-    assert len(msgs) > 0, "Should have captured console messages"
-
-    all_args = []
-    for msg in msgs:
-        all_args.extend(msg)
-
-    expected = [
+    assert len(msgs) == 1, "Print calls should be sent in one RPC"
+    assert msgs[0][0].split("\n") == [
         "'Hello, World!'",
         "42",
         "3.14",
         "True",
         "None",
-        "'Multiple'",
-        "'args'",
-        "123",
-        "False",
+        "'Multiple' 'args' 123 False",
     ]
-    for item in expected:
-        assert item in all_args, f"Expected '{item}' not found in console output"
 
 
 @pytest.mark.asyncio
@@ -0,0 +1,82 @@
+import asyncio
+import os
+import signal
+
+import aiohttp
+import pytest
+from src.nanoid import nanoid
+
+from tests.integration.conftest import create_task_settings, wait_for_task_done
+
+
+async def get_stats(manager) -> dict:
+    async with aiohttp.ClientSession() as session:
+        response = await session.get(f"{manager.get_health_check_url()}/stats")
+        assert response.status == 200
+        return await response.json()
+
+
+async def wait_for_processes(manager, predicate, timeout: float = 10.0) -> dict:
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+
+    while True:
+        stats = await get_stats(manager)
+        if predicate(stats) or loop.time() > deadline:
+            return stats
+        await asyncio.sleep(0.1)
+
+
+def all_serving(stats: dict) -> bool:
+    return all(process["stats"] for process in stats["processes"])
+
+
+@pytest.mark.asyncio
+async def test_supervisor_runs_tasks_on_all_processes(broker, manager_with_processes):
+    stats = await wait_for_processes(manager_with_processes, all_serving)
+
+    assert stats["running_processes"] == 2
+    assert broker.grant_tokens_issued == 2
+    runner_ids = {process["stats"]["runner_id"] for process in stats["processes"]}
+    assert len(runner_ids) == 2
+
+    task_ids = [nanoid() for _ in range(4)]
+    for task_id in task_ids:
+        task_settings = create_task_settings(
+            code="return [{'ok': True}]", node_mode="all_items"
+        )
+        await broker.send_task(task_id=task_id, task_settings=task_settings)
+
+    for task_id in task_ids:
+        done = await wait_for_task_done(broker, task_id)
+        assert done is not None
+        assert done["data"]["result"] == [{"ok": True}]
+
+    async with aiohttp.ClientSession() as session:
+        response = await session.get(
+            f"{manager_with_processes.get_health_check_url()}/metrics"
+        )
+        metrics = await response.text()
+
+    lines = metrics.splitlines()
+    assert lines.count("# TYPE n8n_runner_running_tasks gauge") == 1
+    assert 'n8n_runner_running_tasks{process="0"} 0' in lines
+    assert 'n8n_runner_running_tasks{process="1"} 0' in lines
+
+
+@pytest.mark.asyncio
+async def test_supervisor_restarts_crashed_process(broker, manager_with_processes):
+    stats = await wait_for_processes(manager_with_processes, all_serving)
+    crashed_pid = stats["processes"][0]["pid"]
+
+    os.kill(crashed_pid, signal.SIGKILL)
+
+    stats = await wait_for_processes(
+        manager_with_processes,
+        lambda stats: stats["processes"][0]["restarts"] == 1 and all_serving(stats),
+    )
+
+    assert stats["processes"][0]["restarts"] == 1
+    assert stats["processes"][0]["pid"] != crashed_pid
+    assert stats["running_processes"] == 2
+    assert broker.grant_tokens_issued == 3
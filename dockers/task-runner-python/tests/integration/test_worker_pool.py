@@ -0,0 +1,152 @@
+import asyncio
+import textwrap
+
+import pytest
+from src.nanoid import nanoid
+
+from tests.integration.conftest import (
+    create_task_settings,
+    measure_throughput,
+    wait_for_task_done,
+    wait_for_task_error,
+)
+from tests.fixtures.test_constants import TASK_TIMEOUT
+
+THROUGHPUT_TASK_COUNT = 20
+
+
+async def run_task(broker, code: str, node_mode="all_items", items=None):
+    task_id = nanoid()
+    task_settings = create_task_settings(code=code, node_mode=node_mode, items=items)
+    await broker.send_task(task_id=task_id, task_settings=task_settings)
+    return task_id
+
+
+@pytest.mark.asyncio
+async def test_pool_runs_tasks_in_both_modes(broker, manager_with_worker_pool):
+    task_id = await run_task(broker, "return [{'sum': sum(range(10))}]")
+    result = await wait_for_task_done(broker, task_id)
+    assert result["data"]["result"] == [{"sum": 45}]
+
+    items = [{"json": {"n": 1}}, {"json": {"n": 2}}]
+    task_id = await run_task(
+        broker, "return {'n': _item['json']['n'] * 2}", "per_item", items
+    )
+    result = await wait_for_task_done(broker, task_id)
+    assert result["data"]["result"] == [
+        {"json": {"n": 2}, "pairedItem": {"item": 0}},
+        {"json": {"n": 4}, "pairedItem": {"item": 1}},
+    ]
+
+
+@pytest.mark.asyncio
+async def test_pool_passes_large_payloads_as_memfds(broker, manager_with_worker_pool):
+    items = [{"json": {"index": i, "data": "x" * 1024}} for i in range(2000)]
+
+    # twice, so the second task runs on a reused worker
+    for _ in range(2):
+        task_id = await run_task(
+            broker, "return [item['json'] for item in _items]", items=items
+        )
+        result = await wait_for_task_done(broker, task_id)
+        assert result["data"]["result"] == [item["json"] for item in items]
+
+
+@pytest.mark.asyncio
+async def test_pool_reuses_workers(broker, manager_with_worker_pool):
+    # fixture recycles workers after 5 tasks
+    for _ in range(5):
+        task_id = await run_task(broker, "return [{'ok': True}]")
+        result = await wait_for_task_done(broker, task_id)
+        assert result["data"]["result"] == [{"ok": True}]
+
+    await asyncio.sleep(0.2)
+    assert any(
+        "after 5 tasks (max_tasks)" in line
+        for line in manager_with_worker_pool.stdout_buffer
+    )
+
+
+@pytest.mark.asyncio
+async def test_user_errors_are_reported(broker, manager_with_worker_pool):
+    task_id = await run_task(broker, "raise ValueError('Intentional error')")
+    error_msg = await wait_for_task_error(broker, task_id)
+    assert "Intentional error" in str(error_msg["error"]["message"])
+
+    task_id = await run_task(broker, "return [{'ok': True}]")
+    result = await wait_for_task_done(broker, task_id)
+    assert result["data"]["result"] == [{"ok": True}]
+
+
+@pytest.mark.asyncio
+async def test_state_change_recycles_worker(broker, manager_with_worker_pool):
+    code = textwrap.dedent("""
+        import json
+        json.leaked = "secret"
+        return [{"ok": True}]
+    """)
+    task_id = await run_task(broker, code)
+    await wait_for_task_done(broker, task_id)
+
+    code = textwrap.dedent("""
+        import json
+        try:
+            json.leaked
+            leaked = True
+        except AttributeError:
+            leaked = False
+        return [{"leaked": leaked}]
+    """)
+    for _ in range(5):
+        task_id = await run_task(broker, code)
+        result = await wait_for_task_done(broker, task_id)
+        assert result["data"]["result"] == [{"leaked": False}]
+
+    assert any(
+        "(state_changed)" in line for line in manager_with_worker_pool.stdout_buffer
+    )
+
+
+@pytest.mark.asyncio
+async def test_timeout_kills_worker(broker, manager_with_worker_pool):
+    task_id = await run_task(broker, "while True: pass")
+    error_msg = await wait_for_task_error(broker, task_id, timeout=TASK_TIMEOUT + 2)
+    assert "timed out" in error_msg["error"]["message"].lower()
+
+    task_id = await run_task(broker, "return [{'ok': True}]")
+    result = await wait_for_task_done(broker, task_id)
+    assert result["data"]["result"] == [{"ok": True}]
+
+
+@pytest.mark.asyncio
+async def test_cancel_kills_worker(broker, manager_with_worker_pool):
+    task_id = await run_task(broker, "while True: pass")
+    await asyncio.sleep(0.5)
+    await broker.cancel_task(task_id, reason="Cancelled by user")
+
+    error_msg = await wait_for_task_error(broker, task_id)
+    assert "cancelled" in error_msg["error"]["message"].lower()
+
+    task_id = await run_task(broker, "return [{'ok': True}]")
+    result = await wait_for_task_done(broker, task_id)
+    assert result["data"]["result"] == [{"ok": True}]
+
+
+@pytest.mark.asyncio
+async def test_pool_throughput(broker, manager_with_worker_pool):
+    task_settings = create_task_settings(
+        code="return [{'ok': True}]", node_mode="all_items"
+    )
+    throughput = await measure_throughput(broker, task_settings, THROUGHPUT_TASK_COUNT)
+    print(f"Worker pool throughput: {throughput:.1f} tasks/s")
+    assert throughput > 0
+
+
+@pytest.mark.asyncio
+async def test_process_per_task_throughput(broker, manager):
+    task_settings = create_task_settings(
+        code="return [{'ok': True}]", node_mode="all_items"
+    )
+    throughput = await measure_throughput(broker, task_settings, THROUGHPUT_TASK_COUNT)
+    print(f"Process-per-task throughput: {throughput:.1f} tasks/s")
+    assert throughput > 0
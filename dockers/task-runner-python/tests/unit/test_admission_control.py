@@ -0,0 +1,120 @@
+import asyncio
+from unittest.mock import patch
+
+import pytest
+
+from src.admission_control import AdmissionControl
+from src.errors import TaskCancelledError, TaskMemoryBudgetError
+
+MB = 1024 * 1024
+
+
+@pytest.fixture(autouse=True)
+def runner_rss():
+    with patch("src.admission_control._current_rss_bytes", return_value=20 * MB):
+        yield
+
+
+class TestAdmissionControl:
+    @pytest.mark.asyncio
+    async def test_disabled_without_budget(self):
+        admission = AdmissionControl(budget_mb=0)
+
+        await admission.reserve("task-1", 10_000 * MB, timeout=1)
+
+        assert admission.reservations == {}
+        assert admission.has_headroom()
+
+    @pytest.mark.asyncio
+    async def test_reserves_and_releases(self):
+        admission = AdmissionControl(budget_mb=100)
+
+        await admission.reserve("task-1", 30 * MB, timeout=1)
+        await admission.reserve("task-2", 30 * MB, timeout=1)
+        assert admission.reserved_bytes == 60 * MB
+        assert admission.has_headroom()
+
+        admission.release("task-1")
+        assert admission.reservations == {"task-2": 30 * MB}
+
+    @pytest.mark.asyncio
+    async def test_rejects_task_larger_than_budget(self):
+        admission = AdmissionControl(budget_mb=100)
+
+        with pytest.raises(TaskMemoryBudgetError, match="budget of 100 MB"):
+            await admission.reserve("task-1", 101 * MB, timeout=1)
+
+        assert admission.tasks_rejected == 1
+
+    @pytest.mark.asyncio
+    async def test_first_task_is_admitted_despite_runner_rss(self):
+        admission = AdmissionControl(budget_mb=100)
+
+        await admission.reserve("task-1", 90 * MB, timeout=1)
+
+        assert admission.reservations == {"task-1": 90 * MB}
+        assert not admission.has_headroom()
+
+    @pytest.mark.asyncio
+    async def test_queues_until_memory_is_released(self):
+        admission = AdmissionControl(budget_mb=100)
+        await admission.reserve("task-1", 60 * MB, timeout=1)
+
+        queued = asyncio.create_task(admission.reserve("task-2", 60 * MB, timeout=1))
+        await asyncio.sleep(0.01)
+        assert not queued.done()
+        assert admission.queued_tasks == 1
+
+        admission.release("task-1")
+        await queued
+
+        assert admission.reservations == {"task-2": 60 * MB}
+        assert (admission.queued_tasks, admission.tasks_queued) == (0, 1)
+
+    @pytest.mark.asyncio
+    async def test_queue_times_out(self):
+        admission = AdmissionControl(budget_mb=100)
+        await admission.reserve("task-1", 60 * MB, timeout=1)
+
+        with pytest.raises(TaskMemoryBudgetError, match="waited too long"):
+            await admission.reserve("task-2", 60 * MB, timeout=0.01)
+
+        assert admission.reservations == {"task-1": 60 * MB}
+        assert admission.tasks_rejected == 1
+
+    @pytest.mark.asyncio
+    async def test_resident_bytes_are_not_reserved_twice(self):
+        admission = AdmissionControl(budget_mb=100)
+        await admission.reserve("task-1", 30 * MB, timeout=1)
+
+        # RSS of 20 MB already holds task-2's 10 MB of settings
+        await admission.reserve("task-2", 60 * MB, timeout=1, resident_bytes=10 * MB)
+
+        assert admission.reservations == {"task-1": 30 * MB, "task-2": 50 * MB}
+        assert admission.tasks_queued == 0
+
+    @pytest.mark.asyncio
+    async def test_cancel_stops_queued_task(self):
+        admission = AdmissionControl(budget_mb=100)
+        await admission.reserve("task-1", 60 * MB, timeout=1)
+
+        queued = asyncio.create_task(admission.reserve("task-2", 60 * MB, timeout=5))
+        await asyncio.sleep(0.01)
+        admission.cancel("task-2")
+
+        with pytest.raises(TaskCancelledError):
+            await asyncio.wait_for(queued, timeout=1)
+
+        assert admission.reservations == {"task-1": 60 * MB}
+        assert admission.queued_tasks == 0
+        assert not admission.waiting and not admission.cancelled
+
+    @pytest.mark.asyncio
+    async def test_cancel_ignores_task_not_waiting(self):
+        admission = AdmissionControl(budget_mb=100)
+        await admission.reserve("task-1", 60 * MB, timeout=1)
+
+        admission.cancel("task-1")
+
+        assert not admission.cancelled
+        assert admission.reservations == {"task-1": 60 * MB}
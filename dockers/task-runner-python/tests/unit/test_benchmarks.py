@@ -0,0 +1,76 @@
+import pytest
+
+from benchmarks.run_benchmarks import (
+    build_scenarios,
+    compare,
+    parse_metrics,
+    percentile,
+    phase_means,
+)
+from src.metrics import Metrics
+
+
+def result(tasks_per_second: float, p95: float) -> dict:
+    return {"tasks_per_second": tasks_per_second, "latency_seconds": {"p95": p95}}
+
+
+class TestPercentile:
+    def test_interpolates_between_values(self):
+        values = [4.0, 1.0, 3.0, 2.0]
+
+        assert percentile(values, 0) == 1.0
+        assert percentile(values, 50) == 2.5
+        assert percentile(values, 100) == 4.0
+
+    def test_single_value(self):
+        assert percentile([7.0], 99) == 7.0
+
+
+class TestPhaseMeans:
+    def test_means_over_observations_between_snapshots(self):
+        metrics = Metrics()
+        metrics.execution_seconds.observe(1.0)
+        before = parse_metrics(metrics.render(gauges=[]))
+
+        metrics.execution_seconds.observe(0.2)
+        metrics.execution_seconds.observe(0.4)
+        after = parse_metrics(metrics.render(gauges=[]))
+
+        means = phase_means(before, after)
+
+        assert means["execution"] == pytest.approx(0.3)
+        assert "process_spawn" not in means
+
+
+class TestCompare:
+    def test_reports_regressions_beyond_threshold(self):
+        baseline = {
+            "scenarios": {
+                "slower": result(100.0, 0.010),
+                "steady": result(100.0, 0.010),
+            }
+        }
+        current = {
+            "scenarios": {
+                "slower": result(80.0, 0.015),
+                "steady": result(95.0, 0.0105),
+                "new": result(1.0, 1.0),
+            }
+        }
+
+        regressions = compare(baseline, current, threshold=0.1)
+
+        assert len(regressions) == 2
+        assert all(regression.startswith("slower:") for regression in regressions)
+
+
+class TestScenarios:
+    def test_names_are_unique(self):
+        names = [scenario.name for scenario in build_scenarios(quick=False)]
+
+        assert len(names) == len(set(names))
+
+    def test_quick_skips_largest_payloads(self):
+        assert max(s.payload_bytes for s in build_scenarios(quick=True)) == (
+            10 * 1024 * 1024
+        )
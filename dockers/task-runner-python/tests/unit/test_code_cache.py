@@ -0,0 +1,90 @@
+import marshal
+import threading
+from unittest.mock import patch
+
+import pytest
+
+from src.code_cache import CodeCache
+from src.task_executor import TaskExecutor
+
+
+class TestCodeCache:
+    def test_compiles_wrapped_code_on_miss(self):
+        cache = CodeCache()
+
+        bytecode = cache.get("return [{'a': 1}]", "all_items")
+
+        assert bytecode is not None
+        namespace: dict = {}
+        exec(marshal.loads(bytecode), namespace)
+        assert namespace["__n8n_internal_user_output__"] == [{"a": 1}]
+        assert (cache.hits, cache.misses) == (0, 1)
+
+    def test_per_item_code_only_defines_function(self):
+        cache = CodeCache()
+
+        bytecode = cache.get("return {'v': _item}", "per_item")
+
+        assert bytecode is not None
+        namespace: dict = {"_item": None}
+        exec(marshal.loads(bytecode), namespace)
+        assert "__n8n_internal_user_output__" not in namespace
+        namespace["_item"] = 7
+        assert namespace["_user_function"]() == {"v": 7}
+
+    def test_hit_returns_same_bytecode(self):
+        cache = CodeCache()
+
+        first = cache.get("return []", "all_items")
+        second = cache.get("return []", "all_items")
+
+        assert first is second
+        assert (cache.hits, cache.misses) == (1, 1)
+        assert cache.hit_rate == 0.5
+
+    def test_node_mode_is_part_of_key(self):
+        cache = CodeCache()
+
+        cache.get("return []", "all_items")
+        cache.get("return []", "per_item")
+
+        assert cache.misses == 2
+
+    def test_syntax_error_is_not_cached(self):
+        cache = CodeCache()
+
+        assert cache.get("return [", "all_items") is None
+        assert cache.get_stats()["size"] == 0
+
+    def test_evicts_least_recently_used(self):
+        cache = CodeCache(max_size=2)
+
+        cache.get("return 1", "all_items")
+        cache.get("return 2", "all_items")
+        cache.get("return 1", "all_items")  # refresh
+        cache.get("return 3", "all_items")  # evicts "return 2"
+
+        cache.get("return 1", "all_items")
+        assert cache.hits == 2
+        cache.get("return 2", "all_items")
+        assert cache.misses == 4
+
+    @pytest.mark.asyncio
+    async def test_compiles_off_loop_on_miss_only(self):
+        cache = CodeCache()
+        loop_thread = threading.get_ident()
+        compile_threads = []
+        compile_code = TaskExecutor.compile_code
+
+        def record_thread(code, node_mode):
+            compile_threads.append(threading.get_ident())
+            return compile_code(code, node_mode)
+
+        with patch.object(TaskExecutor, "compile_code", side_effect=record_thread):
+            first = await cache.get_off_loop("return []", "all_items")
+            second = await cache.get_off_loop("return []", "all_items")
+
+        assert first is second
+        assert len(compile_threads) == 1
+        assert compile_threads[0] != loop_thread
+        assert (cache.hits, cache.misses) == (1, 1)
@@ -0,0 +1,92 @@
+import datetime
+
+import pytest
+
+from src import json_codec
+from src.json_codec import JsonCodec, OrjsonCodec
+
+CODECS = [
+    pytest.param(JsonCodec, id="json"),
+    pytest.param(
+        OrjsonCodec,
+        id="orjson",
+        marks=pytest.mark.skipif(not json_codec.orjson, reason="orjson not installed"),
+    ),
+]
+
+
+@pytest.fixture(params=CODECS)
+def codec(request) -> JsonCodec:
+    return request.param()
+
+
+class TestJsonCodec:
+    def test_round_trip(self, codec: JsonCodec):
+        value = {"json": {"name": "Zoë", "n": [1, 2.5, None, True]}}
+
+        encoded = codec.dumps(value)
+
+        assert isinstance(encoded, bytes)
+        assert codec.loads(encoded) == value
+        assert codec.loads(encoded.decode("utf-8")) == value
+
+    def test_encodes_compact_utf8(self, codec: JsonCodec):
+        assert codec.dumps({"a": ["é"]}) == '{"a":["é"]}'.encode("utf-8")
+
+    def test_encodes_unsupported_values_as_str(self, codec: JsonCodec):
+        at = datetime.datetime(2024, 1, 2, 3, 4, 5)
+        tags = {"a"}
+
+        assert codec.loads(codec.dumps({"at": at, "tags": tags})) == {
+            "at": str(at),
+            "tags": str(tags),
+        }
+
+    def test_encodes_float_subclasses_as_numbers(self, codec: JsonCodec):
+        class Price(float):
+            pass
+
+        assert codec.loads(codec.dumps([Price(1.5)])) == [1.5]
+
+    def test_encodes_int_keys_as_str(self, codec: JsonCodec):
+        assert codec.loads(codec.dumps({1: "a"})) == {"1": "a"}
+
+    def test_falls_back_for_big_ints(self, codec: JsonCodec):
+        assert codec.loads(codec.dumps([2**70])) == [2**70]
+
+    def test_encodes_non_finite_floats_as_null(self, codec: JsonCodec):
+        class Price(float):
+            pass
+
+        value = {
+            "a": [float("nan"), float("inf"), -float("inf")],
+            "b": (Price("nan"), 1.5),
+        }
+
+        assert codec.dumps(value) == b'{"a":[null,null,null],"b":[null,1.5]}'
+
+    def test_encodes_non_finite_floats_as_null_in_fallback(self, codec: JsonCodec):
+        assert codec.dumps([2**70, float("nan")]) == f"[{2**70},null]".encode()
+
+    def test_rejects_non_finite_constants(self, codec: JsonCodec):
+        with pytest.raises(ValueError):
+            codec.loads("[NaN]")
+
+    def test_circular_reference_raises(self, codec: JsonCodec):
+        value: list = []
+        value.append(value)
+
+        with pytest.raises(ValueError):
+            codec.dumps(value)
+
+    def test_decodes_memoryview(self, codec: JsonCodec):
+        assert codec.loads(memoryview(b'x[1,{"a":2}]x')[1:-1]) == [1, {"a": 2}]
+
+    def test_invalid_json_raises_value_error(self, codec: JsonCodec):
+        with pytest.raises(ValueError):
+            codec.loads("{not json")
+
+    def test_uses_orjson_if_installed(self):
+        expected = "orjson" if json_codec.orjson else "json"
+
+        assert json_codec.codec.name == expected
@@ -0,0 +1,61 @@
+import json
+
+from src.message_serde import MessageSerde
+from src.message_types.pipe import EncodedItems
+from src.message_types.runner import RunnerRpcCall, RunnerTaskDone
+
+
+class TestSerializeTaskDone:
+    def test_splices_encoded_items(self):
+        result = EncodedItems(
+            chunks=[b'{"json": {"a": 1}},{"json": {"b": "\xc3\xa9"}}', b'{"json": {}}']
+        )
+        message = RunnerTaskDone(task_id="task-1", data={"result": result})
+
+        serialized = MessageSerde.serialize_runner_message(message)
+
+        assert json.loads(serialized) == {
+            "taskId": "task-1",
+            "type": "runner:taskdone",
+            "data": {
+                "result": [{"json": {"a": 1}}, {"json": {"b": "é"}}, {"json": {}}]
+            },
+        }
+
+    def test_empty_encoded_items(self):
+        message = RunnerTaskDone(task_id="task-1", data={"result": EncodedItems()})
+
+        serialized = MessageSerde.serialize_runner_message(message)
+
+        assert json.loads(serialized)["data"] == {"result": []}
+
+    def test_matches_plain_result(self):
+        items = [{"json": {"value": i}} for i in range(3)]
+        encoded = EncodedItems(chunks=[json.dumps(items)[1:-1].encode("utf-8")])
+
+        plain = MessageSerde.serialize_runner_message(
+            RunnerTaskDone(task_id="task-1", data={"result": items})
+        )
+        spliced = MessageSerde.serialize_runner_message(
+            RunnerTaskDone(task_id="task-1", data={"result": encoded})
+        )
+
+        assert json.loads(spliced) == json.loads(plain)
+
+
+class TestSerializeRunnerMessage:
+    def test_camel_cases_fields(self):
+        params = ["'a'\n'b'"]
+        message = RunnerRpcCall(
+            call_id="call-1", task_id="task-1", name="logNodeOutput", params=params
+        )
+
+        serialized = MessageSerde.serialize_runner_message(message)
+
+        assert json.loads(serialized) == {
+            "callId": "call-1",
+            "taskId": "task-1",
+            "name": "logNodeOutput",
+            "params": params,
+            "type": "runner:rpc",
+        }
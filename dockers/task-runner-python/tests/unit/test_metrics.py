@@ -0,0 +1,62 @@
+from src.metrics import Histogram, Metrics, merge_metrics
+
+
+class TestHistogram:
+    def test_renders_cumulative_buckets(self):
+        histogram = Histogram("test_seconds", "Test latency.", (0.1, 1))
+
+        for value in (0.05, 0.1, 0.5, 2):
+            histogram.observe(value)
+
+        assert histogram.render() == [
+            "# HELP n8n_runner_test_seconds Test latency.",
+            "# TYPE n8n_runner_test_seconds histogram",
+            'n8n_runner_test_seconds_bucket{le="0.1"} 2',
+            'n8n_runner_test_seconds_bucket{le="1"} 3',
+            'n8n_runner_test_seconds_bucket{le="+Inf"} 4',
+            "n8n_runner_test_seconds_sum 2.65",
+            "n8n_runner_test_seconds_count 4",
+        ]
+
+
+class TestMetrics:
+    def test_renders_gauges_and_histograms(self):
+        metrics = Metrics()
+        metrics.execution_seconds.observe(0.2)
+
+        rendered = metrics.render(gauges=[("running_tasks", "Running tasks.", 3)])
+
+        assert rendered.endswith("\n")
+        lines = rendered.splitlines()
+        assert lines[:3] == [
+            "# HELP n8n_runner_running_tasks Running tasks.",
+            "# TYPE n8n_runner_running_tasks gauge",
+            "n8n_runner_running_tasks 3",
+        ]
+        assert "n8n_runner_execution_seconds_count 1" in lines
+        assert "n8n_runner_offer_accept_seconds_count 0" in lines
+
+
+class TestMergeMetrics:
+    def test_labels_samples_and_keeps_families_together(self):
+        histogram = Histogram("test_seconds", "Test latency.", (1,))
+        histogram.observe(0.5)
+        exposition = Metrics().render(gauges=[("running_tasks", "Running tasks.", 1)])
+        exposition += "\n".join(histogram.render()) + "\n"
+
+        lines = merge_metrics([("0", exposition), ("1", exposition)]).splitlines()
+
+        assert lines[:4] == [
+            "# HELP n8n_runner_running_tasks Running tasks.",
+            "# TYPE n8n_runner_running_tasks gauge",
+            'n8n_runner_running_tasks{process="0"} 1',
+            'n8n_runner_running_tasks{process="1"} 1',
+        ]
+        assert lines[-4:] == [
+            'n8n_runner_test_seconds_bucket{le="1",process="1"} 1',
+            'n8n_runner_test_seconds_bucket{le="+Inf",process="1"} 1',
+            'n8n_runner_test_seconds_sum{process="1"} 0.5',
+            'n8n_runner_test_seconds_count{process="1"} 1',
+        ]
+        assert 'n8n_runner_test_seconds_count{process="0"} 1' in lines
+        assert lines.count("# TYPE n8n_runner_test_seconds histogram") == 1
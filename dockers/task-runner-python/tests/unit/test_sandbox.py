@@ -0,0 +1,108 @@
+import os
+import sys
+import types
+
+import pytest
+
+from src import sandbox
+from src.config.security_config import SecurityConfig
+from src.errors import SecurityViolationError
+from src.sandbox import SandboxTemplate
+
+
+def security_config(
+    stdlib_allow: set[str] | None = None,
+    external_allow: set[str] | None = None,
+    builtins_deny: set[str] | None = None,
+) -> SecurityConfig:
+    return SecurityConfig(
+        stdlib_allow=stdlib_allow or set(),
+        external_allow=external_allow or set(),
+        builtins_deny=builtins_deny or set(),
+        runner_env_deny=False,
+    )
+
+
+@pytest.fixture
+def restore_sys_modules():
+    loaded = dict(sys.modules)
+    yield
+    sys.modules.clear()
+    sys.modules.update(loaded)
+
+
+class TestIsSafe:
+    def test_allowed_modules_and_their_submodules(self):
+        template = SandboxTemplate.build(security_config(stdlib_allow={"email.mime"}))
+
+        assert template.is_safe("email.mime")
+        assert template.is_safe("email.mime.text")
+        assert not template.is_safe("email")
+        assert not template.is_safe("email.mimetypes")
+
+    def test_external_wildcard_allows_everything_outside_stdlib(self):
+        template = SandboxTemplate.build(security_config(external_allow={"*"}))
+
+        assert template.is_safe("numpy")
+        assert not template.is_safe("os")
+
+
+class TestSanitizeSysModules:
+    def test_removes_modules_loaded_before_and_after_building(
+        self, restore_sys_modules
+    ):
+        sys.modules["fake_before"] = types.ModuleType("fake_before")
+        sys.modules["fake_allowed.sub"] = types.ModuleType("fake_allowed.sub")
+        template = SandboxTemplate.build(
+            security_config(external_allow={"fake_allowed"})
+        )
+        sys.modules["fake_after"] = types.ModuleType("fake_after")
+        sys.modules["fake_allowed.later"] = types.ModuleType("fake_allowed.later")
+
+        template.sanitize_sys_modules()
+
+        assert "fake_before" not in sys.modules
+        assert "fake_after" not in sys.modules
+        assert "fake_allowed.sub" in sys.modules
+        assert "fake_allowed.later" in sys.modules
+        assert "sys" in sys.modules
+
+
+class TestBuiltins:
+    def test_removes_denied_builtins_and_copies_per_task(self):
+        template = SandboxTemplate.build(security_config(builtins_deny={"open"}))
+
+        first = template.create_builtins()
+        first["len"] = None
+        second = template.create_builtins()
+
+        assert "open" not in second
+        assert second["len"] is len
+
+    def test_import_is_restricted_to_allowlist(self):
+        builtins = SandboxTemplate.build(
+            security_config(stdlib_allow={"json"})
+        ).create_builtins()
+
+        assert builtins["__import__"]("json").__name__ == "json"
+        with pytest.raises(SecurityViolationError):
+            builtins["__import__"]("os")
+
+
+class TestGetTemplate:
+    def test_reuses_template_for_equal_configs(self):
+        first = sandbox.get_template(security_config(stdlib_allow={"json", "math"}))
+        second = sandbox.get_template(security_config(stdlib_allow={"math", "json"}))
+
+        assert first is second
+
+    def test_warm_up_builds_template_from_env(self, monkeypatch):
+        config = security_config(stdlib_allow={"zlib"}, builtins_deny={"input"})
+        for name, value in sandbox.warm_up_env(config).items():
+            monkeypatch.setenv(name, value)
+        monkeypatch.setattr(sandbox, "_templates", {})
+
+        sandbox.warm_up_from_env()
+
+        assert sandbox._templates.keys() == {sandbox._to_template_key(config)}
+        assert not sandbox.warm_up_env(config).keys() & set(os.environ)
@@ -0,0 +1,162 @@
+import json
+import os
+import pickle
+import socket
+from unittest.mock import patch
+
+import pytest
+
+from src import shared_payload
+from src.constants import PIPE_MSG_PREFIX_LENGTH, SHARED_MEMORY_MIN_SIZE
+from src.errors import InvalidPipeMsgContentError
+from src.pipe_reader import PipeReader
+from src.shared_payload import SharedItems
+from src.task_executor import MULTIPROCESSING_CONTEXT, TaskExecutor
+
+
+def _large_items():
+    # distinct strings, so pickle cannot memoize them away
+    return [
+        {"json": {"value": f"{i}-" + "x" * 1024}}
+        for i in range(SHARED_MEMORY_MIN_SIZE // 1024)
+    ]
+
+
+class TestSharedItems:
+    def test_small_items_are_passed_as_is(self):
+        items = [{"json": {"value": 1}}]
+
+        assert shared_payload.share_items(items) is items
+
+    def test_large_items_round_trip(self):
+        items = _large_items()
+
+        shared = shared_payload.share_items(items)
+        try:
+            assert isinstance(shared, SharedItems)
+            assert shared_payload.load_items(shared) == items
+        finally:
+            shared_payload.release_items(shared)
+
+    def test_items_are_sealed(self):
+        shared = shared_payload.share_items(_large_items())
+        assert isinstance(shared, SharedItems)
+
+        try:
+            with pytest.raises(PermissionError):
+                os.pwrite(shared.fd, b"x", 0)
+            with pytest.raises(PermissionError):
+                os.ftruncate(shared.fd, 0)
+        finally:
+            shared_payload.release_items(shared)
+
+    def test_release_closes_fd(self):
+        shared = shared_payload.share_items(_large_items())
+        assert isinstance(shared, SharedItems)
+
+        shared_payload.release_items(shared)
+
+        with pytest.raises(OSError):
+            os.fstat(shared.fd)
+
+    def test_items_are_passed_as_is_without_memory(self):
+        items = _large_items()
+
+        with patch("os.posix_fallocate", side_effect=OSError(28, "No space")):
+            assert shared_payload.share_items(items) is items
+
+
+class TestSharedResult:
+    def test_small_result_goes_through_pipe(self):
+        assert shared_payload.put_result(b"[]") is None
+
+    def test_large_result_is_read_once(self):
+        data = json.dumps({"value": "x" * SHARED_MEMORY_MIN_SIZE}).encode("utf-8")
+
+        fd = shared_payload.put_result(data)
+
+        assert fd is not None
+        assert shared_payload.read_result(fd, len(data)) == data
+        with pytest.raises(OSError):
+            os.fstat(fd)
+
+    def test_rejects_result_shorter_than_announced(self):
+        fd = shared_payload.put_result(b"x" * SHARED_MEMORY_MIN_SIZE)
+        assert fd is not None
+
+        with pytest.raises(InvalidPipeMsgContentError, match="ended after"):
+            shared_payload.read_result(fd, SHARED_MEMORY_MIN_SIZE + 1)
+
+    def test_rejects_fd_other_than_memory_file(self):
+        read_fd, write_fd = os.pipe()
+        os.close(write_fd)
+
+        with pytest.raises(InvalidPipeMsgContentError, match="not a memory file"):
+            shared_payload.read_result(read_fd, 10)
+
+    def test_result_goes_through_pipe_without_memory(self):
+        with patch("os.posix_fallocate", side_effect=OSError(12, "No memory")):
+            assert shared_payload.put_result(b"x" * SHARED_MEMORY_MIN_SIZE) is None
+
+
+class TestSharedResultThroughPipe:
+    def _read(self, write):
+        read_conn, write_conn = MULTIPROCESSING_CONTEXT.Pipe()
+        pipe_reader = PipeReader(read_conn.fileno(), read_conn)
+        pipe_reader.start()
+
+        with write_conn:
+            write(write_conn.fileno())
+
+        pipe_reader.join(timeout=5)
+        return pipe_reader
+
+    def test_large_result_arrives_with_its_memfd(self):
+        message = {
+            "result": [{"value": "x" * SHARED_MEMORY_MIN_SIZE}],
+            "print_args": [],
+        }
+
+        pipe_reader = self._read(
+            lambda fd: TaskExecutor._write_frame(fd, json.dumps(message).encode())
+        )
+
+        assert pipe_reader.error is None
+        assert pipe_reader.pipe_message == message
+        assert not pipe_reader.received_fds
+
+    def test_handle_without_memfd_is_rejected(self):
+        handle = json.dumps({"shm_size": SHARED_MEMORY_MIN_SIZE}).encode()
+        frame = len(handle).to_bytes(PIPE_MSG_PREFIX_LENGTH, "big") + handle
+
+        pipe_reader = self._read(lambda fd: TaskExecutor._write_bytes(fd, frame))
+
+        assert isinstance(pipe_reader.error, InvalidPipeMsgContentError)
+        assert pipe_reader.pipe_message is None
+
+    def test_unhandled_fds_are_closed(self):
+        final = json.dumps({"result": [], "print_args": []}).encode()
+        frame = len(final).to_bytes(PIPE_MSG_PREFIX_LENGTH, "big") + final
+        stray_fd = shared_payload.put_result(pickle.dumps(_large_items()))
+        assert stray_fd is not None
+
+        def write(fd):
+            with socket.socket(fileno=os.dup(fd)) as sock:
+                socket.send_fds(sock, [frame], [stray_fd])
+
+        try:
+            pipe_reader = self._read(write)
+            stat = os.fstat(stray_fd)
+        finally:
+            os.close(stray_fd)
+
+        assert pipe_reader.pipe_message == {"result": [], "print_args": []}
+        assert not pipe_reader.received_fds
+        open_files = set()
+        for name in os.listdir("/proc/self/fd"):
+            try:
+                fd_stat = os.stat(f"/proc/self/fd/{name}")
+            except OSError:
+                continue
+            open_files.add((fd_stat.st_dev, fd_stat.st_ino))
+        assert (stat.st_dev, stat.st_ino) not in open_files
@@ -1,5 +1,12 @@
+import json
+import os
+import stat
+from collections import OrderedDict
+from pathlib import Path
+
 import pytest
 
+from src import task_analyzer
 from src.errors.security_violation_error import SecurityViolationError
 from src.task_analyzer import TaskAnalyzer
 from src.config.security_config import SecurityConfig
@@ -195,3 +202,79 @@ class TestAllowAll(TestTaskAnalyzer):
 
         for code in unsafe_allowed_code:
             analyzer.validate(code)
+
+
+class TestValidationCache(TestTaskAnalyzer):
+    @pytest.fixture(autouse=True)
+    def empty_cache(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(TaskAnalyzer, "_cache", OrderedDict())
+
+    def test_evicts_least_recently_used(
+        self, analyzer: TaskAnalyzer, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        monkeypatch.setattr(task_analyzer, "MAX_VALIDATION_CACHE_SIZE", 2)
+
+        analyzer.validate("a = 1")
+        analyzer.validate("b = 2")
+        analyzer.validate("a = 1")
+        analyzer.validate("c = 3")
+
+        assert len(TaskAnalyzer._cache) == 2
+        analyzer.validate("a = 1")
+        assert analyzer.hits == 2
+        analyzer.validate("b = 2")
+        assert analyzer.misses == 4
+
+    @pytest.mark.asyncio
+    async def test_validate_off_loop_caches_violations(
+        self, analyzer: TaskAnalyzer
+    ) -> None:
+        for _ in range(2):
+            with pytest.raises(SecurityViolationError):
+                await analyzer.validate_off_loop("import os")
+
+        assert analyzer.misses == 1
+        assert analyzer.hits == 1
+
+    def test_save_and_load_round_trip(
+        self, analyzer: TaskAnalyzer, tmp_path: Path
+    ) -> None:
+        path = str(tmp_path / "cache.json")
+        analyzer.validate("a = 1")
+        with pytest.raises(SecurityViolationError):
+            analyzer.validate("import os")
+
+        assert analyzer.save_cache(path) == 2
+        assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+
+        TaskAnalyzer._cache.clear()
+        assert analyzer.load_cache(path) == 2
+
+        analyzer.validate("a = 1")
+        with pytest.raises(SecurityViolationError):
+            analyzer.validate("import os")
+        assert analyzer.hits == 2
+
+    def test_load_ignores_cache_of_other_validator(
+        self, analyzer: TaskAnalyzer, tmp_path: Path
+    ) -> None:
+        path = tmp_path / "cache.json"
+        path.write_text(
+            json.dumps({"fingerprint": "other", "entries": [["hash", [], [], []]]})
+        )
+
+        assert analyzer.load_cache(str(path)) == 0
+        assert len(TaskAnalyzer._cache) == 0
+
+    def test_load_missing_file(self, analyzer: TaskAnalyzer, tmp_path: Path) -> None:
+        assert analyzer.load_cache(str(tmp_path / "missing.json")) == 0
+
+    def test_load_refuses_writable_file(
+        self, analyzer: TaskAnalyzer, tmp_path: Path
+    ) -> None:
+        path = str(tmp_path / "cache.json")
+        analyzer.save_cache(path)
+        os.chmod(path, 0o666)
+
+        with pytest.raises(PermissionError):
+            analyzer.load_cache(path)
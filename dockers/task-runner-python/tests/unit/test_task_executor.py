@@ -1,12 +1,33 @@
+import asyncio
+import logging
 import pytest
+import resource
 import json
+import threading
+import time
 from unittest.mock import MagicMock, patch
 
-from src.task_executor import TaskExecutor
-from src.pipe_reader import PipeReader
-from src.errors import TaskCancelledError, TaskKilledError, TaskSubprocessFailedError
-from src.constants import SIGTERM_EXIT_CODE, SIGKILL_EXIT_CODE, PIPE_MSG_PREFIX_LENGTH
+from src.config.security_config import SecurityConfig
+from src.task_executor import MULTIPROCESSING_CONTEXT, TaskExecutor, TaskOutput
+from src import shared_payload
+from src.pipe_reader import AsyncPipeReader, PipeReader
+from src.errors import (
+    InvalidPipeMsgContentError,
+    TaskCancelledError,
+    TaskKilledError,
+    TaskResultMissingError,
+    TaskResultReadError,
+    TaskSubprocessFailedError,
+)
+from src.constants import (
+    SIGTERM_EXIT_CODE,
+    SIGKILL_EXIT_CODE,
+    PIPE_MSG_PREFIX_LENGTH,
+    PIPE_RESULT_CHUNK_PREFIX,
+    PIPE_RESULT_CHUNK_SUFFIX,
+)
 from src.message_types.pipe import (
+    EncodedItems,
     PipeResultMessage,
     PipeErrorMessage,
     TaskErrorInfo,
@@ -96,8 +117,15 @@ class TestTaskExecutorProcessExitHandling:
 
 
 class TestTaskExecutorPipeCommunication:
-    @patch("os.read")
-    def test_successful_result_communication(self, mock_os_read):
+    @staticmethod
+    def _read_conn_with_input(*parts: bytes):
+        read_conn, write_conn = MULTIPROCESSING_CONTEXT.Pipe()
+        with write_conn:
+            for part in parts:
+                TaskExecutor._write_bytes(write_conn.fileno(), part)
+        return read_conn
+
+    def test_successful_result_communication(self):
         result_data: PipeResultMessage = {
             "result": [{"json": {"foo": "bar"}}],
             "print_args": [],
@@ -105,17 +133,15 @@ class TestTaskExecutorPipeCommunication:
         result_json = json.dumps(result_data).encode("utf-8")
         result_length = len(result_json).to_bytes(PIPE_MSG_PREFIX_LENGTH, "big")
 
-        mock_os_read.side_effect = [result_length, result_json]
+        read_conn = self._read_conn_with_input(result_length, result_json)
 
         process = MagicMock()
         process.is_alive.return_value = False
         process.exitcode = 0
 
-        read_conn = MagicMock()
         write_conn = MagicMock()
-        read_conn.fileno.return_value = 999
 
-        result, print_args, size = TaskExecutor.execute_process(
+        result, print_args, size, *_ = TaskExecutor.execute_process(
             process=process,
             read_conn=read_conn,
             write_conn=write_conn,
@@ -128,8 +154,73 @@ class TestTaskExecutorPipeCommunication:
         assert print_args == []
         assert size == len(result_json)
 
-    @patch("os.read")
-    def test_successful_error_communication(self, mock_os_read):
+    def test_streamed_result_chunks_are_kept_encoded(self):
+        chunk = b'{"result_chunk":[{"json": {"a": 1}},{"json": {"b": 2}}]}'
+        final = json.dumps({"result": [], "print_args": [], "peak_rss": 1024})
+        final_bytes = final.encode("utf-8")
+
+        read_conn = self._read_conn_with_input(
+            len(chunk).to_bytes(PIPE_MSG_PREFIX_LENGTH, "big"),
+            chunk,
+            len(final_bytes).to_bytes(PIPE_MSG_PREFIX_LENGTH, "big"),
+            final_bytes,
+        )
+
+        process = MagicMock()
+        process.is_alive.return_value = False
+        process.exitcode = 0
+
+        output = TaskExecutor.execute_process(
+            process=process,
+            read_conn=read_conn,
+            write_conn=MagicMock(),
+            task_timeout=60,
+            pipe_reader_timeout=3.0,
+            continue_on_fail=False,
+        )
+
+        assert isinstance(output.result, EncodedItems)
+        assert [bytes(c) for c in output.result.chunks] == [
+            b'{"json": {"a": 1}},{"json": {"b": 2}}'
+        ]
+        assert output.result_size_bytes == len(chunk) + len(final_bytes)
+        assert output.peak_rss_bytes == 1024
+
+    @pytest.mark.parametrize(
+        "chunk",
+        [
+            b'{"json": {"a": 1}}], "injected": [1',  # closes the result list
+            b'{"json": {"a": 1}',
+            b"",
+        ],
+    )
+    def test_invalid_result_chunks_are_rejected(self, chunk):
+        frame = PIPE_RESULT_CHUNK_PREFIX + chunk + PIPE_RESULT_CHUNK_SUFFIX
+        final = json.dumps({"result": [], "print_args": []}).encode("utf-8")
+        read_conn = self._read_conn_with_input(
+            len(frame).to_bytes(PIPE_MSG_PREFIX_LENGTH, "big"),
+            frame,
+            len(final).to_bytes(PIPE_MSG_PREFIX_LENGTH, "big"),
+            final,
+        )
+
+        process = MagicMock()
+        process.is_alive.return_value = False
+        process.exitcode = 0
+
+        with pytest.raises(TaskResultReadError) as exc_info:
+            TaskExecutor.execute_process(
+                process=process,
+                read_conn=read_conn,
+                write_conn=MagicMock(),
+                task_timeout=60,
+                pipe_reader_timeout=3.0,
+                continue_on_fail=False,
+            )
+
+        assert isinstance(exc_info.value.original_error, InvalidPipeMsgContentError)
+
+    def test_successful_error_communication(self):
         from src.errors import TaskRuntimeError
 
         error_info: TaskErrorInfo = {
@@ -145,15 +236,13 @@ class TestTaskExecutorPipeCommunication:
         error_json = json.dumps(error_data).encode("utf-8")
         error_length = len(error_json).to_bytes(PIPE_MSG_PREFIX_LENGTH, "big")
 
-        mock_os_read.side_effect = [error_length, error_json]
+        read_conn = self._read_conn_with_input(error_length, error_json)
 
         process = MagicMock()
         process.is_alive.return_value = False
         process.exitcode = 0
 
-        read_conn = MagicMock()
         write_conn = MagicMock()
-        read_conn.fileno.return_value = 999
 
         with pytest.raises(TaskRuntimeError) as exc_info:
             TaskExecutor.execute_process(
@@ -169,32 +258,179 @@ class TestTaskExecutorPipeCommunication:
         assert exc_info.value.stack_trace == "traceback..."
 
 
+class TestAsyncPipeReader:
+    @staticmethod
+    def _frame(data: bytes) -> bytes:
+        return len(data).to_bytes(PIPE_MSG_PREFIX_LENGTH, "big") + data
+
+    @pytest.mark.asyncio
+    async def test_reads_frames_larger_than_pipe_buffer(self):
+        chunk = b'{"result_chunk":[' + b'{"json": {"a": "' + b"x" * 500_000 + b'"}}]}'
+        final = json.dumps({"result": [], "print_args": [["hi"]]}).encode()
+        read_conn, write_conn = MULTIPROCESSING_CONTEXT.Pipe()
+
+        pipe_reader = AsyncPipeReader(read_conn)
+        pipe_reader.start()
+
+        def write():
+            with write_conn:
+                TaskExecutor._write_bytes(
+                    write_conn.fileno(), self._frame(chunk) + self._frame(final)
+                )
+
+        writer = threading.Thread(target=write)
+        writer.start()
+        await asyncio.wait_for(pipe_reader.done, timeout=5)
+        writer.join()
+
+        assert pipe_reader.error is None
+        assert read_conn.closed
+        assert pipe_reader.pipe_message == {"result": [], "print_args": [["hi"]]}
+        assert bytes(pipe_reader.result_chunks[0]) == chunk[17:-2]
+        assert pipe_reader.message_size == len(chunk) + len(final)
+
+    @pytest.mark.asyncio
+    async def test_event_loop_stays_responsive_while_frames_are_handled(self):
+        message = {"result": [{"data": "x" * 2_000_000}], "print_args": []}
+        read_conn, write_conn = MULTIPROCESSING_CONTEXT.Pipe()
+        read_result = shared_payload.read_result
+
+        def read_result_slowly(fd, size):
+            time.sleep(0.5)  # as copying a memfd of several GB would
+            return read_result(fd, size)
+
+        pipe_reader = AsyncPipeReader(read_conn)
+        pipe_reader.start()
+        gaps = []
+
+        async def tick():
+            while not pipe_reader.done.done():
+                started_at = time.perf_counter()
+                await asyncio.sleep(0.01)
+                gaps.append(time.perf_counter() - started_at)
+
+        with patch.object(shared_payload, "read_result", read_result_slowly):
+            with write_conn:
+                TaskExecutor._write_frame(
+                    write_conn.fileno(), json.dumps(message).encode()
+                )
+            await asyncio.gather(tick(), asyncio.wait_for(pipe_reader.done, 5))
+
+        assert pipe_reader.error is None
+        assert pipe_reader.pipe_message == message
+        assert max(gaps) < 0.25
+
+    @pytest.mark.asyncio
+    async def test_pipe_closed_mid_frame_sets_error(self):
+        read_conn, write_conn = MULTIPROCESSING_CONTEXT.Pipe()
+
+        pipe_reader = AsyncPipeReader(read_conn)
+        pipe_reader.start()
+
+        with write_conn:
+            TaskExecutor._write_bytes(write_conn.fileno(), self._frame(b"{}")[:-1])
+
+        await asyncio.wait_for(pipe_reader.done, timeout=5)
+
+        assert isinstance(pipe_reader.error, EOFError)
+        assert pipe_reader.pipe_message is None
+
+
+class TestPipeReaderDeadline:
+    FINAL = json.dumps({"result": [{"a": 1}], "print_args": []}).encode()
+
+    @staticmethod
+    def _frame(data: bytes) -> bytes:
+        return len(data).to_bytes(PIPE_MSG_PREFIX_LENGTH, "big") + data
+
+    def test_finish_timeout_grows_with_announced_unread_bytes(self):
+        pipe_reader = PipeReader(999, MagicMock())
+        base = pipe_reader.finish_timeout(1.0)
+
+        pipe_reader._start_frame(500_000_000)
+        pipe_reader._count_read(100_000_000)
+
+        assert base == 1.0
+        assert pipe_reader.finish_timeout(1.0) == pytest.approx(1.0 + 9.0)
+
+    def test_waits_past_base_timeout_while_reader_makes_progress(self):
+        read_conn, write_conn = MULTIPROCESSING_CONTEXT.Pipe()
+        pipe_reader = PipeReader(read_conn.fileno(), read_conn)
+        pipe_reader.start()
+        frame = self._frame(self.FINAL)
+
+        def write_slowly():
+            with write_conn:
+                for byte in frame:
+                    TaskExecutor._write_bytes(write_conn.fileno(), bytes([byte]))
+                    time.sleep(0.01)
+
+        writer = threading.Thread(target=write_slowly)
+        writer.start()
+        output = TaskExecutor._read_result(pipe_reader, read_conn, 0.1)
+        writer.join()
+
+        assert output.result == [{"a": 1}]
+
+    def test_gives_up_once_reader_stalls(self, caplog):
+        read_conn, write_conn = MULTIPROCESSING_CONTEXT.Pipe()
+        pipe_reader = PipeReader(read_conn.fileno(), read_conn)
+        pipe_reader.start()
+        frame = self._frame(self.FINAL)
+
+        with write_conn:
+            TaskExecutor._write_bytes(write_conn.fileno(), frame[:10])
+
+            with caplog.at_level(logging.WARNING):
+                with pytest.raises(TaskResultMissingError):
+                    TaskExecutor._read_result(pipe_reader, read_conn, 0.1)
+
+        pipe_reader.join(timeout=5)
+        unread = len(self.FINAL) - (10 - PIPE_MSG_PREFIX_LENGTH)
+        assert f"{unread} of {len(self.FINAL)} announced bytes unread" in caplog.text
+
+
 class TestTaskExecutorLowLevelIO:
-    @patch("os.read")
-    def test_read_exact_bytes_single_read(self, mock_os_read):
+    @staticmethod
+    def _reader_with_input(*parts: bytes) -> PipeReader:
+        read_conn, write_conn = MULTIPROCESSING_CONTEXT.Pipe()
+        with write_conn:
+            for part in parts:
+                TaskExecutor._write_bytes(write_conn.fileno(), part)
+        pipe_reader = PipeReader(read_conn.fileno(), read_conn)
+        pipe_reader._open_socket()
+        return pipe_reader
+
+    def test_read_exact_bytes_single_read(self):
         data = b"test data"
-        mock_os_read.return_value = data
+        pipe_reader = self._reader_with_input(data)
 
-        result = PipeReader._read_exact_bytes(999, len(data))
+        result = pipe_reader._read_exact_bytes(len(data))
 
         assert result == data
-        mock_os_read.assert_called_once_with(999, len(data))
+        pipe_reader._close_socket()
 
-    @patch("os.read")
-    def test_read_exact_bytes_multiple_reads(self, mock_os_read):
-        mock_os_read.side_effect = [b"test", b" ", b"data"]
+    def test_read_exact_bytes_multiple_reads(self):
+        pipe_reader = self._reader_with_input(b"test", b" ", b"data")
+        reads = []
 
-        result = PipeReader._read_exact_bytes(999, 9)
+        with patch.object(
+            pipe_reader,
+            "_recv_into",
+            side_effect=lambda view: pipe_reader.sock.recv_into(view[:4]),
+        ):
+            result = pipe_reader._read_exact_bytes(9, on_read=reads.append)
 
         assert result == b"test data"
-        assert mock_os_read.call_count == 3
+        assert reads == [4, 4, 1]
+        pipe_reader._close_socket()
 
-    @patch("os.read")
-    def test_read_exact_bytes_eof_error(self, mock_os_read):
-        mock_os_read.side_effect = [b"test", b""]  # empty for EOF
+    def test_read_exact_bytes_eof_error(self):
+        pipe_reader = self._reader_with_input(b"test")
 
         with pytest.raises(EOFError, match="Pipe closed before reading all data"):
-            PipeReader._read_exact_bytes(999, 10)
+            pipe_reader._read_exact_bytes(10)
+        pipe_reader._close_socket()
 
     @patch("os.write")
     def test_write_bytes_write_failure(self, mock_os_write):
@@ -202,3 +438,142 @@ class TestTaskExecutorLowLevelIO:
 
         with pytest.raises(OSError, match="Write failed"):
             TaskExecutor._write_bytes(999, b"test data")
+
+
+class TestResourceLimits:
+    CONFIG = SecurityConfig(
+        stdlib_allow=set(),
+        external_allow=set(),
+        builtins_deny=set(),
+        runner_env_deny=False,
+        task_max_memory_bytes=256 * 1024 * 1024,
+        task_max_cpu_seconds=10,
+    )
+
+    @staticmethod
+    def _apply(in_worker: bool, hard: int = resource.RLIM_INFINITY) -> dict:
+        usage = MagicMock(ru_utime=2.2, ru_stime=0.4)
+        with (
+            patch("resource.getrlimit", return_value=(hard, hard)),
+            patch("resource.getrusage", return_value=usage),
+            patch("resource.setrlimit") as setrlimit,
+        ):
+            TaskExecutor._apply_resource_limits(TestResourceLimits.CONFIG, in_worker)
+
+        return dict(c.args for c in setrlimit.call_args_list)
+
+    def test_per_task_process_lowers_hard_limits(self):
+        limits = self._apply(in_worker=False)
+
+        memory = 256 * 1024 * 1024
+        assert limits[resource.RLIMIT_AS] == (memory, memory)
+        assert limits[resource.RLIMIT_CPU] == (13, 14)
+
+    def test_pooled_worker_keeps_hard_limits(self):
+        limits = self._apply(in_worker=True)
+
+        infinity = resource.RLIM_INFINITY
+        assert limits[resource.RLIMIT_AS] == (256 * 1024 * 1024, infinity)
+        assert limits[resource.RLIMIT_CPU] == (13, infinity)
+
+    def test_limits_stay_within_current_hard_limit(self):
+        limits = self._apply(in_worker=False, hard=12)
+
+        assert limits[resource.RLIMIT_AS] == (12, 12)
+        assert limits[resource.RLIMIT_CPU] == (12, 12)
+
+
+class TestResultChunks:
+    @staticmethod
+    def _chunks(result: list, chunk_size: int) -> list[bytes]:
+        chunks = []
+        with (
+            patch("src.task_executor.PIPE_RESULT_CHUNK_SIZE", chunk_size),
+            patch.object(
+                TaskExecutor,
+                "_write_result_chunk",
+                side_effect=lambda _, parts: chunks.append(b",".join(parts)),
+            ),
+        ):
+            TaskExecutor._put_result_chunks(999, result)
+        return chunks
+
+    def test_chunks_stay_within_size_across_a_batch(self):
+        result = [{"json": {"i": i, "data": "x" * 300}} for i in range(50)]
+
+        chunks = self._chunks(result, chunk_size=1000)
+
+        assert len(chunks) > 1
+        assert all(len(chunk) <= 1000 for chunk in chunks)
+        assert json.loads(b"[" + b",".join(chunks) + b"]") == result
+
+    def test_item_larger_than_chunk_size_is_a_chunk_of_its_own(self):
+        result = [
+            {"json": {"i": 0}},
+            {"json": {"data": "x" * 5000}},
+            {"json": {"i": 2}},
+        ]
+
+        chunks = self._chunks(result, chunk_size=1000)
+
+        assert [json.loads(b"[" + chunk + b"]") for chunk in chunks] == [
+            result[:1],
+            result[1:2],
+            result[2:],
+        ]
+
+
+class TestChunkProcesses:
+    def test_split_items_keeps_first_indexes(self):
+        items = [{"json": {"i": i}} for i in range(10)]
+
+        chunks = TaskExecutor.split_items(items, chunk_count=4)
+
+        assert [first_index for first_index, _ in chunks] == [0, 3, 6, 9]
+        assert [item for _, chunk in chunks for item in chunk] == items
+
+    @staticmethod
+    async def _supervise(outcomes: dict) -> TaskOutput:
+        stopped = {process: asyncio.Event() for process in outcomes}
+
+        async def supervise_process(process, *_):
+            outcome = outcomes[process]
+            if outcome is None:
+                await stopped[process].wait()
+                raise TaskCancelledError()
+            if isinstance(outcome, Exception):
+                raise outcome
+            return TaskOutput(outcome, [], 1, None)
+
+        def stop_process(process):
+            stopped[process].set()
+
+        with (
+            patch.object(TaskExecutor, "supervise_process", supervise_process),
+            patch.object(TaskExecutor, "stop_process", side_effect=stop_process),
+        ):
+            return await TaskExecutor.supervise_chunk_processes(
+                chunks=[(process, None, None) for process in outcomes],
+                task_timeout=60,
+                pipe_reader_timeout=3.0,
+                continue_on_fail=False,
+            )
+
+    @pytest.mark.asyncio
+    async def test_merges_results_in_chunk_order(self):
+        output = await self._supervise(
+            {"chunk-0": [{"json": {"i": 0}}], "chunk-1": [{"json": {"i": 1}}]}
+        )
+
+        assert output.result == [{"json": {"i": 0}}, {"json": {"i": 1}}]
+        assert output.result_size_bytes == 2
+
+    @pytest.mark.asyncio
+    async def test_first_failing_chunk_stops_the_others(self):
+        with pytest.raises(TaskSubprocessFailedError):
+            await asyncio.wait_for(
+                self._supervise(
+                    {"chunk-0": None, "chunk-1": TaskSubprocessFailedError(1)}
+                ),
+                timeout=1,
+            )
@@ -0,0 +1,71 @@
+from src.task_profiler import TaskProfiler, format_profile, merge_profiles
+
+
+def entry(function: str, calls: int, own: float, cumulative: float) -> dict:
+    return {
+        "function": function,
+        "calls": calls,
+        "own_seconds": own,
+        "cumulative_seconds": cumulative,
+    }
+
+
+class TestTaskProfiler:
+    def test_reports_top_functions_by_cumulative_time(self):
+        def inner():
+            return sum(range(10_000))
+
+        def outer():
+            return [inner() for _ in range(3)]
+
+        profiler = TaskProfiler(top=2)
+        with profiler:
+            outer()
+
+        profile = profiler.summarize()
+
+        assert profile is not None
+        assert [e["function"].split(" ")[0] for e in profile] == ["outer", "inner"]
+        assert profile[1]["calls"] == 3
+        assert profile[0]["cumulative_seconds"] >= profile[1]["cumulative_seconds"]
+
+    def test_leaves_out_its_own_frames(self):
+        profiler = TaskProfiler(top=50)
+        with profiler:
+            len([])
+
+        functions = [e["function"] for e in profiler.summarize() or []]
+
+        assert functions == ["<built-in method builtins.len>"]
+
+    def test_disabled_without_top(self):
+        profiler = TaskProfiler(top=0)
+        with profiler:
+            len([])
+
+        assert profiler.profiler is None
+        assert profiler.summarize() is None
+
+
+class TestMergeProfiles:
+    def test_sums_chunks_and_keeps_top(self):
+        merged = merge_profiles(
+            [
+                [entry("a", 1, 0.1, 0.4), entry("b", 2, 0.2, 0.2)],
+                None,
+                [entry("b", 3, 0.3, 0.3), entry("c", 1, 0.1, 0.1)],
+            ]
+        )
+
+        assert merged == [entry("b", 5, 0.5, 0.5), entry("a", 1, 0.1, 0.4)]
+
+    def test_none_without_profiles(self):
+        assert merge_profiles([None, None]) is None
+
+
+def test_format_profile_lists_one_function_per_line():
+    text = format_profile([entry("a", 1, 0.1, 0.4), entry("b", 2, 0.2, 0.2)])
+
+    assert text.splitlines()[0].endswith("a")
+    assert "0.400s cumulative" in text.splitlines()[0]
+    assert len(text.splitlines()) == 2
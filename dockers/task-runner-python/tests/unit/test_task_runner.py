@@ -1,29 +1,52 @@
+import asyncio
+import time
+
 import pytest
-from unittest.mock import patch, Mock
+from unittest.mock import AsyncMock, patch, Mock
 from websockets.exceptions import InvalidStatus
 
-from src.task_runner import TaskRunner
+from src.message_types.runner import RunnerTaskError
+from src.task_runner import TaskOffer, TaskRunner
+from src.task_executor import TaskExecutor, TaskOutput, TaskTimings
+from src.errors import TaskCancelledError
+from src.task_state import TaskState, TaskStatus
 from src.config.task_runner_config import TaskRunnerConfig
 
 
-class TestTaskRunnerConnectionRetry:
-    @pytest.fixture
-    def config(self):
-        return TaskRunnerConfig(
-            grant_token="test-token",
-            task_broker_uri="http://127.0.0.1:5679",
-            max_concurrency=5,
-            max_payload_size=1024 * 1024,
-            task_timeout=60,
-            auto_shutdown_timeout=0,
-            graceful_shutdown_timeout=10,
-            stdlib_allow={"*"},
-            external_allow={"*"},
-            builtins_deny=set(),
-            env_deny=False,
-            pipe_reader_timeout=3.0,
-        )
+@pytest.fixture
+def config():
+    return TaskRunnerConfig(
+        grant_token="test-token",
+        task_broker_uri="http://127.0.0.1:5679",
+        max_concurrency=5,
+        max_payload_size=1024 * 1024,
+        task_timeout=60,
+        auto_shutdown_timeout=0,
+        graceful_shutdown_timeout=10,
+        stdlib_allow={"*"},
+        external_allow={"*"},
+        builtins_deny=set(),
+        env_deny=False,
+        pipe_reader_timeout=3.0,
+        preload_modules=[],
+        worker_pool_enabled=False,
+        worker_max_tasks=100,
+        worker_max_memory_mb=512,
+        per_item_parallel_min_items=0,
+        per_item_parallel_processes=4,
+        max_memory_mb=0,
+        task_max_memory_mb=0,
+        task_max_cpu_seconds=0,
+        validation_cache_file="",
+        processes=1,
+        auth_token="",
+        profile_workflow_ids=set(),
+        profile_sample_rate=0.0,
+        profile_top=20,
+    )
+
 
+class TestTaskRunnerConnectionRetry:
     @pytest.mark.asyncio
     async def test_connection_failure_logs_warning_not_crash(self, config):
         runner = TaskRunner(config)
@@ -68,3 +91,203 @@ class TestTaskRunnerConnectionRetry:
             assert "Authentication failed with status 403" in args
 
             assert mock_connect.call_count == 1
+
+
+class TestTaskRunnerOffers:
+    @pytest.mark.asyncio
+    async def test_capacity_change_wakes_offers_loop(self, config):
+        runner = TaskRunner(config)
+        asyncio.get_running_loop().call_later(0.01, runner.capacity_changed.set)
+
+        started_at = time.perf_counter()
+        await runner._wait_for_offers_trigger()
+
+        assert time.perf_counter() - started_at < 0.5
+
+    @pytest.mark.asyncio
+    async def test_offer_expiry_wakes_offers_loop(self, config):
+        runner = TaskRunner(config)
+        runner.open_offers["offer-1"] = TaskOffer("offer-1", time.time() + 0.05)
+
+        started_at = time.perf_counter()
+        await runner._wait_for_offers_trigger()
+
+        assert runner.open_offers["offer-1"].has_expired
+        assert time.perf_counter() - started_at < 0.5
+
+
+class TestTaskRunnerProfiling:
+    def test_profiles_allowlisted_workflows_only(self, config):
+        config.profile_workflow_ids = {"wf-1"}
+        runner = TaskRunner(config)
+        task_state = TaskState("task-1")
+
+        task_state.workflow_id = "wf-1"
+        assert runner._get_profile_top(task_state) == 20
+
+        task_state.workflow_id = "wf-2"
+        assert runner._get_profile_top(task_state) == 0
+
+    def test_profiles_sampled_tasks(self, config):
+        config.profile_sample_rate = 1.0
+        runner = TaskRunner(config)
+
+        assert runner._get_profile_top(TaskState("task-1")) == 20
+
+    def test_keeps_recent_profiles_newest_first(self, config, caplog):
+        runner = TaskRunner(config)
+        task_state = TaskState("task-1")
+        task_state.workflow_id = "wf-1"
+        profile = [
+            {
+                "function": "_user_function (<all_items_task_execution>:1)",
+                "calls": 1,
+                "own_seconds": 0.5,
+                "cumulative_seconds": 1.5,
+            }
+        ]
+        output = TaskOutput([], [], 0, None, TaskTimings(exec_seconds=1.5), profile)
+
+        with caplog.at_level("INFO"):
+            runner._record_profile("task-1", task_state, output)
+            runner._record_profile("task-2", task_state, output)
+
+        profiles = runner.get_profiles()
+        assert [p["task_id"] for p in profiles] == ["task-2", "task-1"]
+        assert profiles[0]["workflow_id"] == "wf-1"
+        assert profiles[0]["functions"] == profile
+        assert "Profiled task task-1" in caplog.text
+        assert "user code ran 1500ms" in caplog.text
+
+
+class TestTaskRunnerCancelDuringSetup:
+    @staticmethod
+    def _running_task() -> TaskState:
+        task_state = TaskState("task-1")
+        task_state.status = TaskStatus.RUNNING
+        return task_state
+
+    @pytest.mark.asyncio
+    async def test_cancel_while_acquiring_worker_releases_it(self, config):
+        runner = TaskRunner(config)
+        task_state = self._running_task()
+        worker = Mock()
+
+        def acquire():
+            task_state.status = TaskStatus.ABORTING
+            return worker
+
+        runner.worker_pool = Mock()
+        runner.worker_pool.acquire.side_effect = acquire
+
+        with pytest.raises(TaskCancelledError):
+            await runner._execute_on_worker(task_state, Mock(), [], None, 0)
+
+        runner.worker_pool.release.assert_called_once_with(worker)
+        runner.worker_pool.execute_task.assert_not_called()
+        assert task_state.process is None
+
+    @pytest.mark.asyncio
+    async def test_cancel_while_sharing_items_starts_no_process(self, config):
+        runner = TaskRunner(config)
+        runner.executor = Mock()
+        task_state = self._running_task()
+
+        def share_items(items):
+            task_state.status = TaskStatus.ABORTING
+            return items
+
+        with patch("src.shared_payload.share_items", side_effect=share_items):
+            with pytest.raises(TaskCancelledError):
+                await runner._execute_in_process(task_state, Mock(), None, 0)
+
+        runner.executor.create_process.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_cancel_while_queued_for_memory_ends_task(self, config):
+        config.max_memory_mb = 100
+        runner = TaskRunner(config)
+        runner.admission.reservations["task-0"] = 90 * 1024 * 1024
+        runner.running_tasks["task-1"] = self._running_task()
+        runner.analyzer = Mock(validate_off_loop=AsyncMock())
+        runner._send_message = AsyncMock()
+        task_settings = Mock(payload_size=5 * 1024 * 1024)
+
+        with (
+            patch("src.admission_control._current_rss_bytes", return_value=0),
+            patch.object(runner, "_get_bytecode", AsyncMock()),
+        ):
+            execution = asyncio.create_task(
+                runner._execute_task("task-1", task_settings)
+            )
+            await asyncio.sleep(0.01)
+            assert runner.admission.queued_tasks == 1
+
+            await runner._handle_task_cancel(Mock(task_id="task-1"))
+            await asyncio.wait_for(execution, timeout=1)
+
+        (response,) = runner._send_message.call_args[0]
+        assert isinstance(response, RunnerTaskError)
+        assert response.error == {"message": "Task was cancelled"}
+        assert "task-1" not in runner.admission.reservations
+
+
+class TestTaskRunnerChunks:
+    @pytest.fixture
+    def chunked_config(self, config):
+        config.per_item_parallel_min_items = 4
+        config.per_item_parallel_processes = 2
+        return config
+
+    @staticmethod
+    def _settings(item_count: int) -> Mock:
+        items = [{"json": {"i": i}} for i in range(item_count)]
+        return Mock(node_mode="per_item", items=items, payload_size=1024)
+
+    @pytest.mark.asyncio
+    async def test_reserves_memory_for_every_chunk(self, chunked_config):
+        chunked_config.max_memory_mb = 100
+        runner = TaskRunner(chunked_config)
+        runner.running_tasks["task-1"] = TaskState("task-1")
+        runner.analyzer = Mock(validate_off_loop=AsyncMock())
+        runner.admission.reserve = AsyncMock(side_effect=TaskCancelledError())
+        runner._send_message = AsyncMock()
+
+        with patch.object(runner, "_get_bytecode", AsyncMock()):
+            await runner._execute_task("task-1", self._settings(4))
+
+        (_, required_bytes, _), kwargs = runner.admission.reserve.call_args
+        assert required_bytes == 2 * runner.admission.estimate(1024)
+        assert kwargs == {"resident_bytes": 1024}
+
+    @pytest.mark.asyncio
+    async def test_chunks_share_their_items_and_release_them(self, chunked_config):
+        runner = TaskRunner(chunked_config)
+        runner.executor = Mock(split_items=TaskExecutor.split_items)
+        runner.executor.create_process.side_effect = lambda **kwargs: (
+            kwargs["first_index"],
+            None,
+            None,
+        )
+        runner.executor.supervise_chunk_processes = AsyncMock()
+        task_state = TaskState("task-1")
+        task_settings = self._settings(4)
+        chunks = runner._split_per_item(task_settings)
+        assert chunks is not None
+
+        with (
+            patch(
+                "src.shared_payload.share_items",
+                side_effect=lambda items: ("shared", items[0]["json"]["i"]),
+            ),
+            patch("src.shared_payload.release_items") as release_items,
+        ):
+            await runner._execute_in_chunks(task_state, task_settings, chunks, None, 0)
+
+        created = runner.executor.create_process.call_args_list
+        assert [c.kwargs["items"] for c in created] == [("shared", 0), ("shared", 2)]
+        assert task_state.chunk_processes == [0, 2]
+        assert [c.args[0] for c in release_items.call_args_list] == [
+            ("shared", 0),
+            ("shared", 2),
+        ]
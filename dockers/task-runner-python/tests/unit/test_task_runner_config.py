@@ -0,0 +1,82 @@
+import pytest
+
+from src.config.task_runner_config import TaskRunnerConfig, parse_preload_modules
+from src.errors import ConfigurationError
+
+
+class TestParsePreloadModules:
+    def test_unset_preloads_nothing(self):
+        assert parse_preload_modules(None, {"json", "math"}, {"numpy"}) == []
+
+    def test_empty_value_preloads_nothing(self):
+        assert parse_preload_modules("", {"json"}, {"numpy"}) == []
+
+    def test_explicit_list(self):
+        assert parse_preload_modules(" numpy ,json", {"json", "math"}, {"numpy"}) == [
+            "json",
+            "numpy",
+        ]
+
+    def test_explicit_list_accepts_modules_allowed_by_wildcard(self):
+        assert parse_preload_modules("pandas", set(), {"*"}) == ["pandas"]
+
+    def test_rejects_modules_that_are_not_allowlisted(self):
+        with pytest.raises(ConfigurationError, match="'os'"):
+            parse_preload_modules("json,os", {"json"}, set())
+
+    def test_rejects_wildcard(self):
+        with pytest.raises(ConfigurationError, match="Wildcard"):
+            parse_preload_modules("*", {"*"}, {"*"})
+
+
+class TestRunnerProcesses:
+    def test_single_process_requires_grant_token(self, monkeypatch):
+        monkeypatch.delenv("N8N_RUNNERS_GRANT_TOKEN", raising=False)
+        monkeypatch.setenv("N8N_RUNNERS_AUTH_TOKEN", "auth_token")
+
+        with pytest.raises(ConfigurationError, match="N8N_RUNNERS_GRANT_TOKEN"):
+            TaskRunnerConfig.from_env()
+
+    def test_several_processes_require_auth_token(self, monkeypatch):
+        monkeypatch.setenv("N8N_RUNNERS_GRANT_TOKEN", "grant_token")
+        monkeypatch.delenv("N8N_RUNNERS_AUTH_TOKEN", raising=False)
+        monkeypatch.setenv("N8N_RUNNERS_PROCESSES", "4")
+
+        with pytest.raises(ConfigurationError, match="N8N_RUNNERS_AUTH_TOKEN"):
+            TaskRunnerConfig.from_env()
+
+    def test_several_processes_with_auth_token(self, monkeypatch):
+        monkeypatch.delenv("N8N_RUNNERS_GRANT_TOKEN", raising=False)
+        monkeypatch.setenv("N8N_RUNNERS_AUTH_TOKEN", "auth_token")
+        monkeypatch.setenv("N8N_RUNNERS_PROCESSES", "4")
+
+        config = TaskRunnerConfig.from_env()
+
+        assert config.processes == 4
+        assert config.is_supervisor
+
+    def test_rejects_zero_processes(self, monkeypatch):
+        monkeypatch.setenv("N8N_RUNNERS_GRANT_TOKEN", "grant_token")
+        monkeypatch.setenv("N8N_RUNNERS_PROCESSES", "0")
+
+        with pytest.raises(ConfigurationError, match="at least 1"):
+            TaskRunnerConfig.from_env()
+
+
+class TestProfiling:
+    def test_parses_workflow_allowlist(self, monkeypatch):
+        monkeypatch.setenv("N8N_RUNNERS_GRANT_TOKEN", "grant_token")
+        monkeypatch.setenv("N8N_RUNNERS_PROFILE_WORKFLOWS", " wf-1, ,wf-2")
+        monkeypatch.setenv("N8N_RUNNERS_PROFILE_SAMPLE_RATE", "0.25")
+
+        config = TaskRunnerConfig.from_env()
+
+        assert config.profile_workflow_ids == {"wf-1", "wf-2"}
+        assert config.profile_sample_rate == 0.25
+
+    def test_rejects_sample_rate_above_one(self, monkeypatch):
+        monkeypatch.setenv("N8N_RUNNERS_GRANT_TOKEN", "grant_token")
+        monkeypatch.setenv("N8N_RUNNERS_PROFILE_SAMPLE_RATE", "2")
+
+        with pytest.raises(ConfigurationError, match="between 0 and 1"):
+            TaskRunnerConfig.from_env()
@@ -0,0 +1,36 @@
+import json
+
+from src.worker_pool import _is_namespace_changed, _StateSnapshot
+
+
+class TestIsNamespaceChanged:
+    def test_unchanged(self):
+        value = object()
+        assert not _is_namespace_changed({"a": value}, {"a": value})
+
+    def test_rebound_attribute(self):
+        assert _is_namespace_changed({"a": object()}, {"a": object()})
+
+    def test_added_attribute(self):
+        assert _is_namespace_changed({}, {"a": 1})
+
+    def test_removed_attribute(self):
+        assert _is_namespace_changed({"a": 1}, {})
+
+    def test_ignores_warning_registry(self):
+        assert not _is_namespace_changed({}, {"__warningregistry__": {}})
+
+
+class TestStateSnapshot:
+    def test_detects_module_attribute_change(self):
+        snapshot = _StateSnapshot()
+        assert not snapshot.is_changed()
+
+        original = json.dumps
+        json.dumps = lambda *args, **kwargs: ""
+        try:
+            assert snapshot.is_changed()
+        finally:
+            json.dumps = original
+
+        assert not snapshot.is_changed()